@@ -21,4 +21,11 @@
 # SOFTWARE.
 
 
-from gchaos.install import install_chaos
+def install_chaos(config=None):
+    """Install the chaos hooks, see gchaos.install.install_chaos. The config
+    and hooks are only imported when this is called so importing gchaos
+    doesn't slow down loading requests.
+    """
+    from gchaos.install import install_chaos as install
+
+    install(config)
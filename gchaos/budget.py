@@ -0,0 +1,264 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import logging
+
+from contextlib import contextmanager
+from threading import local
+
+from gchaos.log import logger
+from gchaos.log import PREFIX
+
+
+_LOCAL = local()
+
+# Budget configuration of the installed chaos, None when budgets are off.
+_CONFIG = None
+
+
+class Budget(object):
+    """Chaos a single request is still allowed. A limit of None is
+    unlimited.
+
+    Properties:
+        latency_ms (int): Injected latency (in milliseconds) left
+        errors (int): Errors left
+        faults (int): Faults of any kind left
+    """
+
+    def __init__(self, latency_ms=None, errors=None, faults=None):
+        """Initialize the Budget with the limits of a request.
+
+        Args:
+            latency_ms (int): Most latency (in milliseconds) to inject
+            errors (int): Most errors to raise
+            faults (int): Most faults, latency spikes and errors included, to
+                          cause
+        """
+        self.latency_ms = latency_ms
+        self.errors = errors
+        self.faults = faults
+
+    def allow_fault(self):
+        """Spend a fault if there's one left.
+
+        Return:
+            bool: True if the fault can happen
+        """
+        if self.faults is None:
+            return True
+
+        if self.faults <= 0:
+            return False
+
+        self.faults -= 1
+
+        return True
+
+    def allow_error(self):
+        """Spend an error, and the fault it is, if there's one left.
+
+        Return:
+            bool: True if the error can be raised
+        """
+        if self.errors is not None and self.errors <= 0:
+            return False
+
+        if not self.allow_fault():
+            return False
+
+        if self.errors is not None:
+            self.errors -= 1
+
+        return True
+
+    def allow_latency(self, milli_time):
+        """Spend as much of the latency as is left, and a fault if any of it
+        is.
+
+        Args:
+            milli_time (int): Latency (in milliseconds) about to be injected
+
+        Return:
+            int: The latency (in milliseconds) that can be injected
+        """
+        if self.latency_ms is not None:
+            milli_time = min(milli_time, self.latency_ms)
+
+        if milli_time <= 0 or not self.allow_fault():
+            return 0
+
+        if self.latency_ms is not None:
+            self.latency_ms -= milli_time
+
+        return milli_time
+
+
+def configure(budget_config):
+    """Set the budget configuration new requests get their budget from.
+
+    Args:
+        budget_config (gchaos.config.hydrate.BudgetConfig): Budget
+                                                            configuration
+
+    Return:
+        None
+    """
+    global _CONFIG
+
+    _CONFIG = budget_config if budget_config.enabled else None
+
+
+def begin():
+    """Give the current thread a fresh budget from the configuration.
+
+    Return:
+        Budget: The thread's budget, None when budgets are off
+    """
+    config = _CONFIG
+
+    if config is None:
+        _LOCAL.budget = None
+    else:
+        _LOCAL.budget = Budget(config.latency_ms, config.errors, config.faults)
+
+    return _LOCAL.budget
+
+
+def end():
+    """Drop the current thread's budget so chaos outside a request isn't
+    limited by it.
+
+    Return:
+        None
+    """
+    _LOCAL.budget = None
+
+
+def current():
+    """Return the current thread's budget.
+
+    Return:
+        Budget: The budget, None outside a request or when budgets are off
+    """
+    return getattr(_LOCAL, 'budget', None)
+
+
+@contextmanager
+def scope():
+    """Context manager giving the code in it a budget of its own, like a
+    request handled outside of WSGI.
+    """
+    previous = current()
+    begin()
+
+    try:
+        yield
+    finally:
+        _LOCAL.budget = previous
+
+
+def allow_fault():
+    """Return True if the current thread's budget allows another fault.
+
+    Return:
+        bool
+    """
+    budget = current()
+
+    if budget is None or budget.allow_fault():
+        return True
+
+    _spent("fault")
+
+    return False
+
+
+def allow_error():
+    """Return True if the current thread's budget allows another error.
+
+    Return:
+        bool
+    """
+    budget = current()
+
+    if budget is None or budget.allow_error():
+        return True
+
+    _spent("error")
+
+    return False
+
+
+def allow_latency(milli_time):
+    """Return the part of the latency the current thread's budget allows.
+
+    Args:
+        milli_time (int): Latency (in milliseconds) about to be injected
+
+    Return:
+        int
+    """
+    budget = current()
+
+    if budget is None:
+        return milli_time
+
+    allowed = budget.allow_latency(milli_time)
+
+    if allowed < milli_time:
+        _spent("latency")
+
+    return allowed
+
+
+def budget_middleware(app):
+    """Wrap a WSGI app so each request starts with a fresh budget.
+
+    Args:
+        app (func): WSGI application
+
+    Return:
+        func: WSGI application
+    """
+    def wrapped(environ, start_response):
+        begin()
+
+        try:
+            return app(environ, start_response)
+        finally:
+            end()
+
+    return wrapped
+
+
+def _spent(kind):
+    """Log that the request's budget stopped some chaos.
+
+    Args:
+        kind (str): The kind of chaos stopped
+
+    Return:
+        None
+    """
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("%sThe request's %s budget is spent", PREFIX, kind)
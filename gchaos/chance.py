@@ -22,11 +22,179 @@
 
 import logging
 import random
+import threading
+
+from itertools import chain
+from itertools import count
+
+from gchaos.log import logger
+
+
+# NumPy is only imported once a stream draws with it, it's slow to import.
+numpy = None
+_NUMPY_IMPORTED = False
+
+
+# Number of random values drawn at a time for each stream.
+BLOCK_SIZE = 1024
+
+# Per thread streams, replaced when the streams are reseeded.
+_LOCAL = threading.local()
+
+# Seed the streams are derived from, None to seed from system entropy.
+_SEED = None
+
+# Counter used to derive a different seed for each stream.
+_STREAM_IDS = count()
+
+_USE_NUMPY = True
+
+
+class RandomStream(object):
+    """A stream of uniform random values in [0.0, 1.0) which are drawn a block
+    at a time ahead of when they are needed. Blocks are drawn with NumPy when
+    it's available, otherwise with a random.Random instance owned by the
+    stream. A stream isn't thread safe, each thread should use its own.
+
+    Properties:
+        block_size (int): Number of values drawn at a time
+        next (func): Returns the next value in the stream
+    """
+
+    def __init__(self, seed=None, block_size=BLOCK_SIZE, use_numpy=True):
+        """Initialize the RandomStream object.
+
+        Args:
+            seed (int): Seed for the stream, None to seed from system entropy
+            block_size (int): Number of values to draw at a time
+            use_numpy (bool): Draw with NumPy if it's available
+        """
+        self.block_size = block_size
+
+        if use_numpy and get_numpy() is not None:
+            self._generator = numpy.random.RandomState(seed)
+            self._draw_block = self._draw_numpy_block
+        else:
+            self._generator = random.Random(seed)
+            self._draw_block = self._draw_python_block
+
+        # Iterating the blocks is done in C, the block function is only
+        # called when a block runs out.
+        self.next = chain.from_iterable(iter(self._draw_block, None)).next
+
+    def _draw_numpy_block(self):
+        return self._generator.random_sample(self.block_size).tolist()
+
+    def _draw_python_block(self):
+        rand = self._generator.random
+
+        return [rand() for _ in xrange(self.block_size)]
+
+
+def get_numpy():
+    """Return the numpy module, importing it the first time, or None if it
+    isn't installed.
+
+    Return:
+        module
+    """
+    global numpy, _NUMPY_IMPORTED
+
+    if not _NUMPY_IMPORTED:
+        try:
+            import numpy as module
+        except ImportError:
+            module = None
+
+        numpy = module
+        _NUMPY_IMPORTED = True
+
+    return numpy
+
+
+def seed(value=None, use_numpy=True):
+    """Reset the random streams of every thread. When a seed is given each
+    thread's stream is seeded off of it and the order threads first draw in,
+    so a run with the same seed (and the same NumPy availability) draws the
+    same values.
+
+    Args:
+        value (int): Seed, None to seed from system entropy
+        use_numpy (bool): Draw with NumPy if it's available
+
+    Return:
+        None
+    """
+    global _LOCAL, _SEED, _STREAM_IDS, _USE_NUMPY
+
+    _SEED = value
+    _STREAM_IDS = count()
+    _USE_NUMPY = use_numpy
+    _LOCAL = threading.local()
+
+
+def uniform():
+    """Return the next value from the current thread's random stream.
+
+    Return:
+        float: Value in [0.0, 1.0)
+    """
+    try:
+        return _LOCAL.next()
+    except AttributeError:
+        return _create_stream().next()
+
+
+def randint(min_, max_):
+    """Return a random integer in the range [min_, max_] drawn from the
+    current thread's random stream.
+
+    Args:
+        min_ (int): Lowest value
+        max_ (int): Highest value
+
+    Return:
+        int
+    """
+    return min_ + int(uniform() * (max_ - min_ + 1))
+
+
+def _create_stream():
+    """Create the random stream for the current thread.
+
+    Return:
+        RandomStream
+    """
+    local = _LOCAL
+    stream_seed = None
+
+    if _SEED is not None:
+        stream_seed = _derive_seed(_SEED, next(_STREAM_IDS))
+
+    stream = RandomStream(stream_seed, use_numpy=_USE_NUMPY)
+    local.next = stream.next
+
+    return stream
+
+
+def _derive_seed(value, stream_id):
+    """Derive a 32 bit seed for a stream off the global seed.
+
+    Args:
+        value (int): Global seed
+        stream_id (int): Order the stream was created in
+
+    Return:
+        int
+    """
+    base = random.Random(value).getrandbits(32)
+
+    return (base + stream_id) & 0xFFFFFFFF
 
 
 def roll(value):
     """Returns True if the past in value is greather than the random chance that
-    we compute via the random module.
+    we compute off the current thread's random stream.
 
     Args:
         value (float): The value to compare to. It should be between
@@ -37,7 +205,8 @@ def roll(value):
     """
     chance = _get_chance()
 
-    logging.info("RATE {0} AND CHANCE {1}".format(value, chance))
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("RATE %s AND CHANCE %s", value, chance)
 
     return value >= chance
 
@@ -46,6 +215,6 @@ def _get_chance():
     """Generate a random number and return it.
 
     Return:
-        int
+        float
     """
-    return random.random()
+    return uniform()
@@ -22,56 +22,102 @@
 
 
 import bisect
-from random import random
+
+from gchaos.chance import uniform
+
+
+# Engines used to draw from a Choice.
+BISECT = 'bisect'
+ALIAS = 'alias'
+
+ENGINES = (BISECT, ALIAS)
+
+# Choices with at least this many options use the alias engine by default.
+# Below this the bisect engine is cheaper to draw from since bisect is done in
+# C. See tests/benchmarks/bench_choice.py.
+ALIAS_THRESHOLD = 32
 
 
 class Choice(object):
     """Class to hold choices and their corresponding propability weights. It
-    caches the accumulated weights as totals which are used to pull from.
+    builds the table for the engine when it's created, either the accumulated
+    weights as totals for the bisect engine or an alias table for the alias
+    engine, which are used to pull from.
     """
 
-    def __init__(self, weights, choices):
+    def __init__(self, weights, choices, engine=None):
         """Initializes the Choice object. Setting the weights and choices to
-        the passed in values. Initializes totals to None.
+        the passed in values and building the table for the engine.
 
         Args:
-            weights (list<int>): List of weights as integers that correspond
-                                 to the choices
-            choices (list<string>): List of the choices as strings that correspond
-                                    to the weights
+            weights (list<int|float>): List of weights that correspond to the
+                                       choices
+            choices (list<object>): List of the choices that correspond to the
+                                    weights
+            engine (str): Engine to draw with, BISECT or ALIAS. Defaults to
+                          picking one based off the number of choices.
         """
+        if engine is None:
+            engine = pick_engine(len(choices))
+
+        if engine not in ENGINES:
+            raise ValueError("Unknown choice engine {0}".format(engine))
+
         self.weights = weights
         self.choices = choices
+        self.engine = engine
         self.totals = None
+        self.alias_table = None
+
+        if not (weights and choices):
+            return
+
+        if engine == ALIAS:
+            self.alias_table = build_alias_table(weights, choices)
+        else:
+            self.totals = fold_weights(weights)
 
     def next(self):
         """Returns a choice based off the weights and choices passed in.
 
         Return:
-            Choice (string): The choice based off the weight distribution.
+            Choice (object): The choice based off the weight distribution.
         """
-        if not (self.weights and self.choices):
-            return
+        if self.totals is not None:
+            return weighted_choice(self.totals, self.choices)
 
-        if not self.totals:
-            self.totals = fold_weights(self.weights)
+        if self.alias_table is not None:
+            return alias_choice(self.alias_table)
 
-        return weighted_choice(self.totals, self.choices)
+
+def pick_engine(size):
+    """Return the engine to use for a number of choices.
+
+    Args:
+        size (int): Number of choices
+
+    Return:
+        str
+    """
+    if size >= ALIAS_THRESHOLD:
+        return ALIAS
+
+    return BISECT
 
 
 def weighted_choice(totals, choices):
     """Returns a choice based off the totals and choices passed in.
 
     Args:
-        totals (list<int>): List of totalled weights as integers that correspond
-                            to the choices
-        choices (list<string>): List of the choices as strings that correspond
-                                to the weights
+        totals (list<int|float>): List of totalled weights that correspond to
+                                  the choices
+        choices (list<object>): List of the choices that correspond to the
+                                weights
 
     Return:
-        Choice (string): The choice based off the weight distribution.
+        Choice (object): The choice based off the weight distribution.
     """
-    rnd = random() * totals[-1]
+    rnd = uniform() * totals[-1]
 
     return choices[bisect.bisect_right(totals, rnd)]
 
@@ -83,11 +129,11 @@ def fold_weights(weights):
     NOTE: In python 3 we could use itertools.accumulate
 
     Args:
-        weights (list<int>): List of weights as integers that correspond to the
-                             choices
+        weights (list<int|float>): List of weights that correspond to the
+                                   choices
 
     Return:
-        folded weights (list<int>)
+        folded weights (list<int|float>)
     """
     accum = 0
     totals = []
@@ -97,3 +143,72 @@ def fold_weights(weights):
         totals.append(accum)
 
     return totals
+
+
+def build_alias_table(weights, choices):
+    """Build an alias table for the weights using Vose's method. Each column of
+    the table has the probability of keeping its own choice and the choice to
+    use otherwise, so drawing from it is constant time.
+
+    Args:
+        weights (list<int|float>): List of weights that correspond to the
+                                   choices
+        choices (list<object>): List of the choices that correspond to the
+                                weights
+
+    Return:
+        tuple(list<float>, list<object>, list<object>): The probabilities,
+            choices and alias choices for each column.
+    """
+    size = len(weights)
+    total = float(sum(weights))
+
+    if total <= 0:
+        raise ValueError("Choice weights must add up to more than 0")
+
+    scaled = [weight * size / total for weight in weights]
+    probabilities = [1.0] * size
+    aliases = list(choices)
+
+    small = [i for i, p in enumerate(scaled) if p < 1.0]
+    large = [i for i, p in enumerate(scaled) if p >= 1.0]
+
+    while small and large:
+        less = small.pop()
+        more = large.pop()
+
+        probabilities[less] = scaled[less]
+        aliases[less] = choices[more]
+
+        scaled[more] = (scaled[more] + scaled[less]) - 1.0
+
+        if scaled[more] < 1.0:
+            small.append(more)
+        else:
+            large.append(more)
+
+    # Anything left over is only off from 1.0 due to float rounding so it
+    # always keeps its own choice.
+
+    return probabilities, list(choices), aliases
+
+
+def alias_choice(alias_table):
+    """Returns a choice from the alias table. A single random number picks
+    both the column and whether to use the column's choice or its alias.
+
+    Args:
+        alias_table (tuple): Table built by build_alias_table
+
+    Return:
+        Choice (object): The choice based off the weight distribution.
+    """
+    probabilities, choices, aliases = alias_table
+
+    rnd = uniform() * len(choices)
+    column = int(rnd)
+
+    if rnd - column < probabilities[column]:
+        return choices[column]
+
+    return aliases[column]
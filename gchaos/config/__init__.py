@@ -23,6 +23,8 @@
 
 from gchaos.config.memory import DEFAULT_CONFIG as INMEM_CONFIG
 from gchaos.config.hydrate import ChaosConfig
+from gchaos.config.loader import find_path
+from gchaos.config.loader import load_file
 
 
 DEFAULT_CONFIG = {}
@@ -30,7 +32,13 @@ DEFAULT_CONFIG = {}
 # For now only using in-memory config
 DEFAULT_CONFIG.update(INMEM_CONFIG)
 
-CHAOS_CONFIG = ChaosConfig(DEFAULT_CONFIG)
+# Sections of the config file, if there is one, replace the in-memory ones.
+CONFIG_PATH = find_path()
+
+if CONFIG_PATH:
+    CHAOS_CONFIG = load_file(CONFIG_PATH, DEFAULT_CONFIG)
+else:
+    CHAOS_CONFIG = ChaosConfig(DEFAULT_CONFIG)
 
 
 __all__ = [CHAOS_CONFIG, DEFAULT_CONFIG]
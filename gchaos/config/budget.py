@@ -0,0 +1,44 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# Most latency (in milliseconds) injected into a single request. Half the 60
+# second request deadline leaves room for the request's own work.
+LATENCY_MS = 30000
+
+# Most errors raised in a single request
+ERRORS = 3
+
+# Most faults of any kind, latency spikes and errors included, in a single
+# request
+FAULTS = 10
+
+# Wrap it all up into the CONFIG variable. Budgets are off by default and only
+# apply to requests wrapped in gchaos.budget.budget_middleware.
+CONFIG = {
+    'enabled': False,
+    'latency_ms': LATENCY_MS,
+    'errors': ERRORS,
+    'faults': FAULTS,
+}
+
+# Place CONFIG in the list of publically available variables
+__all__ = [CONFIG]
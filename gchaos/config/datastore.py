@@ -21,50 +21,134 @@
 # SOFTWARE.
 
 
-from google.appengine.api import datastore_errors
-
-from gchaos.utils import full_name
-
 # GOOGLE FILE
 # google-cloud-sdk/platform/google_appengine/google/appengine/api/datastore_errors.py
 
+# Errors are given by their path so the SDK module is only imported once one
+# of them is raised, not when gchaos is imported.
+ERRORS_MODULE = 'google.appengine.api.datastore_errors'
+
 # Set error names
 DELETE = 'DELETE'
 GET = 'GET'
 PUT = 'PUT'
+RUN_QUERY = 'RUN_QUERY'
+NEXT = 'NEXT'
+COMMIT = 'COMMIT'
+ROLLBACK = 'ROLLBACK'
+BEGIN_TRANSACTION = 'BEGIN_TRANSACTION'
+ALLOCATE_IDS = 'ALLOCATE_IDS'
 
 # Set error rates
 DELETE_ERROR_RATE = 0.05
 GET_ERROR_RATE = 0.01
 PUT_ERROR_RATE = 0.02
+RUN_QUERY_ERROR_RATE = 0.01
+NEXT_ERROR_RATE = 0.01
+COMMIT_ERROR_RATE = 0.02
+ROLLBACK_ERROR_RATE = 0.01
+BEGIN_TRANSACTION_ERROR_RATE = 0.01
+ALLOCATE_IDS_ERROR_RATE = 0.01
 
 # Configure error types
 DELETE_ERRORS = {
-    full_name(datastore_errors.BadValueError): 5,
-    full_name(datastore_errors.BadRequestError): 5,
-    full_name(datastore_errors.InternalError): 20,
-    full_name(datastore_errors.Timeout): 70,
+    ERRORS_MODULE + '.BadValueError': 5,
+    ERRORS_MODULE + '.BadRequestError': 5,
+    ERRORS_MODULE + '.InternalError': 20,
+    ERRORS_MODULE + '.Timeout': 70,
 }
 
 GET_ERRORS = {
-    full_name(datastore_errors.BadValueError): 5,
-    full_name(datastore_errors.BadRequestError): 5,
-    full_name(datastore_errors.EntityNotFoundError): 5,  # ERROR IS DEPRECATED
-    full_name(datastore_errors.InternalError): 10,
-    full_name(datastore_errors.Timeout): 75,
+    ERRORS_MODULE + '.BadValueError': 5,
+    ERRORS_MODULE + '.BadRequestError': 5,
+    ERRORS_MODULE + '.EntityNotFoundError': 5,  # ERROR IS DEPRECATED
+    ERRORS_MODULE + '.InternalError': 10,
+    ERRORS_MODULE + '.Timeout': 75,
 }
 
 PUT_ERRORS = {
-    full_name(datastore_errors.BadValueError): 5,
-    full_name(datastore_errors.BadRequestError): 5,
-    full_name(datastore_errors.InternalError): 10,
-    full_name(datastore_errors.Timeout): 80,
+    ERRORS_MODULE + '.BadValueError': 5,
+    ERRORS_MODULE + '.BadRequestError': 5,
+    ERRORS_MODULE + '.InternalError': 10,
+    ERRORS_MODULE + '.Timeout': 80,
+}
+
+RUN_QUERY_ERRORS = {
+    ERRORS_MODULE + '.BadRequestError': 5,
+    ERRORS_MODULE + '.NeedIndexError': 5,
+    ERRORS_MODULE + '.InternalError': 10,
+    ERRORS_MODULE + '.Timeout': 80,
+}
+
+# Fetching the next batch also fails when the query's cursor has expired
+NEXT_ERRORS = {
+    ERRORS_MODULE + '.BadRequestError': 10,
+    ERRORS_MODULE + '.InternalError': 10,
+    ERRORS_MODULE + '.Timeout': 80,
+}
+
+COMMIT_ERRORS = {
+    ERRORS_MODULE + '.CommittedButStillApplying': 10,
+    ERRORS_MODULE + '.InternalError': 10,
+    ERRORS_MODULE + '.Timeout': 30,
+    ERRORS_MODULE + '.TransactionFailedError': 50,
+}
+
+ROLLBACK_ERRORS = {
+    ERRORS_MODULE + '.InternalError': 20,
+    ERRORS_MODULE + '.Timeout': 80,
+}
+
+BEGIN_TRANSACTION_ERRORS = {
+    ERRORS_MODULE + '.BadRequestError': 10,
+    ERRORS_MODULE + '.InternalError': 20,
+    ERRORS_MODULE + '.Timeout': 70,
+}
+
+ALLOCATE_IDS_ERRORS = {
+    ERRORS_MODULE + '.InternalError': 20,
+    ERRORS_MODULE + '.Timeout': 80,
+}
+
+# Errors raised when an entity group is written to faster than it can be
+CONTENTION_ERRORS = {
+    ERRORS_MODULE + '.Timeout': 50,
+    ERRORS_MODULE + '.TransactionFailedError': 50,
+}
+
+# Sustained writes per second an entity group can take
+CONTENTION_THRESHOLD = 1.0
+
+# Errors raised when a transaction's commit conflicts with another write
+TRANSACTION_ERRORS = {
+    ERRORS_MODULE + '.TransactionFailedError': 1,
 }
 
+# Seconds an in-flight transaction is followed for, transactions expire after
+# a minute
+TRANSACTION_TTL = 60
+
+# Most transactions followed at once
+MAX_TRANSACTIONS = 1000
+
+# Shortest time (in seconds) a transaction is open for, the time a commit
+# takes
+TRANSACTION_MIN_WINDOW = 0.1
+
 DEFAULT_LATENCY = (500, 10000)
 DELETE_LATENCY_RATE = 0.05
 GET_LATENCY_RATE = 0.01
 PUT_LATENCY_RATE = 0.02
+RUN_QUERY_LATENCY_RATE = 0.02
+NEXT_LATENCY_RATE = 0.02
+COMMIT_LATENCY_RATE = 0.02
+ROLLBACK_LATENCY_RATE = 0.01
+BEGIN_TRANSACTION_LATENCY_RATE = 0.01
+ALLOCATE_IDS_LATENCY_RATE = 0.01
+
+# Latency (in milliseconds) added to a slow query batch for each result it
+# returns
+RESULT_LATENCY = {'ms_per_entity': 2}
 
 # Wrap it all up into the CONFIG variable
 CONFIG = {
@@ -73,11 +157,24 @@ CONFIG = {
         DELETE: (DELETE_ERRORS, DELETE_ERROR_RATE),
         GET: (GET_ERRORS, GET_ERROR_RATE),
         PUT: (PUT_ERRORS, PUT_ERROR_RATE),
+        RUN_QUERY: (RUN_QUERY_ERRORS, RUN_QUERY_ERROR_RATE),
+        NEXT: (NEXT_ERRORS, NEXT_ERROR_RATE),
+        COMMIT: (COMMIT_ERRORS, COMMIT_ERROR_RATE),
+        ROLLBACK: (ROLLBACK_ERRORS, ROLLBACK_ERROR_RATE),
+        BEGIN_TRANSACTION: (
+            BEGIN_TRANSACTION_ERRORS, BEGIN_TRANSACTION_ERROR_RATE),
+        ALLOCATE_IDS: (ALLOCATE_IDS_ERRORS, ALLOCATE_IDS_ERROR_RATE),
     }),
     'latency': (True, {
         DELETE: (DEFAULT_LATENCY, DELETE_LATENCY_RATE),
         GET: (DEFAULT_LATENCY, GET_LATENCY_RATE),
         PUT: (DEFAULT_LATENCY, PUT_LATENCY_RATE),
+        RUN_QUERY: (DEFAULT_LATENCY, RUN_QUERY_LATENCY_RATE, RESULT_LATENCY),
+        NEXT: (DEFAULT_LATENCY, NEXT_LATENCY_RATE, RESULT_LATENCY),
+        COMMIT: (DEFAULT_LATENCY, COMMIT_LATENCY_RATE),
+        ROLLBACK: (DEFAULT_LATENCY, ROLLBACK_LATENCY_RATE),
+        BEGIN_TRANSACTION: (DEFAULT_LATENCY, BEGIN_TRANSACTION_LATENCY_RATE),
+        ALLOCATE_IDS: (DEFAULT_LATENCY, ALLOCATE_IDS_LATENCY_RATE),
     })
 }
 
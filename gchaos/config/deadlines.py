@@ -0,0 +1,66 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from gchaos.settings import CLOUD_DATASTORE_STUB
+from gchaos.settings import DATASTORE_STUB
+from gchaos.settings import DATASTORE_V4_STUB
+from gchaos.settings import URLFETCH_STUB
+
+# Seconds a request has to respond before the runtime raises
+# DeadlineExceededError, and the longer deadline of task queue and cron
+# requests on automatically scaled instances.
+REQUEST_DEADLINE = 60
+TASK_DEADLINE = 600
+
+# Raised when a stall overruns the request's deadline
+REQUEST_ERROR = 'google.appengine.runtime.DeadlineExceededError'
+
+# Raised when a stall overruns the deadline of an RPC to a service without an
+# error of its own below
+RPC_ERROR = 'google.appengine.runtime.apiproxy_errors.DeadlineExceededError'
+
+DATASTORE_TIMEOUT = 'google.appengine.api.datastore_errors.Timeout'
+URLFETCH_TIMEOUT = 'google.appengine.api.urlfetch_errors.DeadlineExceededError'
+
+# The error each service's client raises when its RPC times out
+ERRORS = {
+    DATASTORE_STUB: DATASTORE_TIMEOUT,
+    DATASTORE_V4_STUB: DATASTORE_TIMEOUT,
+    CLOUD_DATASTORE_STUB: DATASTORE_TIMEOUT,
+    URLFETCH_STUB: URLFETCH_TIMEOUT,
+}
+
+# Wrap it all up into the CONFIG variable. The request deadline only applies
+# to requests wrapped in gchaos.deadline.deadline_middleware, the RPC deadlines
+# apply everywhere.
+CONFIG = {
+    'enabled': True,
+    'mode': 'timeout',
+    'request': REQUEST_DEADLINE,
+    'task': TASK_DEADLINE,
+    'request_error': REQUEST_ERROR,
+    'rpc_error': RPC_ERROR,
+    'errors': ERRORS,
+}
+
+# Place CONFIG in the list of publically available variables
+__all__ = [CONFIG]
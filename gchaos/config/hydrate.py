@@ -22,12 +22,43 @@
 
 
 from gchaos.choice import Choice
+from gchaos.config.datastore import CONTENTION_ERRORS
+from gchaos.config.datastore import CONTENTION_THRESHOLD
+from gchaos.config.datastore import MAX_TRANSACTIONS
+from gchaos.config.datastore import TRANSACTION_ERRORS
+from gchaos.config.datastore import TRANSACTION_MIN_WINDOW
+from gchaos.config.datastore import TRANSACTION_TTL
+from gchaos.config.deadlines import REQUEST_DEADLINE
+from gchaos.config.deadlines import REQUEST_ERROR
+from gchaos.config.deadlines import RPC_ERROR
+from gchaos.config.deadlines import TASK_DEADLINE
+from gchaos.config.metrics import OVERHEAD_BUCKETS
+from gchaos.config.metrics import STALL_BUCKETS
+from gchaos.config.replay import PATH as REPLAY_PATH
+from gchaos.config.tracing import BATCH_SIZE
+from gchaos.config.tracing import CAPACITY
+from gchaos.config.tracing import EXPORTER
+from gchaos.config.tracing import FLUSH_INTERVAL
+from gchaos.deadline import MODES as DEADLINE_MODES
+from gchaos.distributions import from_config as distribution_from_config
 from gchaos.gae.datastore.actions import ACTIONS
+from gchaos.gae.datastore.hotkeys import HotKeyMonitor
+from gchaos.gae.datastore.latency import MODES
+from gchaos.gae.datastore.transactions import TransactionSimulator
+from gchaos.gae.memcache.actions import ACTIONS as MEMCACHE_ACTIONS
+from gchaos.gae.memcache.evictions import STORMS
+from gchaos.matcher import Matcher
+from gchaos.replay import MODES as REPLAY_MODES
+from gchaos.tracing import JsonFileExporter
+from gchaos.utils import resolve_path
 
 
 DEFAULT_ERROR_ENTRY = ({}, 0.00)
 DEFAULT_LATENCY_ENTRY = (None, 0.00)
 DEFAULT_CONFIG = (False, {})
+DEFAULT_EVICTIONS_CONFIG = (False, [])
+DEFAULT_HOT_KEYS_CAPACITY = 64
+DEFAULT_HOT_KEYS_HALF_LIFE = 10.0
 
 
 class ChaosConfig(object):
@@ -35,6 +66,18 @@ class ChaosConfig(object):
 
     Properties:
         datastore (DatastoreConfig): The datastore configuration
+        memcache (MemcacheConfig): The memcache configuration
+        urlfetch (UrlfetchConfig): The urlfetch configuration
+        taskqueue (TaskqueueConfig): The taskqueue configuration
+        search (ServiceConfig): The search configuration
+        blobstore (ServiceConfig): The blobstore configuration
+        budget (BudgetConfig): The per request budget configuration
+        deadlines (DeadlinesConfig): The deadlines configuration
+        metrics (MetricsConfig): The metrics configuration
+        tracing (TracingConfig): The tracing configuration
+        replay (ReplayConfig): The record and replay configuration
+        quiet (bool): Only log when chaos actually fires
+        seed (int): Seed for the random streams, None to use system entropy
     """
 
     def __init__(self, config):
@@ -46,6 +89,58 @@ class ChaosConfig(object):
             config (dict): Dictionary of a Chaos Configuration
         """
         self.datastore = DatastoreConfig(config.get("datastore", {}))
+        self.memcache = MemcacheConfig(config.get("memcache", {}))
+        self.urlfetch = UrlfetchConfig(config.get("urlfetch", {}))
+        self.taskqueue = TaskqueueConfig(config.get("taskqueue", {}))
+        self.search = ServiceConfig(config.get("search", {}))
+        self.blobstore = ServiceConfig(config.get("blobstore", {}))
+        self.budget = BudgetConfig(config.get("budget", {}))
+        self.deadlines = DeadlinesConfig(config.get("deadlines", {}))
+        self.metrics = MetricsConfig(config.get("metrics", {}))
+        self.tracing = TracingConfig(config.get("tracing", {}))
+        self.replay = ReplayConfig(config.get("replay", {}))
+        self.quiet = config.get("quiet", False)
+        self.seed = config.get("seed")
+
+    def resolve(self):
+        """Resolve every error and exporter path in the config. Building the
+        config doesn't import them, so this is what catches a bad path before
+        the config is published or any of it is installed.
+
+        Return:
+            None
+
+        Raises:
+            gchaos.utils.BadObjectPathError: If a path can't be resolved
+        """
+        for error_config in self._error_configs():
+            error_config.resolve()
+
+        self.deadlines.resolve()
+        self.tracing.exporter()
+
+    def _error_configs(self):
+        """Yield every ErrorConfig in the config."""
+        datastore = self.datastore
+
+        for error_config in datastore.errors.errors.itervalues():
+            yield error_config
+
+        if datastore.hot_keys.contention is not None:
+            yield datastore.hot_keys.contention.errors
+
+        yield datastore.transactions.errors
+
+        for error_config in self.memcache.errors.errors.itervalues():
+            yield error_config
+
+        rules = self.urlfetch.rules + self.taskqueue.rules
+        calls = (self.search.calls.values() +
+                 self.blobstore.calls.values())
+
+        for rule in rules + calls:
+            if rule.errors is not None:
+                yield rule.errors
 
 
 class DatastoreConfig(object):
@@ -55,6 +150,10 @@ class DatastoreConfig(object):
         enabled (bool): Whether the datastore chaos is enabled
         errors (ErrorsConfig): The datastore errors configuration
         latency (TODO): The datastore latency configuration
+        targets (TargetsConfig): The kinds and keys chaos is limited to
+        hot_keys (HotKeysConfig): The hot key monitoring configuration
+        transactions (TransactionsConfig): The transaction contention
+                                           configuration
     """
 
     def __init__(self, config):
@@ -67,6 +166,133 @@ class DatastoreConfig(object):
         self.enabled = config.get('enabled', False)
         self.errors = ErrorsConfig(*config.get('errors', DEFAULT_CONFIG))
         self.latency = LatenciesConfig(*config.get('latency', DEFAULT_CONFIG))
+        self.targets = TargetsConfig(config.get('targets', {}))
+        self.hot_keys = HotKeysConfig(config.get('hot_keys', {}))
+        self.transactions = TransactionsConfig(config.get('transactions', {}))
+
+
+class TargetsConfig(object):
+    """Datastore targets configuration object. When there are any rules chaos
+    only happens to requests with at least one key matching them.
+
+    Properties:
+        kinds (gchaos.matcher.Matcher): Rules matched against the key's kind
+        keys (gchaos.matcher.Matcher): Rules matched against the key's path
+    """
+
+    def __init__(self, config):
+        """Initialize the TargetsConfig object compiling the kind and key
+        rules.
+
+        Args:
+            config (dict): Dictionary with lists of `kinds` and `keys` rules
+
+        Raises:
+            ValueError: If a regex rule isn't a valid regular expression
+        """
+        self.kinds = Matcher(config.get('kinds'))
+        self.keys = Matcher(config.get('keys'))
+
+    @property
+    def enabled(self):
+        return bool(self.kinds or self.keys)
+
+
+class HotKeysConfig(object):
+    """Datastore hot keys configuration object.
+
+    Properties:
+        enabled (bool): Flag for enabling
+        monitor (gchaos.gae.datastore.hotkeys.HotKeyMonitor): Monitor the keys
+            are counted in, None if not enabled
+        contention (ContentionConfig): Contention configuration, None to only
+                                       monitor
+    """
+
+    def __init__(self, config):
+        """Initialize the HotKeysConfig object creating the monitor.
+
+        Args:
+            config (dict): Dictionary with the `capacity` and `half_life` of
+                           the monitor and a `contention` configuration
+
+        Raises:
+            ValueError: If the capacity or half life isn't positive
+        """
+        self.enabled = config.get('enabled', False)
+        self.monitor = None
+        self.contention = None
+
+        if not self.enabled:
+            return
+
+        self.monitor = HotKeyMonitor(
+            config.get('capacity', DEFAULT_HOT_KEYS_CAPACITY),
+            config.get('half_life', DEFAULT_HOT_KEYS_HALF_LIFE))
+
+        if 'contention' in config:
+            self.contention = ContentionConfig(config['contention'])
+
+
+class ContentionConfig(object):
+    """Datastore contention configuration object.
+
+    Properties:
+        threshold (float): Writes per second to an entity group above which
+                           contention errors are triggered
+        errors (ErrorConfig): The contention errors and their rate
+    """
+
+    def __init__(self, config):
+        """Initialize the ContentionConfig object.
+
+        Args:
+            config (dict): Dictionary with the `threshold`, `errors` and
+                           `error_rate`. The errors default to Timeout and
+                           TransactionFailedError.
+        """
+        self.threshold = config.get('threshold', CONTENTION_THRESHOLD)
+        self.errors = ErrorConfig(config.get('errors', CONTENTION_ERRORS),
+                                  config.get('error_rate', 1.0))
+
+
+class TransactionsConfig(object):
+    """Datastore transaction contention configuration object.
+
+    Properties:
+        enabled (bool): Flag for enabling
+        simulator (gchaos.gae.datastore.transactions.TransactionSimulator):
+            Simulator the transactions are followed by, None if not enabled
+        errors (ErrorConfig): The errors a conflicting commit raises
+    """
+
+    def __init__(self, config):
+        """Initialize the TransactionsConfig object creating the simulator.
+
+        Args:
+            config (dict): Dictionary with the `capacity` and `half_life` of
+                           the entity group write counts, the `ttl` and
+                           `max_transactions` of the transactions followed,
+                           the `min_window` of a transaction and the
+                           `errors`, which default to TransactionFailedError
+
+        Raises:
+            ValueError: If the capacity or half life isn't positive
+        """
+        self.enabled = config.get('enabled', False)
+        self.simulator = None
+        self.errors = ErrorConfig(
+            config.get('errors', TRANSACTION_ERRORS), 1.0)
+
+        if not self.enabled:
+            return
+
+        self.simulator = TransactionSimulator(
+            config.get('capacity', DEFAULT_HOT_KEYS_CAPACITY),
+            config.get('half_life', DEFAULT_HOT_KEYS_HALF_LIFE),
+            config.get('ttl', TRANSACTION_TTL),
+            config.get('max_transactions', MAX_TRANSACTIONS),
+            config.get('min_window', TRANSACTION_MIN_WINDOW))
 
 
 class ErrorsConfig(object):
@@ -74,26 +300,21 @@ class ErrorsConfig(object):
 
     Properties:
         enabled (bool): Flag for enabling
-        delete_errors (ErrorConfig): Delete error configuration
-        get_errors (ErrorConfig): Get error configuration
-        put_errors (ErrorConfig): Put error configuration
+        errors (dict(str, ErrorConfig)): Error configuration of each action
     """
 
     def __init__(self, enabled, config):
-        """Initlialize the ErrorsConfig object setting the delete_errors,
-        get_errors and put_errors to an ErrorConfig generated off the passed in
-        config.
+        """Initlialize the ErrorsConfig object with an ErrorConfig for each
+        datastore action.
 
         Args:
             enabled (bool): Flag for enabling
             config (dict): Dictionary of a Datastore Errors Configuration
         """
         self.enabled = enabled
-        self.delete_errors = ErrorConfig(
-            *config.get("DELETE", DEFAULT_ERROR_ENTRY))
-        self.get_errors = ErrorConfig(*config.get("GET", DEFAULT_ERROR_ENTRY))
-        self.put_errors = ErrorConfig(*config.get("PUT", DEFAULT_ERROR_ENTRY))
-        # self.enabled =
+        self.errors = dict(
+            (action, ErrorConfig(*config.get(action, DEFAULT_ERROR_ENTRY)))
+            for action in ACTIONS.all())
 
     def get_by_action(self, action):
         """Return the corresponding ErrorConfig for the action passed in.
@@ -102,35 +323,71 @@ class ErrorsConfig(object):
             actions (str): Action as a string. (Options can be found on the
                            ACTIONS global obect.
         """
-        if action == ACTIONS.DELETE:
-            return self.delete_errors
-
-        elif action == ACTIONS.GET:
-            return self.get_errors
-
-        elif action == ACTIONS.PUT:
-            return self.put_errors
+        return self.errors.get(action)
 
 
 class ErrorConfig(object):
     """Datastore error configuration object.
 
     Properties:
-        errors (Choice): Choice object of datastore errors
+        errors (Choice): Choice object of datastore error classes
         error_rate (float): Error Rate (should be between 0.00 and 1.00)
+        per_entity (bool): The rate applies to each entity in a batch
+        partial (bool): Part of a batch is applied before the error is raised
     """
 
-    def __init__(self, errors, error_rate):
+    def __init__(self, errors, error_rate, batch=None):
         """Initialize the ErrorConfig object setting the errors and error_rate
-        to the passed in values. The errors are converted to a Choice object.
+        to the passed in values.
 
         Args:
             errors (dict): Dictionary of choices (keys) and propability weights
-                           (values)
+                           (values). The choices are error paths or classes.
             error_rate (float): Error rate value between 0.00 and 1.00
+            batch (dict): Batch options, `per_entity` and `partial`
         """
-        self.errors = Choice(errors.values(), errors.keys())
+        batch = batch or {}
+
         self.error_rate = error_rate
+        self.per_entity = batch.get('per_entity', False)
+        self.partial = batch.get('partial', False)
+
+        self._paths = errors
+        self._errors = None
+
+    @property
+    def errors(self):
+        """Choice object over the error classes. The error paths are resolved
+        the first time it's used, which imports their modules, rather than
+        when the config is built or each time an error is raised.
+
+        Raises:
+            gchaos.utils.BadObjectPathError: If an error path can't be resolved
+        """
+        errors = self._errors
+
+        if errors is None:
+            errors = self.resolve()
+
+        return errors
+
+    def resolve(self):
+        """Resolve the error paths now if they haven't been. The hooks call
+        this when they're compiled so an invalid path fails when they're
+        installed instead of in the first request that raises the error.
+
+        Return:
+            Choice
+
+        Raises:
+            gchaos.utils.BadObjectPathError: If an error path can't be resolved
+        """
+        if self._errors is None:
+            self._errors = Choice(
+                self._paths.values(),
+                [resolve_path(path) for path in self._paths.keys()])
+
+        return self._errors
 
 
 class LatenciesConfig(object):
@@ -138,30 +395,33 @@ class LatenciesConfig(object):
 
     Properties:
         enabled (bool): Flag for enabling
-        delete_latencies (LatencyConfig): Delete latency configuration
-        get_latencies (LatencyConfig): Get latency configuration
-        put_latencies (LatencyConfig): Put latency configuration
+        mode (str): How latency is injected (Options can be found on the
+                    MODES global object)
+        latencies (dict(str, LatencyConfig)): Latency configuration of each
+                                              action
     """
 
-    def __init__(self, enabled, config):
-        """Initlialize the LatenciesConfig object setting the delete_latencies,
-        get_latencies and put_latencies to a LatencyConfig generated off the
-        passed in config.
+    def __init__(self, enabled, config, mode=MODES.BLOCKING):
+        """Initlialize the LatenciesConfig object with a LatencyConfig for
+        each datastore action.
 
         Args:
             enabled (bool): Flag for enabling
             config (dict): Dictionary of a Datastore Latencies Configuration
-        """
-        self.enabled = enabled
-
-        self.delete_latencies = LatencyConfig(
-            *config.get("DELETE", DEFAULT_LATENCY_ENTRY))
+            mode (str): How latency is injected, blocking the request thread
+                        or delaying the RPC's completion
 
-        self.get_latencies = LatencyConfig(
-            *config.get("GET", DEFAULT_LATENCY_ENTRY))
+        Raises:
+            ValueError: If the mode isn't one of MODES
+        """
+        if mode not in MODES.all():
+            raise ValueError("Unknown latency mode {0}".format(mode))
 
-        self.put_latencies = LatencyConfig(
-            *config.get("PUT", DEFAULT_LATENCY_ENTRY))
+        self.enabled = enabled
+        self.mode = mode
+        self.latencies = dict(
+            (action, LatencyConfig(*config.get(action, DEFAULT_LATENCY_ENTRY)))
+            for action in ACTIONS.all())
 
     def get_by_action(self, action):
         """Return the corresponding LatencyConfig for the action passed in.
@@ -170,34 +430,639 @@ class LatenciesConfig(object):
             actions (str): Action as a string. (Options can be found on the
                            ACTIONS global obect.
         """
-        if action == ACTIONS.DELETE:
-            return self.delete_latencies
-
-        elif action == ACTIONS.GET:
-            return self.get_latencies
-
-        elif action == ACTIONS.PUT:
-            return self.put_latencies
+        return self.latencies.get(action)
 
 
 class LatencyConfig(object):
     """Datastore latency configuration object.
 
     Properties:
-        latencies (Choice): Choice object of datastore latencies
+        latency (tuple|int|gchaos.distributions.Distribution): The latency
+            spike (in milliseconds) or the distribution to draw it from
         latency_rate (float): Latency Rate (should be between 0.00 and 1.00)
+        per_entity (bool): The rate applies to each entity in a batch
+        ms_per_entity (float): Latency added for each entity in a batch, or
+                               each result of a query batch
+        ms_per_kb (float): Latency added for each kilobyte of the request, or
+                           of the query results
     """
 
-    def __init__(self, latency, latency_rate):
-        """Initialize the LatencyConfig object setting the latencies and
-        latency_rate to the passed in values. The latencies are converted to a
-        Choice object.
+    def __init__(self, latency, latency_rate, batch=None):
+        """Initialize the LatencyConfig object setting the latency and
+        latency_rate to the passed in values. A latency distribution
+        configuration is converted to a Distribution here so its table is
+        only built once.
 
         Args:
-            latency (tuple): A tuple that is the range of a latency spike to
-                             pic from. The second value can be ignored to just
-                             use a constant rate.
+            latency (tuple|int|dict): A tuple that is the range of a latency
+                spike to pic from. The second value can be ignored to just use
+                a constant rate. Or a dictionary configuring a distribution
+                (see gchaos.distributions.from_config).
             latency_rate (float): Latency rate value between 0.00 and 1.00
+            batch (dict): Batch options, `per_entity`, `ms_per_entity` and
+                          `ms_per_kb`
+
+        Raises:
+            gchaos.errors.InvalidLatencyException: If the distribution isn't
+                                                   valid
         """
+        batch = batch or {}
+
+        if isinstance(latency, dict):
+            latency = distribution_from_config(latency)
+
         self.latency = latency
         self.latency_rate = latency_rate
+        self.per_entity = batch.get('per_entity', False)
+        self.ms_per_entity = batch.get('ms_per_entity', 0)
+        self.ms_per_kb = batch.get('ms_per_kb', 0)
+
+    @property
+    def proportional(self):
+        """True if latency is added for the size of a batch."""
+        return bool(self.ms_per_entity or self.ms_per_kb)
+
+
+class MemcacheConfig(object):
+    """Memcache configuration object.
+
+    Properties:
+        enabled (bool): Whether the memcache chaos is enabled
+        errors (MemcacheErrorsConfig): The memcache errors configuration
+        latency (MemcacheLatenciesConfig): The memcache latency configuration
+        evictions (EvictionsConfig): The memcache evictions configuration
+    """
+
+    def __init__(self, config):
+        """Initlialize the MemcacheConfig object setting the enabled, errors,
+        latency and evictions properties off the passed in config.
+
+        Args:
+            config (dict): Dictionary of a Memcache Configuration
+        """
+        self.enabled = config.get('enabled', False)
+        self.errors = MemcacheErrorsConfig(
+            *config.get('errors', DEFAULT_CONFIG))
+        self.latency = MemcacheLatenciesConfig(
+            *config.get('latency', DEFAULT_CONFIG))
+        self.evictions = EvictionsConfig(
+            *config.get('evictions', DEFAULT_EVICTIONS_CONFIG))
+
+
+class MemcacheErrorsConfig(object):
+    """Memcache errors configuration object.
+
+    Properties:
+        enabled (bool): Flag for enabling
+        errors (dict(str, ErrorConfig)): Error configuration of each action
+    """
+
+    def __init__(self, enabled, config):
+        """Initlialize the MemcacheErrorsConfig object with an ErrorConfig for
+        each memcache action.
+
+        Args:
+            enabled (bool): Flag for enabling
+            config (dict): Dictionary of a Memcache Errors Configuration
+        """
+        self.enabled = enabled
+        self.errors = dict(
+            (action, ErrorConfig(*config.get(action, DEFAULT_ERROR_ENTRY)))
+            for action in MEMCACHE_ACTIONS.all())
+
+    def get_by_action(self, action):
+        """Return the corresponding ErrorConfig for the action passed in.
+
+        Args:
+            actions (str): Action as a string. (Options can be found on the
+                           memcache ACTIONS global obect.
+        """
+        return self.errors.get(action)
+
+
+class MemcacheLatenciesConfig(object):
+    """Memcache latencies configuration object.
+
+    Properties:
+        enabled (bool): Flag for enabling
+        mode (str): How latency is injected (Options can be found on the
+                    MODES global object)
+        latencies (dict(str, LatencyConfig)): Latency configuration of each
+                                              action
+    """
+
+    def __init__(self, enabled, config, mode=MODES.BLOCKING):
+        """Initlialize the MemcacheLatenciesConfig object with a LatencyConfig
+        for each memcache action.
+
+        Args:
+            enabled (bool): Flag for enabling
+            config (dict): Dictionary of a Memcache Latencies Configuration
+            mode (str): How latency is injected, blocking the request thread
+                        or delaying the RPC's completion
+
+        Raises:
+            ValueError: If the mode isn't one of MODES
+        """
+        if mode not in MODES.all():
+            raise ValueError("Unknown latency mode {0}".format(mode))
+
+        self.enabled = enabled
+        self.mode = mode
+        self.latencies = dict(
+            (action, LatencyConfig(*config.get(action, DEFAULT_LATENCY_ENTRY)))
+            for action in MEMCACHE_ACTIONS.all())
+
+    def get_by_action(self, action):
+        """Return the corresponding LatencyConfig for the action passed in.
+
+        Args:
+            actions (str): Action as a string. (Options can be found on the
+                           memcache ACTIONS global obect.
+        """
+        return self.latencies.get(action)
+
+
+class EvictionsConfig(object):
+    """Memcache evictions configuration object.
+
+    Properties:
+        enabled (bool): Flag for enabling
+        storms (list(StormConfig)): The eviction storms
+    """
+
+    def __init__(self, enabled, storms):
+        """Initialize the EvictionsConfig object.
+
+        Args:
+            enabled (bool): Flag for enabling
+            storms (list(dict)): Eviction storm configurations
+        """
+        self.enabled = enabled
+        self.storms = [StormConfig(storm) for storm in storms]
+
+
+class StormConfig(object):
+    """Memcache eviction storm configuration object. It also keeps when the
+    current storm ends.
+
+    Properties:
+        type (str): Type of storm (Options can be found on the STORMS global
+                    object)
+        rate (float): Rate a storm starts on a get (between 0.00 and 1.00)
+        fraction (float): Fraction of the keys read that are evicted
+        namespaces (frozenset(str)): Namespaces the storm is limited to
+        duration (float): Seconds the storm lasts
+        until (float): Time the current storm ends
+    """
+
+    def __init__(self, config):
+        """Initialize the StormConfig object.
+
+        Args:
+            config (dict): Dictionary with the `type`, `rate`, `fraction`,
+                           `namespaces` and `duration` of the storm
+
+        Raises:
+            ValueError: If the type isn't one of STORMS or a namespace storm
+                        doesn't have namespaces
+        """
+        self.type = config.get('type', STORMS.FULL)
+
+        if self.type not in STORMS.all():
+            raise ValueError("Unknown eviction storm {0}".format(self.type))
+
+        self.rate = config.get('rate', 0.0)
+        self.fraction = config.get('fraction', 1.0)
+        self.namespaces = frozenset(config.get('namespaces', ()))
+        self.duration = config.get('duration', 0)
+        self.until = 0.0
+
+        if self.type == STORMS.NAMESPACE and not self.namespaces:
+            raise ValueError("A namespace eviction storm needs namespaces")
+
+
+class UrlfetchConfig(object):
+    """URLFetch configuration object.
+
+    Properties:
+        enabled (bool): Whether the urlfetch chaos is enabled
+        mode (str): How latency is injected (Options can be found on the
+                    MODES global object)
+        rules (list(UrlfetchRuleConfig)): The rules, the first rule matching
+                                          a fetch is used
+    """
+
+    def __init__(self, config):
+        """Initialize the UrlfetchConfig object setting the enabled, mode and
+        rules properties off the passed in config.
+
+        Args:
+            config (dict): Dictionary of a URLFetch Configuration
+
+        Raises:
+            ValueError: If the mode isn't one of MODES
+        """
+        self.enabled = config.get('enabled', False)
+        self.mode = config.get('mode', MODES.BLOCKING)
+
+        if self.mode not in MODES.all():
+            raise ValueError("Unknown latency mode {0}".format(self.mode))
+
+        self.rules = [UrlfetchRuleConfig(rule)
+                      for rule in config.get('rules', [])]
+
+
+class UrlfetchRuleConfig(object):
+    """URLFetch rule configuration object.
+
+    Properties:
+        hosts (gchaos.matcher.Matcher): Rules matched against the host name,
+                                        matches every host if empty
+        paths (gchaos.matcher.Matcher): Rules matched against the path,
+                                        matches every path if empty
+        errors (ErrorConfig): Error configuration, None for no errors
+        latency (LatencyConfig): Latency configuration, None for no latency
+        throttle (float): Simulated download rate in kilobytes per second,
+                          None to not throttle
+    """
+
+    def __init__(self, config):
+        """Initialize the UrlfetchRuleConfig object.
+
+        Args:
+            config (dict): Dictionary with the `hosts` and `paths` rules and
+                           the `errors`, `latency` and `throttle` of the rule
+
+        Raises:
+            ValueError: If a regex rule isn't valid or the throttle isn't
+                        positive
+        """
+        self.hosts = Matcher(config.get('hosts'), ignore_case=True)
+        self.paths = Matcher(config.get('paths'))
+
+        self.errors = None
+        self.latency = None
+        self.throttle = config.get('throttle')
+
+        if 'errors' in config:
+            self.errors = ErrorConfig(*config['errors'])
+
+        if 'latency' in config:
+            self.latency = LatencyConfig(*config['latency'])
+
+        if self.throttle is not None and self.throttle <= 0:
+            raise ValueError("The throttle must be positive")
+
+
+class TaskqueueConfig(object):
+    """Task Queue configuration object.
+
+    Properties:
+        enabled (bool): Whether the taskqueue chaos is enabled
+        mode (str): How latency is injected (Options can be found on the
+                    MODES global object)
+        rules (list(TaskqueueRuleConfig)): The rules, the first rule matching
+                                           a queue is used
+    """
+
+    def __init__(self, config):
+        """Initialize the TaskqueueConfig object setting the enabled, mode and
+        rules properties off the passed in config.
+
+        Args:
+            config (dict): Dictionary of a Task Queue Configuration
+
+        Raises:
+            ValueError: If the mode isn't one of MODES
+        """
+        self.enabled = config.get('enabled', False)
+        self.mode = config.get('mode', MODES.BLOCKING)
+
+        if self.mode not in MODES.all():
+            raise ValueError("Unknown latency mode {0}".format(self.mode))
+
+        self.rules = [TaskqueueRuleConfig(rule)
+                      for rule in config.get('rules', [])]
+
+
+class TaskqueueRuleConfig(object):
+    """Task Queue rule configuration object.
+
+    Properties:
+        queues (gchaos.matcher.Matcher): Rules matched against the queue
+                                         name, matches every queue if empty
+        errors (ErrorConfig): Error configuration, None for no errors
+        latency (LatencyConfig): Latency configuration of the add, None for
+                                 no latency
+        delay (LatencyConfig): Delay (in milliseconds) added to the tasks'
+                               ETA, None to not delay them
+    """
+
+    def __init__(self, config):
+        """Initialize the TaskqueueRuleConfig object.
+
+        Args:
+            config (dict): Dictionary with the `queues` rules and the
+                           `errors`, `latency` and `delay` of the rule
+
+        Raises:
+            ValueError: If a regex rule isn't valid
+        """
+        self.queues = Matcher(config.get('queues'))
+
+        self.errors = None
+        self.latency = None
+        self.delay = None
+
+        if 'errors' in config:
+            self.errors = ErrorConfig(*config['errors'])
+
+        if 'latency' in config:
+            self.latency = LatencyConfig(*config['latency'])
+
+        if 'delay' in config:
+            self.delay = LatencyConfig(*config['delay'])
+
+
+class ServiceConfig(object):
+    """Configuration object of a service gchaos only knows the raw RPC names
+    of.
+
+    Properties:
+        enabled (bool): Whether the service chaos is enabled
+        mode (str): How latency is injected (Options can be found on the
+                    MODES global object)
+        calls (dict(str, ServiceCallConfig)): Configuration of each raw RPC
+                                              name, `*` for every other call
+    """
+
+    def __init__(self, config):
+        """Initialize the ServiceConfig object setting the enabled, mode and
+        calls properties off the passed in config.
+
+        Args:
+            config (dict): Dictionary of a Service Configuration
+
+        Raises:
+            ValueError: If the mode isn't one of MODES
+        """
+        self.enabled = config.get('enabled', False)
+        self.mode = config.get('mode', MODES.BLOCKING)
+
+        if self.mode not in MODES.all():
+            raise ValueError("Unknown latency mode {0}".format(self.mode))
+
+        self.calls = dict(
+            (name, ServiceCallConfig(call))
+            for name, call in config.get('calls', {}).iteritems())
+
+
+class ServiceCallConfig(object):
+    """Service call configuration object.
+
+    Properties:
+        errors (ErrorConfig): Error configuration, None for no errors
+        latency (LatencyConfig): Latency configuration, None for no latency
+    """
+
+    def __init__(self, config):
+        """Initialize the ServiceCallConfig object.
+
+        Args:
+            config (dict): Dictionary with the `errors` and `latency` of the
+                           call
+        """
+        self.errors = None
+        self.latency = None
+
+        if 'errors' in config:
+            self.errors = ErrorConfig(*config['errors'])
+
+        if 'latency' in config:
+            self.latency = LatencyConfig(*config['latency'])
+
+
+class BudgetConfig(object):
+    """Per request budget configuration object. A limit of None is
+    unlimited.
+
+    Properties:
+        enabled (bool): Whether requests are given a budget
+        latency_ms (int): Most latency (in milliseconds) injected per request
+        errors (int): Most errors raised per request
+        faults (int): Most faults of any kind caused per request
+    """
+
+    def __init__(self, config):
+        """Initialize the BudgetConfig object.
+
+        Args:
+            config (dict): Dictionary with the `enabled`, `latency_ms`,
+                           `errors` and `faults` of the budget
+
+        Raises:
+            ValueError: If a limit is negative
+        """
+        self.enabled = config.get('enabled', False)
+        self.latency_ms = config.get('latency_ms')
+        self.errors = config.get('errors')
+        self.faults = config.get('faults')
+
+        for limit in (self.latency_ms, self.errors, self.faults):
+            if limit is not None and limit < 0:
+                raise ValueError("Budget limits can't be negative")
+
+
+class DeadlinesConfig(object):
+    """Deadlines configuration object.
+
+    Properties:
+        enabled (bool): Whether stalls are checked against deadlines
+        mode (str): What happens to a stall overrunning a deadline (Options
+                    can be found on the gchaos.deadline.MODES global object)
+        request (float): Seconds a request has to respond
+        task (float): Seconds a task queue or cron request has to respond
+    """
+
+    def __init__(self, config):
+        """Initialize the DeadlinesConfig object.
+
+        Args:
+            config (dict): Dictionary with the `enabled`, `mode`, `request`,
+                           `task`, `request_error`, `rpc_error` and `errors`
+                           (the timeout error of each service) of the
+                           deadlines
+
+        Raises:
+            ValueError: If the mode isn't one of gchaos.deadline.MODES or a
+                        deadline isn't positive
+        """
+        self.enabled = config.get('enabled', False)
+        self.mode = config.get('mode', DEADLINE_MODES.TIMEOUT)
+
+        if self.mode not in DEADLINE_MODES.all():
+            raise ValueError("Unknown deadline mode {0}".format(self.mode))
+
+        self.request = config.get('request', REQUEST_DEADLINE)
+        self.task = config.get('task', TASK_DEADLINE)
+
+        if self.request <= 0 or self.task <= 0:
+            raise ValueError("Deadlines must be positive")
+
+        self._request_error = config.get('request_error', REQUEST_ERROR)
+        self._rpc_error = config.get('rpc_error', RPC_ERROR)
+        self._errors = dict(config.get('errors', {}))
+
+    def error(self, service=None):
+        """Return the error class a deadline times out with. The path is
+        resolved on first use.
+
+        Args:
+            service (str): Service of the RPC whose deadline it is, None for
+                           the request's deadline
+
+        Return:
+            type
+
+        Raises:
+            gchaos.utils.BadObjectPathError: If the error path can't be
+                                             resolved
+        """
+        if service is None:
+            return resolve_path(self._request_error)
+
+        return resolve_path(self._errors.get(service, self._rpc_error))
+
+    def resolve(self):
+        """Resolve the error path of every deadline.
+
+        Return:
+            None
+
+        Raises:
+            gchaos.utils.BadObjectPathError: If an error path can't be
+                                             resolved
+        """
+        self.error()
+
+        for service in [''] + self._errors.keys():
+            self.error(service)
+
+
+class MetricsConfig(object):
+    """Metrics configuration object.
+
+    Properties:
+        enabled (bool): Whether the chaos caused is counted
+        stall_buckets (tuple(int)): Upper bounds (in milliseconds) of the
+                                    injected stall histogram buckets
+        overhead_buckets (tuple(int)): Upper bounds (in microseconds) of the
+                                       hook overhead histogram buckets
+    """
+
+    def __init__(self, config):
+        """Initialize the MetricsConfig object.
+
+        Args:
+            config (dict): Dictionary with the `enabled`, `stall_buckets` and
+                           `overhead_buckets` of the metrics
+
+        Raises:
+            ValueError: If the bucket bounds aren't positive and increasing
+        """
+        self.enabled = config.get('enabled', False)
+        self.stall_buckets = tuple(
+            config.get('stall_buckets', STALL_BUCKETS))
+        self.overhead_buckets = tuple(
+            config.get('overhead_buckets', OVERHEAD_BUCKETS))
+
+        for buckets in (self.stall_buckets, self.overhead_buckets):
+            if not buckets or buckets[0] <= 0 or any(
+                    low >= high for low, high in zip(buckets, buckets[1:])):
+                raise ValueError(
+                    "Bucket bounds must be positive and increasing")
+
+
+class TracingConfig(object):
+    """Tracing configuration object.
+
+    Properties:
+        enabled (bool): Whether the chaos caused is annotated
+        capacity (int): Most annotations buffered
+        batch_size (int): Annotations exported at once
+        flush_interval (float): Seconds before a partial batch is flushed
+        path (str): File the spans are written to instead of exporting them
+    """
+
+    def __init__(self, config):
+        """Initialize the TracingConfig object.
+
+        Args:
+            config (dict): Dictionary with the `enabled`, `capacity`,
+                           `batch_size`, `flush_interval`, `exporter` and
+                           `path` of the tracing
+
+        Raises:
+            ValueError: If the capacity or batch size isn't positive or the
+                        flush interval is negative
+        """
+        self.enabled = config.get('enabled', False)
+        self.capacity = config.get('capacity', CAPACITY)
+        self.batch_size = config.get('batch_size', BATCH_SIZE)
+        self.flush_interval = config.get('flush_interval', FLUSH_INTERVAL)
+        self.path = config.get('path')
+
+        if self.capacity <= 0 or self.batch_size <= 0:
+            raise ValueError("Tracing capacity and batch size must be "
+                             "positive")
+
+        if self.flush_interval < 0:
+            raise ValueError("Tracing flush interval can't be negative")
+
+        self._exporter = config.get('exporter') or EXPORTER
+
+    def exporter(self):
+        """Return the function the spans are exported with, writing them to
+        the path when there is one. The path is resolved on first use.
+
+        Return:
+            func
+
+        Raises:
+            gchaos.utils.BadObjectPathError: If the exporter path can't be
+                                             resolved
+        """
+        if self.path:
+            return JsonFileExporter(self.path)
+
+        return resolve_path(self._exporter)
+
+
+class ReplayConfig(object):
+    """Record and replay configuration object.
+
+    Properties:
+        enabled (bool): Whether the chaos is recorded or replayed
+        mode (str): What is done with the schedule (Options can be found on
+                    the gchaos.replay.MODES global object)
+        path (str): File the schedule is recorded to or replayed from
+    """
+
+    def __init__(self, config):
+        """Initialize the ReplayConfig object.
+
+        Args:
+            config (dict): Dictionary with the `enabled`, `mode` and `path` of
+                           the schedule
+
+        Raises:
+            ValueError: If the mode isn't one of gchaos.replay.MODES
+        """
+        self.enabled = config.get('enabled', False)
+        self.mode = config.get('mode', REPLAY_MODES.RECORD)
+
+        if self.mode not in REPLAY_MODES.all():
+            raise ValueError("Unknown replay mode {0}".format(self.mode))
+
+        self.path = config.get('path', REPLAY_PATH)
@@ -0,0 +1,289 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import cPickle as pickle
+import hashlib
+import json
+import logging
+import os
+
+from gchaos.config.hydrate import ChaosConfig
+from gchaos.gae.memcache.bypass import bypass
+from gchaos.log import logger
+
+
+# Environment variable with the path of the config file
+CONFIG_ENV = 'GCHAOS_CONFIG'
+
+# Config files looked for in the app's directory, next to app.yaml
+CONFIG_FILES = ('gchaos.yaml', 'gchaos.yml', 'gchaos.json')
+
+# Top level config sections
+SECTIONS = frozenset([
+    'datastore', 'memcache', 'urlfetch', 'taskqueue', 'search', 'blobstore',
+    'budget', 'deadlines', 'metrics', 'tracing', 'replay', 'quiet',
+    'seed'])
+
+# Sections that aren't dictionaries
+VALUES = frozenset(['quiet', 'seed'])
+
+# Memcache namespace and key of a hydrated config. Bump the format when the
+# hydrated objects change in a way older pickles can't be loaded into.
+CACHE_NAMESPACE = 'gchaos'
+CACHE_KEY = 'config:file:{0}:{1}:{2}:{3}'
+CACHE_FORMAT = 8
+
+
+def find_path(root=None):
+    """Return the path of the config file, from the environment variable or
+    the first config file in the app's directory.
+
+    Args:
+        root (str): Directory to look in, defaults to the current directory
+                    which is the app's directory on App Engine
+
+    Return:
+        str: Path of the config file, None if there isn't one
+    """
+    path = os.environ.get(CONFIG_ENV)
+
+    if path:
+        return path
+
+    root = root or os.getcwd()
+
+    for name in CONFIG_FILES:
+        path = os.path.join(root, name)
+
+        if os.path.isfile(path):
+            return path
+
+    return None
+
+
+def load_file(path, defaults=None, cache=True):
+    """Load the config file into a ChaosConfig. Sections in the file replace
+    the same section of the defaults.
+
+    The config is hydrated and resolved, so a bad setting or error path in
+    any section fails here, and only then cached in memcache by the file's
+    modification time and hash, so new instances of the same version skip
+    parsing and hydrating the file.
+
+    Args:
+        path (str): Path of a YAML or JSON config file
+        defaults (dict): Config the file's sections are added to
+        cache (bool): Whether to use the cached config
+
+    Return:
+        gchaos.config.hydrate.ChaosConfig
+
+    Raises:
+        IOError: If the file can't be read
+        ValueError: If the config isn't valid
+        gchaos.utils.BadObjectPathError: If a path in it can't be resolved
+    """
+    with open(path, 'rb') as config_file:
+        data = config_file.read()
+
+    key = None
+
+    if cache:
+        key = cache_key(os.path.getmtime(path), data)
+        config = _get_cached(key)
+
+        if config is not None:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Loaded the cached config for %s", path)
+
+            return config
+
+    config = dict(defaults or {})
+    config.update(parse(path, data))
+    config = ChaosConfig(config)
+    config.resolve()
+
+    if key:
+        _set_cached(key, config)
+
+    return config
+
+
+def parse(path, data):
+    """Parse and validate the contents of a config file. Files ending in
+    `.json` are JSON and the others YAML. Lists are turned into tuples, like
+    the in memory config uses.
+
+    Args:
+        path (str): Path of the config file
+        data (str): Contents of the config file
+
+    Return:
+        dict
+
+    Raises:
+        ValueError: If the file can't be parsed or the config isn't valid
+    """
+    if path.endswith('.json'):
+        config = json.loads(data)
+    else:
+        config = _load_yaml(path, data)
+
+    validate(config)
+
+    return _to_tuples(config)
+
+
+def _load_yaml(path, data):
+    """Parse a YAML config. PyYAML is only imported for YAML files.
+
+    Args:
+        path (str): Path of the config file
+        data (str): Contents of the config file
+
+    Return:
+        object
+
+    Raises:
+        ValueError: If PyYAML isn't installed or the file can't be parsed
+    """
+    try:
+        import yaml
+    except ImportError:
+        raise ValueError("PyYAML is needed to load {0}".format(path))
+
+    try:
+        return yaml.safe_load(data)
+    except yaml.YAMLError as e:
+        raise ValueError("Invalid YAML in {0}: {1}".format(path, e))
+
+
+def validate(config):
+    """Check the config is a dictionary of known sections. Only the section
+    names and types are checked, the settings in them are checked when the
+    config is hydrated and resolved by load_file.
+
+    Args:
+        config (object): Parsed config
+
+    Return:
+        None
+
+    Raises:
+        ValueError: If the config isn't valid
+    """
+    if not isinstance(config, dict):
+        raise ValueError("The config must be a mapping of sections")
+
+    unknown = set(config) - SECTIONS
+
+    if unknown:
+        raise ValueError("Unknown config sections {0}".format(
+            ", ".join(sorted(unknown))))
+
+    for name, section in config.iteritems():
+        if name not in VALUES and not isinstance(section, dict):
+            raise ValueError("The {0} section must be a mapping".format(name))
+
+
+def cache_key(mtime, data):
+    """Return the memcache key of the hydrated config of a file. The app's
+    version is part of it so a deploy never loads objects pickled by other
+    code.
+
+    Args:
+        mtime (float): Modification time of the file
+        data (str): Contents of the file
+
+    Return:
+        str
+    """
+    return CACHE_KEY.format(
+        CACHE_FORMAT, os.environ.get('CURRENT_VERSION_ID', ''), int(mtime),
+        hashlib.sha1(data).hexdigest())
+
+
+def _get_cached(key):
+    """Return the cached config, None if it isn't cached or can't be loaded.
+
+    Args:
+        key (str): Cache key
+
+    Return:
+        gchaos.config.hydrate.ChaosConfig
+    """
+    from google.appengine.api import memcache
+
+    try:
+        with bypass():
+            blob = memcache.get(key, namespace=CACHE_NAMESPACE)
+
+        if blob is None:
+            return None
+
+        return pickle.loads(blob)
+    except Exception:
+        # Memcache may not be available yet, and an unreadable pickle is
+        # replaced once the file is hydrated.
+        logger.debug("Couldn't load the cached config", exc_info=True)
+
+        return None
+
+
+def _set_cached(key, config):
+    """Cache the hydrated config.
+
+    Args:
+        key (str): Cache key
+        config (gchaos.config.hydrate.ChaosConfig): Hydrated config
+
+    Return:
+        None
+    """
+    from google.appengine.api import memcache
+
+    try:
+        blob = pickle.dumps(config, pickle.HIGHEST_PROTOCOL)
+
+        with bypass():
+            memcache.set(key, blob, namespace=CACHE_NAMESPACE)
+    except Exception:
+        logger.debug("Couldn't cache the config", exc_info=True)
+
+
+def _to_tuples(value):
+    """Return the value with every list in it turned into a tuple.
+
+    Args:
+        value (object): Parsed config value
+
+    Return:
+        object
+    """
+    if isinstance(value, dict):
+        return dict((key, _to_tuples(item))
+                    for key, item in value.iteritems())
+
+    if isinstance(value, list):
+        return tuple(_to_tuples(item) for item in value)
+
+    return value
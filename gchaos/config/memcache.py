@@ -0,0 +1,83 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# GOOGLE FILE
+# google-cloud-sdk/platform/google_appengine/google/appengine/runtime/apiproxy_errors.py
+#
+# The memcache client catches these and treats them as a miss (get) or a
+# failed write (set, delete, incr).
+
+ERRORS_MODULE = 'google.appengine.runtime.apiproxy_errors'
+
+# Set action names
+GET = 'GET'
+SET = 'SET'
+DELETE = 'DELETE'
+INCREMENT = 'INCREMENT'
+BATCH_INCREMENT = 'BATCH_INCREMENT'
+
+# Set error rates
+GET_ERROR_RATE = 0.01
+SET_ERROR_RATE = 0.01
+DELETE_ERROR_RATE = 0.01
+INCREMENT_ERROR_RATE = 0.01
+
+# Configure error types
+ERRORS = {
+    ERRORS_MODULE + '.DeadlineExceededError': 70,
+    ERRORS_MODULE + '.RPCFailedError': 20,
+    ERRORS_MODULE + '.CapabilityDisabledError': 10,
+}
+
+DEFAULT_LATENCY = (20, 500)
+GET_LATENCY_RATE = 0.01
+SET_LATENCY_RATE = 0.01
+DELETE_LATENCY_RATE = 0.01
+INCREMENT_LATENCY_RATE = 0.01
+
+# Evict half of the keys read for 30 seconds
+EVICTION_STORMS = [
+    {'type': 'fraction', 'fraction': 0.5, 'rate': 0.0001, 'duration': 30},
+]
+
+# Wrap it all up into the CONFIG variable. Memcache chaos is off by default.
+CONFIG = {
+    'enabled': False,
+    'errors': (True, {
+        GET: (ERRORS, GET_ERROR_RATE),
+        SET: (ERRORS, SET_ERROR_RATE),
+        DELETE: (ERRORS, DELETE_ERROR_RATE),
+        INCREMENT: (ERRORS, INCREMENT_ERROR_RATE),
+        BATCH_INCREMENT: (ERRORS, INCREMENT_ERROR_RATE),
+    }),
+    'latency': (True, {
+        GET: (DEFAULT_LATENCY, GET_LATENCY_RATE),
+        SET: (DEFAULT_LATENCY, SET_LATENCY_RATE),
+        DELETE: (DEFAULT_LATENCY, DELETE_LATENCY_RATE),
+        INCREMENT: (DEFAULT_LATENCY, INCREMENT_LATENCY_RATE),
+        BATCH_INCREMENT: (DEFAULT_LATENCY, INCREMENT_LATENCY_RATE),
+    }),
+    'evictions': (True, EVICTION_STORMS),
+}
+
+# Place CONFIG in the list of publically available variables
+__all__ = [CONFIG]
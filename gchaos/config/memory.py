@@ -21,13 +21,45 @@
 # SOFTWARE.
 
 
+from gchaos.config.blobstore import CONFIG as BLOBSTORE_CONFIG
+from gchaos.config.budget import CONFIG as BUDGET_CONFIG
 from gchaos.config.datastore import CONFIG as DATASTORE_CONFIG
+from gchaos.config.deadlines import CONFIG as DEADLINES_CONFIG
+from gchaos.config.memcache import CONFIG as MEMCACHE_CONFIG
+from gchaos.config.metrics import CONFIG as METRICS_CONFIG
+from gchaos.config.replay import CONFIG as REPLAY_CONFIG
+from gchaos.config.search import CONFIG as SEARCH_CONFIG
+from gchaos.config.taskqueue import CONFIG as TASKQUEUE_CONFIG
+from gchaos.config.tracing import CONFIG as TRACING_CONFIG
+from gchaos.config.urlfetch import CONFIG as URLFETCH_CONFIG
 
 DATASTORE = 'datastore'
+MEMCACHE = 'memcache'
+URLFETCH = 'urlfetch'
+TASKQUEUE = 'taskqueue'
+SEARCH = 'search'
+BLOBSTORE = 'blobstore'
+BUDGET = 'budget'
+DEADLINES = 'deadlines'
+METRICS = 'metrics'
+TRACING = 'tracing'
+REPLAY = 'replay'
+QUIET = 'quiet'
 
 
 DEFAULT_CONFIG = {
-    DATASTORE: DATASTORE_CONFIG
+    DATASTORE: DATASTORE_CONFIG,
+    MEMCACHE: MEMCACHE_CONFIG,
+    URLFETCH: URLFETCH_CONFIG,
+    TASKQUEUE: TASKQUEUE_CONFIG,
+    SEARCH: SEARCH_CONFIG,
+    BLOBSTORE: BLOBSTORE_CONFIG,
+    BUDGET: BUDGET_CONFIG,
+    DEADLINES: DEADLINES_CONFIG,
+    METRICS: METRICS_CONFIG,
+    TRACING: TRACING_CONFIG,
+    REPLAY: REPLAY_CONFIG,
+    QUIET: False,
 }
 
 
@@ -0,0 +1,40 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# Upper bounds (in milliseconds) of the injected stall histogram buckets, up
+# to the 60 second request deadline. Anything longer lands in +Inf.
+STALL_BUCKETS = (10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+# Upper bounds (in microseconds) of the buckets of the time spent in the hooks
+# themselves, stalls excluded.
+OVERHEAD_BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+# Wrap it all up into the CONFIG variable. Metrics are off by default, when on
+# every hooked RPC is counted and timed.
+CONFIG = {
+    'enabled': False,
+    'stall_buckets': STALL_BUCKETS,
+    'overhead_buckets': OVERHEAD_BUCKETS,
+}
+
+# Place CONFIG in the list of publically available variables
+__all__ = [CONFIG]
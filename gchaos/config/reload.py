@@ -0,0 +1,205 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import logging
+
+from threading import Lock
+from time import time
+from uuid import uuid4
+
+from gchaos.config.hydrate import ChaosConfig
+from gchaos.gae.memcache.bypass import bypass
+from gchaos.install import update_chaos
+from gchaos.log import logger
+from gchaos.log import PREFIX
+
+
+# Memcache namespace the config is kept in
+NAMESPACE = 'gchaos'
+
+# Key of the latest config version and of each version's config
+VERSION_KEY = 'config:version'
+CONFIG_KEY = 'config:{0}'
+
+# Seconds between checks for a new version
+DEFAULT_INTERVAL = 30
+
+
+def publish(config, namespace=NAMESPACE):
+    """Store the config in memcache as a new version for every instance to
+    pick up. The config is hydrated and its paths resolved first so a bad
+    config is never published.
+
+    The version is the publish time tagged with a random suffix rather than a
+    counter, a counter would start over if memcache evicted it and instances
+    already on that number would never load the new config.
+
+    Args:
+        config (dict): Dictionary of a Chaos Configuration
+        namespace (str): Memcache namespace to store it in
+
+    Return:
+        str: The new version, None if memcache couldn't store it
+
+    Raises:
+        ValueError: If the config isn't valid
+        gchaos.utils.BadObjectPathError: If a path in it can't be resolved
+    """
+    from google.appengine.api import memcache
+
+    ChaosConfig(config).resolve()
+
+    version = '{0:.6f}-{1}'.format(time(), uuid4().hex[:8])
+
+    with bypass():
+        # The config is stored before the version points at it.
+        if not memcache.set(CONFIG_KEY.format(version), config,
+                            namespace=namespace):
+            return None
+
+        if not memcache.set(VERSION_KEY, version, namespace=namespace):
+            return None
+
+    return version
+
+
+class MemcacheSource(object):
+    """Config kept up to date with the latest version published to memcache.
+
+    Checking is cheap: at most once every interval one thread reads the
+    version key, the config itself is only fetched and hydrated when the
+    version changed. The new config replaces the current one with a single
+    assignment so threads reading it never wait on a lock.
+
+    Properties:
+        config (gchaos.config.hydrate.ChaosConfig): The current config
+        version (str): Version of the current config, None until one is
+                       loaded from memcache
+        interval (float): Seconds between checks for a new version
+        namespace (str): Memcache namespace the config is kept in
+    """
+
+    def __init__(self, config, interval=DEFAULT_INTERVAL, namespace=NAMESPACE,
+                 on_change=None):
+        """Initialize the MemcacheSource object.
+
+        Args:
+            config (gchaos.config.hydrate.ChaosConfig): Config used until a
+                                                        version is loaded
+            interval (float): Seconds between checks for a new version
+            namespace (str): Memcache namespace the config is kept in
+            on_change (func): Called with each new config, defaults to
+                              replacing the installed hooks with its
+        """
+        self.config = config
+        self.version = None
+        self.interval = interval
+        self.namespace = namespace
+        self.on_change = on_change or update_chaos
+
+        self._next_check = 0.0
+        self._lock = Lock()
+
+    def check(self, now=None):
+        """Check for a new version if the interval has passed and return the
+        current config. Threads that come in while another is checking don't
+        wait for it, they use the current config.
+
+        Args:
+            now (float): Current time, defaults to time()
+
+        Return:
+            gchaos.config.hydrate.ChaosConfig
+        """
+        if now is None:
+            now = time()
+
+        if now >= self._next_check and self._lock.acquire(False):
+            try:
+                if now >= self._next_check:
+                    self._next_check = now + self.interval
+                    self.refresh()
+            finally:
+                self._lock.release()
+
+        return self.config
+
+    def refresh(self):
+        """Load the latest version if it's new. A version whose config is
+        missing is retried on the next check and one that fails to hydrate or
+        install is skipped, the current config is kept until then.
+
+        Return:
+            bool: True if the config was replaced
+        """
+        from google.appengine.api import memcache
+
+        with bypass():
+            version = memcache.get(VERSION_KEY, namespace=self.namespace)
+
+            if version is None or version == self.version:
+                return False
+
+            raw = memcache.get(CONFIG_KEY.format(version),
+                               namespace=self.namespace)
+
+        if raw is None:
+            return False
+
+        self.version = version
+
+        try:
+            config = ChaosConfig(raw)
+            config.resolve()
+            self.on_change(config)
+        except Exception:
+            logger.exception("%sSkipping invalid config version %s",
+                             PREFIX, version)
+            return False
+
+        self.config = config
+
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("%sLoaded config version %s", PREFIX, version)
+
+        return True
+
+
+def reload_middleware(app, source):
+    """Wrap a WSGI app so the config is checked for a new version at the
+    start of each request.
+
+    Args:
+        app (func): WSGI application
+        source (MemcacheSource): Config source to check
+
+    Return:
+        func: WSGI application
+    """
+    check = source.check
+
+    def wrapped(environ, start_response):
+        check()
+
+        return app(environ, start_response)
+
+    return wrapped
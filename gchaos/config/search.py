@@ -0,0 +1,67 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+# GOOGLE FILE
+# google-cloud-sdk/platform/google_appengine/google/appengine/runtime/apiproxy_errors.py
+#
+# The search client only translates application errors so these reach the
+# caller as they are.
+
+ERRORS_MODULE = 'google.appengine.runtime.apiproxy_errors'
+
+# Set error rates
+SEARCH_ERROR_RATE = 0.01
+INDEX_ERROR_RATE = 0.01
+
+# Configure error types
+ERRORS = {
+    ERRORS_MODULE + '.DeadlineExceededError': 80,
+    ERRORS_MODULE + '.RPCFailedError': 20,
+}
+
+DEFAULT_LATENCY = (50, 1000)
+SEARCH_LATENCY_RATE = 0.01
+INDEX_LATENCY_RATE = 0.01
+
+# Wrap it all up into the CONFIG variable. The calls are keyed by their raw
+# RPC names. Search chaos is off by default.
+CONFIG = {
+    'enabled': False,
+    'calls': {
+        'Search': {
+            'errors': (ERRORS, SEARCH_ERROR_RATE),
+            'latency': (DEFAULT_LATENCY, SEARCH_LATENCY_RATE),
+        },
+        'IndexDocument': {
+            'errors': (ERRORS, INDEX_ERROR_RATE),
+            'latency': (DEFAULT_LATENCY, INDEX_LATENCY_RATE),
+        },
+        'DeleteDocument': {
+            'errors': (ERRORS, INDEX_ERROR_RATE),
+            'latency': (DEFAULT_LATENCY, INDEX_LATENCY_RATE),
+        },
+    },
+}
+
+# Place CONFIG in the list of publically available variables
+__all__ = [CONFIG]
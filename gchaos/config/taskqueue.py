@@ -0,0 +1,57 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# GOOGLE FILE
+# google-cloud-sdk/platform/google_appengine/google/appengine/api/taskqueue/taskqueue.py
+
+ERRORS_MODULE = 'google.appengine.api.taskqueue.taskqueue'
+
+# Set error rate
+ERROR_RATE = 0.01
+
+# Configure error types
+ERRORS = {
+    ERRORS_MODULE + '.TransientError': 80,
+    ERRORS_MODULE + '.InternalError': 10,
+    ERRORS_MODULE + '.TaskAlreadyExistsError': 10,
+}
+
+# Fail part of a batch of tasks instead of all of them
+ERROR_BATCH = {'partial': True}
+
+DEFAULT_LATENCY = (100, 2000)
+LATENCY_RATE = 0.01
+
+# Wrap it all up into the CONFIG variable. A rule without queues matches
+# every queue. Task Queue chaos is off by default.
+CONFIG = {
+    'enabled': False,
+    'rules': [
+        {
+            'errors': (ERRORS, ERROR_RATE, ERROR_BATCH),
+            'latency': (DEFAULT_LATENCY, LATENCY_RATE),
+        },
+    ],
+}
+
+# Place CONFIG in the list of publically available variables
+__all__ = [CONFIG]
@@ -0,0 +1,50 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# Most annotations kept while waiting to be flushed. Past it the oldest are
+# dropped so a stalled exporter can't eat the instance's memory.
+CAPACITY = 10000
+
+# Annotations handed to the exporter at once
+BATCH_SIZE = 100
+
+# Seconds an annotation waits for its batch to fill before it is flushed
+# anyway, checked whenever chaos is annotated.
+FLUSH_INTERVAL = 5.0
+
+# Object path of the function the batches of spans are exported with
+EXPORTER = 'gchaos.tracing.log_exporter'
+
+# Wrap it all up into the CONFIG variable. Tracing is off by default. Set the
+# path to write the spans to a file, one JSON object per line, instead of
+# exporting them.
+CONFIG = {
+    'enabled': False,
+    'capacity': CAPACITY,
+    'batch_size': BATCH_SIZE,
+    'flush_interval': FLUSH_INTERVAL,
+    'exporter': EXPORTER,
+    'path': None,
+}
+
+# Place CONFIG in the list of publically available variables
+__all__ = [CONFIG]
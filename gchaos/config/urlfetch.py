@@ -0,0 +1,54 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# GOOGLE FILE
+# google-cloud-sdk/platform/google_appengine/google/appengine/api/urlfetch_errors.py
+
+ERRORS_MODULE = 'google.appengine.api.urlfetch_errors'
+
+# Set error rate
+ERROR_RATE = 0.01
+
+# Configure error types
+ERRORS = {
+    ERRORS_MODULE + '.DeadlineExceededError': 60,
+    ERRORS_MODULE + '.DownloadError': 30,
+    ERRORS_MODULE + '.InternalTransientError': 10,
+}
+
+DEFAULT_LATENCY = (500, 5000)
+LATENCY_RATE = 0.01
+
+# Wrap it all up into the CONFIG variable. A rule without hosts or paths
+# matches every fetch. URLFetch chaos is off by default.
+CONFIG = {
+    'enabled': False,
+    'rules': [
+        {
+            'errors': (ERRORS, ERROR_RATE),
+            'latency': (DEFAULT_LATENCY, LATENCY_RATE),
+        },
+    ],
+}
+
+# Place CONFIG in the list of publically available variables
+__all__ = [CONFIG]
@@ -0,0 +1,195 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import logging
+
+from threading import local
+from time import time
+
+from gchaos.log import logger
+from gchaos.log import PREFIX
+
+
+_LOCAL = local()
+
+# Deadlines configuration of the installed chaos, None when deadlines are off.
+_CONFIG = None
+
+# WSGI environ keys of the headers App Engine sets on task queue and cron
+# requests, which get the longer deadline.
+TASK_HEADERS = ('HTTP_X_APPENGINE_QUEUENAME', 'HTTP_X_APPENGINE_CRON')
+
+
+class MODES:
+    """What happens to a stall that would overrun a deadline."""
+
+    # Stall until the deadline then raise the timeout error.
+    TIMEOUT = "timeout"
+    # Stall until the deadline and let the call carry on.
+    CLAMP = "clamp"
+
+    @classmethod
+    def all(cls):
+        """Return a tuple of all the deadline modes.
+
+        Return:
+            tuple(str): Tuple of deadline mode strings
+        """
+        return (cls.TIMEOUT, cls.CLAMP)
+
+
+def configure(deadlines_config):
+    """Set the deadlines configuration stalls are checked against.
+
+    Args:
+        deadlines_config (gchaos.config.hydrate.DeadlinesConfig): Deadlines
+                                                                  configuration
+
+    Return:
+        None
+    """
+    global _CONFIG
+
+    _CONFIG = deadlines_config if deadlines_config.enabled else None
+
+
+def begin(environ=None):
+    """Start the current thread's request deadline. Task queue and cron
+    requests get the task deadline, every other request the request deadline.
+
+    Args:
+        environ (dict): WSGI environ of the request
+
+    Return:
+        float: Time the request's deadline passes, None when deadlines are off
+    """
+    config = _CONFIG
+
+    if config is None:
+        _LOCAL.deadline = None
+        return None
+
+    seconds = config.request
+
+    if environ and any(header in environ for header in TASK_HEADERS):
+        seconds = config.task
+
+    _LOCAL.deadline = time() + seconds
+
+    return _LOCAL.deadline
+
+
+def end():
+    """Drop the current thread's request deadline.
+
+    Return:
+        None
+    """
+    _LOCAL.deadline = None
+
+
+def remaining():
+    """Return the milliseconds left until the current request's deadline.
+
+    Return:
+        float: Milliseconds, None outside a request
+    """
+    deadline = getattr(_LOCAL, 'deadline', None)
+
+    if deadline is None:
+        return None
+
+    return max(deadline - time(), 0) * 1000
+
+
+def check(milli_time, rpc=None, service=None):
+    """Check the stall against the RPC's deadline and the request's. If it
+    would overrun the first of them it is cut short to it, and unless the mode
+    is clamp the error the deadline times out with is returned.
+
+    The RPC's package isn't set yet when the hooks run, so the service the RPC
+    is made to is passed in by the hook.
+
+    Args:
+        milli_time (int): Stall time in milliseconds
+        rpc (google.appengine.api.apiproxy_rpc.RPC): The RPC being made
+        service (str): Service the RPC is made to
+
+    Return:
+        tuple(int, BaseException): The stall time in milliseconds and the
+                                   timeout error, None when it doesn't time out
+    """
+    config = _CONFIG
+
+    if config is None:
+        return milli_time, None
+
+    limit = None
+    # The service whose RPC deadline is first, None for the request's
+    timed_out = None
+
+    deadline = getattr(rpc, 'deadline', None)
+
+    if deadline and deadline > 0:
+        limit = deadline * 1000
+        timed_out = service or ''
+
+    left = remaining()
+
+    if left is not None and (limit is None or left < limit):
+        limit = left
+        timed_out = None
+
+    if limit is None or milli_time <= limit:
+        return milli_time, None
+
+    limit = int(limit)
+
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("%sThe stall would overrun the deadline in %s "
+                    "milliseconds", PREFIX, limit)
+
+    if config.mode == MODES.CLAMP:
+        return limit, None
+
+    return limit, config.error(timed_out)()
+
+
+def deadline_middleware(app):
+    """Wrap a WSGI app so stalls in each request are checked against its
+    deadline.
+
+    Args:
+        app (func): WSGI application
+
+    Return:
+        func: WSGI application
+    """
+    def wrapped(environ, start_response):
+        begin(environ)
+
+        try:
+            return app(environ, start_response)
+        finally:
+            end()
+
+    return wrapped
@@ -0,0 +1,433 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import csv
+import math
+
+from gchaos.chance import uniform
+from gchaos.errors import InvalidLatencyException
+
+
+# Number of segments in the inverse CDF tables.
+TABLE_SIZE = 1024
+
+# Highest quantile in the tables for distributions without an upper bound.
+MAX_QUANTILE = 0.99999
+
+# Quantile from which unbounded distributions are drawn from their inverse CDF
+# rather than interpolated from the table.
+TAIL_QUANTILE = 0.99
+
+
+class DISTRIBUTIONS:
+    """Named latency distributions."""
+
+    EXPONENTIAL = "exponential"
+    LOGNORMAL = "lognormal"
+    PARETO = "pareto"
+    PERCENTILES = "percentiles"
+    HISTOGRAM = "histogram"
+
+    @classmethod
+    def all(cls):
+        """Return a tuple of all the distribution names.
+
+        Return:
+            tuple(str): Tuple of distribution name strings
+        """
+        return (cls.EXPONENTIAL, cls.LOGNORMAL, cls.PARETO, cls.PERCENTILES,
+                cls.HISTOGRAM)
+
+
+class Distribution(object):
+    """A distribution of values stored as an inverse CDF table. The table
+    holds the value at evenly spaced quantiles so drawing a value is a lookup
+    and a linear interpolation between two entries.
+
+    A heavy tail grows far too fast between the table entries to be
+    interpolated, so unbounded distributions keep their inverse CDF and draws
+    from TAIL_QUANTILE up are computed exactly.
+
+    Properties:
+        table (list<float>): Values at the quantiles 0, 1/n, ..., 1
+        max_value (float): Values drawn are capped to this if set
+    """
+
+    def __init__(self, table, max_value=None, tail=None):
+        """Initialize the Distribution object.
+
+        Args:
+            table (list<float>): Values at evenly spaced quantiles, at least
+                                 two entries
+            max_value (float): Cap for the values drawn
+            tail (func): Inverse CDF used for quantiles from TAIL_QUANTILE
+        """
+        if len(table) < 2:
+            raise InvalidLatencyException(table)
+
+        if max_value is not None:
+            table = [min(value, max_value) for value in table]
+
+        self.table = table
+        self.max_value = max_value
+        self._segments = len(table) - 1
+        self._tail = tail
+
+    def sample(self):
+        """Draw a value from the distribution.
+
+        Return:
+            float
+        """
+        return self.value_at(uniform())
+
+    def value_at(self, quantile):
+        """Return the value at the quantile.
+
+        Args:
+            quantile (float): Quantile in [0.0, 1.0]
+
+        Return:
+            float
+        """
+        position = quantile * self._segments
+        index = int(position)
+
+        if self._tail is not None and quantile >= TAIL_QUANTILE:
+            value = self._tail(quantile)
+
+            if self.max_value is not None:
+                return min(value, self.max_value)
+
+            return value
+
+        if index >= self._segments:
+            return self.table[-1]
+
+        low = self.table[index]
+
+        return low + (position - index) * (self.table[index + 1] - low)
+
+
+def from_config(config):
+    """Build a Distribution from a latency distribution configuration.
+
+    Args:
+        config (dict): The distribution name under `distribution` and its
+                       parameters. `max` caps the values for any of them.
+
+    Return:
+        Distribution
+
+    Raises:
+        InvalidLatencyException: If the configuration isn't valid
+    """
+    name = config.get('distribution')
+
+    try:
+        builder = _BUILDERS[name]
+    except KeyError:
+        raise InvalidLatencyException(config)
+
+    try:
+        table, tail = builder(config)
+    except (KeyError, TypeError, ValueError, IOError):
+        raise InvalidLatencyException(config)
+
+    return Distribution(table, config.get('max'), tail)
+
+
+def build_table(inverse_cdf, size=TABLE_SIZE, max_quantile=MAX_QUANTILE):
+    """Build an inverse CDF table by evaluating the inverse CDF at evenly
+    spaced quantiles. The last quantile is max_quantile since unbounded
+    distributions have no value at 1.
+
+    Args:
+        inverse_cdf (func): Takes a quantile and returns the value
+        size (int): Number of segments in the table
+        max_quantile (float): Quantile used for the end of the table
+
+    Return:
+        list<float>
+    """
+    table = [inverse_cdf(i / float(size)) for i in xrange(size)]
+    table.append(inverse_cdf(max_quantile))
+
+    return table
+
+
+def unbounded(inverse_cdf, max_quantile=MAX_QUANTILE):
+    """Return the table of a distribution without an upper bound and its
+    inverse CDF for the tail. The tail stops at max_quantile like the table.
+
+    Args:
+        inverse_cdf (func): Takes a quantile and returns the value
+        max_quantile (float): Highest quantile drawn
+
+    Return:
+        tuple(list<float>, func)
+    """
+    def tail(q):
+        return inverse_cdf(min(q, max_quantile))
+
+    return build_table(inverse_cdf, max_quantile=max_quantile), tail
+
+
+def exponential_table(config):
+    """Inverse CDF table of an exponential distribution.
+
+    Args:
+        config (dict): `mean` of the distribution
+
+    Return:
+        tuple(list<float>, func)
+    """
+    mean = float(config['mean'])
+
+    if mean <= 0:
+        raise ValueError(mean)
+
+    return unbounded(lambda q: -mean * math.log(1.0 - q))
+
+
+def lognormal_table(config):
+    """Inverse CDF table of a lognormal distribution.
+
+    Args:
+        config (dict): `median` (or `mu`, the mean of the log) and `sigma`,
+                       the standard deviation of the log
+
+    Return:
+        tuple(list<float>, func)
+    """
+    if 'median' in config:
+        mu = math.log(config['median'])
+    else:
+        mu = float(config['mu'])
+
+    sigma = float(config['sigma'])
+
+    if sigma <= 0:
+        raise ValueError(sigma)
+
+    def inverse_cdf(q):
+        if q <= 0:
+            return 0.0
+
+        return math.exp(mu + sigma * normal_ppf(q))
+
+    return unbounded(inverse_cdf)
+
+
+def pareto_table(config):
+    """Inverse CDF table of a pareto distribution.
+
+    Args:
+        config (dict): `scale`, the lowest value, and the `alpha` shape
+
+    Return:
+        tuple(list<float>, func)
+    """
+    scale = float(config['scale'])
+    alpha = float(config['alpha'])
+
+    if scale <= 0 or alpha <= 0:
+        raise ValueError((scale, alpha))
+
+    return unbounded(lambda q: scale / (1.0 - q) ** (1.0 / alpha))
+
+
+def percentiles_table(config):
+    """Inverse CDF table that interpolates between fixed percentiles.
+
+    Args:
+        config (dict): `percentiles`, a dictionary of percentiles (0 - 100) to
+                       values, and optionally the `min` value (default 0)
+
+    Return:
+        tuple(list<float>, None)
+    """
+    points = sorted(
+        (float(percentile) / 100, float(value))
+        for percentile, value in config['percentiles'].items())
+
+    if points[0][0] > 0:
+        points.insert(0, (0.0, float(config.get('min', 0))))
+
+    return build_table(_interpolate(points), max_quantile=1.0), None
+
+
+def histogram_table(config):
+    """Inverse CDF table of an empirical histogram. The histogram is either
+    passed in as `buckets` or loaded from a CSV file at `path` (see
+    load_histogram).
+
+    Args:
+        config (dict): `buckets`, a list of (value, count) pairs, or `path`
+
+    Return:
+        tuple(list<float>, None)
+    """
+    if 'path' in config:
+        buckets = load_histogram(config['path'])
+    else:
+        buckets = config['buckets']
+
+    buckets = sorted(
+        (float(value), float(count)) for value, count in buckets if count > 0)
+
+    total = sum(count for _, count in buckets)
+
+    if not total:
+        raise ValueError(buckets)
+
+    points = [(0.0, buckets[0][0])]
+    seen = 0.0
+
+    for value, count in buckets:
+        seen += count
+        points.append((seen / total, value))
+
+    return build_table(_interpolate(points), max_quantile=1.0), None
+
+
+def load_histogram(path):
+    """Load a latency histogram from a CSV file, such as latencies exported
+    from Cloud Trace. Each row is the latency in milliseconds and optionally
+    the number of times it was seen, rows that don't start with a number (like
+    a header) are skipped.
+
+    Args:
+        path (str): Path to the CSV file
+
+    Return:
+        list<tuple(float, float)>: (latency, count) pairs
+    """
+    buckets = []
+
+    with open(path, 'rb') as histogram:
+        for row in csv.reader(histogram):
+            if not row:
+                continue
+
+            try:
+                value = float(row[0])
+            except ValueError:
+                continue
+
+            count = float(row[1]) if len(row) > 1 and row[1] else 1.0
+
+            buckets.append((value, count))
+
+    return buckets
+
+
+def _interpolate(points):
+    """Return a function that linearly interpolates between the points.
+
+    Args:
+        points (list<tuple(float, float)>): Sorted (quantile, value) pairs
+
+    Return:
+        func: Takes a quantile and returns the value
+    """
+    def inverse_cdf(q):
+        previous_q, previous_value = points[0]
+
+        for point_q, value in points:
+            if q <= point_q:
+                if point_q == previous_q:
+                    return value
+
+                fraction = (q - previous_q) / (point_q - previous_q)
+
+                return previous_value + fraction * (value - previous_value)
+
+            previous_q, previous_value = point_q, value
+
+        return points[-1][1]
+
+    return inverse_cdf
+
+
+def normal_ppf(q):
+    """Inverse CDF of the standard normal distribution using Peter Acklam's
+    rational approximation (relative error below 1.2e-9).
+
+    Args:
+        q (float): Quantile in (0.0, 1.0)
+
+    Return:
+        float
+    """
+    if q < _PPF_LOW:
+        r = math.sqrt(-2 * math.log(q))
+        return (_polynomial(_PPF_C, r) /
+                (_polynomial(_PPF_D, r) * r + 1))
+
+    if q > 1 - _PPF_LOW:
+        r = math.sqrt(-2 * math.log(1 - q))
+        return -(_polynomial(_PPF_C, r) /
+                 (_polynomial(_PPF_D, r) * r + 1))
+
+    r = q - 0.5
+    s = r * r
+
+    return (_polynomial(_PPF_A, s) * r /
+            (_polynomial(_PPF_B, s) * s + 1))
+
+
+def _polynomial(coefficients, x):
+    result = 0.0
+
+    for coefficient in coefficients:
+        result = result * x + coefficient
+
+    return result
+
+
+_PPF_LOW = 0.02425
+
+_PPF_A = (-3.969683028665376e+01, 2.209460984245205e+02,
+          -2.759285104469687e+02, 1.383577518672690e+02,
+          -3.066479806614716e+01, 2.506628277459239e+00)
+
+_PPF_B = (-5.447609879822406e+01, 1.615858368580409e+02,
+          -1.556989798598866e+02, 6.680131188771972e+01,
+          -1.328068155288572e+01)
+
+_PPF_C = (-7.784894002430293e-03, -3.223964580411365e-01,
+          -2.400758277161838e+00, -2.549732539343734e+00,
+          4.374664141464968e+00, 2.938163982698783e+00)
+
+_PPF_D = (7.784695709041462e-03, 3.224671290700398e-01,
+          2.445134137142996e+00, 3.754408661907416e+00)
+
+
+_BUILDERS = {
+    DISTRIBUTIONS.EXPONENTIAL: exponential_table,
+    DISTRIBUTIONS.LOGNORMAL: lognormal_table,
+    DISTRIBUTIONS.PARETO: pareto_table,
+    DISTRIBUTIONS.PERCENTILES: percentiles_table,
+    DISTRIBUTIONS.HISTOGRAM: histogram_table,
+}
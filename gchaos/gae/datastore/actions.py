@@ -27,6 +27,12 @@ class ACTIONS:
     PUT = "PUT"
     GET = "GET"
     DELETE ="DELETE"
+    RUN_QUERY = "RUN_QUERY"
+    NEXT = "NEXT"
+    COMMIT = "COMMIT"
+    ROLLBACK = "ROLLBACK"
+    BEGIN_TRANSACTION = "BEGIN_TRANSACTION"
+    ALLOCATE_IDS = "ALLOCATE_IDS"
 
     @classmethod
     def all(cls):
@@ -35,4 +41,44 @@ class ACTIONS:
         Return:
             tuple(str): Tuple of datastore action strings
         """
-        return (cls.PUT, cls.GET, cls.DELETE)
+        return (cls.PUT, cls.GET, cls.DELETE, cls.RUN_QUERY, cls.NEXT,
+                cls.COMMIT, cls.ROLLBACK, cls.BEGIN_TRANSACTION,
+                cls.ALLOCATE_IDS)
+
+
+# Raw datastore RPC method names (as passed to the api proxy hooks) mapped to
+# the action they correspond to.
+RPC_ACTIONS = {
+    "Put": ACTIONS.PUT,
+    "Get": ACTIONS.GET,
+    "Delete": ACTIONS.DELETE,
+    "RunQuery": ACTIONS.RUN_QUERY,
+    "Next": ACTIONS.NEXT,
+    "Commit": ACTIONS.COMMIT,
+    "Rollback": ACTIONS.ROLLBACK,
+    "BeginTransaction": ACTIONS.BEGIN_TRANSACTION,
+    "AllocateIds": ACTIONS.ALLOCATE_IDS,
+}
+
+# Raw datastore v4 and Cloud Datastore RPC method names mapped to the action
+# they correspond to. A commit holds the writes made outside of a transaction
+# as well as inside one, so it is treated as a put.
+V4_RPC_ACTIONS = {
+    "Lookup": ACTIONS.GET,
+    "Commit": ACTIONS.PUT,
+    "RunQuery": ACTIONS.RUN_QUERY,
+    "ContinueQuery": ACTIONS.NEXT,
+    "Rollback": ACTIONS.ROLLBACK,
+    "BeginTransaction": ACTIONS.BEGIN_TRANSACTION,
+    "AllocateIds": ACTIONS.ALLOCATE_IDS,
+}
+
+# Actions whose requests carry the keys they read or write. Only they can be
+# targeted or counted by the hot keys monitor.
+KEY_ACTIONS = frozenset([ACTIONS.PUT, ACTIONS.GET, ACTIONS.DELETE])
+
+# Actions whose responses carry a batch of query results.
+QUERY_ACTIONS = frozenset([ACTIONS.RUN_QUERY, ACTIONS.NEXT])
+
+# Actions that write to the entity groups of their keys.
+WRITE_ACTIONS = frozenset([ACTIONS.PUT, ACTIONS.DELETE])
@@ -0,0 +1,134 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+from gchaos.gae.datastore.actions import ACTIONS
+
+
+# Name of the method returning the list of entities or keys in the request of
+# each action.
+ITEM_LISTS = {
+    ACTIONS.PUT: 'entity_list',
+    ACTIONS.GET: 'key_list',
+    ACTIONS.DELETE: 'key_list',
+}
+
+# Name of the method returning the list of entities in the response of each
+# query action.
+RESULT_LISTS = {
+    ACTIONS.RUN_QUERY: 'result_list',
+    ACTIONS.NEXT: 'result_list',
+}
+
+# Lists of entities rather than keys
+ENTITY_LISTS = frozenset(['entity_list', 'result_list'])
+
+
+class Batch(object):
+    """View of the entities or keys carried by a datastore request, or of the
+    results of a query response. Nothing is read off the request until it's
+    asked for, and the size is computed off the protocol buffer without
+    serializing it.
+
+    Properties:
+        request (ProtocolMessage): The datastore request or response
+        count (int): Number of entities or keys in the request (at least 1)
+        kilobytes (float): Size of the request in kilobytes
+    """
+
+    def __init__(self, action, request, item_lists=ITEM_LISTS):
+        """Initialize the Batch object.
+
+        Args:
+            action (str): Datastore action (should be in ACTIONS)
+            request (ProtocolMessage): The datastore request or response
+            item_lists (dict(str, str)): Name of the list method of each
+                action, RESULT_LISTS for query responses
+        """
+        self.request = request
+        self._item_list = item_lists.get(action)
+
+    def items(self):
+        """Return the list of entities or keys in the request. This is the
+        request's own list so changing it changes the request.
+
+        Return:
+            list
+        """
+        if self.request is None or self._item_list is None:
+            return []
+
+        return getattr(self.request, self._item_list)()
+
+    def keys(self):
+        """Return the keys of the entities in the request. New entities have
+        incomplete keys.
+
+        Return:
+            list(Reference)
+        """
+        items = self.items()
+
+        if self._item_list in ENTITY_LISTS:
+            return [entity.key() for entity in items]
+
+        return items
+
+    @property
+    def count(self):
+        return max(len(self.items()), 1)
+
+    @property
+    def kilobytes(self):
+        if self.request is None:
+            return 0.0
+
+        return self.request.ByteSize() / 1024.0
+
+    def truncate(self, count):
+        """Drop everything after the first count entities or keys from the
+        request.
+
+        Args:
+            count (int): Number of entities or keys to keep
+
+        Return:
+            None
+        """
+        del self.items()[count:]
+
+
+def batch_rate(rate, count):
+    """Return the chance of at least one of count entities being hit when each
+    entity is hit independently at the rate.
+
+    Args:
+        rate (float): Per entity rate between 0.00 and 1.00
+        count (int): Number of entities
+
+    Return:
+        float
+    """
+    if count <= 1:
+        return rate
+
+    return 1.0 - (1.0 - rate) ** count
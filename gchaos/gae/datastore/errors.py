@@ -22,31 +22,90 @@
 
 import logging
 
+from gchaos.budget import allow_error
+from gchaos.chance import randint
 from gchaos.chance import roll
-from gchaos.errors import ChaosException
-from gchaos.utils import get_func_info_for_path
+from gchaos.gae.datastore.batch import batch_rate
+from gchaos.gae.rpc import raise_on_completion
+from gchaos.gae.triggers import get_error
+from gchaos.log import logger
+from gchaos.log import PREFIX
+from gchaos.metrics import count_error
+from gchaos.tracing import trace_error
 
 
-def trigger(error_config):
+def trigger(error_config, batch=None, rpc=None, service=None, call=None):
     """Generates a chance value between 0 and 1. If the error rate on the error
     config is greather than or equal to the chance then it will trigger errors
     if errors exist on the config. It will get the error configs next option
     which is based on the error config probabilities.
 
+    When the config is per entity the rate applies to each entity in the
+    batch. When the config allows partial failures and the RPC can be wrapped
+    only part of the batch is sent and the error is raised once the RPC
+    completes.
+
     Args:
         error_config (gchaos.config.hydrate.ErrorConfig): Datastore Error
                                                           Configuration
+        batch (gchaos.gae.datastore.batch.Batch): The entities or keys in the
+                                                  request
+        rpc (google.appengine.api.apiproxy_rpc.RPC): The RPC being made
+        service (str): Service the RPC is made to
+        call (str): Raw RPC method name
 
     Return:
         None
     """
-    if not roll(error_config.error_rate):
+    rate = error_config.error_rate
+
+    if batch is not None and error_config.per_entity:
+        rate = batch_rate(rate, batch.count)
+
+    if not roll(rate) or not allow_error():
         return
 
-    if error_config.errors.choices and error_config.errors.weights:
-        logging.info("Looking for error to raise.")
-        error_info = get_func_info_for_path(error_config.errors.next())
-        logging.info("Going to raise %s", error_info.name)
-        raise error_info.func()
+    error = get_error(error_config)
+    count_error(error)
+    trace_error(error, service, call)
+
+    if (error_config.partial and batch is not None and rpc is not None and
+            _fail_partially(error, batch, rpc)):
+        return
+
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("%sGoing to raise %s", PREFIX, error.__class__.__name__)
+
+    raise error
+
+
+def _fail_partially(error, batch, rpc):
+    """Only send the first part of the batch, at least one entity and not all
+    of them, and raise the error when the RPC's success is checked. This is
+    how a batch that was partially applied fails.
+
+    Args:
+        error (Exception): The error to raise
+        batch (gchaos.gae.datastore.batch.Batch): The entities or keys in the
+                                                  request
+        rpc (google.appengine.api.apiproxy_rpc.RPC): The RPC being made
+
+    Return:
+        bool: False if the batch can't be partially failed
+    """
+    count = batch.count
+
+    if count < 2:
+        return False
+
+    if not raise_on_completion(rpc, error):
+        return False
+
+    kept = randint(1, count - 1)
+    batch.truncate(kept)
+
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("%sGoing to raise %s after %s of %s entities", PREFIX,
+                    error.__class__.__name__, kept, count)
 
-    raise ChaosException("Raising Chaos!")
+    return True
@@ -22,18 +22,37 @@
 
 import logging
 
+from gchaos.log import logger
+from gchaos.settings import CLOUD_DATASTORE_STUB
 from gchaos.settings import DATASTORE_STUB
-from gchaos.gae.datastore.actions import ACTIONS
+from gchaos.settings import DATASTORE_V4_STUB
+from gchaos.gae.datastore.actions import KEY_ACTIONS
+from gchaos.gae.datastore.actions import QUERY_ACTIONS
+from gchaos.gae.datastore.actions import RPC_ACTIONS
+from gchaos.gae.datastore.actions import V4_RPC_ACTIONS
+from gchaos.gae.datastore.batch import Batch
+from gchaos.gae.datastore.hotkeys import set_monitor
+from gchaos.gae.datastore.hotkeys import trigger as trigger_hot_keys
+from gchaos.gae.datastore.latency import MODES
 from gchaos.gae.datastore.latency import trigger as trigger_latency
+from gchaos.gae.datastore.latency import trigger_results
 from gchaos.gae.datastore.errors import trigger as trigger_errors
+from gchaos.gae.datastore.targets import matches
+from gchaos.gae.datastore.transactions import TRANSACTION_ACTIONS
+from gchaos.gae.datastore.transactions import trigger as trigger_transactions
+from gchaos.gae.registry import install_service
+from gchaos.gae.registry import register
+from gchaos.gae.triggers import compile_triggers
 
 
-DATSTORE_HOOK_INSTALLED = False
+# Datastore services, the v4 and Cloud Datastore APIs share the datastore
+# config with v3.
+DATASTORE_SERVICES = (DATASTORE_STUB, DATASTORE_V4_STUB, CLOUD_DATASTORE_STUB)
 
 
 def install_hook(config):
-    """Install the datastore hook with binding the datastore config to be
-    checked when calls come in.
+    """Install the datastore hooks of every datastore API version binding the
+    datastore config to be checked when calls come in.
 
     Args:
         config (gchaos.config.hydrate.DatastoreConfig):
@@ -42,100 +61,296 @@ def install_hook(config):
     Return:
         None
     """
-    from google.appengine.api.apiproxy_stub_map import apiproxy
+    for service in DATASTORE_SERVICES:
+        install_service(service, config)
 
-    global DATSTORE_HOOK_INSTALLED
 
-    if DATSTORE_HOOK_INSTALLED:
-        return
+def hook_wrapper(config, rpc_actions=RPC_ACTIONS, inspect=True):
+    """The function that wraps all datastore calls. The config is compiled
+    once into a dictionary of RPC names to triggers so each call is a single
+    dictionary lookup. RPCs that aren't tracked or that can never trigger
+    anything are not in the dictionary.
 
-    apiproxy.GetPreCallHooks().Append(
-        'gchaos_datastore_hooks', hook_wrapper(config), DATASTORE_STUB)
+    Args:
+        config (gchaos.config.hydrate.DatastoreConfig):
+            Datastore configuration
+        rpc_actions (dict(str, str)): Raw RPC method names to the action
+                                      they correspond to
+        inspect (bool): Whether the requests are datastore v3 requests whose
+                        keys can be looked at
+
+    Returns:
+        func
+    """
+    actions = compile_actions(config, rpc_actions, inspect)
+    get_trigger = actions.get
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Tracking datastore RPCs %s", sorted(actions.keys()))
+
+    def wrap(service, name, request, response, rpc=None):
+        """Called before hitting the datastore stub. The api proxy passes the
+        RPC in since the hook takes five arguments.
+        """
+        trigger = get_trigger(name)
 
-    DATSTORE_HOOK_INSTALLED = True
+        if trigger:
+            trigger(service, name, request, response, rpc)
+
+    return wrap
 
 
-def hook_wrapper(config):
-    """The function that wraps all datastore calls. And will trigger the action
-    if the service is the datastore stub.
+def v4_hook_wrapper(config):
+    """The function that wraps all datastore v4 and Cloud Datastore calls.
+    Their requests aren't looked at so only the errors and latencies that
+    don't depend on the keys are caused.
 
     Args:
-        config (gchaos.config.hydrate.{ErrorsConfig|LatenciesConfig|):
-            Datastore errors or latencies configuration
+        config (gchaos.config.hydrate.DatastoreConfig):
+            Datastore configuration
 
     Returns:
         func
     """
+    return hook_wrapper(config, V4_RPC_ACTIONS, inspect=False)
 
-    def wrap(service, name, request, response):
-        """Called before hitting the datastore stub."""
-        assert service == DATASTORE_STUB
 
-        trigger_action(name, config)
+def compile_actions(config, rpc_actions=RPC_ACTIONS, inspect=True):
+    """Build a dictionary of raw RPC method names (`Put`, `Get`, ...) to a
+    function that triggers the errors and latencies configured for that
+    action. Actions that are disabled or have a rate of zero are left out.
+    When there are target rules the triggers only fire for requests with a
+    matching key, so actions whose requests don't carry keys are left out.
+    Hot keys are monitored for every request carrying keys, and transactions
+    are followed through every request, targeted or not.
 
-    return wrap
-
-
-def trigger_action(name, config):
-    """If the service is a datastore action that we track get the errors or
-    latencies for the action from the config and if those exist pass them on to
-    the trigger functions.
+    When the requests aren't inspected the targets, hot keys, transactions and
+    batch options are ignored.
 
     Args:
-        name (str): Google service action
         config (gchaos.config.hydrate.DatastoreConfig):
             Datastore configuration.
+        rpc_actions (dict(str, str)): Raw RPC method names to the action
+                                      they correspond to
+        inspect (bool): Whether the requests can be looked at
 
     Return:
-        None
+        dict(str, func)
     """
-    uname = name.upper()
+    if not config.enabled:
+        if inspect:
+            set_monitor(None)
+
+        return {}
 
-    if uname not in ACTIONS.all():
-        logging.info(
-            "Action is not in our tracked actions {0}".format(uname))
-        return
+    if inspect:
+        set_monitor(config.hot_keys.monitor)
 
-    _trigger_actions(uname, config)
+    actions = {}
 
+    for rpc_name, action in rpc_actions.iteritems():
+        keyed = action in KEY_ACTIONS
+        targeted = inspect and config.targets.enabled
 
-def _trigger_actions(name, config):
-    """Call the trigger functions for errors and latencies.
+        triggers = []
+
+        if keyed or not targeted:
+            triggers = _get_triggers(action, config, inspect)
+
+        if triggers:
+            trigger = compile_triggers(triggers)
+
+            if targeted:
+                trigger = _target_trigger(action, config.targets, trigger)
+
+            triggers = [trigger]
+
+        if inspect and keyed and config.hot_keys.enabled:
+            triggers.insert(0, _hot_keys_trigger(action, config.hot_keys))
+
+        if (inspect and config.transactions.enabled and
+                action in TRANSACTION_ACTIONS):
+            triggers.insert(
+                0, _transactions_trigger(action, config.transactions))
+
+        if triggers:
+            actions[rpc_name] = compile_triggers(triggers)
+
+    return actions
+
+
+def _get_triggers(action, config, inspect=True):
+    """Return a list of the trigger functions, bound to their configuration,
+    that can fire for the action.
 
     Args:
-        name (str): Google service action
+        action (str): Datastore action (should be in ACTIONS)
         config (gchaos.config.hydrate.DatastoreConfig):
             Datastore configuration.
+        inspect (bool): Whether the request can be looked at
 
     Return:
-        None
+        list(func)
     """
+    triggers = []
+
     # Errors
     if config.errors.enabled:
-        get_config_and_trigger(name, config.errors, trigger_errors)
+        error_config = config.errors.get_by_action(action)
+
+        if error_config and error_config.error_rate > 0:
+            triggers.append(_error_trigger(action, error_config, inspect))
 
     # Latencies
     if config.latency.enabled:
-        get_config_and_trigger(name, config.latency, trigger_latency)
+        latency_config = config.latency.get_by_action(action)
+
+        if (latency_config and latency_config.latency_rate > 0 and
+                (latency_config.latency or
+                 (inspect and latency_config.proportional))):
+            triggers.append(_latency_trigger(
+                action, latency_config, config.latency.mode, inspect))
 
+    return triggers
 
-def get_config_and_trigger(service_name, config, trigger_func):
-    """Load the specific configuration from the config for the service. If a
-    configuration exists for the service trigger the function passed in with
-    that configuration.
+
+def _error_trigger(action, error_config, inspect=True):
+    """Bind the error config to a trigger function. The request is only looked
+    at when the config has batch options.
 
     Args:
-        service_name (string): Name of the services (should be in ACTIONS)
-        config (gchaos.config.hydrate.{ErrorConfig|LatencyConfig}:
-            Datastore Configuration
-        trigger_func (func): The function to trigger which takes the config
+        action (str): Datastore action (should be in ACTIONS)
+        error_config (gchaos.config.hydrate.ErrorConfig):
+            Datastore error configuration
+        inspect (bool): Whether the request can be looked at
 
     Return:
-        None
+        func: Trigger taking the service, RPC name, request, response and RPC
+
+    Raises:
+        gchaos.utils.BadObjectPathError: If an error path can't be resolved
     """
-    # Load each specific config for the action off errors and latencies
-    loaded_config = config.get_by_action(service_name)
+    error_config.resolve()
+
+    if inspect and error_config.partial:
+        def trigger(service, call, request, response, rpc):
+            trigger_errors(error_config, Batch(action, request), rpc,
+                           service, call)
+    elif inspect and error_config.per_entity:
+        def trigger(service, call, request, response, rpc):
+            trigger_errors(error_config, Batch(action, request),
+                           service=service, call=call)
+    else:
+        def trigger(service, call, request, response, rpc):
+            trigger_errors(error_config, service=service, call=call)
+
+    return trigger
+
+
+def _latency_trigger(action, latency_config, mode, inspect=True):
+    """Bind the latency config to a trigger function. In deferred mode the
+    RPC's completion is delayed instead of the request thread being stalled,
+    either way the RPC is passed along for its deadline. The request is only
+    looked at when the config has batch options. Queries get the latency of
+    their batch of results once the RPC completes.
+
+    Args:
+        action (str): Datastore action (should be in ACTIONS)
+        latency_config (gchaos.config.hydrate.LatencyConfig):
+            Datastore latency configuration
+        mode (str): Latency mode (should be in MODES)
+        inspect (bool): Whether the request can be looked at
+
+    Return:
+        func: Trigger taking the service, RPC name, request, response and RPC
+    """
+    deferred = mode == MODES.DEFERRED
+
+    if inspect and action in QUERY_ACTIONS:
+        def trigger(service, call, request, response, rpc):
+            trigger_results(latency_config, action, rpc, deferred, service,
+                            call)
+    elif inspect and (latency_config.per_entity or
+                      latency_config.proportional):
+        def trigger(service, call, request, response, rpc):
+            trigger_latency(latency_config, rpc, Batch(action, request),
+                            deferred, service, call)
+    else:
+        def trigger(service, call, request, response, rpc):
+            trigger_latency(latency_config, rpc, deferred=deferred,
+                            service=service, call=call)
+
+    return trigger
+
+
+def _hot_keys_trigger(action, hot_keys_config):
+    """Bind the hot keys config to a trigger function.
+
+    Args:
+        action (str): Datastore action (should be in ACTIONS)
+        hot_keys_config (gchaos.config.hydrate.HotKeysConfig):
+            Datastore hot keys configuration
+
+    Return:
+        func: Trigger taking the service, RPC name, request, response and RPC
+
+    Raises:
+        gchaos.utils.BadObjectPathError: If an error path can't be resolved
+    """
+    if hot_keys_config.contention is not None:
+        hot_keys_config.contention.errors.resolve()
+
+    def trigger(service, call, request, response, rpc):
+        trigger_hot_keys(hot_keys_config, action, Batch(action, request),
+                         service, call)
+
+    return trigger
+
+
+def _transactions_trigger(action, transactions_config):
+    """Bind the transactions config to a trigger function.
+
+    Args:
+        action (str): Datastore action (should be in TRANSACTION_ACTIONS)
+        transactions_config (gchaos.config.hydrate.TransactionsConfig):
+            Datastore transactions configuration
+
+    Return:
+        func: Trigger taking the service, RPC name, request, response and RPC
+
+    Raises:
+        gchaos.utils.BadObjectPathError: If an error path can't be resolved
+    """
+    transactions_config.errors.resolve()
+
+    def trigger(service, call, request, response, rpc):
+        trigger_transactions(transactions_config, action, request, rpc,
+                             service, call)
+
+    return trigger
+
+
+def _target_trigger(action, targets_config, trigger):
+    """Wrap the trigger so it only fires for requests with a key matching the
+    target rules.
+
+    Args:
+        action (str): Datastore action (should be in ACTIONS)
+        targets_config (gchaos.config.hydrate.TargetsConfig):
+            Datastore targets configuration
+        trigger (func): Trigger taking the service, RPC name, request,
+                        response and RPC
+
+    Return:
+        func: Trigger taking the service, RPC name, request, response and RPC
+    """
+    def targeted(service, call, request, response, rpc):
+        if matches(targets_config, Batch(action, request)):
+            trigger(service, call, request, response, rpc)
+
+    return targeted
+
 
-    # Trigger the functions for each errors and latencies if the config exists.
-    if loaded_config:
-        trigger_func(loaded_config)
+register(DATASTORE_STUB, 'datastore', hook_wrapper)
+register(DATASTORE_V4_STUB, 'datastore', v4_hook_wrapper)
+register(CLOUD_DATASTORE_STUB, 'datastore', v4_hook_wrapper)
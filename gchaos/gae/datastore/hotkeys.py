@@ -0,0 +1,205 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import logging
+
+from threading import Lock
+from time import time
+
+from gchaos.gae.datastore.actions import WRITE_ACTIONS
+from gchaos.gae.datastore.errors import trigger as trigger_errors
+from gchaos.gae.datastore.targets import entity_group
+from gchaos.gae.datastore.targets import key_kind
+from gchaos.gae.datastore.targets import key_path
+from gchaos.log import logger
+from gchaos.log import PREFIX
+from gchaos.sketch import SpaceSaving
+
+
+# Monitor of the installed datastore hook.
+MONITOR = None
+
+
+class HotKeyMonitor(object):
+    """Follows the most used keys and kinds, and the most written entity
+    groups, of this instance in fixed memory no matter how many keys there
+    are. Keys of new entities aren't counted, though a new child entity
+    still writes to its parent's entity group.
+
+    Properties:
+        keys (gchaos.sketch.SpaceSaving): Key paths of every action
+        kinds (gchaos.sketch.SpaceSaving): Kinds of every action
+        groups (gchaos.sketch.SpaceSaving): Entity groups written to
+    """
+
+    def __init__(self, capacity, half_life):
+        """Initialize the HotKeyMonitor object.
+
+        Args:
+            capacity (int): Maximum number of keys, kinds and groups followed
+            half_life (float): Seconds for a count to decay by half
+        """
+        now = time()
+
+        self.keys = SpaceSaving(capacity, half_life, now)
+        self.kinds = SpaceSaving(capacity, half_life, now)
+        self.groups = SpaceSaving(capacity, half_life, now)
+
+        self._lock = Lock()
+
+    def __getstate__(self):
+        """Pickle everything but the lock."""
+        state = self.__dict__.copy()
+        del state['_lock']
+
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = Lock()
+
+    def observe(self, action, batch):
+        """Count the keys in the batch and return the highest write rate, per
+        second, of the entity groups it writes to.
+
+        Args:
+            action (str): Datastore action (should be in ACTIONS)
+            batch (gchaos.gae.datastore.batch.Batch): The entities or keys in
+                                                      the request
+
+        Return:
+            tuple(float, str): The rate and the entity group, (0.0, None) for
+                               reads
+        """
+        write = action in WRITE_ACTIONS
+        hottest = (0.0, None)
+
+        now = time()
+
+        with self._lock:
+            for key in batch.keys():
+                self.kinds.add(key_kind(key), now)
+
+                path = key_path(key)
+
+                # A new entity's key isn't complete until it's written, but
+                # its parent's group still takes the write.
+                if not path.endswith(':'):
+                    self.keys.add(path, now)
+
+                if not write:
+                    continue
+
+                group = entity_group(key)
+
+                if group and not group.endswith(':'):
+                    count = self.groups.add(group, now)
+                    hottest = max(hottest, (count, group))
+
+        return self.groups.rate(hottest[0]), hottest[1]
+
+    def top_keys(self, size=10):
+        """Return the most used key paths with their rate per second.
+
+        Args:
+            size (int): Number of keys to return
+
+        Return:
+            list(tuple(str, float))
+        """
+        return self._top(self.keys, size)
+
+    def top_kinds(self, size=10):
+        """Return the most used kinds with their rate per second.
+
+        Args:
+            size (int): Number of kinds to return
+
+        Return:
+            list(tuple(str, float))
+        """
+        return self._top(self.kinds, size)
+
+    def top_groups(self, size=10):
+        """Return the most written entity groups with their write rate per
+        second.
+
+        Args:
+            size (int): Number of entity groups to return
+
+        Return:
+            list(tuple(str, float))
+        """
+        return self._top(self.groups, size)
+
+    def _top(self, sketch, size):
+        with self._lock:
+            top = sketch.top(size, time())
+
+        return [(item, sketch.rate(count)) for item, count, _ in top]
+
+
+def get_monitor():
+    """Return the monitor of the installed datastore hook, None if hot keys
+    aren't monitored.
+
+    Return:
+        HotKeyMonitor
+    """
+    return MONITOR
+
+
+def set_monitor(monitor):
+    global MONITOR
+
+    MONITOR = monitor
+
+
+def trigger(hot_keys_config, action, batch, service=None, call=None):
+    """Count the keys in the batch and, if contention is configured, trigger
+    contention errors when it writes to an entity group above the write rate
+    threshold.
+
+    Args:
+        hot_keys_config (gchaos.config.hydrate.HotKeysConfig):
+            Datastore hot keys configuration
+        action (str): Datastore action (should be in ACTIONS)
+        batch (gchaos.gae.datastore.batch.Batch): The entities or keys in the
+                                                  request
+        service (str): Service the RPC is made to
+        call (str): Raw RPC method name
+
+    Return:
+        None
+    """
+    rate, group = hot_keys_config.monitor.observe(action, batch)
+
+    contention = hot_keys_config.contention
+
+    if contention is None or rate <= contention.threshold:
+        return
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("%s%s is written %.2f times a second", PREFIX, group,
+                     rate)
+
+    trigger_errors(contention.errors, service=service, call=call)
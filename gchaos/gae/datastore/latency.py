@@ -23,24 +23,125 @@
 
 import logging
 
-import random
-from random import randint
 from time import sleep
+from time import time
 
+from gchaos.budget import allow_latency
+from gchaos.chance import randint
 from gchaos.chance import roll
+from gchaos.deadline import check as check_deadline
+from gchaos.distributions import Distribution
 from gchaos.errors import InvalidLatencyException
-from gchaos.utils import get_func_info_for_path
+from gchaos.gae.datastore.batch import Batch
+from gchaos.gae.datastore.batch import batch_rate
+from gchaos.gae.datastore.batch import RESULT_LISTS
+from gchaos.gae.rpc import after_completion
+from gchaos.gae.rpc import raise_on_completion
+from gchaos.log import logger
+from gchaos.log import PREFIX
+from gchaos.metrics import count_error
+from gchaos.metrics import count_stall
+from gchaos.replay import record_stall
+from gchaos.tracing import trace_error
+from gchaos.tracing import trace_stall
+
+
+class MODES:
+    """Ways latency can be injected."""
+
+    # Sleep in the pre-call hook, blocking the request thread.
+    BLOCKING = "blocking"
+    # Delay the completion of the RPC, only blocking code that waits on it.
+    DEFERRED = "deferred"
+
+    @classmethod
+    def all(cls):
+        """Return a tuple of all the latency modes.
+
+        Return:
+            tuple(str): Tuple of latency mode strings
+        """
+        return (cls.BLOCKING, cls.DEFERRED)
+
+
+def latency_trigger(latency_config, mode):
+    """Bind the latency config to a trigger any service's hook can use. In
+    deferred mode the RPC's completion is delayed instead of the request
+    thread being stalled. The RPC is passed along in both modes for its
+    deadline.
 
+    Args:
+        latency_config (gchaos.config.hydrate.LatencyConfig):
+            Latency configuration
+        mode (str): Latency mode (should be in MODES)
+
+    Return:
+        func: Trigger taking the service, RPC name, request, response and RPC
+    """
+    deferred = mode == MODES.DEFERRED
+
+    def bound(service, call, request, response, rpc):
+        trigger(latency_config, rpc, deferred=deferred, service=service,
+                call=call)
+
+    return bound
 
-def trigger(latency_config):
+
+def trigger(latency_config, rpc=None, batch=None, deferred=True,
+            service=None, call=None):
     """Generates a chance value between 0 and 1. If the latency rate on the
     latency config is greather than or equal to the chance then it will trigger
     latencies if latencies exist on the config. It will get the latency configs
     next option which is based on the latency config probabilities.
 
+    When the config is per entity the rate applies to each entity in the
+    batch, and the config can add latency for each entity and kilobyte in the
+    batch on top of the spike.
+
+    Args:
+        latency_config (gchaos.config.hydrate.LatncyConfig):
+            Datastore Latency Configuration
+        rpc (google.appengine.api.apiproxy_rpc.RPC): The RPC being made
+        batch (gchaos.gae.datastore.batch.Batch): The entities or keys in the
+                                                  request
+        deferred (bool): Delay the RPC instead of stalling right away
+        service (str): Service the RPC is made to
+        call (str): Raw RPC method name
+
+    Return:
+        None
+    """
+    rate = latency_config.latency_rate
+
+    if batch is not None and latency_config.per_entity:
+        rate = batch_rate(rate, batch.count)
+
+    if not roll(rate):
+        return
+
+    extra = get_batch_latency(latency_config, batch)
+
+    stall(latency_config.latency, rpc, extra, deferred, service, call)
+
+
+def trigger_results(latency_config, action, rpc=None, deferred=True,
+                    service=None, call=None):
+    """Generates a chance value between 0 and 1. If the latency rate on the
+    latency config is greather than or equal to the chance the query batch is
+    slowed down by the latency spike and by the latency for each result in it.
+
+    How many results come back is only known once the RPC completes, so the
+    latency for them is stalled on the first success check, before the caller
+    sees the results.
+
     Args:
         latency_config (gchaos.config.hydrate.LatncyConfig):
             Datastore Latency Configuration
+        action (str): Query action (should be in QUERY_ACTIONS)
+        rpc (google.appengine.api.apiproxy_rpc.RPC): The RPC being made
+        deferred (bool): Delay the RPC instead of stalling right away
+        service (str): Service the RPC is made to
+        call (str): Raw RPC method name
 
     Return:
         None
@@ -48,38 +149,120 @@ def trigger(latency_config):
     if not roll(latency_config.latency_rate):
         return
 
-    stall(latency_config.latency)
+    stall(latency_config.latency, rpc, 0, deferred, service, call)
+
+    if rpc is None or not latency_config.proportional:
+        return
+
+    def results():
+        batch = Batch(action, rpc.response, RESULT_LISTS)
+
+        stall(None, None, get_batch_latency(latency_config, batch),
+              service=service, call=call)
 
+    after_completion(rpc, results)
+
+
+def get_batch_latency(latency_config, batch):
+    """Return the latency (in milliseconds) added for the size of the batch.
+
+    Args:
+        latency_config (gchaos.config.hydrate.LatncyConfig):
+            Datastore Latency Configuration
+        batch (gchaos.gae.datastore.batch.Batch): The entities or keys in the
+                                                  request
 
-def stall(latency):
+    Return:
+        int
+    """
+    if batch is None:
+        return 0
+
+    milli_time = 0.0
+
+    if latency_config.ms_per_entity:
+        milli_time += latency_config.ms_per_entity * batch.count
+
+    if latency_config.ms_per_kb:
+        milli_time += latency_config.ms_per_kb * batch.kilobytes
+
+    return int(milli_time)
+
+
+def stall(latency, rpc=None, extra=0, deferred=True, service=None,
+          call=None):
     """Based off the latency stall for that long. The latency is a tuple if only
     one value is provided then stall for exactly that long. If two values are
-    provided then stall for a random choice between those values.
+    provided then stall for a random choice between those values. If an rpc is
+    passed in and deferred its completion is delayed instead of stalling right
+    away. The stall is cut short to what is left of the request's budget.
+
+    A stall that would overrun the RPC's or the request's deadline only lasts
+    until the deadline and then times out, unless deadlines are configured to
+    clamp it.
 
     Args:
         latency (tuple(int, int): A tuple of a latency range (in milliseconds)
+        rpc (google.appengine.api.apiproxy_rpc.RPC): The RPC being made
+        extra (int): Latency (in milliseconds) added to the spike
+        deferred (bool): Delay the RPC instead of stalling right away
+        service (str): Service the RPC is made to, for the error its deadline
+                       times out with
+        call (str): Raw RPC method name
 
     Return:
         None
+
+    Raises:
+        Exception: The timeout error when the stall overruns a deadline and
+                   the RPC can't be wrapped to raise it on completion
     """
-    if not latency:
+    if not (latency or extra):
         return
 
-    _stall(_get_latency(latency))
+    milli_time = extra
 
+    if latency:
+        milli_time += get_latency(latency)
 
-def _get_latency(latency):
+    milli_time = allow_latency(milli_time)
+
+    if not milli_time:
+        return
+
+    milli_time, error = check_deadline(milli_time, rpc, service)
+
+    if deferred and rpc is not None and _defer(rpc, milli_time):
+        count_stall(milli_time, slept=False)
+        trace_stall(milli_time, service, call, deferred=True)
+        record_stall(milli_time, deferred=True)
+    else:
+        trace_stall(milli_time, service, call)
+        record_stall(milli_time)
+        _stall(milli_time)
+        count_stall(milli_time)
+
+    if error is not None:
+        _time_out(error, rpc, service, call)
+
+
+def get_latency(latency):
     """Check the latency field and if it's a single value tuple or an integer
     then return that value. If it's a 2 value tuple then get the value from the
-    range. Otherwise raise an InvalidLatencyException.
+    range. If it's a distribution draw the value from it. Otherwise raise an
+    InvalidLatencyException.
 
     Args:
-        latency (tuple(int,) | tuple(int, int) | int):
-            A tuple of one or two ints or just an int.
+        latency (tuple(int,) | tuple(int, int) | int |
+                 gchaos.distributions.Distribution):
+            A tuple of one or two ints, just an int or a distribution.
 
     Return:
-        None
+        int
     """
+    if isinstance(latency, Distribution):
+        return int(latency.sample())
+
     if isinstance(latency, tuple):
         if len(latency) == 1:
             return latency[0]
@@ -123,8 +306,88 @@ def _stall(milli_time):
     Return:
         None
     """
-    logging.info(
-        "CHAOS: Starting to stall the call for {0} milliseconds".format(
-            milli_time))
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(
+            "%sStarting to stall the call for %s milliseconds", PREFIX,
+            milli_time)
 
     sleep(milli_time / float(1000))
+
+
+def _time_out(error, rpc=None, service=None, call=None):
+    """Raise the timeout error when the RPC's success is checked, like the
+    service would, or right away without the RPC.
+
+    Args:
+        error (BaseException): The timeout error
+        rpc (google.appengine.api.apiproxy_rpc.RPC): The RPC being made
+        service (str): Service the RPC is made to
+        call (str): Raw RPC method name
+
+    Return:
+        None
+    """
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("%sGoing to raise %s", PREFIX, error.__class__.__name__)
+
+    count_error(error)
+    trace_error(error, service, call)
+
+    if rpc is not None and raise_on_completion(rpc, error):
+        return
+
+    raise error
+
+
+def _defer(rpc, milli_time):
+    """Delay the completion of the RPC so it finishes no sooner than the time
+    (in milliseconds) from now. The RPC's Wait and CheckSuccess are wrapped to
+    sleep off whatever is left of the delay, so only code waiting on this RPC
+    is stalled while other RPCs and tasklets carry on.
+
+    Args:
+        rpc (google.appengine.api.apiproxy_rpc.RPC): The RPC to delay
+        milli_time (int): Time in milliseconds
+
+    Return:
+        bool: False if the RPC couldn't be wrapped
+    """
+    ready_at = time() + milli_time / float(1000)
+
+    wait = rpc.Wait
+    check_success = rpc.CheckSuccess
+
+    def delayed_wait():
+        _sleep_until(ready_at)
+        wait()
+
+    def delayed_check_success():
+        _sleep_until(ready_at)
+        check_success()
+
+    try:
+        rpc.Wait = delayed_wait
+        rpc.CheckSuccess = delayed_check_success
+    except AttributeError:
+        return False
+
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(
+            "%sDelaying the call by %s milliseconds", PREFIX, milli_time)
+
+    return True
+
+
+def _sleep_until(ready_at):
+    """Sleep until the ready at time if it hasn't passed yet.
+
+    Args:
+        ready_at (float): Time in seconds since the epoch
+
+    Return:
+        None
+    """
+    remaining = ready_at - time()
+
+    if remaining > 0:
+        sleep(remaining)
@@ -0,0 +1,108 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+def matches(targets_config, batch):
+    """Return True if any of the keys in the batch is targeted by either the
+    kind or the key rules.
+
+    Args:
+        targets_config (gchaos.config.hydrate.TargetsConfig):
+            Datastore targets configuration
+        batch (gchaos.gae.datastore.batch.Batch): The entities or keys in the
+                                                  request
+
+    Return:
+        bool
+    """
+    match_kind = targets_config.kinds.match if targets_config.kinds else None
+    match_key = targets_config.keys.match if targets_config.keys else None
+
+    for key in batch.keys():
+        if match_kind and match_kind(key_kind(key)):
+            return True
+
+        if match_key and match_key(key_path(key)):
+            return True
+
+    return False
+
+
+def key_kind(key):
+    """Return the kind of the key.
+
+    Args:
+        key (Reference): Datastore key
+
+    Return:
+        str
+    """
+    elements = key.path().element_list()
+
+    if not elements:
+        return ''
+
+    return elements[-1].type()
+
+
+def key_path(key):
+    """Return the path of the key as `Kind:id_or_name` pairs joined by `/`,
+    such as `User:42/Session:abc`. An incomplete key ends with an empty id,
+    `Session:`.
+
+    Args:
+        key (Reference): Datastore key
+
+    Return:
+        str
+    """
+    return '/'.join(
+        '%s:%s' % (element.type(), _element_id(element))
+        for element in key.path().element_list())
+
+
+def entity_group(key):
+    """Return the path of the root of the key's entity group, such as
+    `User:42`.
+
+    Args:
+        key (Reference): Datastore key
+
+    Return:
+        str
+    """
+    elements = key.path().element_list()
+
+    if not elements:
+        return ''
+
+    return '%s:%s' % (elements[0].type(), _element_id(elements[0]))
+
+
+def _element_id(element):
+    if element.has_name():
+        return element.name()
+
+    if element.has_id():
+        return element.id()
+
+    return ''
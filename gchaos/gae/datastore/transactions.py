@@ -0,0 +1,326 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import logging
+
+from collections import OrderedDict
+from math import exp
+from threading import Lock
+from time import time
+
+from gchaos.budget import allow_error
+from gchaos.chance import roll
+from gchaos.gae.datastore.actions import ACTIONS
+from gchaos.gae.datastore.actions import WRITE_ACTIONS
+from gchaos.gae.datastore.batch import Batch
+from gchaos.gae.datastore.targets import entity_group
+from gchaos.gae.rpc import after_completion
+from gchaos.gae.triggers import get_error
+from gchaos.log import logger
+from gchaos.log import PREFIX
+from gchaos.metrics import count_error
+from gchaos.sketch import SpaceSaving
+from gchaos.tracing import trace_error
+
+
+# Actions the simulator follows transactions through.
+TRANSACTION_ACTIONS = frozenset([
+    ACTIONS.BEGIN_TRANSACTION, ACTIONS.GET, ACTIONS.PUT, ACTIONS.DELETE,
+    ACTIONS.COMMIT, ACTIONS.ROLLBACK])
+
+
+class Transaction(object):
+    """An in-flight transaction.
+
+    Properties:
+        started (float): Time the transaction began
+        groups (dict(str, float)): Entity groups read or written to, and when
+                                   the transaction first touched them
+        writes (set(str)): Entity groups written to
+    """
+
+    __slots__ = ('started', 'groups', 'writes')
+
+    def __init__(self, started):
+        self.started = started
+        self.groups = {}
+        self.writes = set()
+
+
+class TransactionSimulator(object):
+    """Follows the transactions in flight on this instance, and the rate
+    entity groups are written to, to tell how likely a commit is to conflict
+    with another write.
+
+    A transaction conflicts when another write lands on one of its entity
+    groups between the transaction first touching the group and committing.
+    Writes are taken to arrive at the group's observed rate, so the chance of
+    none arriving is `exp(-rate * time open)` for each group.
+
+    Transactions are kept in the order they began and are dropped once they
+    are older than the TTL, or the oldest when there are too many, so
+    transactions that are never committed or rolled back don't pile up.
+
+    Properties:
+        groups (gchaos.sketch.SpaceSaving): Entity groups written to
+        ttl (float): Seconds a transaction is followed for
+        max_transactions (int): Most transactions followed at once
+        min_window (float): Shortest time (in seconds) a transaction is open
+                            for, the time its commit takes
+    """
+
+    def __init__(self, capacity, half_life, ttl, max_transactions,
+                 min_window):
+        """Initialize the TransactionSimulator object.
+
+        Args:
+            capacity (int): Maximum number of entity groups followed
+            half_life (float): Seconds for a write count to decay by half
+            ttl (float): Seconds a transaction is followed for
+            max_transactions (int): Most transactions followed at once
+            min_window (float): Shortest time (in seconds) a transaction is
+                                open for
+        """
+        self.groups = SpaceSaving(capacity, half_life, time())
+        self.ttl = ttl
+        self.max_transactions = max_transactions
+        self.min_window = min_window
+
+        self._transactions = OrderedDict()
+        self._lock = Lock()
+
+    def __getstate__(self):
+        """Pickle everything but the lock."""
+        state = self.__dict__.copy()
+        del state['_lock']
+
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._transactions)
+
+    def begin(self, handle, now=None):
+        """Start following the transaction.
+
+        Args:
+            handle (int): Transaction handle
+            now (float): Current time in seconds
+
+        Return:
+            None
+        """
+        now = time() if now is None else now
+
+        with self._lock:
+            self._evict(now)
+            self._transactions[handle] = Transaction(now)
+
+    def touch(self, handle, keys, write, now=None):
+        """Note the entity groups of the keys as read or written to by the
+        transaction. A transaction that wasn't seen beginning is followed from
+        now.
+
+        Args:
+            handle (int): Transaction handle
+            keys (list(Reference)): Keys read or written to
+            write (bool): Whether the keys are written to
+            now (float): Current time in seconds
+
+        Return:
+            None
+        """
+        now = time() if now is None else now
+
+        with self._lock:
+            transaction = self._transactions.get(handle)
+
+            if transaction is None:
+                self._evict(now)
+                transaction = self._transactions[handle] = Transaction(now)
+
+            for group in _groups(keys):
+                transaction.groups.setdefault(group, now)
+
+                if write:
+                    transaction.writes.add(group)
+
+    def write(self, keys, now=None):
+        """Count a write, outside of a transaction, to the entity groups of
+        the keys.
+
+        Args:
+            keys (list(Reference)): Keys written to
+            now (float): Current time in seconds
+
+        Return:
+            None
+        """
+        now = time() if now is None else now
+
+        with self._lock:
+            for group in _groups(keys):
+                self.groups.add(group, now)
+
+    def end(self, handle):
+        """Stop following the transaction.
+
+        Args:
+            handle (int): Transaction handle
+
+        Return:
+            Transaction: The transaction, None if it isn't followed
+        """
+        with self._lock:
+            return self._transactions.pop(handle, None)
+
+    def conflict_chance(self, transaction, now=None):
+        """Return the chance another write landed on one of the
+        transaction's entity groups while it was open.
+
+        Args:
+            transaction (Transaction): The committing transaction
+            now (float): Current time in seconds
+
+        Return:
+            float
+        """
+        now = time() if now is None else now
+        min_window = self.min_window
+        expected = 0.0
+
+        with self._lock:
+            for group, touched in transaction.groups.iteritems():
+                rate = self.groups.rate(self.groups.estimate(group, now))
+
+                if rate:
+                    expected += rate * max(now - touched, min_window)
+
+        return 1.0 - exp(-expected)
+
+    def commit(self, transaction, now=None):
+        """Count the writes of the committed transaction.
+
+        Args:
+            transaction (Transaction): The committed transaction
+            now (float): Current time in seconds
+
+        Return:
+            None
+        """
+        now = time() if now is None else now
+
+        with self._lock:
+            for group in transaction.writes:
+                self.groups.add(group, now)
+
+    def _evict(self, now):
+        """Drop the transactions that began before the TTL, and the oldest
+        transactions when there are too many. Must be called with the lock.
+        """
+        transactions = self._transactions
+        expired = now - self.ttl
+
+        while transactions:
+            handle, transaction = next(transactions.iteritems())
+
+            if (transaction.started > expired and
+                    len(transactions) < self.max_transactions):
+                break
+
+            del transactions[handle]
+
+
+def trigger(transactions_config, action, request, rpc=None, service=None,
+            call=None):
+    """Follow the transaction through the request and, when it's committed,
+    raise an error at the chance it conflicts with another write.
+
+    Args:
+        transactions_config (gchaos.config.hydrate.TransactionsConfig):
+            Datastore transactions configuration
+        action (str): Datastore action (should be in TRANSACTION_ACTIONS)
+        request (ProtocolMessage): The datastore request
+        rpc (google.appengine.api.apiproxy_rpc.RPC): The RPC being made
+        service (str): Service the RPC is made to
+        call (str): Raw RPC method name
+
+    Return:
+        None
+    """
+    simulator = transactions_config.simulator
+
+    if action == ACTIONS.BEGIN_TRANSACTION:
+        # The handle is only known once the transaction has begun.
+        if rpc is not None:
+            after_completion(
+                rpc, lambda: simulator.begin(rpc.response.handle()))
+
+    elif action == ACTIONS.COMMIT:
+        transaction = simulator.end(request.handle())
+
+        if transaction is None:
+            return
+
+        chance = simulator.conflict_chance(transaction)
+
+        if chance and roll(chance) and allow_error():
+            error = get_error(transactions_config.errors)
+            count_error(error)
+            trace_error(error, service, call)
+
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("%sThe commit conflicts, going to raise %s",
+                            PREFIX, error.__class__.__name__)
+
+            raise error
+
+        simulator.commit(transaction)
+
+    elif action == ACTIONS.ROLLBACK:
+        simulator.end(request.handle())
+
+    elif request.has_transaction():
+        simulator.touch(request.transaction().handle(),
+                        Batch(action, request).keys(),
+                        action in WRITE_ACTIONS)
+
+    elif action in WRITE_ACTIONS:
+        simulator.write(Batch(action, request).keys())
+
+
+def _groups(keys):
+    """Return the entity groups of the keys, leaving out new root entities
+    which can't be contended.
+    """
+    groups = set()
+
+    for key in keys:
+        group = entity_group(key)
+
+        if group and not group.endswith(':'):
+            groups.add(group)
+
+    return groups
@@ -0,0 +1,54 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+class ACTIONS:
+    """Memcache actions we are tracking. The multi versions of the client
+    calls (`get_multi`, `set_multi`, ...) are the same actions with more keys.
+    """
+
+    GET = "GET"
+    SET = "SET"
+    DELETE = "DELETE"
+    INCREMENT = "INCREMENT"
+    BATCH_INCREMENT = "BATCH_INCREMENT"
+
+    @classmethod
+    def all(cls):
+        """Return a tuple of all the memcache actions.
+
+        Return:
+            tuple(str): Tuple of memcache action strings
+        """
+        return (cls.GET, cls.SET, cls.DELETE, cls.INCREMENT,
+                cls.BATCH_INCREMENT)
+
+
+# Raw memcache RPC method names (as passed to the api proxy hooks) mapped to
+# the action they correspond to.
+RPC_ACTIONS = {
+    "Get": ACTIONS.GET,
+    "Set": ACTIONS.SET,
+    "Delete": ACTIONS.DELETE,
+    "Increment": ACTIONS.INCREMENT,
+    "BatchIncrement": ACTIONS.BATCH_INCREMENT,
+}
@@ -0,0 +1,150 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import logging
+
+from time import time
+
+from gchaos.budget import allow_fault
+from gchaos.chance import roll
+from gchaos.chance import uniform
+from gchaos.gae.memcache.bypass import bypass
+from gchaos.log import logger
+from gchaos.log import PREFIX
+from gchaos.settings import MEMCACHE_STUB
+
+
+class STORMS:
+    """Types of eviction storms."""
+
+    FULL = "full"
+    FRACTION = "fraction"
+    NAMESPACE = "namespace"
+
+    @classmethod
+    def all(cls):
+        return [cls.FULL, cls.FRACTION, cls.NAMESPACE]
+
+
+def trigger(evictions_config, request):
+    """Roll each eviction storm for a memcache get. A storm that starts, or
+    is still going, evicts keys before the get is made so it misses them.
+
+    A `full` storm flushes the whole cache once. A `fraction` storm evicts
+    that fraction of the keys read while it lasts. A `namespace` storm evicts
+    every key read from its namespaces while it lasts.
+
+    Args:
+        evictions_config (gchaos.config.hydrate.EvictionsConfig):
+            Memcache evictions configuration
+        request (MemcacheGetRequest): The memcache get request
+
+    Return:
+        None
+    """
+    now = time()
+
+    for storm in evictions_config.storms:
+        if storm.namespaces and request.name_space() not in storm.namespaces:
+            continue
+
+        if now >= storm.until:
+            if not roll(storm.rate) or not allow_fault():
+                continue
+
+            storm.until = now + storm.duration
+
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("%sStarting a %s eviction storm", PREFIX,
+                            storm.type)
+
+            if storm.type == STORMS.FULL:
+                flush(request)
+                continue
+
+        elif storm.type == STORMS.FULL or not allow_fault():
+            continue
+
+        evict(request, storm.fraction)
+
+
+def evict(request, fraction=1.0):
+    """Delete a random fraction of the keys of the get request from memcache.
+
+    Args:
+        request (MemcacheGetRequest): The memcache get request
+        fraction (float): Fraction of the keys to evict
+
+    Return:
+        None
+    """
+    from google.appengine.api.memcache import memcache_service_pb
+
+    keys = request.key_list()
+
+    if fraction < 1.0:
+        keys = [key for key in keys if uniform() < fraction]
+
+    if not keys:
+        return
+
+    delete = memcache_service_pb.MemcacheDeleteRequest()
+
+    if request.has_name_space():
+        delete.set_name_space(request.name_space())
+
+    if request.has_override():
+        delete.mutable_override().CopyFrom(request.override())
+
+    for key in keys:
+        delete.add_item().set_key(key)
+
+    _call('Delete', delete, memcache_service_pb.MemcacheDeleteResponse())
+
+
+def flush(request):
+    """Flush the whole cache of the app making the request.
+
+    Args:
+        request (MemcacheGetRequest): The memcache get request
+
+    Return:
+        None
+    """
+    from google.appengine.api.memcache import memcache_service_pb
+
+    flush_request = memcache_service_pb.MemcacheFlushRequest()
+
+    if request.has_override():
+        flush_request.mutable_override().CopyFrom(request.override())
+
+    _call('FlushAll', flush_request,
+          memcache_service_pb.MemcacheFlushResponse())
+
+
+def _call(method, request, response):
+    """Make the memcache call without it being disrupted."""
+    from google.appengine.api import apiproxy_stub_map
+
+    with bypass():
+        apiproxy_stub_map.MakeSyncCall(
+            MEMCACHE_STUB, method, request, response)
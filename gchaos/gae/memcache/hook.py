@@ -0,0 +1,160 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import logging
+
+from gchaos.gae.datastore.latency import latency_trigger
+from gchaos.gae.memcache.actions import ACTIONS
+from gchaos.gae.memcache.actions import RPC_ACTIONS
+from gchaos.gae.memcache.bypass import bypassed
+from gchaos.gae.memcache.evictions import trigger as trigger_evictions
+from gchaos.gae.registry import install_service
+from gchaos.gae.registry import register
+from gchaos.gae.triggers import compile_triggers
+from gchaos.gae.triggers import error_trigger
+from gchaos.log import logger
+from gchaos.settings import MEMCACHE_STUB
+
+
+def install_hook(config):
+    """Install the memcache hook with binding the memcache config to be
+    checked when calls come in.
+
+    Args:
+        config (gchaos.config.hydrate.MemcacheConfig): Memcache configuration
+
+    Return:
+        None
+    """
+    install_service(MEMCACHE_STUB, config)
+
+
+def hook_wrapper(config):
+    """The function that wraps all memcache calls. The config is compiled
+    once into a dictionary of RPC names to triggers so each call is a single
+    dictionary lookup. Calls gchaos makes itself are left alone.
+
+    Args:
+        config (gchaos.config.hydrate.MemcacheConfig): Memcache configuration
+
+    Returns:
+        func
+    """
+    actions = compile_actions(config)
+    get_trigger = actions.get
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Tracking memcache RPCs %s", sorted(actions.keys()))
+
+    def wrap(service, name, request, response, rpc=None):
+        """Called before hitting the memcache stub. The api proxy passes the
+        RPC in since the hook takes five arguments.
+        """
+        trigger = get_trigger(name)
+
+        if trigger and not bypassed():
+            trigger(service, name, request, response, rpc)
+
+    return wrap
+
+
+def compile_actions(config):
+    """Build a dictionary of raw RPC method names (`Get`, `Set`, ...) to a
+    function that triggers the evictions, errors and latencies configured for
+    that action. Actions that are disabled or have a rate of zero are left
+    out.
+
+    Args:
+        config (gchaos.config.hydrate.MemcacheConfig): Memcache configuration
+
+    Return:
+        dict(str, func)
+    """
+    if not config.enabled:
+        return {}
+
+    actions = {}
+
+    for rpc_name, action in RPC_ACTIONS.iteritems():
+        triggers = _get_triggers(action, config)
+
+        if triggers:
+            actions[rpc_name] = compile_triggers(triggers)
+
+    return actions
+
+
+def _get_triggers(action, config):
+    """Return a list of the trigger functions, bound to their configuration,
+    that can fire for the action. Evictions come first so a get made during a
+    storm misses.
+
+    Args:
+        action (str): Memcache action (should be in ACTIONS)
+        config (gchaos.config.hydrate.MemcacheConfig): Memcache configuration
+
+    Return:
+        list(func)
+    """
+    triggers = []
+
+    # Evictions
+    if (action == ACTIONS.GET and config.evictions.enabled and
+            config.evictions.storms):
+        triggers.append(_evictions_trigger(config.evictions))
+
+    # Errors
+    if config.errors.enabled:
+        error_config = config.errors.get_by_action(action)
+
+        if error_config and error_config.error_rate > 0:
+            triggers.append(error_trigger(error_config))
+
+    # Latencies
+    if config.latency.enabled:
+        latency_config = config.latency.get_by_action(action)
+
+        if (latency_config and latency_config.latency and
+                latency_config.latency_rate > 0):
+            triggers.append(
+                latency_trigger(latency_config, config.latency.mode))
+
+    return triggers
+
+
+def _evictions_trigger(evictions_config):
+    """Bind the evictions config to a trigger function.
+
+    Args:
+        evictions_config (gchaos.config.hydrate.EvictionsConfig):
+            Memcache evictions configuration
+
+    Return:
+        func: Trigger taking the service, RPC name, request, response and RPC
+    """
+    def trigger(service, call, request, response, rpc):
+        trigger_evictions(evictions_config, request)
+
+    return trigger
+
+
+register(MEMCACHE_STUB, 'memcache', hook_wrapper)
@@ -0,0 +1,188 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import logging
+
+from collections import OrderedDict
+from threading import Lock
+
+from gchaos.log import logger
+from gchaos.metrics import instrument as measure
+from gchaos.replay import instrument as record_or_replay
+
+
+# Key of the single pre-call hook every service is dispatched from
+HOOK_NAME = 'gchaos_hooks'
+
+# Service name to the ChaosConfig property holding its configuration and the
+# function that binds that configuration into a hook, in registration order.
+SERVICES = OrderedDict()
+
+# Service name to the installed hook for the service. The dictionary is never
+# changed once installed, a new one replaces it so calls in flight see either
+# the old hooks or the new ones.
+HANDLERS = {}
+
+_get_handler = HANDLERS.get
+
+# Serializes installs, calls never take it.
+_INSTALL_LOCK = Lock()
+
+
+def register(service, config_name, hook_wrapper):
+    """Register the hook of a service. Registering a service again replaces
+    its hook wrapper.
+
+    Args:
+        service (str): Service name the api proxy calls the stub with
+        config_name (str): Name of the ChaosConfig property with the service's
+                           configuration
+        hook_wrapper (func): Function taking the service's configuration and
+                             returning a hook taking the service, RPC name,
+                             request, response and RPC
+
+    Return:
+        None
+    """
+    SERVICES[service] = (config_name, hook_wrapper)
+
+
+def install_hooks(config):
+    """Install the hooks of every registered service that is enabled and
+    remove the hooks of the others, replacing all of them at once.
+
+    Args:
+        config (gchaos.config.hydrate.ChaosConfig): Chaos configuration
+
+    Return:
+        None
+    """
+    handlers = {}
+
+    for service, (config_name, hook_wrapper) in SERVICES.iteritems():
+        service_config = getattr(config, config_name, None)
+
+        if service_config is not None and service_config.enabled:
+            handlers[service] = _instrument(
+                service, hook_wrapper(service_config))
+
+    with _INSTALL_LOCK:
+        _set_handlers(handlers)
+
+    _append_hook()
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Installed the %s hooks", sorted(handlers.keys()))
+
+
+def install_service(service, config):
+    """Bind the configuration into the service's hook and make sure the
+    combined hook is installed. Installing a service again replaces its hook
+    so the new configuration is used from the next call on.
+
+    Args:
+        service (str): Registered service name
+        config (object): The service's configuration
+
+    Return:
+        None
+
+    Raises:
+        KeyError: If the service isn't registered
+    """
+    _, hook_wrapper = SERVICES[service]
+
+    handler = _instrument(service, hook_wrapper(config))
+
+    with _INSTALL_LOCK:
+        handlers = dict(HANDLERS)
+        handlers[service] = handler
+        _set_handlers(handlers)
+
+    _append_hook()
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Installed the %s hook", service)
+
+
+def uninstall_service(service):
+    """Stop causing chaos for the service. The combined hook stays installed.
+
+    Args:
+        service (str): Registered service name
+
+    Return:
+        None
+    """
+    with _INSTALL_LOCK:
+        handlers = dict(HANDLERS)
+        handlers.pop(service, None)
+        _set_handlers(handlers)
+
+
+def _instrument(service, handler):
+    """Wrap a service's hook to be recorded or replayed and measured. Each
+    wrapper is left out while it's off.
+
+    Args:
+        service (str): Service name
+        handler (func): The service's hook
+
+    Return:
+        func
+    """
+    return measure(service, record_or_replay(service, handler))
+
+
+def _set_handlers(handlers):
+    """Replace the installed hooks. Calls only look at the bound lookup so
+    they switch over with a single assignment.
+
+    Args:
+        handlers (dict(str, func)): Service name to its hook
+
+    Return:
+        None
+    """
+    global HANDLERS, _get_handler
+
+    HANDLERS = handlers
+    _get_handler = handlers.get
+
+
+def _append_hook():
+    """Make sure the combined hook is in the api proxy's pre-call hooks."""
+    from google.appengine.api.apiproxy_stub_map import apiproxy
+
+    # The api proxy ignores a hook that is already in the list.
+    apiproxy.GetPreCallHooks().Append(HOOK_NAME, dispatch)
+
+
+def dispatch(service, call, request, response, rpc=None):
+    """Called before hitting any stub. Calls to services without an installed
+    hook cost a single dictionary lookup. The api proxy passes the RPC in
+    since the hook takes five arguments.
+    """
+    handler = _get_handler(service)
+
+    if handler:
+        handler(service, call, request, response, rpc)
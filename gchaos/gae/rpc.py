@@ -0,0 +1,95 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from gchaos.replay import record_completion_error
+
+
+def after_completion(rpc, func):
+    """Call func once the RPC has completed successfully, when its success is
+    checked. The client calls wait for the RPC and check its success before
+    reading the response so func runs before the caller sees the result.
+    Success can be checked more than once, func only runs on the first check
+    that succeeds.
+
+    Args:
+        rpc (google.appengine.api.apiproxy_rpc.RPC): The RPC being made
+        func (func): Function taking no arguments
+
+    Return:
+        bool: False if the RPC can't be wrapped
+    """
+    # Set once func has run
+    called = []
+
+    def call_once():
+        if called:
+            return
+
+        called.append(True)
+        func()
+
+    return _wrap_check_success(rpc, call_once)
+
+
+def raise_on_completion(rpc, error):
+    """Raise the error when the RPC's success is checked.
+
+    Args:
+        rpc (google.appengine.api.apiproxy_rpc.RPC): The RPC being made
+        error (Exception): The error to raise
+
+    Return:
+        bool: False if the RPC can't be wrapped
+    """
+    def fail():
+        raise error
+
+    if not _wrap_check_success(rpc, fail):
+        return False
+
+    record_completion_error(error)
+
+    return True
+
+
+def _wrap_check_success(rpc, func):
+    """Call func after the RPC's own success check, every time it is made.
+
+    Args:
+        rpc (google.appengine.api.apiproxy_rpc.RPC): The RPC being made
+        func (func): Function taking no arguments
+
+    Return:
+        bool: False if the RPC can't be wrapped
+    """
+    check_success = rpc.CheckSuccess
+
+    def wrapped_check_success():
+        check_success()
+        func()
+
+    try:
+        rpc.CheckSuccess = wrapped_check_success
+    except AttributeError:
+        return False
+
+    return True
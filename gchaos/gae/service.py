@@ -0,0 +1,115 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import logging
+
+from gchaos.gae.datastore.latency import latency_trigger
+from gchaos.gae.registry import register
+from gchaos.gae.triggers import compile_triggers
+from gchaos.gae.triggers import error_trigger
+from gchaos.log import logger
+from gchaos.settings import BLOBSTORE_STUB
+from gchaos.settings import SEARCH_STUB
+
+
+# RPC name of the configuration used for the calls without their own
+WILDCARD = "*"
+
+
+def hook_wrapper(config):
+    """The function that wraps all calls to a service gchaos only knows the
+    raw RPC names of. The config is compiled once into a dictionary of RPC
+    names to triggers so each call is a single dictionary lookup.
+
+    Args:
+        config (gchaos.config.hydrate.ServiceConfig): Service configuration
+
+    Returns:
+        func
+    """
+    calls = compile_calls(config)
+    get_trigger = calls.get
+    default = calls.get(WILDCARD)
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Tracking service RPCs %s", sorted(calls.keys()))
+
+    def wrap(service, name, request, response, rpc=None):
+        """Called before hitting the service's stub."""
+        trigger = get_trigger(name, default)
+
+        if trigger:
+            trigger(service, name, request, response, rpc)
+
+    return wrap
+
+
+def compile_calls(config):
+    """Build a dictionary of raw RPC method names to a function that triggers
+    the errors and latency configured for the call. Calls that can never
+    trigger anything are left out.
+
+    Args:
+        config (gchaos.config.hydrate.ServiceConfig): Service configuration
+
+    Return:
+        dict(str, func)
+    """
+    if not config.enabled:
+        return {}
+
+    calls = {}
+
+    for name, call in config.calls.iteritems():
+        triggers = _get_triggers(call, config.mode)
+
+        if triggers:
+            calls[name] = compile_triggers(triggers)
+
+    return calls
+
+
+def _get_triggers(call, mode):
+    """Return a list of the trigger functions, bound to their configuration,
+    that can fire for the call.
+
+    Args:
+        call (gchaos.config.hydrate.ServiceCallConfig): Call configuration
+        mode (str): Latency mode (should be in MODES)
+
+    Return:
+        list(func)
+    """
+    triggers = []
+
+    if call.errors and call.errors.error_rate > 0:
+        triggers.append(error_trigger(call.errors))
+
+    if (call.latency and call.latency.latency and
+            call.latency.latency_rate > 0):
+        triggers.append(latency_trigger(call.latency, mode))
+
+    return triggers
+
+
+register(SEARCH_STUB, 'search', hook_wrapper)
+register(BLOBSTORE_STUB, 'blobstore', hook_wrapper)
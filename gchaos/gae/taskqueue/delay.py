@@ -0,0 +1,57 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import logging
+
+from gchaos.budget import allow_fault
+from gchaos.chance import roll
+from gchaos.gae.datastore.latency import get_latency
+from gchaos.log import logger
+from gchaos.log import PREFIX
+
+
+def trigger(delay_config, request):
+    """Generates a chance value between 0 and 1. If the delay rate is greather
+    than or equal to the chance the tasks in the request are scheduled later,
+    like they would run when the queue is backed up.
+
+    Args:
+        delay_config (gchaos.config.hydrate.LatencyConfig): Delay (in
+            milliseconds) and rate
+        request (TaskQueueBulkAddRequest): The bulk add request
+
+    Return:
+        None
+    """
+    if not roll(delay_config.latency_rate) or not allow_fault():
+        return
+
+    delay = get_latency(delay_config.latency)
+
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("%sDelaying %s tasks by %s milliseconds", PREFIX,
+                    request.add_request_size(), delay)
+
+    delay_usec = delay * 1000
+
+    for add in request.add_request_list():
+        add.set_eta_usec(add.eta_usec() + delay_usec)
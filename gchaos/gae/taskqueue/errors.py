@@ -0,0 +1,171 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import logging
+
+from gchaos.budget import allow_error
+from gchaos.chance import randint
+from gchaos.chance import roll
+from gchaos.gae.datastore.batch import batch_rate
+from gchaos.gae.rpc import after_completion
+from gchaos.gae.triggers import get_error
+from gchaos.log import logger
+from gchaos.log import PREFIX
+from gchaos.metrics import count_error
+from gchaos.tracing import trace_error
+
+
+# Task queue errors mapped to the result code of a task that failed with it,
+# built the first time a batch partially fails.
+_ERROR_CODES = None
+
+
+def trigger(error_config, request, response=None, rpc=None, service=None,
+            call=None):
+    """Generates a chance value between 0 and 1. If the error rate on the error
+    config is greather than or equal to the chance then it will trigger errors
+    if errors exist on the config. It will get the error configs next option
+    which is based on the error config probabilities.
+
+    The error is raised before the tasks are added so none of them are. When
+    the config allows partial failures and the RPC can be wrapped only some of
+    the tasks are added and the others fail with the error.
+
+    Args:
+        error_config (gchaos.config.hydrate.ErrorConfig): Task Queue Error
+                                                          Configuration
+        request (TaskQueueBulkAddRequest): The bulk add request
+        response (TaskQueueBulkAddResponse): The bulk add response
+        rpc (google.appengine.api.apiproxy_rpc.RPC): The RPC being made
+        service (str): Service the RPC is made to
+        call (str): Raw RPC method name
+
+    Return:
+        None
+    """
+    rate = error_config.error_rate
+
+    if error_config.per_entity:
+        rate = batch_rate(rate, request.add_request_size())
+
+    if not roll(rate) or not allow_error():
+        return
+
+    error = get_error(error_config)
+    count_error(error)
+    trace_error(error, service, call)
+
+    if (error_config.partial and rpc is not None and
+            _fail_partially(error, request, response, rpc)):
+        return
+
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("%sGoing to raise %s", PREFIX, error.__class__.__name__)
+
+    raise error
+
+
+def _fail_partially(error, request, response, rpc):
+    """Only add some of the tasks, at least one and not all of them. The
+    others are given the error's result code once the RPC completes, so the
+    client raises the error after the rest of the tasks were added.
+
+    Args:
+        error (Exception): The error the tasks fail with
+        request (TaskQueueBulkAddRequest): The bulk add request
+        response (TaskQueueBulkAddResponse): The bulk add response
+        rpc (google.appengine.api.apiproxy_rpc.RPC): The RPC being made
+
+    Return:
+        bool: False if the batch can't be partially failed
+    """
+    adds = request.add_request_list()
+    count = len(adds)
+    code = _get_error_code(error)
+
+    if count < 2 or code is None:
+        return False
+
+    failed = _sample(count, randint(1, count - 1))
+
+    def fail_tasks():
+        added = iter(list(response.taskresult_list()))
+        response.clear_taskresult()
+
+        for i in xrange(count):
+            result = response.add_taskresult()
+
+            if i in failed:
+                result.set_result(code)
+            else:
+                result.CopyFrom(next(added))
+
+    if not after_completion(rpc, fail_tasks):
+        return False
+
+    adds[:] = [add for i, add in enumerate(adds) if i not in failed]
+
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("%sGoing to fail %s of %s tasks with %s", PREFIX,
+                    len(failed), count, error.__class__.__name__)
+
+    return True
+
+
+def _sample(count, size):
+    """Return a random set of size indexes out of count."""
+    indexes = range(count)
+
+    for i in xrange(size):
+        j = randint(i, count - 1)
+        indexes[i], indexes[j] = indexes[j], indexes[i]
+
+    return frozenset(indexes[:size])
+
+
+def _get_error_code(error):
+    """Return the task result code for the error, None if tasks can't fail
+    with it.
+
+    Args:
+        error (Exception): Task queue error
+
+    Return:
+        int
+    """
+    global _ERROR_CODES
+
+    if _ERROR_CODES is None:
+        from google.appengine.api.taskqueue import taskqueue
+        from google.appengine.api.taskqueue.taskqueue_service_pb import \
+            TaskQueueServiceError
+
+        _ERROR_CODES = {
+            taskqueue.TransientError: TaskQueueServiceError.TRANSIENT_ERROR,
+            taskqueue.InternalError: TaskQueueServiceError.INTERNAL_ERROR,
+            taskqueue.TaskAlreadyExistsError:
+                TaskQueueServiceError.TASK_ALREADY_EXISTS,
+            taskqueue.TombstonedTaskError:
+                TaskQueueServiceError.TOMBSTONED_TASK,
+        }
+
+    return _ERROR_CODES.get(type(error))
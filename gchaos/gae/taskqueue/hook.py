@@ -0,0 +1,171 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import logging
+
+from gchaos.gae.datastore.latency import latency_trigger
+from gchaos.gae.registry import install_service
+from gchaos.gae.registry import register
+from gchaos.gae.taskqueue.delay import trigger as trigger_delay
+from gchaos.gae.taskqueue.errors import trigger as trigger_errors
+from gchaos.gae.taskqueue.rules import QueueIndex
+from gchaos.gae.triggers import compile_triggers
+from gchaos.log import logger
+from gchaos.settings import TASKQUEUE_STUB
+
+
+# Raw task queue RPC method name used to add tasks
+BULK_ADD = "BulkAdd"
+
+
+def install_hook(config):
+    """Install the taskqueue hook with binding the taskqueue config to be
+    checked when calls come in.
+
+    Args:
+        config (gchaos.config.hydrate.TaskqueueConfig): Task Queue
+                                                        configuration
+
+    Return:
+        None
+    """
+    install_service(TASKQUEUE_STUB, config)
+
+
+def hook_wrapper(config):
+    """The function that wraps all taskqueue calls. The rules are compiled
+    once into an index of triggers by queue name.
+
+    Args:
+        config (gchaos.config.hydrate.TaskqueueConfig): Task Queue
+                                                        configuration
+
+    Returns:
+        func
+    """
+    index = compile_rules(config)
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Tracking %s taskqueue rules", len(index))
+
+    find = index.find
+
+    def wrap(service, name, request, response, rpc=None):
+        """Called before hitting the taskqueue stub. The api proxy passes the
+        RPC in since the hook takes five arguments.
+        """
+        if name != BULK_ADD or not index or not request.add_request_size():
+            return
+
+        # The client adds a batch of tasks to a single queue.
+        trigger = find(request.add_request(0).queue_name())
+
+        if trigger:
+            trigger(service, name, request, response, rpc)
+
+    return wrap
+
+
+def compile_rules(config):
+    """Build an index of the rules to a function that triggers the delays,
+    errors and latency configured for the rule.
+
+    Args:
+        config (gchaos.config.hydrate.TaskqueueConfig): Task Queue
+                                                        configuration
+
+    Return:
+        gchaos.gae.taskqueue.rules.QueueIndex
+    """
+    if not config.enabled:
+        return QueueIndex([])
+
+    return QueueIndex(
+        (rule, compile_triggers(_get_triggers(rule, config.mode)))
+        for rule in config.rules)
+
+
+def _get_triggers(rule, mode):
+    """Return a list of the trigger functions, bound to their configuration,
+    that can fire for the rule. Delays come first so they are applied to the
+    tasks that are still added when a batch partially fails.
+
+    Args:
+        rule (gchaos.config.hydrate.TaskqueueRuleConfig): Task Queue rule
+        mode (str): Latency mode (should be in MODES)
+
+    Return:
+        list(func)
+    """
+    triggers = []
+
+    if rule.delay and rule.delay.latency and rule.delay.latency_rate > 0:
+        triggers.append(_delay_trigger(rule.delay))
+
+    if rule.errors and rule.errors.error_rate > 0:
+        triggers.append(_error_trigger(rule.errors))
+
+    if (rule.latency and rule.latency.latency and
+            rule.latency.latency_rate > 0):
+        triggers.append(latency_trigger(rule.latency, mode))
+
+    return triggers
+
+
+def _delay_trigger(delay_config):
+    """Bind the delay config to a trigger function.
+
+    Args:
+        delay_config (gchaos.config.hydrate.LatencyConfig):
+            Task Queue delay configuration
+
+    Return:
+        func: Trigger taking the service, RPC name, request, response and RPC
+    """
+    def trigger(service, call, request, response, rpc):
+        trigger_delay(delay_config, request)
+
+    return trigger
+
+
+def _error_trigger(error_config):
+    """Bind the error config to a trigger function.
+
+    Args:
+        error_config (gchaos.config.hydrate.ErrorConfig):
+            Task Queue error configuration
+
+    Return:
+        func: Trigger taking the service, RPC name, request, response and RPC
+
+    Raises:
+        gchaos.utils.BadObjectPathError: If an error path can't be resolved
+    """
+    error_config.resolve()
+
+    def trigger(service, call, request, response, rpc):
+        trigger_errors(error_config, request, response, rpc, service, call)
+
+    return trigger
+
+
+register(TASKQUEUE_STUB, 'taskqueue', hook_wrapper)
@@ -0,0 +1,74 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+# Maximum number of queues to remember the rule of before starting over.
+QUEUE_CACHE_SIZE = 1024
+
+
+class QueueIndex(object):
+    """Finds the first rule matching a queue name. The rule for a queue is
+    worked out the first time the queue is seen, so after that it's a single
+    dictionary lookup.
+    """
+
+    def __init__(self, entries):
+        """Initialize the QueueIndex object.
+
+        Args:
+            entries (list(tuple(TaskqueueRuleConfig, object))): Each rule, in
+                order, with the value found for it
+        """
+        self._entries = tuple(entries)
+        self._queues = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def find(self, queue_name):
+        """Return the value of the first rule matching the queue, None if no
+        rule matches.
+
+        Args:
+            queue_name (str): Name of the queue
+
+        Return:
+            object
+        """
+        try:
+            return self._queues[queue_name]
+        except KeyError:
+            pass
+
+        if len(self._queues) >= QUEUE_CACHE_SIZE:
+            self._queues.clear()
+
+        value = None
+
+        for rule, rule_value in self._entries:
+            if not rule.queues or rule.queues.match(queue_name):
+                value = rule_value
+                break
+
+        self._queues[queue_name] = value
+
+        return value
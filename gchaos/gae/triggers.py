@@ -0,0 +1,127 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import logging
+
+from gchaos.budget import allow_error
+from gchaos.chance import roll
+from gchaos.errors import ChaosException
+from gchaos.gae.rpc import raise_on_completion
+from gchaos.log import logger
+from gchaos.log import PREFIX
+from gchaos.metrics import count_error
+from gchaos.tracing import trace_error
+
+
+def compile_triggers(triggers):
+    """Combine the trigger functions into a single function that calls each
+    of them in order, None if there aren't any. Triggers take the same
+    arguments as the hook: the service, RPC name, request, response and RPC.
+
+    Args:
+        triggers (list(func)): Trigger functions
+
+    Return:
+        func
+    """
+    if not triggers:
+        return None
+
+    if len(triggers) == 1:
+        return triggers[0]
+
+    triggers = tuple(triggers)
+
+    def trigger(service, call, request, response, rpc):
+        for func in triggers:
+            func(service, call, request, response, rpc)
+
+    return trigger
+
+
+def error_trigger(error_config):
+    """Bind the error config to a trigger raising the error when the RPC's
+    success is checked.
+
+    Args:
+        error_config (gchaos.config.hydrate.ErrorConfig): Error configuration
+
+    Return:
+        func: Trigger taking the service, RPC name, request, response and RPC
+
+    Raises:
+        gchaos.utils.BadObjectPathError: If an error path can't be resolved
+    """
+    error_config.resolve()
+
+    def trigger(service, call, request, response, rpc):
+        trigger_error(error_config, rpc, service, call)
+
+    return trigger
+
+
+def trigger_error(error_config, rpc=None, service=None, call=None):
+    """Roll against the error rate and raise the next error off the error
+    config when it hits. The RPC is still made and the error is raised when
+    its success is checked, which is where the clients look for the errors
+    they turn into a cache miss, a failed write or a failed fetch. Without the
+    RPC the error is raised right away.
+
+    Args:
+        error_config (gchaos.config.hydrate.ErrorConfig): Error configuration
+        rpc (google.appengine.api.apiproxy_rpc.RPC): The RPC being made
+        service (str): Service the RPC is made to
+        call (str): Raw RPC method name
+
+    Return:
+        None
+    """
+    if not roll(error_config.error_rate) or not allow_error():
+        return
+
+    error = get_error(error_config)
+    count_error(error)
+    trace_error(error, service, call)
+
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("%sGoing to raise %s", PREFIX, error.__class__.__name__)
+
+    if rpc is not None and raise_on_completion(rpc, error):
+        return
+
+    raise error
+
+
+def get_error(error_config):
+    """Return an instance of the next error off the error config or a
+    ChaosException if it doesn't have any errors.
+
+    Args:
+        error_config (gchaos.config.hydrate.ErrorConfig): Error configuration
+
+    Return:
+        Exception
+    """
+    if error_config.errors.choices and error_config.errors.weights:
+        return error_config.errors.next()()
+
+    return ChaosException("Raising Chaos!")
@@ -0,0 +1,146 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import logging
+
+from gchaos.gae.datastore.latency import latency_trigger
+from gchaos.gae.registry import install_service
+from gchaos.gae.registry import register
+from gchaos.gae.triggers import compile_triggers
+from gchaos.gae.triggers import error_trigger
+from gchaos.gae.urlfetch.rules import RuleIndex
+from gchaos.gae.urlfetch.throttle import trigger as trigger_throttle
+from gchaos.log import logger
+from gchaos.settings import URLFETCH_STUB
+
+
+# Raw urlfetch RPC method name
+FETCH = "Fetch"
+
+
+def install_hook(config):
+    """Install the urlfetch hook with binding the urlfetch config to be
+    checked when calls come in.
+
+    Args:
+        config (gchaos.config.hydrate.UrlfetchConfig): URLFetch configuration
+
+    Return:
+        None
+    """
+    install_service(URLFETCH_STUB, config)
+
+
+def hook_wrapper(config):
+    """The function that wraps all urlfetch calls. The rules are compiled once
+    into an index of triggers so each fetch only looks at the rules for its
+    host.
+
+    Args:
+        config (gchaos.config.hydrate.UrlfetchConfig): URLFetch configuration
+
+    Returns:
+        func
+    """
+    index = compile_rules(config)
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Tracking %s urlfetch rules", len(index))
+
+    find = index.find
+
+    def wrap(service, name, request, response, rpc=None):
+        """Called before hitting the urlfetch stub. The api proxy passes the
+        RPC in since the hook takes five arguments.
+        """
+        if name != FETCH or not index:
+            return
+
+        trigger = find(request.url())
+
+        if trigger:
+            trigger(service, name, request, response, rpc)
+
+    return wrap
+
+
+def compile_rules(config):
+    """Build an index of the rules to a function that triggers the errors,
+    latency and throttling configured for the rule. Rules that can never
+    trigger anything still match, so a fetch they match is left alone.
+
+    Args:
+        config (gchaos.config.hydrate.UrlfetchConfig): URLFetch configuration
+
+    Return:
+        gchaos.gae.urlfetch.rules.RuleIndex
+    """
+    if not config.enabled:
+        return RuleIndex([])
+
+    return RuleIndex(
+        (rule, compile_triggers(_get_triggers(rule, config.mode)))
+        for rule in config.rules)
+
+
+def _get_triggers(rule, mode):
+    """Return a list of the trigger functions, bound to their configuration,
+    that can fire for the rule.
+
+    Args:
+        rule (gchaos.config.hydrate.UrlfetchRuleConfig): URLFetch rule
+        mode (str): Latency mode (should be in MODES)
+
+    Return:
+        list(func)
+    """
+    triggers = []
+
+    if rule.errors and rule.errors.error_rate > 0:
+        triggers.append(error_trigger(rule.errors))
+
+    if (rule.latency and rule.latency.latency and
+            rule.latency.latency_rate > 0):
+        triggers.append(latency_trigger(rule.latency, mode))
+
+    if rule.throttle:
+        triggers.append(_throttle_trigger(rule.throttle))
+
+    return triggers
+
+
+def _throttle_trigger(kilobytes_per_second):
+    """Bind the throttle rate to a trigger function.
+
+    Args:
+        kilobytes_per_second (float): Simulated download rate
+
+    Return:
+        func: Trigger taking the service, RPC name, request, response and RPC
+    """
+    def trigger(service, call, request, response, rpc):
+        trigger_throttle(kilobytes_per_second, response, rpc, service, call)
+
+    return trigger
+
+
+register(URLFETCH_STUB, 'urlfetch', hook_wrapper)
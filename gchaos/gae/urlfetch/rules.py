@@ -0,0 +1,95 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from urlparse import urlsplit
+
+
+# Maximum number of hosts to remember the rules of before starting over.
+HOST_CACHE_SIZE = 1024
+
+
+def split_url(url):
+    """Return the lower case host name and the path of the url.
+
+    Args:
+        url (str): URL being fetched
+
+    Return:
+        tuple(str, str)
+    """
+    parts = urlsplit(url)
+
+    return parts.hostname or '', parts.path or '/'
+
+
+class RuleIndex(object):
+    """Finds the first rule matching a url. The rules that can match a host
+    are worked out the first time the host is seen, so a fetch only checks the
+    path rules of the few rules for its host.
+    """
+
+    def __init__(self, entries):
+        """Initialize the RuleIndex object.
+
+        Args:
+            entries (list(tuple(UrlfetchRuleConfig, object))): Each rule, in
+                order, with the value found for it
+        """
+        self._entries = tuple(entries)
+        self._hosts = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def find(self, url):
+        """Return the value of the first rule matching the url, None if no
+        rule matches.
+
+        Args:
+            url (str): URL being fetched
+
+        Return:
+            object
+        """
+        host, path = split_url(url)
+
+        candidates = self._hosts.get(host)
+
+        if candidates is None:
+            candidates = self._index_host(host)
+
+        for paths, value in candidates:
+            if not paths or paths.match(path):
+                return value
+
+        return None
+
+    def _index_host(self, host):
+        """Return the path rules and values of the rules for the host."""
+        if len(self._hosts) >= HOST_CACHE_SIZE:
+            self._hosts.clear()
+
+        candidates = self._hosts[host] = tuple(
+            (rule.paths, value) for rule, value in self._entries
+            if not rule.hosts or rule.hosts.match(host))
+
+        return candidates
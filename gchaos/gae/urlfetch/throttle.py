@@ -0,0 +1,86 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import logging
+
+from time import sleep
+
+from gchaos.budget import allow_latency
+from gchaos.gae.rpc import after_completion
+from gchaos.log import logger
+from gchaos.log import PREFIX
+from gchaos.metrics import count_stall
+from gchaos.replay import record_stall
+from gchaos.tracing import trace_stall
+
+
+def trigger(kilobytes_per_second, response, rpc=None, service=None,
+            call=None):
+    """Slow the fetch down as if the response was downloaded at the given
+    rate. The response size is only known once the fetch completes so the
+    stall happens then, before the caller sees the result. The download only
+    happens once, so checking the RPC's success again doesn't stall again.
+
+    Args:
+        kilobytes_per_second (float): Simulated download rate
+        response (URLFetchResponse): The response being filled in
+        rpc (google.appengine.api.apiproxy_rpc.RPC): The RPC being made
+        service (str): Service the RPC is made to
+        call (str): Raw RPC method name
+
+    Return:
+        None
+    """
+    def throttle():
+        milli_time = allow_latency(
+            get_download_time(response, kilobytes_per_second) * 1000)
+
+        if not milli_time:
+            return
+
+        stall_for = milli_time / 1000.0
+
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("%sThrottling the fetch for %.3f seconds", PREFIX,
+                        stall_for)
+
+        trace_stall(milli_time, service, call)
+        record_stall(milli_time)
+        sleep(stall_for)
+        count_stall(milli_time)
+
+    if rpc is None or not after_completion(rpc, throttle):
+        logger.debug("%sCan't throttle a fetch without its RPC", PREFIX)
+
+
+def get_download_time(response, kilobytes_per_second):
+    """Return the seconds it takes to download the response content at the
+    rate.
+
+    Args:
+        response (URLFetchResponse): The fetch response
+        kilobytes_per_second (float): Download rate
+
+    Return:
+        float
+    """
+    return len(response.content()) / 1024.0 / kilobytes_per_second
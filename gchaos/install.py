@@ -21,27 +21,70 @@
 # SOFTWARE.
 
 
-import logging
-import random
-
+from gchaos.budget import configure as configure_budget
+from gchaos.chance import seed
 from gchaos.config import CHAOS_CONFIG
-from gchaos.gae.datastore import install_datastore_hooks
+from gchaos.deadline import configure as configure_deadlines
+from gchaos.gae.registry import install_hooks
+from gchaos.log import logger
+from gchaos.log import PREFIX
+from gchaos.log import set_quiet
+from gchaos.metrics import configure as configure_metrics
+from gchaos.replay import configure as configure_replay
+from gchaos.tracing import configure as configure_tracing
 
-# TODO: Override the logging module so we can get a nice chaos formatted
-# message
+# Importing the services registers their hooks.
+import gchaos.gae.datastore  # noqa
+import gchaos.gae.memcache  # noqa
+import gchaos.gae.service  # noqa
+import gchaos.gae.taskqueue  # noqa
+import gchaos.gae.urlfetch  # noqa
 
 
 def install_chaos(config=None):
     """Log a quick message then install the chaos hooks into the Google API
     Proxies.
     """
-    logging.info("CHAOS: Going to cause system wide chaos!!!")
-
     if not config:
         config = CHAOS_CONFIG
 
+    set_quiet(config.quiet)
+
+    logger.info("%sGoing to cause system wide chaos!!!", PREFIX)
+
     # TODO: Create a to dict method on the ChaosConfig object.
     # logging.info("CHAOS: Default Chaos Config: {0}".format(config))
-    random.seed()
+    seed(config.seed)
+
+    configure_budget(config.budget)
+    configure_deadlines(config.deadlines)
+    configure_metrics(config.metrics)
+    configure_tracing(config.tracing)
+    configure_replay(config.replay)
+    install_hooks(config)
+
+
+def update_chaos(config):
+    """Replace the installed chaos hooks with the config's. The random
+    streams are left alone so a seeded run stays reproducible. The config's
+    paths are resolved before anything is replaced so a bad one leaves the
+    installed chaos as it was.
+
+    Args:
+        config (gchaos.config.hydrate.ChaosConfig): Chaos configuration
+
+    Return:
+        None
+
+    Raises:
+        gchaos.utils.BadObjectPathError: If a path can't be resolved
+    """
+    config.resolve()
+    set_quiet(config.quiet)
 
-    install_datastore_hooks(config.datastore)
+    configure_budget(config.budget)
+    configure_deadlines(config.deadlines)
+    configure_metrics(config.metrics)
+    configure_tracing(config.tracing)
+    configure_replay(config.replay)
+    install_hooks(config)
@@ -0,0 +1,47 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import logging
+
+
+LOGGER_NAME = 'gchaos'
+
+# Prefix for messages logged when chaos fires so they are easy to find.
+PREFIX = 'CHAOS: '
+
+logger = logging.getLogger(LOGGER_NAME)
+
+
+def set_quiet(quiet):
+    """Toggle quiet mode on the gchaos logger. In quiet mode only messages
+    logged when chaos actually fires (errors raised, latency injected) are
+    emitted, the per call debug messages are dropped regardless of the root
+    logger's level.
+
+    Args:
+        quiet (bool): Whether to enable quiet mode
+
+    Return:
+        None
+    """
+    logger.setLevel(logging.INFO if quiet else logging.NOTSET)
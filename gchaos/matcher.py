@@ -0,0 +1,181 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import re
+
+
+# Maximum number of values to remember the match of before starting over.
+MATCH_CACHE_SIZE = 1024
+
+
+class RULES:
+    """Types of matching rules. A rule is written as `<type>:<pattern>`, a
+    rule without a type is a glob if it has a wildcard in it and is exact
+    otherwise.
+    """
+    EXACT = "exact"
+    PREFIX = "prefix"
+    GLOB = "glob"
+    REGEX = "re"
+
+    @classmethod
+    def all(cls):
+        return [cls.EXACT, cls.PREFIX, cls.GLOB, cls.REGEX]
+
+
+GLOB_CHARS = frozenset('*?')
+
+
+def parse_rule(rule):
+    """Split a rule into its type and pattern.
+
+    Args:
+        rule (str): Rule such as `Session`, `Counter*`, `prefix:Log` or
+                    `re:^User:\\d+$`
+
+    Return:
+        tuple(str, str)
+    """
+    if ':' in rule:
+        rule_type, pattern = rule.split(':', 1)
+
+        if rule_type in RULES.all():
+            return rule_type, pattern
+
+    if GLOB_CHARS.intersection(rule):
+        return RULES.GLOB, rule
+
+    return RULES.EXACT, rule
+
+
+def glob_to_regex(pattern):
+    """Convert a glob, where `*` matches anything and `?` matches a single
+    character, to a regular expression matching the whole value.
+
+    Args:
+        pattern (str): Glob pattern
+
+    Return:
+        str
+    """
+    parts = []
+
+    for char in pattern:
+        if char == '*':
+            parts.append('.*')
+        elif char == '?':
+            parts.append('.')
+        else:
+            parts.append(re.escape(char))
+
+    parts.append(r'\Z')
+
+    return ''.join(parts)
+
+
+class Matcher(object):
+    """Matches values against a list of rules. Exact rules are kept in a
+    dictionary and the prefix, glob and regex rules are combined into a single
+    regular expression, so a value is checked against all the rules with at
+    most one dictionary lookup and one regex match. Results are remembered so
+    values seen before, like kinds, are a single dictionary lookup.
+
+    Properties:
+        exact (dict): The exact values to match
+        pattern (re.RegexObject): Combined expression of the other rules
+    """
+
+    def __init__(self, rules=None, ignore_case=False):
+        """Initialize the Matcher object compiling the rules.
+
+        Args:
+            rules (list(str)): The rules to match
+            ignore_case (bool): Match the rules regardless of case. The exact,
+                                prefix and glob rules are lower cased and the
+                                regex rules compiled to ignore case, so the
+                                values matched must be lower case
+
+        Raises:
+            ValueError: If a regex rule isn't a valid regular expression
+        """
+        self.exact = {}
+        self._cache = {}
+
+        patterns = []
+
+        for rule in rules or []:
+            rule_type, pattern = parse_rule(rule)
+
+            if ignore_case and rule_type != RULES.REGEX:
+                pattern = pattern.lower()
+
+            if rule_type == RULES.EXACT:
+                self.exact[pattern] = True
+
+            elif rule_type == RULES.PREFIX:
+                patterns.append(re.escape(pattern))
+
+            elif rule_type == RULES.GLOB:
+                patterns.append(glob_to_regex(pattern))
+
+            else:
+                patterns.append(pattern)
+
+        self.pattern = None
+
+        if patterns:
+            try:
+                self.pattern = re.compile(
+                    '|'.join('(?:{0})'.format(p) for p in patterns),
+                    re.IGNORECASE if ignore_case else 0)
+            except re.error as e:
+                raise ValueError("Invalid match rule: {0}".format(e))
+
+    def __nonzero__(self):
+        return bool(self.exact or self.pattern)
+
+    def match(self, value):
+        """Return True if the value matches any of the rules.
+
+        Args:
+            value (str): Value to match
+
+        Return:
+            bool
+        """
+        if value in self.exact:
+            return True
+
+        if self.pattern is None:
+            return False
+
+        try:
+            return self._cache[value]
+        except KeyError:
+            pass
+
+        if len(self._cache) >= MATCH_CACHE_SIZE:
+            self._cache.clear()
+
+        result = self._cache[value] = self.pattern.match(value) is not None
+
+        return result
@@ -0,0 +1,456 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import json
+
+from bisect import bisect_left
+from threading import local
+from threading import Lock
+from time import time
+from urlparse import parse_qs
+
+
+_LOCAL = local()
+
+# Metrics configuration of the installed chaos, None when metrics are off.
+_CONFIG = None
+
+# Every thread's shard. Threads only ever write to their own shard so counting
+# takes no lock, the lock is only taken to add a shard or start over.
+_SHARDS = []
+_SHARDS_LOCK = Lock()
+
+# Bumped to start over, threads replace a shard from an older generation the
+# next time they count something.
+_GENERATION = 0
+
+# Content types the handler answers with
+JSON_TYPE = 'application/json'
+PROMETHEUS_TYPE = 'text/plain; version=0.0.4'
+
+INF = '+Inf'
+
+
+class Histogram(object):
+    """Counts of values falling in fixed buckets along with their sum.
+
+    Properties:
+        bounds (tuple(int)): Inclusive upper bound of each bucket, values past
+                             the last one land in an extra +Inf bucket
+        counts (list(int)): Values in each bucket
+        sum (float): Sum of the values
+        count (int): Number of values
+    """
+
+    def __init__(self, bounds):
+        """Initialize an empty Histogram.
+
+        Args:
+            bounds (tuple(int)): Increasing upper bounds of the buckets
+        """
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def add(self, value):
+        """Count the value in its bucket.
+
+        Args:
+            value (float): Value to count
+
+        Return:
+            None
+        """
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def merge(self, other):
+        """Add the counts of a histogram with the same bounds.
+
+        Args:
+            other (Histogram): Histogram to add
+
+        Return:
+            None
+        """
+        self.counts = [mine + theirs
+                       for mine, theirs in zip(self.counts, other.counts)]
+        self.sum += other.sum
+        self.count += other.count
+
+    def cumulative(self):
+        """Return each bucket's upper bound with the number of values up to
+        it, the last bound being +Inf.
+
+        Return:
+            list(tuple(object, int))
+        """
+        buckets = []
+        total = 0
+
+        for bound, count in zip(self.bounds + (INF,), self.counts):
+            total += count
+            buckets.append((bound, total))
+
+        return buckets
+
+    def to_dict(self):
+        """Return the histogram as a JSON serializable dictionary.
+
+        Return:
+            dict
+        """
+        return {
+            'buckets': [list(bucket) for bucket in self.cumulative()],
+            'sum': self.sum,
+            'count': self.count,
+        }
+
+
+class Shard(object):
+    """Metrics counted by a single thread.
+
+    Properties:
+        generation (int): Generation the shard was made in
+        rpcs (dict(tuple(str, str), int)): Hooked RPCs by service and call
+        errors (dict(str, int)): Errors raised by class name
+        stalls (Histogram): Injected stalls in milliseconds
+        overhead (Histogram): Time spent in the hooks, stalls excluded, in
+                              microseconds
+        slept (float): Milliseconds the thread slept on stalls so far
+    """
+
+    def __init__(self, generation, stall_buckets, overhead_buckets):
+        """Initialize an empty Shard.
+
+        Args:
+            generation (int): Current generation
+            stall_buckets (tuple(int)): Stall histogram bounds
+            overhead_buckets (tuple(int)): Hook overhead histogram bounds
+        """
+        self.generation = generation
+        self.rpcs = {}
+        self.errors = {}
+        self.stalls = Histogram(stall_buckets)
+        self.overhead = Histogram(overhead_buckets)
+        self.slept = 0.0
+
+
+def configure(metrics_config):
+    """Set the metrics configuration. Changing the buckets starts the metrics
+    over since the old counts don't fit them.
+
+    Args:
+        metrics_config (gchaos.config.hydrate.MetricsConfig): Metrics
+                                                              configuration
+
+    Return:
+        None
+    """
+    global _CONFIG
+
+    previous = _CONFIG
+    _CONFIG = metrics_config if metrics_config.enabled else None
+
+    if (previous is not None and _CONFIG is not None and (
+            previous.stall_buckets != _CONFIG.stall_buckets or
+            previous.overhead_buckets != _CONFIG.overhead_buckets)):
+        reset()
+
+
+def enabled():
+    """Return True if metrics are being counted.
+
+    Return:
+        bool
+    """
+    return _CONFIG is not None
+
+
+def reset():
+    """Start the metrics over, dropping what every thread counted.
+
+    Return:
+        None
+    """
+    global _GENERATION, _SHARDS
+
+    with _SHARDS_LOCK:
+        _GENERATION += 1
+        _SHARDS = []
+
+
+def _shard():
+    """Return the current thread's shard, adding one if it has none from the
+    current generation.
+
+    Return:
+        Shard
+    """
+    shard = getattr(_LOCAL, 'shard', None)
+
+    if shard is not None and shard.generation == _GENERATION:
+        return shard
+
+    config = _CONFIG
+
+    with _SHARDS_LOCK:
+        shard = Shard(_GENERATION, config.stall_buckets,
+                      config.overhead_buckets)
+        _SHARDS.append(shard)
+
+    _LOCAL.shard = shard
+
+    return shard
+
+
+def instrument(service, handler):
+    """Wrap a service's hook to count the RPCs it sees and time it. The hook
+    is returned as is when metrics are off so the calls don't pay for it.
+
+    Args:
+        service (str): Service name
+        handler (func): Hook taking the service, RPC name, request, response
+                        and RPC
+
+    Return:
+        func
+    """
+    if _CONFIG is None:
+        return handler
+
+    def measured(service, call, request, response, rpc=None):
+        shard = _shard()
+        key = (service, call)
+        shard.rpcs[key] = shard.rpcs.get(key, 0) + 1
+
+        slept = shard.slept
+        start = time()
+
+        try:
+            handler(service, call, request, response, rpc)
+        finally:
+            elapsed = (time() - start) * 1000 - (shard.slept - slept)
+            shard.overhead.add(max(elapsed, 0) * 1000)
+
+    return measured
+
+
+def count_error(error):
+    """Count an error about to be raised.
+
+    Args:
+        error (BaseException): The error
+
+    Return:
+        None
+    """
+    if _CONFIG is None:
+        return
+
+    errors = _shard().errors
+    name = error.__class__.__name__
+    errors[name] = errors.get(name, 0) + 1
+
+
+def count_stall(milli_time, slept=True):
+    """Count injected latency.
+
+    Args:
+        milli_time (float): Latency in milliseconds
+        slept (bool): Whether the thread sleeps it off now, False when it is
+                      left for whoever waits on the RPC
+
+    Return:
+        None
+    """
+    if _CONFIG is None:
+        return
+
+    shard = _shard()
+    shard.stalls.add(milli_time)
+
+    if slept:
+        shard.slept += milli_time
+
+
+def snapshot():
+    """Add up every thread's metrics.
+
+    Return:
+        dict: The `rpcs` by service and call, `errors` by class name,
+              `stall_ms` and `hook_overhead_us` histograms
+    """
+    config = _CONFIG
+    shards = _SHARDS
+
+    if config is None:
+        return {'enabled': False}
+
+    rpcs = {}
+    errors = {}
+    stalls = Histogram(config.stall_buckets)
+    overhead = Histogram(config.overhead_buckets)
+
+    for shard in shards:
+        # items copies the dictionary in one go, the owning thread can't
+        # change it halfway through.
+        for (service, call), count in shard.rpcs.items():
+            calls = rpcs.setdefault(service, {})
+            calls[call] = calls.get(call, 0) + count
+
+        for name, count in shard.errors.items():
+            errors[name] = errors.get(name, 0) + count
+
+        if shard.stalls.bounds == stalls.bounds:
+            stalls.merge(shard.stalls)
+
+        if shard.overhead.bounds == overhead.bounds:
+            overhead.merge(shard.overhead)
+
+    return {
+        'enabled': True,
+        'rpcs': rpcs,
+        'errors': errors,
+        'stall_ms': stalls.to_dict(),
+        'hook_overhead_us': overhead.to_dict(),
+    }
+
+
+def to_json(metrics=None):
+    """Return the metrics as JSON.
+
+    Args:
+        metrics (dict): A snapshot, a new one when not passed
+
+    Return:
+        str
+    """
+    return json.dumps(metrics or snapshot(), sort_keys=True)
+
+
+def to_prometheus(metrics=None):
+    """Return the metrics in the Prometheus text exposition format.
+
+    Args:
+        metrics (dict): A snapshot, a new one when not passed
+
+    Return:
+        str
+    """
+    metrics = metrics or snapshot()
+
+    if not metrics['enabled']:
+        return ''
+
+    lines = ['# HELP gchaos_rpcs_total RPCs seen by the chaos hooks.',
+             '# TYPE gchaos_rpcs_total counter']
+
+    for service, calls in sorted(metrics['rpcs'].items()):
+        for call, count in sorted(calls.items()):
+            lines.append('gchaos_rpcs_total{service="%s",call="%s"} %d' % (
+                _escape(service), _escape(call), count))
+
+    lines.append('# HELP gchaos_errors_total Errors injected by class.')
+    lines.append('# TYPE gchaos_errors_total counter')
+
+    for name, count in sorted(metrics['errors'].items()):
+        lines.append('gchaos_errors_total{error="%s"} %d' % (
+            _escape(name), count))
+
+    lines.extend(_histogram_lines(
+        'gchaos_stall_milliseconds', 'Latency injected.',
+        metrics['stall_ms']))
+    lines.extend(_histogram_lines(
+        'gchaos_hook_overhead_microseconds',
+        'Time spent in the chaos hooks, stalls excluded.',
+        metrics['hook_overhead_us']))
+
+    return '\n'.join(lines) + '\n'
+
+
+def _histogram_lines(name, help_text, histogram):
+    """Return the Prometheus lines of a histogram.
+
+    Args:
+        name (str): Metric name
+        help_text (str): Metric description
+        histogram (dict): Histogram as returned by Histogram.to_dict
+
+    Return:
+        list(str)
+    """
+    lines = ['# HELP %s %s' % (name, help_text),
+             '# TYPE %s histogram' % name]
+
+    for bound, count in histogram['buckets']:
+        lines.append('%s_bucket{le="%s"} %d' % (name, bound, count))
+
+    lines.append('%s_sum %s' % (name, histogram['sum']))
+    lines.append('%s_count %d' % (name, histogram['count']))
+
+    return lines
+
+
+def _escape(value):
+    """Escape a Prometheus label value.
+
+    Args:
+        value (str): Label value
+
+    Return:
+        str
+    """
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace(
+        '\n', '\\n')
+
+
+def metrics_app(environ, start_response):
+    """WSGI app serving the metrics, as JSON unless Prometheus text is asked
+    for with `?format=prometheus` or an Accept header of text/plain. Mount it
+    on an admin only route.
+
+    Args:
+        environ (dict): WSGI environment
+        start_response (func): WSGI start response
+
+    Return:
+        list(str)
+    """
+    query = parse_qs(environ.get('QUERY_STRING', ''))
+    requested = query.get('format', [None])[0]
+
+    if requested is None:
+        accept = environ.get('HTTP_ACCEPT', '')
+        requested = 'prometheus' if 'text/plain' in accept else 'json'
+
+    if requested == 'prometheus':
+        body, content_type = to_prometheus(), PROMETHEUS_TYPE
+    else:
+        body, content_type = to_json(), JSON_TYPE
+
+    start_response('200 OK', [('Content-Type', content_type),
+                              ('Content-Length', str(len(body)))])
+
+    return [body]
@@ -0,0 +1,667 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import logging
+
+from binascii import crc32
+from collections import namedtuple
+from mmap import ACCESS_READ
+from mmap import mmap
+from struct import Struct
+from threading import local
+from threading import Lock
+from time import sleep
+
+from gchaos.log import logger
+from gchaos.log import PREFIX
+from gchaos.utils import full_name
+from gchaos.utils import resolve_path
+
+
+class MODES:
+    """What is done with the schedule."""
+
+    RECORD = 'record'
+    REPLAY = 'replay'
+
+    @classmethod
+    def all(cls):
+        return (cls.RECORD, cls.REPLAY)
+
+
+class DECISIONS:
+    """What was done to an RPC."""
+
+    # Stalled in the hook
+    STALL = 1
+    # Completion delayed, the caller stalls waiting on it
+    DEFERRED_STALL = 2
+    # Stalled once the RPC completed
+    COMPLETION_STALL = 3
+    # Raised in the hook
+    ERROR = 4
+    # Raised once the RPC completed
+    COMPLETION_ERROR = 5
+
+    @classmethod
+    def all(cls):
+        return (cls.STALL, cls.DEFERRED_STALL, cls.COMPLETION_STALL,
+                cls.ERROR, cls.COMPLETION_ERROR)
+
+
+# Magic, format version, record size and number of records
+HEADER = Struct('<8sIIQ')
+
+# Request id, RPC sequence number, checksum of the service and call, decision,
+# unused, error index (0 for none) and stall in milliseconds
+RECORD = Struct('<QIIBBHf')
+
+# The request id and RPC sequence number a record starts with
+KEY = Struct('<QI')
+
+MAGIC = 'GCHAOSRP'
+VERSION = 1
+
+# Records the schedule file grows by when it is full
+GROW_BY = 4096
+
+# The error classes are listed in a file next to the schedule, one object
+# path per line, and records point at them by line number.
+ERRORS_SUFFIX = '.errors'
+
+# Header giving the request an id of its own. Without it the request's method
+# and URL are used.
+REQUEST_HEADER = 'HTTP_X_GCHAOS_REQUEST_ID'
+
+Decision = namedtuple('Decision', [
+    'request_id', 'sequence', 'action', 'decision', 'error', 'stall_ms'])
+
+_LOCAL = local()
+
+# Replay configuration of the installed chaos, None when it's off.
+_CONFIG = None
+
+# Writer of the schedule being recorded
+_WRITER = None
+
+# Schedule being replayed
+_SCHEDULE = None
+
+# Number of requests seen by checksum of their method and URL, so the nth
+# request to a URL gets the same id in every run.
+_SEEN = {}
+_SEEN_LOCK = Lock()
+
+
+def _offset(number):
+    """Return the offset of a record in the schedule file.
+
+    Args:
+        number (int): Record number
+
+    Return:
+        int
+    """
+    return HEADER.size + number * RECORD.size
+
+
+class ScheduleWriter(object):
+    """Appends decisions to a schedule file mapped into memory. The file grows
+    a chunk at a time, so appending a decision is a copy into the map.
+
+    Properties:
+        path (str): Path of the schedule file
+    """
+
+    def __init__(self, path, grow_by=GROW_BY):
+        """Initialize the ScheduleWriter, replacing the file at the path.
+
+        Args:
+            path (str): Path of the schedule file
+            grow_by (int): Records the file grows by when full
+        """
+        self.path = path
+        self._grow_by = grow_by
+        self._capacity = grow_by
+        self._count = 0
+        self._errors = {}
+        self._lock = Lock()
+
+        self._file = open(path, 'w+b')
+        self._file.truncate(_offset(grow_by))
+        self._map = mmap(self._file.fileno(), _offset(grow_by))
+        self._errors_file = open(path + ERRORS_SUFFIX, 'w')
+
+        HEADER.pack_into(self._map, 0, MAGIC, VERSION, RECORD.size, 0)
+
+    def __len__(self):
+        return self._count
+
+    def append(self, request_id, sequence, action, decision, stall_ms=0,
+               error=None):
+        """Append a decision. The header's count is updated after the record
+        is written so a reader never sees half a record.
+
+        Args:
+            request_id (int): Id of the request
+            sequence (int): Number of the RPC in the request
+            action (int): Checksum of the RPC's service and call
+            decision (int): One of DECISIONS
+            stall_ms (float): Stall in milliseconds
+            error (type): Error class raised
+
+        Return:
+            int: Number of the record, None once the writer is closed
+        """
+        with self._lock:
+            if self._map is None:
+                return None
+
+            error_index = self._error_index(error) if error else 0
+
+            if self._count == self._capacity:
+                self._capacity += self._grow_by
+                self._map.resize(_offset(self._capacity))
+
+            RECORD.pack_into(
+                self._map, _offset(self._count), request_id, sequence,
+                action, decision, 0, error_index, stall_ms)
+
+            self._count += 1
+
+            HEADER.pack_into(
+                self._map, 0, MAGIC, VERSION, RECORD.size, self._count)
+
+            return self._count - 1
+
+    def _error_index(self, error):
+        """Return the line of the error class in the errors file, adding it
+        the first time it's seen.
+
+        Args:
+            error (type): Error class
+
+        Return:
+            int
+        """
+        index = self._errors.get(error)
+
+        if index is None:
+            index = self._errors[error] = len(self._errors) + 1
+            self._errors_file.write(full_name(error) + '\n')
+            self._errors_file.flush()
+
+        return index
+
+    def close(self):
+        """Cut the file down to the records written and close it.
+
+        Return:
+            None
+        """
+        with self._lock:
+            if self._map is None:
+                return
+
+            self._map.resize(_offset(self._count))
+            self._map.flush()
+            self._map.close()
+            self._map = None
+
+            self._file.close()
+            self._errors_file.close()
+
+
+class Schedule(object):
+    """A recorded schedule, mapped into memory. Records are looked up by
+    their number straight off the map, and by request and RPC through an
+    index built when the schedule is opened.
+
+    Properties:
+        path (str): Path of the schedule file
+    """
+
+    def __init__(self, path):
+        """Initialize the Schedule from the file at the path.
+
+        Args:
+            path (str): Path of the schedule file
+
+        Raises:
+            ValueError: If the file isn't a schedule
+        """
+        self.path = path
+
+        with open(path, 'rb') as schedule_file:
+            self._map = mmap(schedule_file.fileno(), 0, access=ACCESS_READ)
+
+        magic, version, record_size, count = HEADER.unpack_from(self._map)
+
+        if (magic, version, record_size) != (MAGIC, VERSION, RECORD.size):
+            raise ValueError("{0} isn't a gchaos schedule".format(path))
+
+        # A recording that wasn't closed still has room left at the end.
+        self._count = min(count, (len(self._map) - HEADER.size) //
+                          RECORD.size)
+
+        with open(path + ERRORS_SUFFIX) as errors_file:
+            self._errors = [line.strip() for line in errors_file]
+
+        self._index = {}
+
+        for number in xrange(self._count):
+            key = KEY.unpack_from(self._map, _offset(number))
+            self._index.setdefault(key, []).append(number)
+
+    def __len__(self):
+        return self._count
+
+    def decision(self, number):
+        """Return a recorded decision by its number.
+
+        Args:
+            number (int): Record number
+
+        Return:
+            Decision
+
+        Raises:
+            IndexError: If there's no such record
+        """
+        if not 0 <= number < self._count:
+            raise IndexError(number)
+
+        (request_id, sequence, action, decision, _, error,
+         stall_ms) = RECORD.unpack_from(self._map, _offset(number))
+
+        return Decision(request_id, sequence, action, decision,
+                        self._errors[error - 1] if error else None, stall_ms)
+
+    def decisions(self, request_id, sequence):
+        """Return the decisions recorded for an RPC in the order they were
+        made.
+
+        Args:
+            request_id (int): Id of the request
+            sequence (int): Number of the RPC in the request
+
+        Return:
+            list(Decision)
+        """
+        return [self.decision(number)
+                for number in self._index.get((request_id, sequence), ())]
+
+
+def configure(replay_config):
+    """Start recording or replaying. The recording under way is kept when the
+    mode and path don't change, so reloading the config doesn't start it
+    over.
+
+    Args:
+        replay_config (gchaos.config.hydrate.ReplayConfig): Replay
+                                                            configuration
+
+    Return:
+        None
+
+    Raises:
+        IOError: If the schedule can't be opened
+        ValueError: If the file to replay isn't a schedule
+    """
+    global _CONFIG, _WRITER, _SCHEDULE
+
+    config = replay_config if replay_config.enabled else None
+
+    if (config is not None and _CONFIG is not None and
+            (config.mode, config.path) == (_CONFIG.mode, _CONFIG.path)):
+        _CONFIG = config
+        return
+
+    close()
+
+    if config is None:
+        return
+
+    with _SEEN_LOCK:
+        _SEEN.clear()
+
+    if config.mode == MODES.RECORD:
+        _WRITER = ScheduleWriter(config.path)
+    else:
+        _SCHEDULE = Schedule(config.path)
+
+    _CONFIG = config
+
+
+def close():
+    """Stop recording or replaying, finishing the schedule being recorded.
+
+    Return:
+        None
+    """
+    global _CONFIG, _WRITER, _SCHEDULE
+
+    writer = _WRITER
+
+    _CONFIG = _WRITER = _SCHEDULE = None
+
+    if writer is not None:
+        writer.close()
+
+
+def begin(environ=None):
+    """Give the current thread's request its id and start counting its RPCs.
+    The id is the checksum of the request's id header, or of its method and
+    URL, along with how many requests had the same checksum before it.
+
+    Args:
+        environ (dict): WSGI environment of the request
+
+    Return:
+        int: The request's id
+    """
+    request_id = 0
+
+    if environ:
+        key = environ.get(REQUEST_HEADER) or '{0} {1}?{2}'.format(
+            environ.get('REQUEST_METHOD', ''), environ.get('PATH_INFO', ''),
+            environ.get('QUERY_STRING', ''))
+        checksum = crc32(key) & 0xffffffff
+
+        with _SEEN_LOCK:
+            seen = _SEEN.get(checksum, 0)
+            _SEEN[checksum] = seen + 1
+
+        request_id = checksum << 32 | seen & 0xffffffff
+
+    _LOCAL.request_id = request_id
+    _LOCAL.sequence = 0
+
+    return request_id
+
+
+def end():
+    """Go back to counting the current thread's RPCs outside of a request.
+
+    Return:
+        None
+    """
+    _LOCAL.request_id = 0
+    _LOCAL.sequence = 0
+
+
+def replay_middleware(app):
+    """Wrap a WSGI app so each request's RPCs are numbered from the start of
+    the request.
+
+    Args:
+        app (func): WSGI application
+
+    Return:
+        func: WSGI application
+    """
+    def wrapped(environ, start_response):
+        begin(environ)
+
+        try:
+            return app(environ, start_response)
+        finally:
+            end()
+
+    return wrapped
+
+
+def _next_key(service, call):
+    """Return the request id, sequence number and action checksum of the RPC
+    being made and move on to the next one.
+
+    Args:
+        service (str): Service name
+        call (str): RPC name
+
+    Return:
+        tuple(int, int, int)
+    """
+    sequence = getattr(_LOCAL, 'sequence', 0)
+    _LOCAL.sequence = sequence + 1
+
+    return (getattr(_LOCAL, 'request_id', 0), sequence,
+            crc32('{0}.{1}'.format(service, call)) & 0xffffffff)
+
+
+def instrument(service, handler):
+    """Wrap a service's hook to record the chaos it causes or replace it with
+    the recorded schedule. The hook is returned as is when neither is on.
+
+    Args:
+        service (str): Service name
+        handler (func): Hook taking the service, RPC name, request, response
+                        and RPC
+
+    Return:
+        func
+    """
+    if _WRITER is not None:
+        return _recording(handler)
+
+    if _SCHEDULE is not None:
+        return _replaying(_SCHEDULE)
+
+    return handler
+
+
+def _bypass_check():
+    """Return the function telling whether the current memcache call is one
+    gchaos makes itself, like reloading the config or evicting keys. Those
+    aren't numbered so a reload between recording and replaying doesn't
+    shift the RPCs after it.
+
+    Return:
+        func
+    """
+    # The memcache hook imports this module through the RPC helpers.
+    from gchaos.gae.memcache.bypass import bypassed
+
+    return bypassed
+
+
+def _recording(handler):
+    """Wrap the hook so the decisions made in it, and once the RPC
+    completes, are recorded against the RPC.
+
+    Args:
+        handler (func): The hook
+
+    Return:
+        func
+    """
+    bypassed = _bypass_check()
+
+    def recorded(service, call, request, response, rpc=None):
+        if bypassed():
+            return handler(service, call, request, response, rpc)
+
+        key = _next_key(service, call)
+        previous = getattr(_LOCAL, 'key', None)
+        _LOCAL.key = key
+
+        try:
+            handler(service, call, request, response, rpc)
+        except BaseException as error:
+            _record(key, DECISIONS.ERROR, error=error.__class__)
+            raise
+        finally:
+            _LOCAL.key = previous
+
+            if rpc is not None:
+                _complete_as(rpc, key)
+
+    return recorded
+
+
+def _complete_as(rpc, key):
+    """Attribute what happens while the RPC's success is checked to it. The
+    hook wraps CheckSuccess before this does, so its callbacks run inside.
+
+    Args:
+        rpc (google.appengine.api.apiproxy_rpc.RPC): The RPC being made
+        key (tuple(int, int, int)): The RPC's key
+
+    Return:
+        None
+    """
+    check_success = rpc.CheckSuccess
+
+    def keyed_check_success():
+        _LOCAL.completing = key
+
+        try:
+            check_success()
+        finally:
+            _LOCAL.completing = None
+
+    try:
+        rpc.CheckSuccess = keyed_check_success
+    except AttributeError:
+        pass
+
+
+def _record(key, decision, stall_ms=0, error=None):
+    """Append a decision about the RPC with the key to the recording.
+
+    Args:
+        key (tuple(int, int, int)): The RPC's key, None outside a hook
+        decision (int): One of DECISIONS
+        stall_ms (float): Stall in milliseconds
+        error (type): Error class raised
+
+    Return:
+        None
+    """
+    writer = _WRITER
+
+    if writer is not None and key is not None:
+        request_id, sequence, action = key
+        writer.append(request_id, sequence, action, decision, stall_ms, error)
+
+
+def record_stall(milli_time, deferred=False):
+    """Record a stall of the RPC being hooked or completed.
+
+    Args:
+        milli_time (float): Stall in milliseconds
+        deferred (bool): Whether the RPC's completion is delayed instead
+
+    Return:
+        None
+    """
+    if _WRITER is None:
+        return
+
+    completing = getattr(_LOCAL, 'completing', None)
+
+    if completing is not None:
+        _record(completing, DECISIONS.COMPLETION_STALL, milli_time)
+    elif deferred:
+        _record(getattr(_LOCAL, 'key', None), DECISIONS.DEFERRED_STALL,
+                milli_time)
+    else:
+        _record(getattr(_LOCAL, 'key', None), DECISIONS.STALL, milli_time)
+
+
+def record_completion_error(error):
+    """Record an error the RPC being hooked raises once it completes.
+
+    Args:
+        error (BaseException): The error
+
+    Return:
+        None
+    """
+    if _WRITER is None:
+        return
+
+    key = getattr(_LOCAL, 'key', None) or getattr(_LOCAL, 'completing', None)
+    _record(key, DECISIONS.COMPLETION_ERROR, error=error.__class__)
+
+
+def _replaying(schedule):
+    """Return a hook injecting the schedule's decisions instead of rolling
+    for chaos. An RPC whose action isn't the recorded one means the run went
+    its own way, so nothing is injected into it.
+
+    Args:
+        schedule (Schedule): The recorded schedule
+
+    Return:
+        func
+    """
+    # The services import this module, so theirs are only imported once the
+    # hooks are installed.
+    from gchaos.gae.datastore.latency import _defer
+    from gchaos.gae.rpc import after_completion
+    from gchaos.gae.rpc import raise_on_completion
+
+    bypassed = _bypass_check()
+
+    def replayed(service, call, request, response, rpc=None):
+        if bypassed():
+            return
+
+        request_id, sequence, action = _next_key(service, call)
+
+        for decision in schedule.decisions(request_id, sequence):
+            if decision.action != action:
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(
+                        "%sRPC %s of request %x isn't the recorded one, "
+                        "skipping it", PREFIX, sequence, request_id)
+                return
+
+            stall_for = decision.stall_ms / 1000.0
+
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("%sReplaying decision %s on %s.%s", PREFIX,
+                            decision.decision, service, call)
+
+            if decision.decision == DECISIONS.STALL:
+                sleep(stall_for)
+
+            elif decision.decision == DECISIONS.DEFERRED_STALL:
+                if rpc is None or not _defer(rpc, decision.stall_ms):
+                    sleep(stall_for)
+
+            elif decision.decision == DECISIONS.COMPLETION_STALL:
+                if rpc is None or not after_completion(
+                        rpc, lambda stall_for=stall_for: sleep(stall_for)):
+                    sleep(stall_for)
+
+            else:
+                error = resolve_path(decision.error)()
+
+                if (decision.decision == DECISIONS.COMPLETION_ERROR and
+                        rpc is not None and raise_on_completion(rpc, error)):
+                    continue
+
+                raise error
+
+    return replayed
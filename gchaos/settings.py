@@ -23,3 +23,20 @@
 # Datastore
 DATASTORE_VERSION = "v3"
 DATASTORE_STUB = "datastore_{0}".format(DATASTORE_VERSION)
+DATASTORE_V4_STUB = "datastore_v4"
+CLOUD_DATASTORE_STUB = "cloud_datastore_v1"
+
+# Memcache
+MEMCACHE_STUB = "memcache"
+
+# URLFetch
+URLFETCH_STUB = "urlfetch"
+
+# Task Queue
+TASKQUEUE_STUB = "taskqueue"
+
+# Search
+SEARCH_STUB = "search"
+
+# Blobstore
+BLOBSTORE_STUB = "blobstore"
@@ -0,0 +1,188 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from math import exp
+from math import log
+
+
+LN2 = log(2)
+
+# Counts are scaled up as time passes instead of decaying every count, once
+# the scale gets this large (e ** 50) they are brought back down.
+MAX_EXPONENT = 50.0
+
+
+class SpaceSaving(object):
+    """Space-Saving heavy hitter sketch. At most capacity items are counted,
+    when a new item comes in and the sketch is full it replaces the item with
+    the lowest count and inherits that count, so the counts of the heaviest
+    items are overestimated by at most the count they inherited (their
+    error).
+
+    With a half life the counts decay exponentially with time, so the sketch
+    follows the current heavy hitters. Decay is done forward, new counts are
+    scaled up by how much time has passed since the start instead of scaling
+    down every count, so adding is constant time. Finding the lowest count is
+    linear in the capacity but is only done when a new item replaces another.
+
+    This is not thread safe.
+
+    Properties:
+        capacity (int): Maximum number of items counted
+        half_life (float): Seconds for a count to decay by half, None to
+                           never decay
+    """
+
+    def __init__(self, capacity, half_life=None, now=0.0):
+        """Initialize the SpaceSaving object.
+
+        Args:
+            capacity (int): Maximum number of items counted
+            half_life (float): Seconds for a count to decay by half
+            now (float): Current time in seconds
+
+        Raises:
+            ValueError: If the capacity or half life isn't positive
+        """
+        if capacity < 1:
+            raise ValueError("Capacity must be positive")
+
+        if half_life is not None and half_life <= 0:
+            raise ValueError("Half life must be positive")
+
+        self.capacity = capacity
+        self.half_life = half_life
+
+        self._decay = LN2 / half_life if half_life else 0.0
+        self._start = now
+        self._counts = {}
+
+    def __len__(self):
+        return len(self._counts)
+
+    def _scale(self, now):
+        """Return how much counts added now are scaled up by."""
+        if not self._decay:
+            return 1.0
+
+        exponent = self._decay * (now - self._start)
+
+        if exponent > MAX_EXPONENT:
+            self._rescale(exponent, now)
+            exponent = 0.0
+
+        return exp(exponent)
+
+    def _rescale(self, exponent, now):
+        """Bring the counts back down and restart the scale from now."""
+        scale = exp(exponent)
+
+        for entry in self._counts.itervalues():
+            entry[0] /= scale
+            entry[1] /= scale
+
+        self._start = now
+
+    def add(self, item, now=0.0, count=1):
+        """Count the item and return its current (decayed) count.
+
+        Args:
+            item (hashable): Item to count
+            now (float): Current time in seconds
+            count (int): Number of times to count it
+
+        Return:
+            float
+        """
+        scale = self._scale(now)
+        counts = self._counts
+
+        entry = counts.get(item)
+
+        if entry is not None:
+            entry[0] += count * scale
+
+        elif len(counts) < self.capacity:
+            entry = counts[item] = [count * scale, 0.0]
+
+        else:
+            victim = min(counts.iteritems(), key=_entry_count)[0]
+            low = counts.pop(victim)[0]
+            entry = counts[item] = [low + count * scale, low]
+
+        return entry[0] / scale
+
+    def estimate(self, item, now=0.0):
+        """Return the current (decayed) count of the item, 0 if it isn't
+        counted.
+
+        Args:
+            item (hashable): Item to look up
+            now (float): Current time in seconds
+
+        Return:
+            float
+        """
+        entry = self._counts.get(item)
+
+        if entry is None:
+            return 0.0
+
+        return entry[0] / self._scale(now)
+
+    def rate(self, count):
+        """Convert a decayed count to a rate per second. A steady rate r adds
+        up to a decayed count of r over the decay constant.
+
+        Args:
+            count (float): Decayed count
+
+        Return:
+            float
+        """
+        return count * self._decay
+
+    def top(self, size=10, now=0.0):
+        """Return the items with the highest counts, highest first.
+
+        Args:
+            size (int): Number of items to return
+            now (float): Current time in seconds
+
+        Return:
+            list(tuple(hashable, float, float)): The item, its count and the
+                                                 most it's overestimated by
+        """
+        scale = self._scale(now)
+
+        entries = sorted(
+            self._counts.iteritems(), key=_entry_count, reverse=True)[:size]
+
+        return [(item, count / scale, error / scale)
+                for item, (count, error) in entries]
+
+    def clear(self):
+        self._counts.clear()
+
+
+def _entry_count(item_entry):
+    return item_entry[1][0]
@@ -0,0 +1,383 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import json
+import logging
+import os
+
+from binascii import hexlify
+from collections import deque
+from collections import namedtuple
+from datetime import datetime
+from threading import Lock
+from threading import Thread
+from time import time
+
+from gchaos.log import logger
+from gchaos.log import PREFIX
+
+
+# Environment variable App Engine puts the request's trace context in, as
+# TRACE_ID/SPAN_ID;o=OPTIONS
+TRACE_CONTEXT = 'HTTP_X_CLOUD_TRACE_CONTEXT'
+
+# Environment variable with the id of the request's log
+REQUEST_ID = 'REQUEST_LOG_ID'
+
+# Prefix of the span names and labels
+SPAN_PREFIX = 'gchaos/'
+
+
+class KINDS:
+    """Kinds of chaos annotated."""
+
+    LATENCY = 'latency'
+    ERROR = 'error'
+
+    @classmethod
+    def all(cls):
+        return (cls.LATENCY, cls.ERROR)
+
+
+# A single injected stall or error. The request's trace context is kept as is
+# and only parsed when the annotation is flushed.
+Annotation = namedtuple('Annotation', [
+    'timestamp', 'trace_context', 'request_id', 'service', 'action', 'kind',
+    'stall_ms', 'error', 'deferred'])
+
+# Tracing configuration of the installed chaos, None when tracing is off.
+_CONFIG = None
+
+# Annotations waiting to be flushed. Appending and popping are atomic so
+# annotating takes no lock.
+_BUFFER = deque()
+
+# What the buffered annotations are exported with, kept when tracing is
+# turned off so they can still be flushed.
+_EXPORTER = None
+_BATCH_SIZE = 1
+
+# Held by whichever thread is flushing
+_FLUSH_LOCK = Lock()
+
+_LAST_FLUSH = 0.0
+
+
+def configure(tracing_config):
+    """Set the tracing configuration. Annotations already buffered are kept.
+
+    Args:
+        tracing_config (gchaos.config.hydrate.TracingConfig): Tracing
+                                                              configuration
+
+    Return:
+        None
+
+    Raises:
+        gchaos.utils.BadObjectPathError: If the exporter path can't be
+                                         resolved
+    """
+    global _CONFIG, _BUFFER, _EXPORTER, _BATCH_SIZE, _LAST_FLUSH
+
+    if not tracing_config.enabled:
+        _CONFIG = None
+        return
+
+    _EXPORTER = tracing_config.exporter()
+    _BATCH_SIZE = tracing_config.batch_size
+    _BUFFER = deque(_BUFFER, tracing_config.capacity)
+    _LAST_FLUSH = time()
+    _CONFIG = tracing_config
+
+
+def trace_stall(milli_time, service=None, call=None, deferred=False):
+    """Annotate an injected stall. The service and call are the ones the
+    hook was called with, the RPC's own aren't set before it's made.
+
+    Args:
+        milli_time (float): Latency in milliseconds
+        service (str): Service of the RPC being stalled
+        call (str): Raw RPC method name
+        deferred (bool): Whether the stall is left for whoever waits on the
+                         RPC
+
+    Return:
+        None
+    """
+    if _CONFIG is not None:
+        _annotate(KINDS.LATENCY, service, call, milli_time, None, deferred)
+
+
+def trace_error(error, service=None, call=None):
+    """Annotate an error about to be raised.
+
+    Args:
+        error (BaseException): The error
+        service (str): Service of the RPC failing
+        call (str): Raw RPC method name
+
+    Return:
+        None
+    """
+    if _CONFIG is not None:
+        _annotate(KINDS.ERROR, service, call, 0, error.__class__.__name__,
+                  False)
+
+
+def _annotate(kind, service, call, stall_ms, error, deferred):
+    """Buffer an annotation and start a flush once a batch is ready or the
+    oldest annotation waited long enough.
+
+    Args:
+        kind (str): One of KINDS
+        service (str): Service of the RPC
+        call (str): Raw RPC method name
+        stall_ms (float): Injected latency in milliseconds
+        error (str): Class name of the error raised
+        deferred (bool): Whether the stall is deferred
+
+    Return:
+        None
+    """
+    config = _CONFIG
+    buffer = _BUFFER
+    now = time()
+
+    buffer.append(Annotation(
+        now, os.environ.get(TRACE_CONTEXT), os.environ.get(REQUEST_ID),
+        service, call, kind, stall_ms, error, deferred))
+
+    if (len(buffer) >= config.batch_size or
+            now - _LAST_FLUSH >= config.flush_interval):
+        _start_flush()
+
+
+def _start_flush():
+    """Flush on a thread of its own unless a flush is already going. The
+    thread only lives until the buffer is empty, so it ends with the request
+    on runtimes that don't allow threads to outlive it. Runtimes that can't
+    start a thread flush on the calling one.
+
+    Return:
+        None
+    """
+    if not _FLUSH_LOCK.acquire(False):
+        return
+
+    try:
+        thread = Thread(target=_drain, name='gchaos-tracing')
+        thread.daemon = True
+        thread.start()
+    except Exception:
+        logger.debug("%sCan't flush the spans in the background", PREFIX)
+
+        _drain()
+
+
+def _drain():
+    """Flush and let the next flush start."""
+    try:
+        _flush()
+    finally:
+        _FLUSH_LOCK.release()
+
+
+def flush():
+    """Export every buffered annotation on the calling thread, waiting for a
+    flush in progress to finish first.
+
+    Return:
+        int: Number of spans exported
+    """
+    with _FLUSH_LOCK:
+        return _flush()
+
+
+def _flush():
+    """Export the buffered annotations a batch at a time. A batch the
+    exporter fails on is logged and dropped.
+
+    Return:
+        int: Number of spans exported
+    """
+    global _LAST_FLUSH
+
+    _LAST_FLUSH = time()
+
+    buffer = _BUFFER
+    exporter = _EXPORTER
+    exported = 0
+
+    while buffer:
+        batch = []
+
+        try:
+            while len(batch) < _BATCH_SIZE:
+                batch.append(buffer.popleft())
+        except IndexError:
+            pass
+
+        try:
+            exporter([to_span(annotation) for annotation in batch])
+        except Exception:
+            logger.exception(
+                "%sCouldn't export %s spans", PREFIX, len(batch))
+        else:
+            exported += len(batch)
+
+    return exported
+
+
+def to_span(annotation):
+    """Return the annotation as a Cloud Trace span, a child of the request's
+    span when its trace context is known. A stall's span lasts as long as
+    the stall.
+
+    Args:
+        annotation (Annotation): The annotation
+
+    Return:
+        dict
+    """
+    end = annotation.timestamp + annotation.stall_ms / 1000.0
+
+    labels = {
+        SPAN_PREFIX + 'kind': annotation.kind,
+        SPAN_PREFIX + 'stall_ms': str(annotation.stall_ms),
+    }
+
+    for label, value in (('service', annotation.service),
+                         ('action', annotation.action),
+                         ('error', annotation.error),
+                         ('request_id', annotation.request_id)):
+        if value is not None:
+            labels[SPAN_PREFIX + label] = str(value)
+
+    if annotation.deferred:
+        labels[SPAN_PREFIX + 'deferred'] = 'true'
+
+    span = {
+        'name': SPAN_PREFIX + annotation.kind,
+        'spanId': _span_id(),
+        'startTime': _timestamp(annotation.timestamp),
+        'endTime': _timestamp(end),
+        'labels': labels,
+    }
+
+    trace_id, parent_id = parse_trace_context(annotation.trace_context)
+
+    if trace_id:
+        span['traceId'] = trace_id
+
+    if parent_id:
+        span['parentSpanId'] = parent_id
+
+    return span
+
+
+def parse_trace_context(trace_context):
+    """Split a trace context header into its trace and span ids.
+
+    Args:
+        trace_context (str): TRACE_ID/SPAN_ID;o=OPTIONS, any part of which
+                             can be missing
+
+    Return:
+        tuple(str, str): The trace id and span id, None when missing
+    """
+    if not trace_context:
+        return None, None
+
+    trace_id, _, rest = trace_context.partition('/')
+    span_id = rest.partition(';')[0]
+
+    return trace_id or None, span_id or None
+
+
+def _span_id():
+    """Return a random non zero 64 bit span id. The chaos random streams are
+    left alone so seeded runs stay reproducible.
+
+    Return:
+        str
+    """
+    return str(int(hexlify(os.urandom(8)), 16) or 1)
+
+
+def _timestamp(seconds):
+    """Return the time as an RFC 3339 UTC timestamp.
+
+    Args:
+        seconds (float): Time in seconds since the epoch
+
+    Return:
+        str
+    """
+    return datetime.utcfromtimestamp(seconds).strftime(
+        '%Y-%m-%dT%H:%M:%S.%fZ')
+
+
+def log_exporter(spans):
+    """Log each span as JSON to the gchaos logger.
+
+    Args:
+        spans (list(dict)): The spans
+
+    Return:
+        None
+    """
+    if not logger.isEnabledFor(logging.INFO):
+        return
+
+    for span in spans:
+        logger.info("%sSpan %s", PREFIX, json.dumps(span, sort_keys=True))
+
+
+class JsonFileExporter(object):
+    """Append spans to a file, one JSON object per line.
+
+    Properties:
+        path (str): Path of the file
+    """
+
+    def __init__(self, path):
+        """Initialize the JsonFileExporter with the file's path.
+
+        Args:
+            path (str): Path of the file
+        """
+        self.path = path
+
+    def __call__(self, spans):
+        """Write the spans to the end of the file.
+
+        Args:
+            spans (list(dict)): The spans
+
+        Return:
+            None
+        """
+        lines = ''.join(
+            json.dumps(span, sort_keys=True) + '\n' for span in spans)
+
+        with open(self.path, 'a') as spans_file:
+            spans_file.write(lines)
@@ -25,6 +25,12 @@
 # https://github.com/WebFilings/furious
 
 from collections import namedtuple
+from collections import OrderedDict
+from threading import Lock
+
+
+# Maximum number of resolved object paths to keep around.
+PATH_CACHE_SIZE = 128
 
 
 def full_name(obj):
@@ -76,13 +82,112 @@ def get_func_info_for_path(path):
         module = __import__(name=module_path,
                             fromlist=[function_name])
     except ImportError:
+        if '.' not in module_path:
+            raise BadObjectPathError(
+                'Unable to import module for "%s".' % (path,))
+
         module_path, class_name = module_path.rsplit('.', 1)
 
-        module = __import__(name=module_path, fromlist=[class_name])
-        module = getattr(module, class_name)
+        try:
+            module = __import__(name=module_path, fromlist=[class_name])
+            module = getattr(module, class_name)
+        except (ImportError, AttributeError):
+            raise BadObjectPathError(
+                'Unable to import module for "%s".' % (path,))
 
     try:
         return FuncInfo(function_name, module, getattr(module, function_name))
     except AttributeError:
         raise BadObjectPathError(
             'Unable to find function "%s".' % (path,))
+
+
+class LRUCache(object):
+    """A small thread safe least recently used cache with a maximum size."""
+
+    def __init__(self, max_size):
+        """Initialize the LRUCache object.
+
+        Args:
+            max_size (int): Maximum number of entries to keep
+        """
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        """Return the value for the key marking it as the most recently used
+        or the default if it isn't cached.
+
+        Args:
+            key (hashable): Cache key
+            default (object): Returned when the key isn't cached
+
+        Return:
+            object
+        """
+        with self._lock:
+            try:
+                value = self._entries.pop(key)
+            except KeyError:
+                return default
+
+            self._entries[key] = value
+
+            return value
+
+    def set(self, key, value):
+        """Cache the value for the key evicting the least recently used entries
+        if the cache is full.
+
+        Args:
+            key (hashable): Cache key
+            value (object): Value to cache
+
+        Return:
+            None
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = value
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Remove all the entries from the cache."""
+        with self._lock:
+            self._entries.clear()
+
+
+_PATH_CACHE = LRUCache(PATH_CACHE_SIZE)
+
+
+def resolve_path(path):
+    """Return the object the path refers to. Resolved paths are memoized so
+    resolving the same path again doesn't go through the import machinery.
+    Anything that isn't a string is assumed to already be resolved and is
+    returned as is.
+
+    Args:
+        path (str): Full python path of the object
+
+    Return:
+        object
+
+    Raises:
+        BadObjectPathError: If the path can't be resolved
+    """
+    if not isinstance(path, basestring):
+        return path
+
+    obj = _PATH_CACHE.get(path)
+
+    if obj is None:
+        obj = get_func_info_for_path(path).func
+        _PATH_CACHE.set(path, obj)
+
+    return obj
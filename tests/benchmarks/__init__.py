@@ -0,0 +1,126 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Microbenchmarks for the overhead gchaos adds to each call.
+
+The modules are named bench_*.py so nose doesn't collect them. Run them all
+with `make bench` (see tests/benchmarks/__main__.py) or one directly, e.g.
+`python -m tests.benchmarks.bench_hook`.
+"""
+
+import json
+import platform
+import timeit
+
+
+def time_per_call(func, number=100000, repeat=3):
+    """Time the function and return the best time per call.
+
+    Args:
+        func (func): Function taking no arguments
+        number (int): Number of calls per timing run
+        repeat (int): Number of timing runs to take the best of
+
+    Return:
+        float: nanoseconds per call
+    """
+    best = min(timeit.Timer(func).repeat(repeat=repeat, number=number))
+
+    return best / number * 1e9
+
+
+def report(title, results):
+    """Print the results of a benchmark as a table.
+
+    Args:
+        title (str): Benchmark title
+        results (list(tuple(str, float))): Case names and ns per call
+
+    Return:
+        None
+    """
+    print title
+    print "-" * len(title)
+
+    width = max(len(name) for name, _ in results)
+
+    for name, ns in results:
+        print "{0}  {1:>10.1f} ns/call".format(name.ljust(width), ns)
+
+    print
+
+
+def write_results(path, results):
+    """Write the benchmark results to a JSON file.
+
+    Args:
+        path (str): Path of the JSON file
+        results (dict): Benchmark names to a dict of case names and ns per call
+
+    Return:
+        None
+    """
+    with open(path, 'w') as output:
+        json.dump({
+            'python': platform.python_version(),
+            'results': results,
+        }, output, indent=2, sort_keys=True)
+
+
+def load_results(path):
+    """Load benchmark results written by write_results.
+
+    Args:
+        path (str): Path of the JSON file
+
+    Return:
+        dict: Benchmark names to a dict of case names and ns per call
+    """
+    with open(path) as results:
+        return json.load(results)['results']
+
+
+def compare_results(previous, current, tolerance):
+    """Return the cases that got slower by more than the tolerance. Cases
+    that are only in one of the results are ignored.
+
+    Args:
+        previous (dict): Results to compare against
+        current (dict): Results of this run
+        tolerance (float): Allowed slow down as a fraction (0.25 is 25%)
+
+    Return:
+        list(tuple(str, str, float, float)): benchmark, case, previous ns and
+            current ns of each regression
+    """
+    regressions = []
+
+    for benchmark, cases in sorted(current.items()):
+        previous_cases = previous.get(benchmark, {})
+
+        for case, ns in sorted(cases.items()):
+            previous_ns = previous_cases.get(case)
+
+            if previous_ns and ns > previous_ns * (1 + tolerance):
+                regressions.append((benchmark, case, previous_ns, ns))
+
+    return regressions
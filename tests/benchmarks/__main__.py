@@ -0,0 +1,91 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Run all the benchmarks and optionally write the results as JSON or compare
+them against a previous run.
+
+    python -m tests.benchmarks [--output FILE] [--compare FILE]
+                               [--tolerance FRACTION]
+
+When comparing, the exit status is 1 if any case got slower than the previous
+run by more than the tolerance.
+"""
+
+import argparse
+import sys
+
+from tests.benchmarks import bench_chance
+from tests.benchmarks import bench_choice
+from tests.benchmarks import bench_hook
+from tests.benchmarks import bench_import
+from tests.benchmarks import bench_logging
+from tests.benchmarks import compare_results
+from tests.benchmarks import load_results
+from tests.benchmarks import write_results
+
+
+BENCHMARKS = (
+    ("logging", bench_logging),
+    ("choice", bench_choice),
+    ("chance", bench_chance),
+    ("hook", bench_hook),
+    ("import", bench_import),
+)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--output", help="Write the results as JSON")
+    parser.add_argument("--compare", help="JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed slow down before failing (fraction)")
+    parser.add_argument("benchmarks", nargs="*",
+                        help="Benchmarks to run (default all)")
+    args = parser.parse_args(argv)
+
+    results = {}
+
+    for name, module in BENCHMARKS:
+        if args.benchmarks and name not in args.benchmarks:
+            continue
+
+        results[name] = dict(module.run())
+
+    if args.output:
+        write_results(args.output, results)
+
+    if args.compare:
+        regressions = compare_results(
+            load_results(args.compare), results, args.tolerance)
+
+        for benchmark, case, previous, current in regressions:
+            print "REGRESSION {0} {1}: {2:.1f} -> {3:.1f} ns/call".format(
+                benchmark, case, previous, current)
+
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
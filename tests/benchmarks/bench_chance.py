@@ -0,0 +1,60 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Compare drawing from the module level random generator against the per
+thread random streams.
+"""
+
+import random
+
+from gchaos.chance import randint
+from gchaos.chance import seed
+from gchaos.chance import uniform
+
+from tests.benchmarks import report
+from tests.benchmarks import time_per_call
+
+
+def run():
+    results = [
+        ("random.random", time_per_call(random.random)),
+        ("random.randint", time_per_call(lambda: random.randint(500, 10000))),
+    ]
+
+    for use_numpy in (False, True):
+        seed(use_numpy=use_numpy)
+
+        label = "numpy" if use_numpy else "python"
+
+        results.append(("uniform ({0})".format(label), time_per_call(uniform)))
+        results.append(("randint ({0})".format(label), time_per_call(
+            lambda: randint(500, 10000))))
+
+    seed()
+
+    report("chance", results)
+
+    return results
+
+
+if __name__ == "__main__":
+    run()
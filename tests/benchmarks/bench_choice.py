@@ -0,0 +1,59 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Compare the draw cost of the bisect and alias Choice engines across
+different numbers of choices.
+"""
+
+import random
+
+from gchaos.choice import ALIAS
+from gchaos.choice import BISECT
+from gchaos.choice import Choice
+
+from tests.benchmarks import report
+from tests.benchmarks import time_per_call
+
+
+SIZES = (2, 4, 8, 16, 32, 64, 128, 1000, 10000)
+
+
+def run():
+    results = []
+
+    for size in SIZES:
+        weights = [random.random() for _ in xrange(size)]
+        choices = range(size)
+
+        for engine in (BISECT, ALIAS):
+            choice = Choice(weights, choices, engine=engine)
+            name = "{0} {1}".format(engine, size)
+
+            results.append((name, time_per_call(choice.next)))
+
+    report("Choice.next", results)
+
+    return results
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,193 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Measure the overhead the datastore hook adds to each RPC. Calls go through
+a real api proxy stub map with a datastore stub that does nothing, so the
+difference from the no hook case is what gchaos costs per call.
+"""
+
+from google.appengine.api import datastore
+from google.appengine.api.apiproxy_stub_map import APIProxyStubMap
+from google.appengine.datastore import datastore_pb
+
+from mock import patch
+
+from gchaos.config.hydrate import DatastoreConfig
+from gchaos.gae.datastore.hook import hook_wrapper
+from gchaos.gae.registry import dispatch
+from gchaos.gae.registry import HOOK_NAME
+from gchaos.settings import DATASTORE_STUB
+
+from tests.benchmarks import report
+from tests.benchmarks import time_per_call
+
+
+FIRING_RATES = (0.01, 0.1, 0.5, 1.0)
+
+TARGETS = {
+    'kinds': ['Session', 'Counter*', 'prefix:Log'],
+    'keys': [r're:User:\d+/Cart:'],
+}
+
+
+class FakeDatastoreStub(object):
+    """Datastore stub that doesn't do anything."""
+
+    def MakeSyncCall(self, service, call, request, response):
+        pass
+
+
+def build_stub_map(config=None):
+    """Build an api proxy stub map with the fake datastore stub and the gchaos
+    hook for the config installed.
+
+    Args:
+        config (gchaos.config.hydrate.DatastoreConfig): Datastore config, no
+                                                        hook if None
+
+    Return:
+        APIProxyStubMap
+    """
+    stub_map = APIProxyStubMap()
+    stub_map.RegisterStub(DATASTORE_STUB, FakeDatastoreStub())
+
+    if config is not None:
+        stub_map.GetPreCallHooks().Append(
+            'gchaos_datastore_hooks', hook_wrapper(config), DATASTORE_STUB)
+
+    return stub_map
+
+
+def build_dispatch_stub_map():
+    """Build an api proxy stub map with the fake datastore stub and the
+    combined gchaos hook, which calls the installed datastore hook.
+
+    Return:
+        APIProxyStubMap
+    """
+    stub_map = APIProxyStubMap()
+    stub_map.RegisterStub(DATASTORE_STUB, FakeDatastoreStub())
+    stub_map.GetPreCallHooks().Append(HOOK_NAME, dispatch)
+
+    return stub_map
+
+
+def build_config(enabled=True, error_rate=0.0, latency_rate=0.0,
+                 targets=None):
+    """Build a datastore config with the same rates for every action."""
+    errors = {'google.appengine.api.datastore_errors.Timeout': 1}
+    latency = 1
+
+    return DatastoreConfig({
+        'enabled': enabled,
+        'errors': (True, {
+            'DELETE': (errors, error_rate),
+            'GET': (errors, error_rate),
+            'PUT': (errors, error_rate),
+        }),
+        'latency': (True, {
+            'DELETE': (latency, latency_rate),
+            'GET': (latency, latency_rate),
+            'PUT': (latency, latency_rate),
+        }),
+        'targets': targets or {},
+    })
+
+
+def build_call(stub_map, name, request):
+    """Return a function making the RPC through the stub map, ignoring any
+    injected errors.
+    """
+    def call():
+        try:
+            stub_map.MakeSyncCall(DATASTORE_STUB, name, request, None)
+        except Exception:
+            pass
+
+    return call
+
+
+def build_put(kind, count):
+    """Build a put request of count entities of the kind."""
+    request = datastore_pb.PutRequest()
+
+    for i in xrange(count):
+        entity = datastore.Entity(kind, name=str(i), _app='bench')
+        request.add_entity().CopyFrom(entity.ToPb())
+
+    return request
+
+
+def _no_sleep(seconds):
+    pass
+
+
+def run():
+    put = datastore_pb.PutRequest()
+    query = datastore_pb.Query()
+
+    cases = [
+        ("no hook", build_stub_map(), "Put", put),
+        ("disabled", build_stub_map(build_config(enabled=False)), "Put", put),
+        ("zero rates", build_stub_map(build_config()), "Put", put),
+        ("zero rates dispatched", build_dispatch_stub_map(), "Put", put),
+        ("untracked RunQuery", build_stub_map(build_config(1.0, 1.0)),
+         "RunQuery", query),
+    ]
+
+    targeted = build_stub_map(build_config(error_rate=1.0, targets=TARGETS))
+
+    for count in (1, 10):
+        cases.append(("targeted miss x{0}".format(count), targeted, "Put",
+                      build_put('User', count)))
+
+    cases.append(("targeted hit", targeted, "Put", build_put('Session', 1)))
+
+    for rate in FIRING_RATES:
+        cases.append(("errors at {0}".format(rate),
+                      build_stub_map(build_config(error_rate=rate)),
+                      "Put", put))
+
+    for rate in FIRING_RATES:
+        cases.append(("latency at {0}".format(rate),
+                      build_stub_map(build_config(latency_rate=rate)),
+                      "Put", put))
+
+    results = []
+
+    # Don't actually sleep when latency fires, only the cost of deciding to
+    # and drawing the stall is measured.
+    handlers = {DATASTORE_STUB: hook_wrapper(build_config())}
+
+    with patch('gchaos.gae.datastore.latency.sleep', new=_no_sleep), \
+            patch('gchaos.gae.registry._get_handler', new=handlers.get):
+        for name, stub_map, rpc_name, request in cases:
+            results.append((name, time_per_call(
+                build_call(stub_map, rpc_name, request), number=20000)))
+
+    report("datastore hook", results)
+
+    return results
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,86 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Measure how long importing gchaos takes in a fresh interpreter, which is
+what it adds to an instance's loading request.
+"""
+
+import os
+import subprocess
+import sys
+
+from tests.benchmarks import report
+
+
+# Imports timed, each in its own interpreter
+IMPORTS = (
+    ("import gchaos", "import gchaos"),
+    ("import gchaos.install", "import gchaos.install"),
+    ("install_chaos ready", "from gchaos.install import install_chaos"),
+)
+
+TIMER = """
+import time
+start = time.time()
+{0}
+print (time.time() - start) * 1e9
+"""
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))))
+
+
+def time_import(statement, repeat=5):
+    """Run the import statement in new interpreters and return the best
+    time. The first run writes the bytecode so it isn't timed.
+
+    Args:
+        statement (str): Import statement
+        repeat (int): Number of interpreters to take the best of
+
+    Return:
+        float: nanoseconds
+    """
+    env = dict(os.environ)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+
+    command = [sys.executable, '-c', TIMER.format(statement)]
+    times = []
+
+    for _ in xrange(repeat + 1):
+        times.append(float(subprocess.check_output(command, cwd=ROOT,
+                                                   env=env)))
+
+    return min(times[1:])
+
+
+def run():
+    results = [(name, time_import(statement))
+               for name, statement in IMPORTS]
+
+    report("import", results)
+
+    return results
+
+
+if __name__ == "__main__":
+    run()
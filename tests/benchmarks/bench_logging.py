@@ -0,0 +1,75 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Compare the per call cost of the chance roll logging before and after
+moving to the guarded gchaos logger.
+"""
+
+import logging
+
+from gchaos.chance import _get_chance
+from gchaos.chance import roll
+from gchaos.log import set_quiet
+
+from tests.benchmarks import report
+from tests.benchmarks import time_per_call
+
+
+def eager_roll(value):
+    """The previous roll implementation which always formatted its message."""
+    chance = _get_chance()
+
+    logging.info("RATE {0} AND CHANCE {1}".format(value, chance))
+
+    return value >= chance
+
+
+def run():
+    root = logging.getLogger()
+    previous_level = root.level
+
+    results = []
+
+    try:
+        # Production like, the root logger only emits warnings.
+        root.setLevel(logging.WARNING)
+        results.append(("eager, root WARNING", time_per_call(
+            lambda: eager_roll(0.0))))
+        results.append(("guarded, root WARNING", time_per_call(
+            lambda: roll(0.0))))
+
+        # Quiet mode with a debug root logger, like the dev appserver.
+        root.setLevel(logging.DEBUG)
+        set_quiet(True)
+        results.append(("guarded, root DEBUG, quiet", time_per_call(
+            lambda: roll(0.0))))
+    finally:
+        set_quiet(False)
+        root.setLevel(previous_level)
+
+    report("chance.roll", results)
+
+    return results
+
+
+if __name__ == "__main__":
+    run()
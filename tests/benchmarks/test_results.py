@@ -0,0 +1,45 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import unittest
+
+from tests.benchmarks import compare_results
+
+
+class CompareResultsTestCase(unittest.TestCase):
+
+    def test_regression(self):
+        """Ensure cases slower than the tolerance are returned."""
+        previous = {"hook": {"a": 100.0, "b": 100.0}}
+        current = {"hook": {"a": 120.0, "b": 130.0}}
+
+        result = compare_results(previous, current, 0.25)
+
+        self.assertEqual(result, [("hook", "b", 100.0, 130.0)])
+
+    def test_new_cases_ignored(self):
+        """Ensure cases that weren't in the previous results are ignored."""
+        previous = {"hook": {"a": 100.0}}
+        current = {"hook": {"b": 500.0}, "choice": {"c": 500.0}}
+
+        self.assertEqual(compare_results(previous, current, 0.25), [])
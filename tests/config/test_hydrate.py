@@ -23,10 +23,28 @@
 
 import unittest
 
+from mock import patch
+
+from google.appengine.api import datastore_errors
+
 from gchaos.config import DEFAULT_CONFIG
 from gchaos.config.datastore import CONFIG as DS_CONFIG
 from gchaos.config.hydrate import ChaosConfig
 from gchaos.config.hydrate import DatastoreConfig
+from gchaos.config.hydrate import ErrorConfig
+from gchaos.config.hydrate import HotKeysConfig
+from gchaos.config.hydrate import LatenciesConfig
+from gchaos.config.hydrate import MemcacheConfig
+from gchaos.config.hydrate import StormConfig
+from gchaos.config.hydrate import TargetsConfig
+from gchaos.config.hydrate import TaskqueueConfig
+from gchaos.config.hydrate import TaskqueueRuleConfig
+from gchaos.config.hydrate import UrlfetchConfig
+from gchaos.config.hydrate import UrlfetchRuleConfig
+from gchaos.gae.datastore.actions import ACTIONS
+from gchaos.gae.datastore.latency import MODES
+from gchaos.utils import BadObjectPathError
+from gchaos.utils import full_name
 
 
 class HydrateChaosConfigTests(unittest.TestCase):
@@ -36,9 +54,16 @@ class HydrateChaosConfigTests(unittest.TestCase):
         result = ChaosConfig(DEFAULT_CONFIG)
 
         self.assertIsNotNone(result.datastore)
+        self.assertFalse(result.quiet)
 
         verify_datastore_config(result.datastore, self)
 
+    def test_quiet(self):
+        """Ensure the quiet flag is hydrated."""
+        result = ChaosConfig({"quiet": True})
+
+        self.assertTrue(result.quiet)
+
 
 class HydrateDataStoreConfigTests(unittest.TestCase):
 
@@ -49,68 +74,267 @@ class HydrateDataStoreConfigTests(unittest.TestCase):
         verify_datastore_config(result, self)
 
 
+class HydrateErrorConfigTests(unittest.TestCase):
+
+    def test_error_paths_resolved(self):
+        """Ensure the error paths are resolved to their classes."""
+        result = ErrorConfig({full_name(datastore_errors.Timeout): 1}, 0.5)
+
+        self.assertEqual(result.errors.choices, [datastore_errors.Timeout])
+        self.assertEqual(result.errors.next(), datastore_errors.Timeout)
+
+    def test_error_classes_accepted(self):
+        """Ensure error classes can be passed in directly."""
+        result = ErrorConfig({datastore_errors.Timeout: 1}, 0.5)
+
+        self.assertEqual(result.errors.choices, [datastore_errors.Timeout])
+
+    def test_invalid_error_path(self):
+        """Ensure an invalid error path fails when the errors are first
+        used.
+        """
+        result = ErrorConfig({"not.a.real.Error": 1}, 0.5)
+
+        self.assertRaises(BadObjectPathError, getattr, result, 'errors')
+
+    def test_error_paths_resolved_once(self):
+        """Ensure the error paths are only resolved the first time."""
+        result = ErrorConfig({full_name(datastore_errors.Timeout): 1}, 0.5)
+
+        with patch('gchaos.config.hydrate.resolve_path') as resolve_path:
+            resolve_path.return_value = datastore_errors.Timeout
+
+            self.assertIs(result.errors, result.errors)
+
+        resolve_path.assert_called_once_with(
+            full_name(datastore_errors.Timeout))
+
+    def test_batch_options(self):
+        """Ensure the batch options are read off the third entry."""
+        result = ErrorConfig({}, 0.5, {'per_entity': True, 'partial': True})
+
+        self.assertTrue(result.per_entity)
+        self.assertTrue(result.partial)
+
+    def test_batch_defaults(self):
+        """Ensure batches are treated as a single call by default."""
+        result = ErrorConfig({}, 0.5)
+
+        self.assertFalse(result.per_entity)
+        self.assertFalse(result.partial)
+
+
+class HydrateTargetsConfigTests(unittest.TestCase):
+
+    def test_no_rules(self):
+        """Ensure targeting is off without any rules."""
+        self.assertFalse(DatastoreConfig({}).targets.enabled)
+
+    def test_rules(self):
+        """Ensure the kind and key rules are compiled."""
+        result = TargetsConfig({'kinds': ['Session'], 'keys': ['User:*']})
+
+        self.assertTrue(result.enabled)
+        self.assertTrue(result.kinds.match('Session'))
+        self.assertTrue(result.keys.match('User:42'))
+
+    def test_invalid_rule(self):
+        """Ensure an invalid regex fails when the config is built."""
+        self.assertRaises(ValueError, TargetsConfig, {'kinds': ['re:(']})
+
+
+class HydrateHotKeysConfigTests(unittest.TestCase):
+
+    def test_disabled(self):
+        """Ensure there's no monitor by default."""
+        result = DatastoreConfig({}).hot_keys
+
+        self.assertFalse(result.enabled)
+        self.assertIsNone(result.monitor)
+        self.assertIsNone(result.contention)
+
+    def test_monitor(self):
+        """Ensure the monitor is created with the capacity and half life."""
+        result = HotKeysConfig(
+            {'enabled': True, 'capacity': 8, 'half_life': 30})
+
+        self.assertEqual(result.monitor.keys.capacity, 8)
+        self.assertEqual(result.monitor.groups.half_life, 30)
+        self.assertIsNone(result.contention)
+
+    def test_contention_defaults(self):
+        """Ensure contention defaults to Timeout and TransactionFailedError
+        above one write a second.
+        """
+        result = HotKeysConfig({'enabled': True, 'contention': {}})
+
+        self.assertEqual(result.contention.threshold, 1.0)
+        self.assertEqual(result.contention.errors.error_rate, 1.0)
+        choices = result.contention.errors.errors.choices
+
+        self.assertEqual(sorted(e.__name__ for e in choices),
+                         ['Timeout', 'TransactionFailedError'])
+
+
+class HydrateMemcacheConfigTests(unittest.TestCase):
+
+    def test_default_config(self):
+        """Ensure the default memcache config hydrates turned off."""
+        result = ChaosConfig(DEFAULT_CONFIG).memcache
+
+        self.assertFalse(result.enabled)
+        self.assertEqual(result.errors.get_by_action('GET').error_rate, 0.01)
+        self.assertEqual(result.latency.get_by_action('SET').latency,
+                         (20, 500))
+        self.assertEqual(result.evictions.storms[0].type, 'fraction')
+
+    def test_empty(self):
+        """Ensure every action has a config even if it isn't configured."""
+        result = MemcacheConfig({})
+
+        self.assertEqual(
+            result.errors.get_by_action('BATCH_INCREMENT').error_rate, 0.0)
+        self.assertIsNone(result.latency.get_by_action('GET').latency)
+        self.assertEqual(result.evictions.storms, [])
+
+    def test_storm_defaults(self):
+        """Ensure a storm is a full flush at a zero rate by default."""
+        result = StormConfig({})
+
+        self.assertEqual(result.type, 'full')
+        self.assertEqual(result.rate, 0.0)
+        self.assertEqual(result.fraction, 1.0)
+        self.assertEqual(result.duration, 0)
+        self.assertEqual(result.until, 0.0)
+
+    def test_invalid_storms(self):
+        """Ensure an unknown storm or a namespace storm without namespaces
+        raises a ValueError.
+        """
+        self.assertRaises(ValueError, StormConfig, {'type': 'foo'})
+        self.assertRaises(ValueError, StormConfig, {'type': 'namespace'})
+
+
+class HydrateUrlfetchConfigTests(unittest.TestCase):
+
+    def test_default_config(self):
+        """Ensure the default urlfetch config hydrates turned off."""
+        result = ChaosConfig(DEFAULT_CONFIG).urlfetch
+
+        self.assertFalse(result.enabled)
+        self.assertEqual(result.mode, MODES.BLOCKING)
+        self.assertEqual(len(result.rules), 1)
+        self.assertEqual(result.rules[0].errors.error_rate, 0.01)
+
+    def test_rule(self):
+        """Ensure a rule's hosts are lower cased and missing faults are
+        None.
+        """
+        result = UrlfetchRuleConfig({'hosts': ['API.example.com'],
+                                     'throttle': 64})
+
+        self.assertTrue(result.hosts.match('api.example.com'))
+        self.assertFalse(result.paths)
+        self.assertIsNone(result.errors)
+        self.assertIsNone(result.latency)
+        self.assertEqual(result.throttle, 64)
+
+    def test_regex_hosts(self):
+        """Ensure regex host rules keep their case but ignore it."""
+        result = UrlfetchRuleConfig({'hosts': [r're:API\D*\.example\.com$']})
+
+        self.assertTrue(result.hosts.match('api.example.com'))
+        self.assertTrue(result.hosts.match('api-eu.example.com'))
+        self.assertFalse(result.hosts.match('api2.example.com'))
+
+    def test_invalid(self):
+        """Ensure an unknown mode or a throttle that isn't positive raises a
+        ValueError.
+        """
+        self.assertRaises(ValueError, UrlfetchConfig, {'mode': 'foo'})
+        self.assertRaises(ValueError, UrlfetchRuleConfig, {'throttle': 0})
+
+
+class HydrateTaskqueueConfigTests(unittest.TestCase):
+
+    def test_default_config(self):
+        """Ensure the default taskqueue config hydrates turned off with
+        partial failures.
+        """
+        result = ChaosConfig(DEFAULT_CONFIG).taskqueue
+
+        self.assertFalse(result.enabled)
+        self.assertTrue(result.rules[0].errors.partial)
+
+    def test_rule(self):
+        """Ensure a rule's delay is read and missing faults are None."""
+        result = TaskqueueRuleConfig({'queues': ['fanout-*'],
+                                      'delay': ((1000, 5000), 0.5)})
+
+        self.assertTrue(result.queues.match('fanout-1'))
+        self.assertEqual(result.delay.latency, (1000, 5000))
+        self.assertIsNone(result.errors)
+        self.assertIsNone(result.latency)
+
+    def test_unknown_mode(self):
+        """Ensure an unknown mode raises a ValueError."""
+        self.assertRaises(ValueError, TaskqueueConfig, {'mode': 'foo'})
+
+
+class HydrateLatenciesConfigTests(unittest.TestCase):
+
+    def test_default_mode(self):
+        """Ensure latency blocks by default."""
+        result = LatenciesConfig(True, {})
+
+        self.assertEqual(result.mode, MODES.BLOCKING)
+
+    def test_deferred_mode(self):
+        """Ensure the mode can be passed in with the latency config."""
+        result = DatastoreConfig({'latency': (True, {}, MODES.DEFERRED)})
+
+        self.assertEqual(result.latency.mode, MODES.DEFERRED)
+
+    def test_unknown_mode(self):
+        """Ensure an unknown mode raises a ValueError."""
+        self.assertRaises(ValueError, LatenciesConfig, True, {}, "foo")
+
+    def test_batch_options(self):
+        """Ensure the batch options are read off the third entry of an
+        action.
+        """
+        result = LatenciesConfig(True, {
+            'PUT': ((100,), 0.5, {'ms_per_entity': 2, 'ms_per_kb': 0.5})})
+
+        self.assertFalse(result.latencies['PUT'].per_entity)
+        self.assertEqual(result.latencies['PUT'].ms_per_entity, 2)
+        self.assertEqual(result.latencies['PUT'].ms_per_kb, 0.5)
+        self.assertTrue(result.latencies['PUT'].proportional)
+        self.assertFalse(result.latencies['GET'].proportional)
+
+
 def verify_datastore_config(datastore_config, runner):
     runner.assertEqual(datastore_config.enabled, True)
 
     runner.assertTrue(datastore_config.errors.enabled)
 
-    # DELETE ERRORS
-    runner.assertEqual(datastore_config.errors.delete_errors.error_rate, 0.05)
-    runner.assertEqual(
-        datastore_config.errors.delete_errors.errors.choices,
-        DS_CONFIG["errors"][1]["DELETE"][0].keys()
-    )
-    runner.assertEqual(
-        datastore_config.errors.delete_errors.errors.weights,
-        DS_CONFIG["errors"][1]["DELETE"][0].values()
-    )
-
-    # GET ERRORS
-    runner.assertEqual(datastore_config.errors.get_errors.error_rate, 0.01)
-    runner.assertEqual(
-        datastore_config.errors.get_errors.errors.choices,
-        DS_CONFIG["errors"][1]["GET"][0].keys()
-    )
-    runner.assertEqual(
-        datastore_config.errors.get_errors.errors.weights,
-        DS_CONFIG["errors"][1]["GET"][0].values()
-    )
-
-    # PUT ERRORS
-    runner.assertEqual(datastore_config.errors.put_errors.error_rate, 0.02)
-    runner.assertEqual(
-        datastore_config.errors.put_errors.errors.choices,
-        DS_CONFIG["errors"][1]["PUT"][0].keys()
-    )
-    runner.assertEqual(
-        datastore_config.errors.put_errors.errors.weights,
-        DS_CONFIG["errors"][1]["PUT"][0].values()
-    )
+    for action in ACTIONS.all():
+        errors, error_rate = DS_CONFIG["errors"][1][action][:2]
+        error_config = datastore_config.errors.get_by_action(action)
+
+        runner.assertEqual(error_config.error_rate, error_rate)
+        runner.assertEqual(
+            [full_name(e) for e in error_config.errors.choices],
+            errors.keys())
+        runner.assertEqual(error_config.errors.weights, errors.values())
 
     runner.assertTrue(datastore_config.latency.enabled)
 
-    # DELETE LATENCIES
-    runner.assertEqual(datastore_config.latency.delete_latencies.latency_rate,
-                       0.05)
-    runner.assertEqual(
-        datastore_config.latency.delete_latencies.latency,
-        DS_CONFIG["latency"][1]["DELETE"][0]
-    )
-
-    # GET LATENCIES
-    runner.assertEqual(datastore_config.latency.get_latencies.latency_rate,
-                       0.01)
-    runner.assertEqual(
-        datastore_config.latency.get_latencies.latency,
-        DS_CONFIG["latency"][1]["GET"][0]
-    )
-
-    # PUT LATENCIES
-    runner.assertEqual(datastore_config.latency.put_latencies.latency_rate,
-                       0.02)
-    runner.assertEqual(
-        datastore_config.latency.put_latencies.latency,
-        DS_CONFIG["latency"][1]["PUT"][0]
-    )
+    for action in ACTIONS.all():
+        latency, latency_rate = DS_CONFIG["latency"][1][action][:2]
+        latency_config = datastore_config.latency.get_by_action(action)
+
+        runner.assertEqual(latency_config.latency_rate, latency_rate)
+        runner.assertEqual(latency_config.latency, latency)
 
 
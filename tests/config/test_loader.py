@@ -0,0 +1,246 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from google.appengine.api import apiproxy_stub_map
+from google.appengine.api import datastore_errors
+from google.appengine.api.memcache.memcache_stub import MemcacheServiceStub
+
+from mock import patch
+
+from gchaos.config.hydrate import ChaosConfig
+from gchaos.config.loader import cache_key
+from gchaos.config.loader import CONFIG_ENV
+from gchaos.config.loader import find_path
+from gchaos.config.loader import load_file
+from gchaos.config.loader import parse
+from gchaos.config.loader import validate
+from gchaos.config.memory import DEFAULT_CONFIG
+from gchaos.settings import MEMCACHE_STUB
+from gchaos.utils import BadObjectPathError
+from gchaos.utils import full_name
+
+
+CONFIG = {
+    'quiet': True,
+    'datastore': {
+        'enabled': True,
+        'errors': [True, {
+            'PUT': [{full_name(datastore_errors.Timeout): 1}, 0.5],
+        }],
+        'latency': [True, {'GET': [[10, 20], 0.5]}],
+    },
+}
+
+
+class LoaderTestCase(unittest.TestCase):
+    """Runs each test in a temporary directory."""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+        super(LoaderTestCase, self).setUp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+        super(LoaderTestCase, self).tearDown()
+
+    def write(self, name, data):
+        path = os.path.join(self.root, name)
+
+        with open(path, 'wb') as config_file:
+            config_file.write(data)
+
+        return path
+
+
+@patch.dict(os.environ, clear=True)
+class FindPathTestCase(LoaderTestCase):
+
+    def test_no_file(self):
+        """Ensure there's no path without a config file."""
+        self.assertIsNone(find_path(self.root))
+
+    def test_app_directory(self):
+        """Ensure a config file in the app's directory is found."""
+        path = self.write('gchaos.json', '{}')
+
+        self.assertEqual(find_path(self.root), path)
+
+    def test_environment(self):
+        """Ensure the environment variable is used first."""
+        self.write('gchaos.json', '{}')
+        os.environ[CONFIG_ENV] = '/srv/chaos.yaml'
+
+        self.assertEqual(find_path(self.root), '/srv/chaos.yaml')
+
+
+class ParseTestCase(unittest.TestCase):
+
+    def test_json(self):
+        """Ensure lists in a JSON config are turned into tuples."""
+        result = parse('gchaos.json', json.dumps(CONFIG))
+
+        self.assertEqual(result['datastore']['latency'],
+                         (True, {'GET': ((10, 20), 0.5)}))
+
+    @patch.dict(sys.modules, yaml=None)
+    def test_yaml_missing(self):
+        """Ensure a YAML config needs PyYAML."""
+        self.assertRaises(ValueError, parse, 'gchaos.yaml', 'quiet: true')
+
+    def test_invalid_json(self):
+        """Ensure a file that isn't JSON isn't accepted."""
+        self.assertRaises(ValueError, parse, 'gchaos.json', '{quiet')
+
+
+class ValidateTestCase(unittest.TestCase):
+
+    def test_valid(self):
+        """Ensure a config with known sections is valid."""
+        validate(DEFAULT_CONFIG)
+
+    def test_not_a_mapping(self):
+        """Ensure the config must be a mapping."""
+        self.assertRaises(ValueError, validate, [])
+
+    def test_unknown_section(self):
+        """Ensure unknown sections aren't accepted."""
+        self.assertRaises(ValueError, validate, {'datastroe': {}})
+
+    def test_section_not_a_mapping(self):
+        """Ensure service sections must be mappings."""
+        self.assertRaises(ValueError, validate, {'datastore': True})
+
+
+class LoadFileTestCase(LoaderTestCase):
+
+    def setUp(self):
+        self.original_apiproxy = apiproxy_stub_map.apiproxy
+
+        apiproxy_stub_map.apiproxy = apiproxy_stub_map.APIProxyStubMap()
+        apiproxy_stub_map.apiproxy.RegisterStub(
+            MEMCACHE_STUB, MemcacheServiceStub())
+
+        super(LoadFileTestCase, self).setUp()
+
+    def tearDown(self):
+        apiproxy_stub_map.apiproxy = self.original_apiproxy
+
+        super(LoadFileTestCase, self).tearDown()
+
+    def test_load(self):
+        """Ensure the file's sections replace the defaults."""
+        path = self.write('gchaos.json', json.dumps(CONFIG))
+
+        result = load_file(path, DEFAULT_CONFIG)
+
+        self.assertTrue(result.quiet)
+        self.assertTrue(result.datastore.enabled)
+        self.assertEqual(result.datastore.latency.latencies['GET'].latency,
+                         (10, 20))
+        self.assertFalse(result.memcache.enabled)
+
+    def test_invalid(self):
+        """Ensure a config that doesn't hydrate isn't loaded."""
+        path = self.write('gchaos.json',
+                          json.dumps({'urlfetch': {'mode': 'sideways'}}))
+
+        self.assertRaises(ValueError, load_file, path)
+
+    @patch('gchaos.config.loader._set_cached')
+    def test_bad_error_path(self, set_cached):
+        """Ensure an error path that can't be resolved fails the load and
+        isn't cached.
+        """
+        path = self.write('gchaos.json', json.dumps({'datastore': {
+            'enabled': True,
+            'errors': [True, {'PUT': [{'gchaos.NoSuchError': 1}, 0.5]}],
+        }}))
+
+        self.assertRaises(BadObjectPathError, load_file, path)
+        set_cached.assert_not_called()
+
+    @patch('gchaos.config.loader.parse')
+    def test_cached(self, parse_mock):
+        """Ensure a file that didn't change isn't parsed again."""
+        path = self.write('gchaos.json', json.dumps(CONFIG))
+        parse_mock.side_effect = parse
+
+        first = load_file(path)
+        second = load_file(path)
+
+        self.assertEqual(parse_mock.call_count, 1)
+        self.assertIsInstance(second, ChaosConfig)
+        self.assertIsNot(second, first)
+        self.assertEqual(second.datastore.errors.errors['PUT'].error_rate, 0.5)
+
+    @patch('gchaos.config.loader.parse')
+    def test_changed(self, parse_mock):
+        """Ensure a changed file is parsed again."""
+        path = self.write('gchaos.json', json.dumps(CONFIG))
+        parse_mock.side_effect = parse
+
+        load_file(path)
+
+        self.write('gchaos.json', json.dumps({'quiet': False}))
+
+        self.assertFalse(load_file(path).quiet)
+        self.assertEqual(parse_mock.call_count, 2)
+
+    @patch('gchaos.config.loader.parse')
+    def test_without_cache(self, parse_mock):
+        """Ensure the cache can be skipped."""
+        path = self.write('gchaos.json', json.dumps(CONFIG))
+        parse_mock.side_effect = parse
+
+        load_file(path)
+        load_file(path, cache=False)
+
+        self.assertEqual(parse_mock.call_count, 2)
+
+    def test_memcache_unavailable(self):
+        """Ensure the file is still loaded without memcache."""
+        apiproxy_stub_map.apiproxy = apiproxy_stub_map.APIProxyStubMap()
+        path = self.write('gchaos.json', json.dumps(CONFIG))
+
+        self.assertTrue(load_file(path).quiet)
+
+
+class CacheKeyTestCase(unittest.TestCase):
+
+    def test_changes(self):
+        """Ensure the key changes with the contents, time and version."""
+        key = cache_key(1.0, 'a')
+
+        self.assertNotEqual(cache_key(1.0, 'b'), key)
+        self.assertNotEqual(cache_key(2.0, 'a'), key)
+
+        with patch.dict(os.environ, CURRENT_VERSION_ID='v2.1'):
+            self.assertNotEqual(cache_key(1.0, 'a'), key)
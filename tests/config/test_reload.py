@@ -0,0 +1,209 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import unittest
+
+from google.appengine.api import apiproxy_stub_map
+from google.appengine.api import memcache
+from google.appengine.api.memcache.memcache_stub import MemcacheServiceStub
+
+from mock import MagicMock
+
+from gchaos.config.hydrate import ChaosConfig
+from gchaos.config.reload import CONFIG_KEY
+from gchaos.config.reload import MemcacheSource
+from gchaos.config.reload import NAMESPACE
+from gchaos.config.reload import publish
+from gchaos.config.reload import reload_middleware
+from gchaos.gae.memcache.bypass import bypassed
+from gchaos.settings import MEMCACHE_STUB
+from gchaos.utils import BadObjectPathError
+
+
+class ReloadTestCase(unittest.TestCase):
+    """Runs each test against a fresh memcache stub."""
+
+    def setUp(self):
+        self.original_apiproxy = apiproxy_stub_map.apiproxy
+
+        apiproxy_stub_map.apiproxy = apiproxy_stub_map.APIProxyStubMap()
+        apiproxy_stub_map.apiproxy.RegisterStub(
+            MEMCACHE_STUB, MemcacheServiceStub())
+
+        self.on_change = MagicMock()
+        self.default = ChaosConfig({})
+        self.source = MemcacheSource(
+            self.default, interval=10, on_change=self.on_change)
+
+        super(ReloadTestCase, self).setUp()
+
+    def tearDown(self):
+        apiproxy_stub_map.apiproxy = self.original_apiproxy
+
+        super(ReloadTestCase, self).tearDown()
+
+    def test_no_version(self):
+        """Ensure the initial config is kept until a version is published."""
+        self.assertIs(self.source.check(now=0), self.default)
+        self.assertIsNone(self.source.version)
+
+        self.on_change.assert_not_called()
+
+    def test_load_version(self):
+        """Ensure a published config is loaded and swapped in."""
+        version = publish({'quiet': True})
+
+        config = self.source.check(now=0)
+
+        self.assertIsNot(config, self.default)
+        self.assertTrue(config.quiet)
+        self.assertEqual(self.source.version, version)
+
+        self.on_change.assert_called_once_with(config)
+
+    def test_interval(self):
+        """Ensure memcache is only checked once per interval."""
+        self.source.check(now=0)
+
+        publish({'quiet': True})
+
+        self.assertIs(self.source.check(now=5), self.default)
+        self.assertTrue(self.source.check(now=10).quiet)
+
+    def test_same_version(self):
+        """Ensure the config isn't fetched again if the version didn't
+        change.
+        """
+        publish({'quiet': True})
+
+        config = self.source.check(now=0)
+
+        self.assertIs(self.source.check(now=10), config)
+
+        self.on_change.assert_called_once_with(config)
+
+    def test_missing_config(self):
+        """Ensure a version whose config isn't there yet is retried."""
+        version = publish({'quiet': True})
+        memcache.delete(CONFIG_KEY.format(version), namespace=NAMESPACE)
+
+        self.assertIs(self.source.check(now=0), self.default)
+        self.assertIsNone(self.source.version)
+
+        memcache.set(CONFIG_KEY.format(version), {'quiet': True},
+                     namespace=NAMESPACE)
+
+        self.assertTrue(self.source.check(now=10).quiet)
+
+    def test_invalid_config(self):
+        """Ensure a config that doesn't hydrate is skipped."""
+        version = publish({})
+        memcache.set(CONFIG_KEY.format(version),
+                     {'urlfetch': {'mode': 'sideways'}}, namespace=NAMESPACE)
+
+        self.assertIs(self.source.check(now=0), self.default)
+        self.assertEqual(self.source.version, version)
+
+        self.on_change.assert_not_called()
+
+    def test_publish_invalid(self):
+        """Ensure an invalid config is never published."""
+        self.assertRaises(ValueError, publish,
+                          {'urlfetch': {'mode': 'sideways'}})
+
+        self.assertIs(self.source.check(now=0), self.default)
+
+    def test_publish_bad_error_path(self):
+        """Ensure a config with an error path that can't be resolved is
+        never published.
+        """
+        config = {'memcache': {
+            'enabled': True,
+            'errors': (True, {'GET': ({'no.such.Error': 1}, 0.5)}),
+        }}
+
+        self.assertRaises(BadObjectPathError, publish, config)
+
+        self.assertIs(self.source.check(now=0), self.default)
+
+    def test_install_failure(self):
+        """Ensure a config that fails to install is skipped and the current
+        one kept.
+        """
+        self.on_change.side_effect = ValueError
+
+        version = publish({'quiet': True})
+
+        self.assertIs(self.source.check(now=0), self.default)
+        self.assertEqual(self.source.version, version)
+
+    def test_version_evicted(self):
+        """Ensure a version published after the version key was evicted is
+        still new to instances on the previous one.
+        """
+        publish({'quiet': False})
+        self.source.check(now=0)
+
+        memcache.flush_all()
+        publish({'quiet': True})
+
+        self.assertTrue(self.source.check(now=10).quiet)
+
+    def test_bypassed(self):
+        """Ensure the config's own memcache calls aren't disrupted."""
+        seen = []
+
+        apiproxy_stub_map.apiproxy.GetPreCallHooks().Append(
+            'bypass_check', lambda *args: seen.append(bypassed()))
+
+        publish({'quiet': True})
+        self.source.check(now=0)
+
+        self.assertTrue(seen)
+        self.assertTrue(all(seen))
+
+    def test_check_in_progress(self):
+        """Ensure threads don't wait for another thread's check."""
+        publish({'quiet': True})
+
+        self.source._lock.acquire()
+
+        try:
+            self.assertIs(self.source.check(now=0), self.default)
+        finally:
+            self.source._lock.release()
+
+        self.assertTrue(self.source.check(now=0).quiet)
+
+
+class ReloadMiddlewareTestCase(unittest.TestCase):
+
+    def test_checks_each_request(self):
+        """Ensure the source is checked before the app is called."""
+        source = MagicMock()
+        app = MagicMock(return_value=['body'])
+
+        result = reload_middleware(app, source)('environ', 'start_response')
+
+        self.assertEqual(result, ['body'])
+        source.check.assert_called_once_with()
+        app.assert_called_once_with('environ', 'start_response')
@@ -0,0 +1,149 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import unittest
+
+from google.appengine.api import datastore
+from google.appengine.datastore import datastore_pb
+
+from gchaos.gae.datastore.actions import ACTIONS
+from gchaos.gae.datastore.batch import Batch
+from gchaos.gae.datastore.batch import batch_rate
+from gchaos.gae.datastore.batch import RESULT_LISTS
+
+
+def _put_request(count):
+    """Build a PutRequest with count entities."""
+    request = datastore_pb.PutRequest()
+
+    for i in xrange(count):
+        entity = datastore.Entity('Kind', name='e{0}'.format(i), _app='test')
+        request.add_entity().CopyFrom(entity.ToPb())
+
+    return request
+
+
+def _query_result(count):
+    """Build a QueryResult with count entities."""
+    result = datastore_pb.QueryResult()
+
+    for i in xrange(count):
+        entity = datastore.Entity('Kind', name='e{0}'.format(i), _app='test')
+        result.add_result().CopyFrom(entity.ToPb())
+
+    return result
+
+
+def _get_request(count):
+    """Build a GetRequest with count keys."""
+    request = datastore_pb.GetRequest()
+
+    for i in xrange(count):
+        key = datastore.Key.from_path('Kind', i + 1, _app='test')
+        request.add_key().CopyFrom(key._ToPb())
+
+    return request
+
+
+class BatchTestCase(unittest.TestCase):
+
+    def test_put_count(self):
+        """Ensure the count of a put is the number of entities."""
+        self.assertEqual(Batch(ACTIONS.PUT, _put_request(3)).count, 3)
+
+    def test_get_count(self):
+        """Ensure the count of a get is the number of keys."""
+        self.assertEqual(Batch(ACTIONS.GET, _get_request(4)).count, 4)
+
+    def test_count_at_least_one(self):
+        """Ensure an empty or missing request counts as a single entity."""
+        self.assertEqual(Batch(ACTIONS.PUT, _put_request(0)).count, 1)
+        self.assertEqual(Batch(ACTIONS.PUT, None).count, 1)
+
+    def test_kilobytes(self):
+        """Ensure the size is the byte size of the request in kilobytes."""
+        request = _put_request(2)
+
+        result = Batch(ACTIONS.PUT, request).kilobytes
+
+        self.assertAlmostEqual(result, request.ByteSize() / 1024.0)
+        self.assertGreater(result, 0)
+
+    def test_keys(self):
+        """Ensure the keys of a put are the keys of its entities."""
+        request = _put_request(2)
+
+        result = Batch(ACTIONS.PUT, request).keys()
+
+        self.assertEqual(result, [request.entity(0).key(),
+                                  request.entity(1).key()])
+
+    def test_get_keys(self):
+        """Ensure the keys of a get are the keys in the request."""
+        request = _get_request(2)
+
+        self.assertEqual(Batch(ACTIONS.GET, request).keys(),
+                         request.key_list())
+
+    def test_query_results(self):
+        """Ensure a query response's batch is its results."""
+        response = _query_result(3)
+
+        batch = Batch(ACTIONS.RUN_QUERY, response, RESULT_LISTS)
+
+        self.assertEqual(batch.count, 3)
+        self.assertEqual(batch.keys()[0], response.result(0).key())
+
+    def test_no_items(self):
+        """Ensure a request without entities or keys counts as one."""
+        batch = Batch(ACTIONS.COMMIT, datastore_pb.Transaction())
+
+        self.assertEqual(batch.items(), [])
+        self.assertEqual(batch.count, 1)
+
+    def test_truncate(self):
+        """Ensure truncate drops the entities after count off the request."""
+        request = _put_request(5)
+
+        Batch(ACTIONS.PUT, request).truncate(2)
+
+        self.assertEqual(request.entity_size(), 2)
+        self.assertEqual(request.entity(1).key().path().element(0).name(),
+                         'e1')
+
+
+class BatchRateTestCase(unittest.TestCase):
+
+    def test_single_entity(self):
+        """Ensure the rate for a single entity is unchanged."""
+        self.assertEqual(batch_rate(0.1, 1), 0.1)
+
+    def test_many_entities(self):
+        """Ensure the rate is the chance of any entity being hit."""
+        self.assertAlmostEqual(batch_rate(0.1, 2), 0.19)
+        self.assertAlmostEqual(batch_rate(0.5, 3), 0.875)
+
+    def test_bounds(self):
+        """Ensure a rate of zero or one is unchanged by the count."""
+        self.assertEqual(batch_rate(0.0, 10), 0.0)
+        self.assertEqual(batch_rate(1.0, 10), 1.0)
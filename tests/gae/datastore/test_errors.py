@@ -46,7 +46,7 @@ class TriggerTestCase(unittest.TestCase):
         """
         roll.return_value = False
 
-        config = ErrorConfig({"a": 1}, 0.01)
+        config = ErrorConfig({full_name(datastore_errors.Timeout): 1}, 0.01)
 
         trigger(config)
 
@@ -76,3 +76,59 @@ class TriggerTestCase(unittest.TestCase):
         self.assertRaises(datastore_errors.BadValueError, trigger, config)
 
         roll.assert_called_once_with(1)
+
+    def test_per_entity_rate(self, roll):
+        """Ensure a per entity rate is rolled for the whole batch."""
+        roll.return_value = False
+
+        batch = MagicMock(count=2)
+        config = ErrorConfig({}, 0.1, {'per_entity': True})
+
+        trigger(config, batch)
+
+        self.assertAlmostEqual(roll.call_args[0][0], 0.19)
+
+
+@patch('gchaos.gae.datastore.errors.roll', return_value=True)
+class PartialTriggerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.config = ErrorConfig(
+            {full_name(datastore_errors.Timeout): 1}, 1, {'partial': True})
+        self.rpc = MagicMock()
+        self.check_success = self.rpc.CheckSuccess
+
+        super(PartialTriggerTestCase, self).setUp()
+
+    @patch('gchaos.gae.datastore.errors.randint', return_value=2)
+    def test_partial_failure(self, randint, roll):
+        """Ensure part of the batch is kept and the error is raised when the
+        RPC's success is checked.
+        """
+        batch = MagicMock(count=5)
+
+        trigger(self.config, batch, self.rpc)
+
+        randint.assert_called_once_with(1, 4)
+        batch.truncate.assert_called_once_with(2)
+
+        self.assertRaises(datastore_errors.Timeout, self.rpc.CheckSuccess)
+        self.check_success.assert_called_once_with()
+
+    def test_single_entity(self, roll):
+        """Ensure a batch of one entity fails right away."""
+        batch = MagicMock(count=1)
+
+        self.assertRaises(
+            datastore_errors.Timeout, trigger, self.config, batch, self.rpc)
+
+        batch.truncate.assert_not_called()
+
+    def test_without_rpc(self, roll):
+        """Ensure without an RPC the batch fails right away."""
+        batch = MagicMock(count=5)
+
+        self.assertRaises(
+            datastore_errors.Timeout, trigger, self.config, batch)
+
+        batch.truncate.assert_not_called()
@@ -22,160 +22,389 @@
 
 import unittest
 
-from mock import call
 from mock import MagicMock
 from mock import patch
 
-from gchaos.config import CHAOS_CONFIG
-from gchaos.gae.datastore.actions import ACTIONS
-from gchaos.gae.datastore.latency import trigger as trigger_latency
-from gchaos.gae.datastore.errors import trigger as trigger_errors
-from gchaos.gae.datastore.hook import get_config_and_trigger
-from gchaos.gae.datastore.hook import trigger_action
-from gchaos.gae.datastore.hook import _trigger_actions
+from google.appengine.api import datastore
+from google.appengine.api import datastore_errors
+from google.appengine.datastore import datastore_pb
+
+from gchaos.config.datastore import CONFIG as DS_CONFIG
+from gchaos.config.hydrate import DatastoreConfig
+from gchaos.gae.datastore.actions import RPC_ACTIONS
+from gchaos.gae.datastore.actions import V4_RPC_ACTIONS
+from gchaos.gae.datastore.hook import compile_actions
+from gchaos.gae.datastore.hook import hook_wrapper
+from gchaos.gae.datastore.hook import _get_triggers
+from gchaos.gae.datastore.hotkeys import get_monitor
+from gchaos.gae.datastore.latency import MODES
+from gchaos.settings import DATASTORE_STUB
+from gchaos.settings import DATASTORE_V4_STUB
+from gchaos.utils import BadObjectPathError
+from gchaos.utils import full_name
+
+
+def _build_config(enabled=True, errors=True, latency=True, error_rate=0.5,
+                  latency_rate=0.5):
+    """Build a DatastoreConfig with the same rates for every action."""
+    error_entry = ({full_name(datastore_errors.Timeout): 1}, error_rate)
+    latency_entry = ((1, 2), latency_rate)
+
+    return DatastoreConfig({
+        'enabled': enabled,
+        'errors': (errors, {
+            'DELETE': error_entry, 'GET': error_entry, 'PUT': error_entry}),
+        'latency': (latency, {
+            'DELETE': latency_entry, 'GET': latency_entry,
+            'PUT': latency_entry}),
+    })
+
+
+class CompileActionsTestCase(unittest.TestCase):
+
+    def test_default_config(self):
+        """Ensure the default config compiles an entry for each of the raw
+        datastore RPC names.
+        """
+        result = compile_actions(DatastoreConfig(DS_CONFIG))
+
+        self.assertEqual(sorted(result.keys()), sorted(RPC_ACTIONS.keys()))
+
+    def test_disabled(self):
+        """Ensure if the datastore config is disabled nothing is compiled."""
+        result = compile_actions(_build_config(enabled=False))
+
+        self.assertEqual(result, {})
+
+    def test_disabled_clears_monitor(self):
+        """Ensure reloading to a disabled config removes the hot key monitor
+        of the config it replaces.
+        """
+        compile_actions(DatastoreConfig({
+            'enabled': True,
+            'hot_keys': {'enabled': True},
+        }))
+
+        self.assertIsNotNone(get_monitor())
+
+        compile_actions(_build_config(enabled=False))
+
+        self.assertIsNone(get_monitor())
+
+    def test_invalid_error_path(self):
+        """Ensure an invalid error path fails when the actions are compiled,
+        which is when the hook is installed.
+        """
+        config = DatastoreConfig({
+            'enabled': True,
+            'errors': (True, {'PUT': ({"not.a.real.Error": 1}, 0.5)}),
+        })
+
+        self.assertRaises(BadObjectPathError, compile_actions, config)
+
+    def test_nothing_enabled(self):
+        """Ensure if neither errors or latency are enabled nothing is
+        compiled.
+        """
+        result = compile_actions(_build_config(errors=False, latency=False))
+
+        self.assertEqual(result, {})
+
+    def test_zero_rates(self):
+        """Ensure if all the rates are zero nothing is compiled."""
+        result = compile_actions(
+            _build_config(error_rate=0.0, latency_rate=0.0))
 
+        self.assertEqual(result, {})
 
-@patch('gchaos.gae.datastore.hook._trigger_actions')
-class TriggerActionErrorTests(unittest.TestCase):
+    def test_missing_actions(self):
+        """Ensure actions without a configuration are not compiled."""
+        config = DatastoreConfig({
+            'enabled': True,
+            'errors': (True, {'PUT': ({}, 0.5)}),
+        })
 
-    def test_name_not_in_actions(self, trigger_actions_mock):
-        """Ensure if the name is not in the actions that no subsequent calls
-        are made.
+        result = compile_actions(config)
+
+        self.assertEqual(result.keys(), ["Put"])
+
+    @patch('gchaos.gae.datastore.hook.trigger_hot_keys')
+    def test_hot_keys(self, trigger_hot_keys):
+        """Ensure hot keys are monitored for every action carrying keys even
+        without errors or latency.
         """
-        name = "foo"
+        config = DatastoreConfig({
+            'enabled': True,
+            'hot_keys': {'enabled': True},
+        })
+
+        result = compile_actions(config)
+
+        self.assertEqual(sorted(result.keys()), ["Delete", "Get", "Put"])
 
-        ds_config = CHAOS_CONFIG.datastore
+        result["Put"](DATASTORE_STUB, "Put", "request", None, None)
 
-        trigger_action(name, ds_config)
+        (hot_keys_config, action, batch, service,
+         call) = trigger_hot_keys.call_args[0]
 
-        trigger_actions_mock.assert_not_called()
+        self.assertIs(hot_keys_config, config.hot_keys)
+        self.assertEqual(action, 'PUT')
+        self.assertEqual(batch.request, "request")
+        self.assertEqual((service, call), (DATASTORE_STUB, "Put"))
 
-    def test_name_in_actions(self, trigger_actions_mock):
-        """Ensure if the name is in the actions that subsequent calls are made.
+    @patch('gchaos.gae.datastore.hook.trigger_errors')
+    def test_targets(self, trigger_errors):
+        """Ensure with target rules only requests with a matching key are
+        triggered.
         """
-        name = ACTIONS.GET
+        config = DatastoreConfig({
+            'enabled': True,
+            'errors': (True, {'GET': ({}, 0.5)}),
+            'targets': {'kinds': ['Session']},
+        })
 
-        ds_config = CHAOS_CONFIG.datastore
+        trigger = compile_actions(config)["Get"]
 
-        trigger_action(name, ds_config)
+        request = datastore_pb.GetRequest()
+        request.add_key().CopyFrom(
+            datastore.Key.from_path('User', 1, _app='test')._ToPb())
 
-        trigger_actions_mock.assert_called_once_with(name, ds_config)
+        trigger(DATASTORE_STUB, "Get", request, None, None)
 
+        trigger_errors.assert_not_called()
 
-@patch('gchaos.gae.datastore.hook.get_config_and_trigger')
-class TriggerActionsTestCase(unittest.TestCase):
+        request.add_key().CopyFrom(
+            datastore.Key.from_path('Session', 1, _app='test')._ToPb())
 
-    def tearDown(self):
-        ds_config = CHAOS_CONFIG.datastore
+        trigger(DATASTORE_STUB, "Get", request, None, None)
 
-        ds_config.errors.enabled = True
-        ds_config.latency.enabled = True
+        trigger_errors.assert_called_once_with(
+            config.errors.errors['GET'], service=DATASTORE_STUB, call="Get")
 
-        super(TriggerActionsTestCase, self).tearDown()
+    def test_targets_skip_actions_without_keys(self):
+        """Ensure with target rules actions whose requests carry no keys are
+        left out.
+        """
+        config = DatastoreConfig({
+            'enabled': True,
+            'errors': (True, {'GET': ({}, 0.5), 'COMMIT': ({}, 0.5)}),
+            'targets': {'kinds': ['Session']},
+        })
+
+        result = compile_actions(config)
 
-    def test_nothing_enabled(self, get_config_and_trigger_mock):
-        """Ensure if none of the configs are enabled that nothing is triggered.
+        self.assertEqual(result.keys(), ["Get"])
+
+    @patch('gchaos.gae.datastore.hook.trigger_hot_keys')
+    @patch('gchaos.gae.datastore.hook.trigger_errors')
+    def test_without_inspecting(self, trigger_errors, trigger_hot_keys):
+        """Ensure v4 requests are never looked at, so targets, hot keys and
+        batch options are ignored.
         """
-        name = ACTIONS.GET
+        config = DatastoreConfig({
+            'enabled': True,
+            'errors': (True, {
+                'PUT': ({}, 0.5, {'per_entity': True}),
+                'DELETE': ({}, 0.5),
+            }),
+            'targets': {'kinds': ['Session']},
+            'hot_keys': {'enabled': True},
+        })
+
+        result = compile_actions(config, V4_RPC_ACTIONS, inspect=False)
 
-        ds_config = CHAOS_CONFIG.datastore
+        self.assertEqual(result.keys(), ["Commit"])
 
-        ds_config.errors.enabled = False
-        ds_config.latency.enabled = False
+        result["Commit"](
+            DATASTORE_V4_STUB, "Commit", "request", None, None)
 
-        _trigger_actions(name, ds_config)
+        trigger_errors.assert_called_once_with(
+            config.errors.errors['PUT'], service=DATASTORE_V4_STUB,
+            call="Commit")
+        trigger_hot_keys.assert_not_called()
 
-        get_config_and_trigger_mock.assert_not_called()
 
-    def test_errors_enabled(self, get_config_and_trigger_mock):
-        """Ensure if the errors module is enabled that it is triggered."""
-        name = ACTIONS.GET
+@patch('gchaos.gae.datastore.hook.trigger_latency')
+@patch('gchaos.gae.datastore.hook.trigger_errors')
+class GetTriggersTestCase(unittest.TestCase):
 
-        ds_config = CHAOS_CONFIG.datastore
+    def _call_triggers(self, triggers):
+        for trigger in triggers:
+            trigger(DATASTORE_STUB, None, None, None, self.rpc)
 
-        ds_config.errors.enabled = True
-        ds_config.latency.enabled = False
+    def setUp(self):
+        self.rpc = MagicMock()
 
-        _trigger_actions(name, ds_config)
+        super(GetTriggersTestCase, self).setUp()
 
-        get_config_and_trigger_mock.assert_called_once_with(
-            name, ds_config.errors, trigger_errors)
+    def test_errors_enabled(self, trigger_errors, trigger_latency):
+        """Ensure if only errors are enabled only they are triggered."""
+        config = _build_config(latency=False)
 
-    def test_latency_enabled(self, get_config_and_trigger_mock):
-        """Ensure if the latency module is enabled that it is triggered."""
-        name = ACTIONS.GET
+        triggers = _get_triggers('GET', config)
 
-        ds_config = CHAOS_CONFIG.datastore
+        self.assertEqual(len(triggers), 1)
 
-        ds_config.errors.enabled = False
-        ds_config.latency.enabled = True
+        self._call_triggers(triggers)
 
-        _trigger_actions(name, ds_config)
+        trigger_errors.assert_called_once_with(
+            config.errors.errors['GET'], service=DATASTORE_STUB, call=None)
+        trigger_latency.assert_not_called()
 
-        get_config_and_trigger_mock.assert_called_once_with(
-            name, ds_config.latency, trigger_latency)
+    def test_latency_enabled(self, trigger_errors, trigger_latency):
+        """Ensure if only latency is enabled only it is triggered."""
+        config = _build_config(errors=False)
 
-    def test_all_enabled(self, get_config_and_trigger_mock):
-        """Ensure if all the modules are enabled that they are all triggered."""
-        name = ACTIONS.GET
+        triggers = _get_triggers('GET', config)
 
-        ds_config = CHAOS_CONFIG.datastore
+        self.assertEqual(len(triggers), 1)
 
-        ds_config.errors.enabled = True
-        ds_config.latency.enabled = True
+        self._call_triggers(triggers)
 
-        _trigger_actions(name, ds_config)
+        trigger_latency.assert_called_once_with(
+            config.latency.latencies['GET'], self.rpc, deferred=False,
+            service=DATASTORE_STUB, call=None)
+        trigger_errors.assert_not_called()
 
-        calls = [
-            call(name, ds_config.errors, trigger_errors),
-            call(name, ds_config.latency, trigger_latency)
-        ]
+    def test_latency_deferred(self, trigger_errors, trigger_latency):
+        """Ensure in deferred mode the RPC is passed to the latency trigger."""
+        config = _build_config(errors=False)
+        config.latency.mode = MODES.DEFERRED
 
-        get_config_and_trigger_mock.assert_has_calls(calls)
+        self._call_triggers(_get_triggers('GET', config))
 
+        trigger_latency.assert_called_once_with(
+            config.latency.latencies['GET'], self.rpc, deferred=True,
+            service=DATASTORE_STUB, call=None)
 
-class GetConfigAndTriggerTestCase(unittest.TestCase):
+    def test_all_enabled(self, trigger_errors, trigger_latency):
+        """Ensure if all the modules are enabled they are all triggered with
+        errors first.
+        """
+        config = _build_config()
+
+        triggers = _get_triggers('PUT', config)
+
+        self.assertEqual(len(triggers), 2)
+
+        self._call_triggers(triggers)
 
-    def test_no_config(self):
-        """Ensure if the action doesn't return a config doesn't trigger."""
-        name = "foo"
+        trigger_errors.assert_called_once_with(
+            config.errors.errors['PUT'], service=DATASTORE_STUB, call=None)
+        trigger_latency.assert_called_once_with(
+            config.latency.latencies['PUT'], self.rpc, deferred=False,
+            service=DATASTORE_STUB, call=None)
 
-        trigger_func = MagicMock()
+    def test_latency_without_value(self, trigger_errors, trigger_latency):
+        """Ensure a latency config without a latency value is left out."""
+        config = DatastoreConfig({
+            'enabled': True,
+            'latency': (True, {'PUT': (None, 1.0)}),
+        })
 
-        error_config = CHAOS_CONFIG.datastore.errors
-        error_config.get_by_action = MagicMock(return_value=None)
+        triggers = _get_triggers('PUT', config)
 
-        get_config_and_trigger(name, error_config, trigger_func)
+        self.assertEqual(triggers, [])
 
-        error_config.get_by_action.assert_called_once_with(name)
-        trigger_func.assert_not_called()
+    def test_proportional_latency_without_value(self, trigger_errors,
+                                                trigger_latency):
+        """Ensure a latency config with only proportional latency is kept and
+        gets the batch.
+        """
+        config = DatastoreConfig({
+            'enabled': True,
+            'latency': (True, {'PUT': (None, 1.0, {'ms_per_entity': 5})}),
+        })
+
+        self._call_triggers(_get_triggers('PUT', config))
+
+        (latency_config, rpc, batch, deferred, service,
+         call) = trigger_latency.call_args[0]
+
+        self.assertIs(latency_config, config.latency.latencies['PUT'])
+        self.assertIs(rpc, self.rpc)
+        self.assertEqual(batch.count, 1)
+        self.assertFalse(deferred)
+        self.assertEqual(service, DATASTORE_STUB)
+
+    @patch('gchaos.gae.datastore.hook.trigger_results')
+    def test_query_latency(self, trigger_results, trigger_errors,
+                           trigger_latency):
+        """Ensure queries get the latency of their results."""
+        config = DatastoreConfig({
+            'enabled': True,
+            'latency': (True, {
+                'RUN_QUERY': ((10,), 1.0, {'ms_per_entity': 2})}),
+        })
+
+        self._call_triggers(_get_triggers('RUN_QUERY', config))
+
+        trigger_results.assert_called_once_with(
+            config.latency.latencies['RUN_QUERY'], 'RUN_QUERY', self.rpc,
+            False, DATASTORE_STUB, None)
+        trigger_latency.assert_not_called()
+
+    def test_partial_errors(self, trigger_errors, trigger_latency):
+        """Ensure partial errors get the batch and the RPC."""
+        config = DatastoreConfig({
+            'enabled': True,
+            'errors': (True, {'PUT': ({}, 1.0, {'partial': True})}),
+        })
+
+        self._call_triggers(_get_triggers('PUT', config))
+
+        (error_config, batch, rpc, service,
+         call) = trigger_errors.call_args[0]
+
+        self.assertIs(error_config, config.errors.errors['PUT'])
+        self.assertIs(rpc, self.rpc)
+        self.assertEqual(service, DATASTORE_STUB)
+
+
+@patch('gchaos.gae.datastore.hook.compile_actions')
+class HookWrapperTestCase(unittest.TestCase):
+
+    def test_name_not_in_actions(self, compile_actions_mock):
+        """Ensure if the name is not in the compiled actions nothing is
+        triggered.
+        """
+        trigger = MagicMock()
+        compile_actions_mock.return_value = {"Put": trigger}
 
-    def test_error_config_exists(self):
-        """Ensure if the action does return a config for errors does trigger."""
-        name = "foo"
+        hook_wrapper(None)("datastore_v3", "RunQuery", None, None)
 
-        trigger_func = MagicMock()
+        trigger.assert_not_called()
 
-        error_config = CHAOS_CONFIG.datastore.errors
-        error_config.get_by_action = MagicMock(
-            return_value=error_config.get_errors)
+    def test_name_in_actions(self, compile_actions_mock):
+        """Ensure if the name is in the compiled actions it is triggered."""
+        trigger = MagicMock()
+        compile_actions_mock.return_value = {"Put": trigger}
 
-        get_config_and_trigger(name, error_config, trigger_func)
+        hook_wrapper(None)("datastore_v3", "Put", "request", None, "rpc")
 
-        error_config.get_by_action.assert_called_once_with(name)
-        trigger_func.assert_called_once_with(error_config.get_errors)
+        trigger.assert_called_once_with(
+            "datastore_v3", "Put", "request", None, "rpc")
 
-    def test_latency_config_exists(self):
-        """Ensure if the action does return a config for latency does trigger."""
-        name = "foo"
+    def test_without_rpc(self, compile_actions_mock):
+        """Ensure the hook works when the api proxy doesn't pass an RPC."""
+        trigger = MagicMock()
+        compile_actions_mock.return_value = {"Put": trigger}
 
-        trigger_func = MagicMock()
+        hook_wrapper(None)("datastore_v3", "Put", "request", None)
 
-        latency_config = CHAOS_CONFIG.datastore.latency
-        latency_config.get_by_action = MagicMock(
-            return_value=latency_config.get_latencies)
+        trigger.assert_called_once_with(
+            "datastore_v3", "Put", "request", None, None)
+
+    def test_config_compiled_once(self, compile_actions_mock):
+        """Ensure the config is compiled once when the hook is built and not
+        on each call.
+        """
+        compile_actions_mock.return_value = {}
+        config = MagicMock()
 
-        get_config_and_trigger(name, latency_config, trigger_func)
+        hook = hook_wrapper(config)
+        hook("datastore_v3", "Put", None, None)
+        hook("datastore_v3", "Get", None, None)
 
-        latency_config.get_by_action.assert_called_once_with(name)
-        trigger_func.assert_called_once_with(latency_config.get_latencies)
+        compile_actions_mock.assert_called_once_with(
+            config, RPC_ACTIONS, True)
@@ -0,0 +1,176 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import cPickle as pickle
+import unittest
+
+from google.appengine.api import datastore
+from google.appengine.api import datastore_errors
+from google.appengine.datastore import datastore_pb
+
+from mock import patch
+
+from gchaos.config.hydrate import HotKeysConfig
+from gchaos.gae.datastore.actions import ACTIONS
+from gchaos.gae.datastore.batch import Batch
+from gchaos.gae.datastore.hotkeys import HotKeyMonitor
+from gchaos.gae.datastore.hotkeys import trigger
+from gchaos.utils import full_name
+
+
+def _put_batch(*entities):
+    request = datastore_pb.PutRequest()
+
+    for entity in entities:
+        request.add_entity().CopyFrom(entity.ToPb())
+
+    return Batch(ACTIONS.PUT, request)
+
+
+def _entity(kind, name, parent=None):
+    return datastore.Entity(kind, name=name, parent=parent, _app='test')
+
+
+@patch('gchaos.gae.datastore.hotkeys.time', return_value=0.0)
+class HotKeyMonitorTestCase(unittest.TestCase):
+
+    def test_observe(self, time):
+        """Ensure the keys, kinds and written entity groups are counted."""
+        monitor = HotKeyMonitor(10, 10.0)
+
+        user = _entity('User', 'a')
+        session = _entity('Session', 's', parent=user.key())
+
+        monitor.observe(ACTIONS.PUT, _put_batch(user, session))
+        monitor.observe(ACTIONS.PUT, _put_batch(session))
+
+        self.assertEqual(monitor.top_keys(1)[0][0], 'User:a/Session:s')
+        self.assertEqual(monitor.top_kinds(1)[0][0], 'Session')
+        self.assertEqual([group for group, _ in monitor.top_groups()],
+                         ['User:a'])
+
+    def test_write_rate(self, time):
+        """Ensure the highest write rate of the groups written is returned."""
+        monitor = HotKeyMonitor(10, 10.0)
+
+        for i in xrange(3):
+            rate, group = monitor.observe(
+                ACTIONS.PUT, _put_batch(_entity('Counter', 'c')))
+
+        self.assertEqual(group, 'Counter:c')
+        self.assertAlmostEqual(rate, 3 * monitor.groups.rate(1))
+
+    def test_reads_not_writes(self, time):
+        """Ensure reads are counted but have no write rate."""
+        monitor = HotKeyMonitor(10, 10.0)
+
+        request = datastore_pb.GetRequest()
+        request.add_key().CopyFrom(_entity('Counter', 'c').key()._ToPb())
+
+        result = monitor.observe(ACTIONS.GET, Batch(ACTIONS.GET, request))
+
+        self.assertEqual(result, (0.0, None))
+        self.assertEqual(len(monitor.keys), 1)
+        self.assertEqual(len(monitor.groups), 0)
+
+    def test_new_entities(self, time):
+        """Ensure the keys of new entities are only counted by kind."""
+        monitor = HotKeyMonitor(10, 10.0)
+
+        result = monitor.observe(ACTIONS.PUT, _put_batch(
+            datastore.Entity('Log', _app='test')))
+
+        self.assertEqual(result, (0.0, None))
+        self.assertEqual(len(monitor.keys), 0)
+        self.assertEqual(len(monitor.kinds), 1)
+
+    def test_new_child_entities(self, time):
+        """Ensure new entities with a parent write to the parent's group."""
+        monitor = HotKeyMonitor(10, 10.0)
+
+        user = _entity('User', 'a')
+
+        rate, group = monitor.observe(ACTIONS.PUT, _put_batch(
+            datastore.Entity('Log', parent=user.key(), _app='test')))
+
+        self.assertEqual(group, 'User:a')
+        self.assertAlmostEqual(rate, monitor.groups.rate(1))
+        self.assertEqual(len(monitor.keys), 0)
+
+    def test_pickle(self, time):
+        """Ensure a monitor can be pickled, for cached configs."""
+        monitor = HotKeyMonitor(10, 10.0)
+        monitor.observe(ACTIONS.PUT, _put_batch(_entity('User', 'a')))
+
+        result = pickle.loads(pickle.dumps(monitor, pickle.HIGHEST_PROTOCOL))
+
+        self.assertEqual(result.top_keys(1)[0][0], 'User:a')
+
+        result.observe(ACTIONS.PUT, _put_batch(_entity('User', 'b')))
+
+
+@patch('gchaos.gae.datastore.errors.roll', return_value=True)
+@patch('gchaos.gae.datastore.hotkeys.time', return_value=0.0)
+class TriggerTestCase(unittest.TestCase):
+
+    @patch('gchaos.gae.datastore.hotkeys.time', return_value=0.0)
+    def setUp(self, time):
+        self.config = HotKeysConfig({
+            'enabled': True,
+            'half_life': 1.0,
+            'contention': {
+                'threshold': 1.0,
+                'errors': {full_name(datastore_errors.Timeout): 1},
+            },
+        })
+
+        super(TriggerTestCase, self).setUp()
+
+    def test_below_threshold(self, time, roll):
+        """Ensure writes below the threshold don't raise."""
+        trigger(self.config, ACTIONS.PUT, _put_batch(_entity('Counter', 'c')))
+
+        roll.assert_not_called()
+
+    def test_above_threshold(self, time, roll):
+        """Ensure writes to a group above the threshold trigger contention
+        errors.
+        """
+        batch = _put_batch(_entity('Counter', 'c'))
+
+        trigger(self.config, ACTIONS.PUT, batch)
+
+        self.assertRaises(datastore_errors.Timeout, trigger, self.config,
+                          ACTIONS.PUT, batch)
+
+    def test_monitor_only(self, time, roll):
+        """Ensure without contention keys are only monitored."""
+        config = HotKeysConfig({'enabled': True, 'half_life': 1.0,
+                                'capacity': 4})
+        batch = _put_batch(_entity('Counter', 'c'))
+
+        for i in xrange(5):
+            trigger(config, ACTIONS.PUT, batch)
+
+        roll.assert_not_called()
+        self.assertEqual(len(config.monitor.groups), 1)
@@ -28,13 +28,17 @@ from mock import patch
 
 from gchaos.config import CHAOS_CONFIG
 from gchaos.config.hydrate import LatencyConfig
+from gchaos.distributions import Distribution
 from gchaos.errors import InvalidLatencyException
 
 from gchaos.gae.datastore.actions import ACTIONS
+from gchaos.gae.datastore.latency import _defer
 from gchaos.gae.datastore.latency import get_stall_time_from_range
 from gchaos.gae.datastore.latency import stall
 from gchaos.gae.datastore.latency import _stall
 from gchaos.gae.datastore.latency import trigger
+from gchaos.gae.datastore.latency import trigger_results
+from gchaos.settings import DATASTORE_STUB
 
 
 @patch('gchaos.gae.datastore.latency.roll')
@@ -54,10 +58,118 @@ class TriggerTestCase(unittest.TestCase):
         roll.assert_called_once_with(0.01)
         stall.assert_not_called()
 
+    @patch('gchaos.gae.datastore.latency.stall')
+    def test_latency_rate_greater_than_chance(self, stall, roll):
+        """Ensure when the latency rate is greater than the chance that stall
+        is called with the latency and RPC.
+        """
+        roll.return_value = True
+
+        config = LatencyConfig((1000,), 0.5)
+
+        trigger(config, "rpc", service=DATASTORE_STUB, call="Get")
+
+        stall.assert_called_once_with(
+            (1000,), "rpc", 0, True, DATASTORE_STUB, "Get")
+
+    @patch('gchaos.gae.datastore.latency.stall')
+    def test_per_entity_rate(self, stall, roll):
+        """Ensure a per entity rate is rolled for the whole batch."""
+        roll.return_value = False
+
+        batch = MagicMock(count=3)
+        config = LatencyConfig((1000,), 0.5, {'per_entity': True})
+
+        trigger(config, None, batch)
+
+        roll.assert_called_once_with(0.875)
+
+    @patch('gchaos.gae.datastore.latency.stall')
+    def test_proportional_latency(self, stall, roll):
+        """Ensure latency is added for each entity and kilobyte in the
+        batch.
+        """
+        roll.return_value = True
+
+        batch = MagicMock(count=3, kilobytes=2.5)
+        config = LatencyConfig(
+            (1000,), 0.5, {'ms_per_entity': 10, 'ms_per_kb': 4})
+
+        trigger(config, None, batch)
+
+        stall.assert_called_once_with((1000,), None, 40, True, None, None)
+
+
+@patch('gchaos.gae.datastore.latency._stall')
+@patch('gchaos.gae.datastore.latency.roll')
+class TriggerResultsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.rpc = MagicMock()
+        self.rpc.response.result_list.return_value = range(5)
+        self.rpc.response.ByteSize.return_value = 0
+
+        super(TriggerResultsTestCase, self).setUp()
+
+    def test_latency_rate_less_than_chance(self, roll, _stall_mock):
+        """Ensure the query isn't slowed down when the roll misses."""
+        roll.return_value = False
+
+        config = LatencyConfig((100,), 0.5, {'ms_per_entity': 10})
+
+        trigger_results(config, ACTIONS.RUN_QUERY, self.rpc, False)
+        self.rpc.CheckSuccess()
+
+        _stall_mock.assert_not_called()
+
+    def test_results_latency(self, roll, _stall_mock):
+        """Ensure the spike stalls right away and the latency for each result
+        once the RPC completes.
+        """
+        roll.return_value = True
+
+        config = LatencyConfig((100,), 0.5, {'ms_per_entity': 10})
+
+        trigger_results(config, ACTIONS.RUN_QUERY, self.rpc, False)
+
+        _stall_mock.assert_called_once_with(100)
+
+        self.rpc.CheckSuccess()
+
+        self.assertEqual(_stall_mock.call_args_list[-1][0], (50,))
+
+    def test_results_checked_twice(self, roll, _stall_mock):
+        """Ensure the results are only stalled for on the first success
+        check.
+        """
+        roll.return_value = True
+
+        config = LatencyConfig((100,), 0.5, {'ms_per_entity': 10})
+
+        trigger_results(config, ACTIONS.RUN_QUERY, self.rpc, False)
+
+        self.rpc.CheckSuccess()
+        self.rpc.CheckSuccess()
+
+        self.assertEqual(
+            [args[0] for args in _stall_mock.call_args_list], [(100,), (50,)])
+
 
 @patch('gchaos.gae.datastore.latency._stall')
 class StallTestCase(unittest.TestCase):
 
+    def test_extra_only(self, _stall_mock):
+        """Ensure extra latency stalls without a latency spike."""
+        stall(None, None, 40)
+
+        _stall_mock.assert_called_once_with(40)
+
+    def test_extra_added(self, _stall_mock):
+        """Ensure extra latency is added to the latency spike."""
+        stall((1000,), None, 40)
+
+        _stall_mock.assert_called_once_with(1040)
+
     def test_latency_not_configured(self, _stall_mock):
         """Ensure when no latency is set on the config that no other actions
         are triggered.
@@ -102,6 +214,73 @@ class StallTestCase(unittest.TestCase):
         _stall_mock.assert_called_once_with(2000)
         range_mock.assert_called_once_with((1000, 3000))
 
+    def test_latency_configured_with_distribution(self, _stall_mock):
+        """Ensure when a distribution is set on the config that the _stall
+        function is called with a value drawn from it.
+        """
+        stall(Distribution([1500, 1500]))
+
+        _stall_mock.assert_called_once_with(1500)
+
+    @patch('gchaos.gae.datastore.latency._defer')
+    def test_rpc_deferred(self, defer_mock, _stall_mock):
+        """Ensure when an RPC is passed in it is delayed instead of stalling.
+        """
+        defer_mock.return_value = True
+
+        stall(1000, "rpc")
+
+        defer_mock.assert_called_once_with("rpc", 1000)
+        _stall_mock.assert_not_called()
+
+    @patch('gchaos.gae.datastore.latency._defer')
+    def test_rpc_not_deferrable(self, defer_mock, _stall_mock):
+        """Ensure when the RPC can't be delayed the call is stalled."""
+        defer_mock.return_value = False
+
+        stall(1000, "rpc")
+
+        _stall_mock.assert_called_once_with(1000)
+
+    @patch('gchaos.gae.datastore.latency._defer')
+    def test_rpc_blocking(self, defer_mock, _stall_mock):
+        """Ensure the call is stalled in blocking mode even with an RPC."""
+        stall(1000, "rpc", deferred=False)
+
+        defer_mock.assert_not_called()
+        _stall_mock.assert_called_once_with(1000)
+
+    @patch('gchaos.gae.datastore.latency.check_deadline')
+    def test_deadline_clamped(self, check_mock, _stall_mock):
+        """Ensure the stall is cut short to the deadline."""
+        check_mock.return_value = (300, None)
+
+        stall(1000, "rpc", deferred=False, service=DATASTORE_STUB)
+
+        check_mock.assert_called_once_with(1000, "rpc", DATASTORE_STUB)
+        _stall_mock.assert_called_once_with(300)
+
+    @patch('gchaos.gae.datastore.latency.check_deadline')
+    def test_deadline_timed_out(self, check_mock, _stall_mock):
+        """Ensure the timeout error is raised when the RPC completes after
+        stalling until the deadline.
+        """
+        rpc = MagicMock()
+        check_mock.return_value = (300, ValueError())
+
+        stall(1000, rpc, deferred=False)
+
+        _stall_mock.assert_called_once_with(300)
+        self.assertRaises(ValueError, rpc.CheckSuccess)
+
+    @patch('gchaos.gae.datastore.latency.check_deadline')
+    def test_deadline_timed_out_without_rpc(self, check_mock, _stall_mock):
+        """Ensure the timeout error is raised right away without an RPC."""
+        check_mock.return_value = (300, ValueError())
+
+        self.assertRaises(ValueError, stall, 1000)
+        _stall_mock.assert_called_once_with(300)
+
 
 class GetStallTimeFromRangeTestCase(unittest.TestCase):
 
@@ -141,3 +320,86 @@ class StallSleepTestCase(unittest.TestCase):
         _stall(1500)
 
         sleep.assert_called_once_with(1.5)
+
+
+class FakeRPC(object):
+
+    def __init__(self):
+        self.calls = []
+
+    def Wait(self):
+        self.calls.append("Wait")
+
+    def CheckSuccess(self):
+        self.calls.append("CheckSuccess")
+
+
+class SlottedRPC(object):
+    __slots__ = ()
+
+    def Wait(self):
+        pass
+
+    def CheckSuccess(self):
+        pass
+
+
+@patch('gchaos.gae.datastore.latency.sleep')
+@patch('gchaos.gae.datastore.latency.time')
+class DeferTestCase(unittest.TestCase):
+
+    def test_does_not_sleep_right_away(self, time, sleep):
+        """Ensure deferring an RPC doesn't sleep in the hook."""
+        time.return_value = 100.0
+
+        self.assertTrue(_defer(FakeRPC(), 1500))
+
+        sleep.assert_not_called()
+
+    def test_wait_sleeps_remaining(self, time, sleep):
+        """Ensure waiting on the RPC sleeps off what's left of the delay then
+        waits on the RPC.
+        """
+        rpc = FakeRPC()
+
+        time.return_value = 100.0
+        _defer(rpc, 1500)
+
+        time.return_value = 101.0
+        rpc.Wait()
+
+        sleep.assert_called_once_with(0.5)
+        self.assertEqual(rpc.calls, ["Wait"])
+
+    def test_check_success_sleeps_remaining(self, time, sleep):
+        """Ensure checking the RPC sleeps off what's left of the delay."""
+        rpc = FakeRPC()
+
+        time.return_value = 100.0
+        _defer(rpc, 1500)
+
+        time.return_value = 100.5
+        rpc.CheckSuccess()
+
+        sleep.assert_called_once_with(1.0)
+        self.assertEqual(rpc.calls, ["CheckSuccess"])
+
+    def test_delay_passed(self, time, sleep):
+        """Ensure once the delay has passed waiting doesn't sleep."""
+        rpc = FakeRPC()
+
+        time.return_value = 100.0
+        _defer(rpc, 1500)
+
+        time.return_value = 102.0
+        rpc.Wait()
+        rpc.CheckSuccess()
+
+        sleep.assert_not_called()
+        self.assertEqual(rpc.calls, ["Wait", "CheckSuccess"])
+
+    def test_rpc_cant_be_wrapped(self, time, sleep):
+        """Ensure False is returned when the RPC can't be wrapped."""
+        time.return_value = 100.0
+
+        self.assertFalse(_defer(SlottedRPC(), 1500))
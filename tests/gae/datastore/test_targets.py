@@ -0,0 +1,104 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import unittest
+
+from google.appengine.api import datastore
+from google.appengine.datastore import datastore_pb
+
+from gchaos.config.hydrate import TargetsConfig
+from gchaos.gae.datastore.actions import ACTIONS
+from gchaos.gae.datastore.batch import Batch
+from gchaos.gae.datastore.targets import key_kind
+from gchaos.gae.datastore.targets import key_path
+from gchaos.gae.datastore.targets import matches
+
+
+def _key(*path):
+    return datastore.Key.from_path(*path, _app='test')._ToPb()
+
+
+def _put_batch(*entities):
+    request = datastore_pb.PutRequest()
+
+    for entity in entities:
+        request.add_entity().CopyFrom(entity.ToPb())
+
+    return Batch(ACTIONS.PUT, request)
+
+
+def _get_batch(*keys):
+    request = datastore_pb.GetRequest()
+
+    for key in keys:
+        request.add_key().CopyFrom(key)
+
+    return Batch(ACTIONS.GET, request)
+
+
+class KeyTestCase(unittest.TestCase):
+
+    def test_kind(self):
+        """Ensure the kind is the last element's type."""
+        self.assertEqual(key_kind(_key('User', 1, 'Session', 'abc')),
+                         'Session')
+
+    def test_path(self):
+        """Ensure the path has every element's kind and id or name."""
+        self.assertEqual(key_path(_key('User', 42, 'Session', 'abc')),
+                         'User:42/Session:abc')
+
+    def test_incomplete_path(self):
+        """Ensure an incomplete key ends with an empty id."""
+        entity = datastore.Entity('Session', _app='test')
+
+        self.assertEqual(key_path(entity.ToPb().key()), 'Session:')
+
+
+class MatchesTestCase(unittest.TestCase):
+
+    def test_kind(self):
+        """Ensure a put with an entity of a targeted kind matches."""
+        config = TargetsConfig({'kinds': ['Counter*']})
+
+        batch = _put_batch(
+            datastore.Entity('User', name='a', _app='test'),
+            datastore.Entity('CounterShard', name='b', _app='test'))
+
+        self.assertTrue(matches(config, batch))
+
+    def test_no_match(self):
+        """Ensure a request without targeted keys doesn't match."""
+        config = TargetsConfig({'kinds': ['Session'], 'keys': ['User:1']})
+
+        batch = _get_batch(_key('User', 2), _key('Counter', 1))
+
+        self.assertFalse(matches(config, batch))
+
+    def test_key(self):
+        """Ensure a get with a targeted key path matches."""
+        config = TargetsConfig({'keys': [r're:User:\d+/Session:']})
+
+        batch = _get_batch(_key('Counter', 1), _key('User', 7, 'Session', 3))
+
+        self.assertTrue(matches(config, batch))
@@ -0,0 +1,326 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import cPickle as pickle
+import unittest
+
+from google.appengine.api import datastore
+from google.appengine.api import datastore_errors
+from google.appengine.datastore import datastore_pb
+
+from mock import MagicMock
+from mock import patch
+
+from gchaos.config.hydrate import DatastoreConfig
+from gchaos.config.hydrate import TransactionsConfig
+from gchaos.errors import ChaosException
+from gchaos.gae.datastore.actions import ACTIONS
+from gchaos.gae.datastore.hook import compile_actions
+from gchaos.gae.datastore.transactions import TransactionSimulator
+from gchaos.gae.datastore.transactions import trigger
+
+
+def _key(kind, name):
+    return datastore.Key.from_path(kind, name, _app='test')._ToPb()
+
+
+def _put_request(handle=None, *entities):
+    request = datastore_pb.PutRequest()
+
+    for entity in entities:
+        request.add_entity().CopyFrom(entity.ToPb())
+
+    if handle is not None:
+        request.mutable_transaction().set_handle(handle)
+        request.mutable_transaction().set_app('test')
+
+    return request
+
+
+def _transaction(handle):
+    transaction = datastore_pb.Transaction()
+    transaction.set_handle(handle)
+    transaction.set_app('test')
+
+    return transaction
+
+
+def _simulator(ttl=60, max_transactions=100):
+    return TransactionSimulator(10, 10.0, ttl, max_transactions, 0.1)
+
+
+@patch('gchaos.gae.datastore.transactions.time', return_value=0.0)
+class TransactionSimulatorTestCase(unittest.TestCase):
+
+    def test_touch(self, time):
+        """Ensure the entity groups read and written are noted, once each."""
+        simulator = _simulator()
+
+        user = _key('User', 'a')
+
+        simulator.begin(1, now=0.0)
+        session = datastore.Key.from_path(
+            'User', 'a', 'Session', 's', _app='test')._ToPb()
+
+        simulator.touch(1, [session], True, now=1.0)
+        simulator.touch(1, [user, _key('Account', 'b')], False, now=2.0)
+
+        transaction = simulator.end(1)
+
+        self.assertEqual(transaction.groups,
+                         {'User:a': 1.0, 'Account:b': 2.0})
+        self.assertEqual(transaction.writes, set(['User:a']))
+        self.assertIsNone(simulator.end(1))
+
+    def test_new_roots(self, time):
+        """Ensure new root entities aren't counted as entity groups."""
+        simulator = _simulator()
+
+        incomplete = datastore.Entity('User', _app='test').key()._ToPb()
+
+        simulator.touch(1, [incomplete], True, now=0.0)
+
+        self.assertEqual(simulator.end(1).groups, {})
+
+    def test_no_conflict_without_writes(self, time):
+        """Ensure a transaction on a group nobody else writes can't
+        conflict.
+        """
+        simulator = _simulator()
+
+        simulator.touch(1, [_key('User', 'a')], True, now=0.0)
+
+        self.assertEqual(
+            simulator.conflict_chance(simulator.end(1), now=5.0), 0.0)
+
+    def test_conflict_grows_with_rate_and_time(self, time):
+        """Ensure the conflict chance grows with the group's write rate and
+        with how long the transaction is open.
+        """
+        simulator = _simulator()
+        key = _key('Counter', 'c')
+
+        simulator.touch(1, [key], True, now=0.0)
+        transaction = simulator.end(1)
+
+        simulator.write([key], now=0.0)
+        low = simulator.conflict_chance(transaction, now=0.0)
+
+        for _ in xrange(20):
+            simulator.write([key], now=0.0)
+
+        high = simulator.conflict_chance(transaction, now=0.0)
+        longer = simulator.conflict_chance(transaction, now=5.0)
+
+        self.assertGreater(low, 0.0)
+        self.assertGreater(high, low)
+        self.assertGreater(longer, high)
+        self.assertLess(longer, 1.0)
+
+    def test_commit_counts_writes(self, time):
+        """Ensure the groups a committed transaction wrote are counted."""
+        simulator = _simulator()
+
+        simulator.touch(1, [_key('Counter', 'c')], True, now=0.0)
+        simulator.touch(1, [_key('User', 'a')], False, now=0.0)
+        simulator.commit(simulator.end(1), now=0.0)
+
+        self.assertGreater(simulator.groups.estimate('Counter:c'), 0)
+        self.assertEqual(simulator.groups.estimate('User:a'), 0)
+
+    def test_ttl(self, time):
+        """Ensure transactions older than the TTL are dropped."""
+        simulator = _simulator(ttl=60)
+
+        simulator.begin(1, now=0.0)
+        simulator.begin(2, now=30.0)
+        simulator.begin(3, now=61.0)
+
+        self.assertEqual(len(simulator), 2)
+        self.assertIsNone(simulator.end(1))
+
+    def test_max_transactions(self, time):
+        """Ensure the oldest transaction is dropped when there are too
+        many.
+        """
+        simulator = _simulator(max_transactions=2)
+
+        for handle in xrange(3):
+            simulator.begin(handle, now=0.0)
+
+        self.assertEqual(len(simulator), 2)
+        self.assertIsNone(simulator.end(0))
+
+    def test_pickle(self, time):
+        """Ensure the simulator can be pickled without its lock."""
+        simulator = _simulator()
+        simulator.begin(1, now=0.0)
+
+        result = pickle.loads(pickle.dumps(simulator, pickle.HIGHEST_PROTOCOL))
+
+        self.assertEqual(len(result), 1)
+        result.touch(1, [_key('User', 'a')], True, now=1.0)
+
+
+@patch('gchaos.gae.datastore.transactions.roll')
+class TriggerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        time_patch = patch('gchaos.gae.datastore.transactions.time',
+                           return_value=0.0)
+        time_patch.start()
+        self.addCleanup(time_patch.stop)
+
+        self.config = TransactionsConfig({'enabled': True})
+        self.simulator = self.config.simulator
+
+        super(TriggerTestCase, self).setUp()
+
+    def test_begin(self, roll):
+        """Ensure the transaction is followed once it has begun."""
+        rpc = MagicMock()
+        rpc.response = _transaction(7)
+
+        trigger(self.config, ACTIONS.BEGIN_TRANSACTION, None, rpc)
+
+        self.assertEqual(len(self.simulator), 0)
+
+        rpc.CheckSuccess()
+
+        self.assertEqual(len(self.simulator), 1)
+
+    def test_begin_checked_twice(self, roll):
+        """Ensure checking the begin RPC again keeps the transaction."""
+        entity = datastore.Entity('User', name='a', _app='test')
+        rpc = MagicMock()
+        rpc.response = _transaction(7)
+
+        trigger(self.config, ACTIONS.BEGIN_TRANSACTION, None, rpc)
+        rpc.CheckSuccess()
+        trigger(self.config, ACTIONS.PUT, _put_request(7, entity))
+        rpc.CheckSuccess()
+
+        self.assertEqual(self.simulator.end(7).writes, set(['User:a']))
+
+    def test_transactional_put(self, roll):
+        """Ensure a put in a transaction is noted as a write of it."""
+        entity = datastore.Entity('User', name='a', _app='test')
+
+        trigger(self.config, ACTIONS.PUT, _put_request(7, entity))
+
+        self.assertEqual(self.simulator.end(7).writes, set(['User:a']))
+
+    def test_put(self, roll):
+        """Ensure a put outside of a transaction is counted right away."""
+        entity = datastore.Entity('User', name='a', _app='test')
+
+        trigger(self.config, ACTIONS.PUT, _put_request(None, entity))
+
+        self.assertEqual(len(self.simulator), 0)
+        self.assertGreater(self.simulator.groups.estimate('User:a'), 0)
+
+    def test_commit_conflicts(self, roll):
+        """Ensure a conflicting commit raises TransactionFailedError and
+        isn't counted as a write.
+        """
+        roll.return_value = True
+
+        entity = datastore.Entity('User', name='a', _app='test')
+
+        trigger(self.config, ACTIONS.PUT, _put_request(None, entity))
+        trigger(self.config, ACTIONS.PUT, _put_request(7, entity))
+
+        before = self.simulator.groups.estimate('User:a')
+
+        self.assertRaises(datastore_errors.TransactionFailedError, trigger,
+                          self.config, ACTIONS.COMMIT, _transaction(7))
+
+        self.assertGreater(roll.call_args[0][0], 0.0)
+        self.assertAlmostEqual(
+            self.simulator.groups.estimate('User:a'), before, places=3)
+        self.assertEqual(len(self.simulator), 0)
+
+    def test_commit_conflicts_without_errors(self, roll):
+        """Ensure a conflict raises a ChaosException if no errors are
+        configured.
+        """
+        roll.return_value = True
+        config = TransactionsConfig({'enabled': True, 'errors': {}})
+
+        entity = datastore.Entity('User', name='a', _app='test')
+
+        trigger(config, ACTIONS.PUT, _put_request(None, entity))
+        trigger(config, ACTIONS.PUT, _put_request(7, entity))
+
+        self.assertRaises(ChaosException, trigger, config, ACTIONS.COMMIT,
+                          _transaction(7))
+
+    def test_commit(self, roll):
+        """Ensure a commit that doesn't conflict counts its writes."""
+        roll.return_value = False
+
+        entity = datastore.Entity('User', name='a', _app='test')
+
+        trigger(self.config, ACTIONS.PUT, _put_request(None, entity))
+        trigger(self.config, ACTIONS.PUT, _put_request(7, entity))
+        trigger(self.config, ACTIONS.COMMIT, _transaction(7))
+
+        self.assertGreater(self.simulator.groups.estimate('User:a'), 1.5)
+
+    def test_uncontended_commit(self, roll):
+        """Ensure a commit on groups nobody else writes isn't rolled."""
+        entity = datastore.Entity('User', name='a', _app='test')
+
+        trigger(self.config, ACTIONS.PUT, _put_request(7, entity))
+        trigger(self.config, ACTIONS.COMMIT, _transaction(7))
+
+        roll.assert_not_called()
+
+    def test_rollback(self, roll):
+        """Ensure a rolled back transaction is dropped."""
+        entity = datastore.Entity('User', name='a', _app='test')
+
+        trigger(self.config, ACTIONS.PUT, _put_request(7, entity))
+        trigger(self.config, ACTIONS.ROLLBACK, _transaction(7))
+
+        self.assertEqual(len(self.simulator), 0)
+        self.assertEqual(self.simulator.groups.estimate('User:a'), 0)
+
+
+class CompileTestCase(unittest.TestCase):
+
+    def test_transactions_followed(self):
+        """Ensure transactions are followed through every transaction action,
+        even with target rules.
+        """
+        config = DatastoreConfig({
+            'enabled': True,
+            'targets': {'kinds': ['Session']},
+            'transactions': {'enabled': True},
+        })
+
+        result = compile_actions(config)
+
+        self.assertEqual(
+            sorted(result.keys()),
+            ['BeginTransaction', 'Commit', 'Delete', 'Get', 'Put',
+             'Rollback'])
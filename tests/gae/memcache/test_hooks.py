@@ -0,0 +1,181 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import unittest
+
+from google.appengine.api import apiproxy_stub_map
+from google.appengine.api import memcache
+from google.appengine.api.memcache.memcache_stub import MemcacheServiceStub
+from google.appengine.runtime import apiproxy_errors
+
+from mock import patch
+
+from gchaos.config.hydrate import MemcacheConfig
+from gchaos.config.memcache import CONFIG as MC_CONFIG
+from gchaos.gae.memcache.bypass import bypass
+from gchaos.gae.memcache.hook import compile_actions
+from gchaos.gae.memcache.hook import hook_wrapper
+from gchaos.settings import MEMCACHE_STUB
+from gchaos.utils import full_name
+
+
+class MemcacheTestCase(unittest.TestCase):
+    """Runs each test against a fresh memcache stub."""
+
+    def setUp(self):
+        self.original_apiproxy = apiproxy_stub_map.apiproxy
+
+        apiproxy_stub_map.apiproxy = apiproxy_stub_map.APIProxyStubMap()
+        apiproxy_stub_map.apiproxy.RegisterStub(
+            MEMCACHE_STUB, MemcacheServiceStub())
+
+        super(MemcacheTestCase, self).setUp()
+
+    def tearDown(self):
+        apiproxy_stub_map.apiproxy = self.original_apiproxy
+
+        super(MemcacheTestCase, self).tearDown()
+
+    def install(self, config):
+        apiproxy_stub_map.apiproxy.GetPreCallHooks().Append(
+            'gchaos_memcache_hooks', hook_wrapper(MemcacheConfig(config)),
+            MEMCACHE_STUB)
+
+
+class CompileActionsTestCase(unittest.TestCase):
+
+    def test_default_config_disabled(self):
+        """Ensure the default memcache config is off."""
+        self.assertEqual(compile_actions(MemcacheConfig(MC_CONFIG)), {})
+
+    def test_default_config(self):
+        """Ensure the default config compiles every memcache RPC when it's
+        turned on.
+        """
+        config = dict(MC_CONFIG, enabled=True)
+
+        result = compile_actions(MemcacheConfig(config))
+
+        self.assertEqual(
+            sorted(result.keys()),
+            ["BatchIncrement", "Delete", "Get", "Increment", "Set"])
+
+    def test_evictions_only_on_get(self):
+        """Ensure evictions alone only compile the get RPC."""
+        config = MemcacheConfig({
+            'enabled': True,
+            'evictions': (True, [{'type': 'full', 'rate': 0.5}]),
+        })
+
+        self.assertEqual(compile_actions(config).keys(), ["Get"])
+
+
+ERRORS = {full_name(apiproxy_errors.DeadlineExceededError): 1}
+
+
+class HookTestCase(MemcacheTestCase):
+
+    def test_get_error_is_a_miss(self):
+        """Ensure a get error is seen as a miss by the memcache client."""
+        memcache.set('key', 'value')
+
+        self.install({
+            'enabled': True,
+            'errors': (True, {'GET': (ERRORS, 1.0)}),
+        })
+
+        self.assertIsNone(memcache.get('key'))
+        self.assertEqual(memcache.get_multi(['key']), {})
+
+    def test_set_error_is_a_failed_write(self):
+        """Ensure a set error is seen as a failed write."""
+        self.install({
+            'enabled': True,
+            'errors': (True, {'SET': (ERRORS, 1.0)}),
+        })
+
+        self.assertFalse(memcache.set('key', 'value'))
+
+    def test_full_storm(self):
+        """Ensure a full storm flushes the cache before the get."""
+        memcache.set('a', 1)
+        memcache.set('b', 2, namespace='other')
+
+        self.install({
+            'enabled': True,
+            'evictions': (True, [{'type': 'full', 'rate': 1.0}]),
+        })
+
+        self.assertIsNone(memcache.get('a'))
+
+        with bypass():
+            self.assertIsNone(memcache.get('b', namespace='other'))
+
+    def test_namespace_storm(self):
+        """Ensure a namespace storm only evicts keys read in its namespaces
+        and keeps going for its duration.
+        """
+        memcache.set_multi({'a': 1, 'b': 2}, namespace='sessions')
+        memcache.set('a', 1)
+
+        self.install({
+            'enabled': True,
+            'evictions': (True, [{'type': 'namespace', 'rate': 1.0,
+                                  'namespaces': ['sessions'],
+                                  'duration': 60}]),
+        })
+
+        self.assertEqual(memcache.get('a'), 1)
+        self.assertEqual(
+            memcache.get_multi(['a', 'b'], namespace='sessions'), {})
+
+        memcache.set('a', 3, namespace='sessions')
+
+        with patch('gchaos.gae.memcache.evictions.roll') as roll:
+            self.assertIsNone(memcache.get('a', namespace='sessions'))
+
+        roll.assert_not_called()
+
+    @patch('gchaos.gae.memcache.evictions.uniform')
+    def test_fraction_storm(self, uniform):
+        """Ensure a fraction storm evicts that fraction of the keys read."""
+        uniform.side_effect = [0.1, 0.9]
+
+        memcache.set_multi({'a': 1, 'b': 2})
+
+        self.install({
+            'enabled': True,
+            'evictions': (True, [{'type': 'fraction', 'fraction': 0.5,
+                                  'rate': 1.0}]),
+        })
+
+        self.assertEqual(memcache.get_multi(['a', 'b']), {'b': 2})
+
+    def test_bypass(self):
+        """Ensure calls in a bypass block aren't disrupted."""
+        self.install({
+            'enabled': True,
+            'errors': (True, {'SET': (ERRORS, 1.0)}),
+        })
+
+        with bypass():
+            self.assertTrue(memcache.set('key', 'value'))
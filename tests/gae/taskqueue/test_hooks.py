@@ -0,0 +1,200 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+import unittest
+
+from google.appengine.api import apiproxy_stub_map
+from google.appengine.api.taskqueue import taskqueue
+from google.appengine.api.taskqueue import taskqueue_service_pb
+from google.appengine.api.taskqueue.taskqueue_stub import TaskQueueServiceStub
+
+from mock import patch
+
+from gchaos.config.hydrate import TaskqueueConfig
+from gchaos.config.hydrate import TaskqueueRuleConfig
+from gchaos.config.taskqueue import CONFIG as TASKQUEUE_CONFIG
+from gchaos.gae.taskqueue.hook import compile_rules
+from gchaos.gae.taskqueue.hook import hook_wrapper
+from gchaos.gae.taskqueue.rules import QueueIndex
+from gchaos.settings import TASKQUEUE_STUB
+from gchaos.utils import full_name
+
+
+TRANSIENT = {full_name(taskqueue.TransientError): 1}
+
+
+class QueueIndexTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.index = QueueIndex([
+            (TaskqueueRuleConfig({'queues': ['fanout-*']}), 'fanout'),
+            (TaskqueueRuleConfig({'queues': ['default']}), 'default'),
+        ])
+
+        super(QueueIndexTestCase, self).setUp()
+
+    def test_find(self):
+        """Ensure the first matching rule is found."""
+        self.assertEqual(self.index.find('fanout-1'), 'fanout')
+        self.assertEqual(self.index.find('default'), 'default')
+        self.assertIsNone(self.index.find('other'))
+
+    def test_remembered(self):
+        """Ensure the rule for a queue is only worked out once."""
+        self.index.find('fanout-1')
+
+        with patch.object(self.index, '_entries', ()):
+            self.assertEqual(self.index.find('fanout-1'), 'fanout')
+
+
+class CompileRulesTestCase(unittest.TestCase):
+
+    def test_default_config_disabled(self):
+        """Ensure the default taskqueue config is off."""
+        self.assertFalse(compile_rules(TaskqueueConfig(TASKQUEUE_CONFIG)))
+
+    def test_default_config(self):
+        """Ensure the default config matches every queue when it's turned
+        on.
+        """
+        config = TaskqueueConfig(dict(TASKQUEUE_CONFIG, enabled=True))
+
+        self.assertIsNotNone(compile_rules(config).find('default'))
+
+
+@patch.dict(os.environ, {'APPLICATION_ID': 'test',
+                         'HTTP_HOST': 'localhost:8080'})
+class HookTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.original_apiproxy = apiproxy_stub_map.apiproxy
+
+        self.stub = TaskQueueServiceStub()
+
+        apiproxy_stub_map.apiproxy = apiproxy_stub_map.APIProxyStubMap()
+        apiproxy_stub_map.apiproxy.RegisterStub(TASKQUEUE_STUB, self.stub)
+
+        super(HookTestCase, self).setUp()
+
+    def tearDown(self):
+        apiproxy_stub_map.apiproxy = self.original_apiproxy
+
+        super(HookTestCase, self).tearDown()
+
+    def install(self, rules):
+        config = TaskqueueConfig({'enabled': True, 'rules': rules})
+
+        apiproxy_stub_map.apiproxy.GetPreCallHooks().Append(
+            'gchaos_taskqueue_hooks', hook_wrapper(config), TASKQUEUE_STUB)
+
+    def tasks(self, count):
+        return [taskqueue.Task(url='/task', name='task-{0}'.format(i))
+                for i in xrange(count)]
+
+    def test_error(self):
+        """Ensure an error drops all the tasks."""
+        self.install([{'errors': (TRANSIENT, 1.0)}])
+
+        self.assertRaises(taskqueue.TransientError, taskqueue.add,
+                          url='/task')
+
+        self.assertEqual(self.stub.GetTasks('default'), [])
+
+    def test_queue_rules(self):
+        """Ensure only queues matching a rule are disrupted."""
+        self.install([{'queues': ['fanout-*'], 'errors': (TRANSIENT, 1.0)}])
+
+        taskqueue.add(url='/task')
+
+        self.assertEqual(len(self.stub.GetTasks('default')), 1)
+
+    @patch('gchaos.gae.taskqueue.errors.randint')
+    def test_partial_failure(self, randint):
+        """Ensure a partial failure adds some of the tasks and raises the
+        error for the others.
+        """
+        # Fail two tasks, swapping the third task into the first slot.
+        randint.side_effect = [2, 2, 1]
+
+        self.install([{'errors': (TRANSIENT, 1.0, {'partial': True})}])
+
+        tasks = self.tasks(4)
+
+        self.assertRaises(taskqueue.TransientError, taskqueue.Queue().add,
+                          tasks)
+
+        self.assertEqual([task.was_enqueued for task in tasks],
+                         [True, False, False, True])
+        self.assertEqual(
+            sorted(task['name'] for task in self.stub.GetTasks('default')),
+            ['task-0', 'task-3'])
+
+    @patch('gchaos.gae.taskqueue.errors.randint')
+    def test_partial_checked_twice(self, randint):
+        """Ensure checking a partially failed RPC again keeps its results."""
+        randint.side_effect = [2, 2, 1]
+
+        self.install([{'errors': (TRANSIENT, 1.0, {'partial': True})}])
+
+        tasks = self.tasks(4)
+        rpc = taskqueue.Queue().add_async(tasks)
+
+        self.assertRaises(taskqueue.TransientError, rpc.get_result)
+        self.assertRaises(taskqueue.TransientError, rpc.get_result)
+
+        codes = taskqueue_service_pb.TaskQueueServiceError
+        self.assertEqual(
+            [result.result() for result in rpc.response.taskresult_list()],
+            [codes.OK, codes.TRANSIENT_ERROR, codes.TRANSIENT_ERROR,
+             codes.OK])
+
+    def test_partial_single_task(self):
+        """Ensure a single task fails outright."""
+        self.install([{'errors': (TRANSIENT, 1.0, {'partial': True})}])
+
+        self.assertRaises(taskqueue.TransientError, taskqueue.Queue().add,
+                          self.tasks(1))
+
+        self.assertEqual(self.stub.GetTasks('default'), [])
+
+    def test_delay(self):
+        """Ensure a delay pushes the tasks' ETA back."""
+        self.install([{'delay': ((60000,), 1.0)}])
+
+        task = taskqueue.Task(url='/task', countdown=10)
+        taskqueue.Queue().add(task)
+
+        eta = self.stub.GetTasks('default')[0]['eta_usec']
+
+        self.assertAlmostEqual(eta - task.eta_posix * 1e6, 60000 * 1000,
+                               delta=1000)
+
+    @patch('gchaos.gae.datastore.latency._stall')
+    @patch('gchaos.gae.datastore.latency.roll', return_value=True)
+    def test_latency(self, roll, _stall):
+        """Ensure latency is injected on the add."""
+        self.install([{'latency': ((250,), 1.0)}])
+
+        taskqueue.add(url='/task')
+
+        _stall.assert_called_once_with(250)
@@ -0,0 +1,218 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import unittest
+
+from google.appengine.api import apiproxy_stub_map
+
+from mock import MagicMock
+from mock import patch
+
+from gchaos.gae import registry
+from gchaos.gae.registry import dispatch
+from gchaos.gae.registry import HOOK_NAME
+from gchaos.gae.registry import install_hooks
+from gchaos.gae.registry import install_service
+from gchaos.gae.registry import register
+from gchaos.gae.registry import uninstall_service
+
+
+class FakeConfig(object):
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+
+
+class HandlersTestCase(unittest.TestCase):
+    """Runs each test without any installed hooks."""
+
+    def setUp(self):
+        self.original_handlers = registry.HANDLERS
+
+        registry._set_handlers({})
+
+        super(HandlersTestCase, self).setUp()
+
+    def tearDown(self):
+        registry._set_handlers(self.original_handlers)
+
+        super(HandlersTestCase, self).tearDown()
+
+
+@patch.dict(registry.SERVICES, clear=True)
+class RegistryTestCase(HandlersTestCase):
+
+    def setUp(self):
+        self.original_apiproxy = apiproxy_stub_map.apiproxy
+
+        apiproxy_stub_map.apiproxy = apiproxy_stub_map.APIProxyStubMap()
+
+        super(RegistryTestCase, self).setUp()
+
+    def tearDown(self):
+        apiproxy_stub_map.apiproxy = self.original_apiproxy
+
+        super(RegistryTestCase, self).tearDown()
+
+    def test_install_service(self):
+        """Ensure the service's hook is bound to its config and the combined
+        hook is installed.
+        """
+        hook = MagicMock()
+        hook_wrapper = MagicMock(return_value=hook)
+        config = FakeConfig()
+
+        register('search', 'search', hook_wrapper)
+        install_service('search', config)
+
+        hook_wrapper.assert_called_once_with(config)
+        self.assertIs(registry.HANDLERS['search'], hook)
+        self.assertEqual(
+            len(apiproxy_stub_map.apiproxy.GetPreCallHooks()), 1)
+
+    def test_single_hook(self):
+        """Ensure installing many services only adds one hook."""
+        register('search', 'search', MagicMock())
+        register('blobstore', 'blobstore', MagicMock())
+
+        install_service('search', FakeConfig())
+        install_service('blobstore', FakeConfig())
+        install_service('search', FakeConfig())
+
+        hooks = apiproxy_stub_map.apiproxy.GetPreCallHooks()
+
+        self.assertEqual(len(hooks), 1)
+
+    def test_reinstall_replaces_hook(self):
+        """Ensure installing a service again uses the new config."""
+        first = MagicMock()
+        second = MagicMock()
+
+        register('search', 'search', MagicMock(side_effect=[first, second]))
+
+        install_service('search', FakeConfig())
+        install_service('search', FakeConfig())
+
+        dispatch('search', 'Search', 'request', 'response', 'rpc')
+
+        first.assert_not_called()
+        second.assert_called_once_with(
+            'search', 'Search', 'request', 'response', 'rpc')
+
+    def test_unknown_service(self):
+        """Ensure installing a service that isn't registered fails."""
+        self.assertRaises(KeyError, install_service, 'search', FakeConfig())
+
+    def test_install_hooks(self):
+        """Ensure only the enabled services are installed."""
+        search_wrapper = MagicMock()
+        blobstore_wrapper = MagicMock()
+        config = MagicMock()
+        config.search = FakeConfig(enabled=True)
+        config.blobstore = FakeConfig(enabled=False)
+
+        register('search', 'search', search_wrapper)
+        register('blobstore', 'blobstore', blobstore_wrapper)
+
+        install_hooks(config)
+
+        search_wrapper.assert_called_once_with(config.search)
+        blobstore_wrapper.assert_not_called()
+        self.assertEqual(registry.HANDLERS.keys(), ['search'])
+        self.assertEqual(
+            len(apiproxy_stub_map.apiproxy.GetPreCallHooks()), 1)
+
+    def test_install_hooks_replaces(self):
+        """Ensure services disabled since the last install are removed and
+        the hooks are replaced at once.
+        """
+        config = MagicMock()
+        config.search = FakeConfig(enabled=True)
+        config.blobstore = FakeConfig(enabled=True)
+
+        register('search', 'search', MagicMock())
+        register('blobstore', 'blobstore', MagicMock())
+
+        install_hooks(config)
+
+        installed = registry.HANDLERS
+        config.blobstore = FakeConfig(enabled=False)
+
+        install_hooks(config)
+
+        self.assertEqual(registry.HANDLERS.keys(), ['search'])
+        self.assertEqual(sorted(installed.keys()), ['blobstore', 'search'])
+
+    def test_uninstall_service(self):
+        """Ensure an uninstalled service is no longer called."""
+        hook = MagicMock()
+
+        register('search', 'search', MagicMock(return_value=hook))
+        install_service('search', FakeConfig())
+        uninstall_service('search')
+
+        dispatch('search', 'Search', None, None)
+
+        hook.assert_not_called()
+
+
+class DispatchTestCase(HandlersTestCase):
+
+    def test_dispatch_by_service(self):
+        """Ensure each call only goes to the hook of its service."""
+        search = MagicMock()
+        blobstore = MagicMock()
+        registry._set_handlers({'search': search, 'blobstore': blobstore})
+
+        dispatch('search', 'Search', 'request', 'response')
+
+        search.assert_called_once_with(
+            'search', 'Search', 'request', 'response', None)
+        blobstore.assert_not_called()
+
+    def test_service_not_installed(self):
+        """Ensure calls to services without a hook are left alone."""
+        dispatch('mail', 'Send', None, None, None)
+
+    def test_hook_name(self):
+        """Ensure the combined hook is appended with the gchaos key."""
+        hooks = MagicMock()
+
+        with patch.object(apiproxy_stub_map.apiproxy, 'GetPreCallHooks',
+                          return_value=hooks):
+            with patch.dict(registry.SERVICES,
+                            search=('search', MagicMock())):
+                install_service('search', FakeConfig())
+
+        hooks.Append.assert_called_once_with(HOOK_NAME, dispatch)
+
+
+class BuiltinServicesTestCase(unittest.TestCase):
+
+    def test_registered(self):
+        """Ensure every built in service is registered."""
+        import gchaos.install  # noqa
+
+        self.assertEqual(
+            sorted(registry.SERVICES.keys()),
+            ['blobstore', 'cloud_datastore_v1', 'datastore_v3',
+             'datastore_v4', 'memcache', 'search', 'taskqueue', 'urlfetch'])
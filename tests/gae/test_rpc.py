@@ -0,0 +1,111 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import unittest
+
+from mock import MagicMock
+
+from gchaos.gae.rpc import after_completion
+from gchaos.gae.rpc import raise_on_completion
+
+
+class SlottedRPC(object):
+    """RPC whose methods can't be replaced."""
+    __slots__ = ()
+
+    def CheckSuccess(self):
+        pass
+
+
+class AfterCompletionTestCase(unittest.TestCase):
+
+    def test_called_after_success(self):
+        """Ensure the function is called after the RPC's own check."""
+        rpc = MagicMock()
+        check_success = rpc.CheckSuccess
+        func = MagicMock(side_effect=lambda: check_success.assert_called())
+
+        self.assertTrue(after_completion(rpc, func))
+
+        rpc.CheckSuccess()
+
+        func.assert_called_once_with()
+
+    def test_called_once(self):
+        """Ensure the function only runs on the first success check."""
+        rpc = MagicMock()
+        func = MagicMock()
+
+        after_completion(rpc, func)
+
+        rpc.CheckSuccess()
+        rpc.CheckSuccess()
+
+        func.assert_called_once_with()
+
+    def test_called_after_failed_check(self):
+        """Ensure the function still runs once a failed check succeeds."""
+        rpc = MagicMock()
+        rpc.CheckSuccess.side_effect = [ValueError, None]
+        func = MagicMock()
+
+        after_completion(rpc, func)
+
+        self.assertRaises(ValueError, rpc.CheckSuccess)
+        rpc.CheckSuccess()
+
+        func.assert_called_once_with()
+
+    def test_not_called_on_failure(self):
+        """Ensure the function isn't called if the RPC failed."""
+        rpc = MagicMock()
+        rpc.CheckSuccess.side_effect = ValueError
+        func = MagicMock()
+
+        after_completion(rpc, func)
+
+        self.assertRaises(ValueError, rpc.CheckSuccess)
+        func.assert_not_called()
+
+    def test_cant_wrap(self):
+        """Ensure False is returned if the RPC can't be wrapped."""
+        self.assertFalse(after_completion(SlottedRPC(), MagicMock()))
+
+
+class RaiseOnCompletionTestCase(unittest.TestCase):
+
+    def test_raises(self):
+        """Ensure the error is raised when the RPC's success is checked."""
+        rpc = MagicMock()
+
+        self.assertTrue(raise_on_completion(rpc, KeyError()))
+
+        self.assertRaises(KeyError, rpc.CheckSuccess)
+
+    def test_raises_every_check(self):
+        """Ensure the error is raised each time success is checked."""
+        rpc = MagicMock()
+
+        raise_on_completion(rpc, KeyError())
+
+        self.assertRaises(KeyError, rpc.CheckSuccess)
+        self.assertRaises(KeyError, rpc.CheckSuccess)
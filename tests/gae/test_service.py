@@ -0,0 +1,123 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import unittest
+
+from google.appengine.runtime import apiproxy_errors
+
+from mock import MagicMock
+from mock import patch
+
+from gchaos.config.blobstore import CONFIG as BLOBSTORE_CONFIG
+from gchaos.config.hydrate import ServiceConfig
+from gchaos.config.search import CONFIG as SEARCH_CONFIG
+from gchaos.gae.datastore.latency import MODES
+from gchaos.gae.service import compile_calls
+from gchaos.gae.service import hook_wrapper
+from gchaos.utils import full_name
+
+
+def _build_config(calls, mode=MODES.BLOCKING):
+    return ServiceConfig({'enabled': True, 'mode': mode, 'calls': calls})
+
+
+class CompileCallsTestCase(unittest.TestCase):
+
+    def test_defaults_disabled(self):
+        """Ensure the default search and blobstore configs are off."""
+        self.assertEqual(compile_calls(ServiceConfig(SEARCH_CONFIG)), {})
+        self.assertEqual(compile_calls(ServiceConfig(BLOBSTORE_CONFIG)), {})
+
+    def test_default_search_config(self):
+        """Ensure the default search config compiles its calls when it's
+        turned on.
+        """
+        config = ServiceConfig(dict(SEARCH_CONFIG, enabled=True))
+
+        self.assertEqual(sorted(compile_calls(config).keys()),
+                         ["DeleteDocument", "IndexDocument", "Search"])
+
+    def test_zero_rates(self):
+        """Ensure calls that can never trigger anything are left out."""
+        config = _build_config({
+            'Search': {'errors': ({}, 0.0), 'latency': ((1, 2), 0.0)},
+            'IndexDocument': {},
+        })
+
+        self.assertEqual(compile_calls(config), {})
+
+    def test_unknown_mode(self):
+        """Ensure an unknown latency mode isn't accepted."""
+        self.assertRaises(ValueError, _build_config, {}, 'sideways')
+
+
+class HookWrapperTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.error = full_name(apiproxy_errors.DeadlineExceededError)
+
+    @patch('gchaos.gae.triggers.roll', return_value=True)
+    def test_error_on_completion(self, roll):
+        """Ensure the error is raised when the RPC's success is checked."""
+        hook = hook_wrapper(_build_config({
+            'Search': {'errors': ({self.error: 1}, 0.5)},
+        }))
+        rpc = MagicMock()
+
+        hook('search', 'Search', None, None, rpc)
+
+        self.assertRaises(
+            apiproxy_errors.DeadlineExceededError, rpc.CheckSuccess)
+
+    @patch('gchaos.gae.triggers.roll', return_value=True)
+    def test_wildcard(self, roll):
+        """Ensure calls without their own config use the wildcard."""
+        hook = hook_wrapper(_build_config({
+            'Search': {'latency': ((1, 2), 0.5)},
+            '*': {'errors': ({self.error: 1}, 0.5)},
+        }))
+
+        self.assertRaises(apiproxy_errors.DeadlineExceededError, hook,
+                          'blobstore', 'FetchData', None, None)
+
+    @patch('gchaos.gae.datastore.latency.trigger')
+    def test_latency_deferred(self, trigger_latency):
+        """Ensure the RPC is passed along in deferred mode."""
+        config = _build_config({'Search': {'latency': ((1, 2), 0.5)}},
+                               MODES.DEFERRED)
+
+        hook_wrapper(config)('search', 'Search', None, None, 'rpc')
+
+        trigger_latency.assert_called_once_with(
+            config.calls['Search'].latency, 'rpc', deferred=True,
+            service='search', call='Search')
+
+    @patch('gchaos.gae.datastore.latency.trigger')
+    def test_call_not_configured(self, trigger_latency):
+        """Ensure calls without a config or wildcard are left alone."""
+        hook = hook_wrapper(_build_config({
+            'Search': {'latency': ((1, 2), 0.5)},
+        }))
+
+        hook('search', 'ListIndexes', None, None)
+
+        trigger_latency.assert_not_called()
@@ -0,0 +1,126 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import unittest
+
+from google.appengine.runtime import apiproxy_errors
+
+from mock import call
+from mock import MagicMock
+from mock import patch
+
+from gchaos.config.hydrate import ErrorConfig
+from gchaos.errors import ChaosException
+from gchaos.gae.triggers import compile_triggers
+from gchaos.gae.triggers import error_trigger
+from gchaos.gae.triggers import get_error
+from gchaos.gae.triggers import trigger_error
+from gchaos.utils import BadObjectPathError
+from gchaos.utils import full_name
+
+
+class CompileTriggersTestCase(unittest.TestCase):
+
+    def test_no_triggers(self):
+        """Ensure nothing is compiled without triggers."""
+        self.assertIsNone(compile_triggers([]))
+
+    def test_single_trigger(self):
+        """Ensure a single trigger is returned as is."""
+        trigger = MagicMock()
+
+        self.assertIs(compile_triggers([trigger]), trigger)
+
+    def test_multiple_triggers(self):
+        """Ensure multiple triggers are all called in order."""
+        parent = MagicMock()
+        args = ("service", "Call", "request", "response", "rpc")
+
+        compile_triggers([parent.first, parent.second])(*args)
+
+        self.assertEqual(parent.mock_calls, [
+            call.first(*args), call.second(*args)])
+
+
+@patch('gchaos.gae.triggers.roll')
+class TriggerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.config = ErrorConfig(
+            {full_name(apiproxy_errors.DeadlineExceededError): 1}, 0.5)
+
+        super(TriggerTestCase, self).setUp()
+
+    def test_error_rate_less_than_chance(self, roll):
+        """Ensure when the chance is greater than the error rate nothing is
+        raised.
+        """
+        roll.return_value = False
+
+        trigger_error(self.config, MagicMock())
+
+        roll.assert_called_once_with(0.5)
+
+    def test_raised_on_completion(self, roll):
+        """Ensure the error is raised when the RPC's success is checked."""
+        roll.return_value = True
+
+        rpc = MagicMock()
+        check_success = rpc.CheckSuccess
+
+        trigger_error(self.config, rpc)
+
+        self.assertRaises(apiproxy_errors.DeadlineExceededError,
+                          rpc.CheckSuccess)
+        check_success.assert_called_once_with()
+
+    def test_raised_without_rpc(self, roll):
+        """Ensure the error is raised right away without an RPC."""
+        roll.return_value = True
+
+        self.assertRaises(apiproxy_errors.DeadlineExceededError, trigger_error,
+                          self.config)
+
+    def test_bound_trigger(self, roll):
+        """Ensure the bound trigger raises on the RPC's completion."""
+        roll.return_value = True
+        rpc = MagicMock()
+
+        error_trigger(self.config)('memcache', 'Get', None, None, rpc)
+
+        self.assertRaises(apiproxy_errors.DeadlineExceededError,
+                          rpc.CheckSuccess)
+
+    def test_invalid_error_path(self, roll):
+        """Ensure an invalid error path fails when the trigger is bound
+        rather than when the error is raised.
+        """
+        config = ErrorConfig({"not.a.real.Error": 1}, 0.5)
+
+        self.assertRaises(BadObjectPathError, error_trigger, config)
+
+
+class GetErrorTestCase(unittest.TestCase):
+
+    def test_without_errors(self):
+        """Ensure a config without errors raises a ChaosException."""
+        self.assertIsInstance(get_error(ErrorConfig({}, 1.0)), ChaosException)
@@ -0,0 +1,157 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import unittest
+
+from google.appengine.api import apiproxy_stub
+from google.appengine.api import apiproxy_stub_map
+from google.appengine.api import urlfetch
+from google.appengine.api import urlfetch_errors
+
+from mock import patch
+
+from gchaos.config.hydrate import UrlfetchConfig
+from gchaos.config.urlfetch import CONFIG as URLFETCH_CONFIG
+from gchaos.gae.urlfetch.hook import compile_rules
+from gchaos.gae.urlfetch.hook import hook_wrapper
+from gchaos.settings import URLFETCH_STUB
+from gchaos.utils import full_name
+
+
+class FakeUrlfetchStub(apiproxy_stub.APIProxyStub):
+    """URLFetch stub responding with 2KB to every fetch."""
+
+    def __init__(self):
+        super(FakeUrlfetchStub, self).__init__(URLFETCH_STUB)
+
+    def _Dynamic_Fetch(self, request, response):
+        response.set_statuscode(200)
+        response.set_content('x' * 2048)
+
+
+ERRORS = {full_name(urlfetch_errors.DeadlineExceededError): 1}
+
+
+class CompileRulesTestCase(unittest.TestCase):
+
+    def test_default_config_disabled(self):
+        """Ensure the default urlfetch config is off."""
+        self.assertFalse(compile_rules(UrlfetchConfig(URLFETCH_CONFIG)))
+
+    def test_default_config(self):
+        """Ensure the default config matches every fetch when it's turned
+        on.
+        """
+        config = UrlfetchConfig(dict(URLFETCH_CONFIG, enabled=True))
+
+        index = compile_rules(config)
+
+        self.assertIsNotNone(index.find("http://example.com/"))
+
+
+class HookTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.original_apiproxy = apiproxy_stub_map.apiproxy
+
+        apiproxy_stub_map.apiproxy = apiproxy_stub_map.APIProxyStubMap()
+        apiproxy_stub_map.apiproxy.RegisterStub(
+            URLFETCH_STUB, FakeUrlfetchStub())
+
+        super(HookTestCase, self).setUp()
+
+    def tearDown(self):
+        apiproxy_stub_map.apiproxy = self.original_apiproxy
+
+        super(HookTestCase, self).tearDown()
+
+    def install(self, rules):
+        config = UrlfetchConfig({'enabled': True, 'rules': rules})
+
+        apiproxy_stub_map.apiproxy.GetPreCallHooks().Append(
+            'gchaos_urlfetch_hooks', hook_wrapper(config), URLFETCH_STUB)
+
+    def test_error(self):
+        """Ensure a matching fetch raises the error when its result is
+        read.
+        """
+        self.install([{'hosts': ['api.example.com'],
+                       'errors': (ERRORS, 1.0)}])
+
+        rpc = urlfetch.create_rpc()
+        urlfetch.make_fetch_call(rpc, "http://api.example.com/")
+
+        self.assertRaises(urlfetch_errors.DeadlineExceededError,
+                          rpc.get_result)
+
+    def test_no_match(self):
+        """Ensure fetches not matching a rule are left alone."""
+        self.install([{'hosts': ['api.example.com'],
+                       'errors': (ERRORS, 1.0)}])
+
+        result = urlfetch.fetch("http://other.example.com/")
+
+        self.assertEqual(result.status_code, 200)
+
+    def test_matching_rule_without_faults(self):
+        """Ensure a rule without faults shields the fetch from later
+        rules.
+        """
+        self.install([{'paths': ['/health']}, {'errors': (ERRORS, 1.0)}])
+
+        self.assertEqual(
+            urlfetch.fetch("http://example.com/health").status_code, 200)
+        self.assertRaises(urlfetch_errors.DeadlineExceededError,
+                          urlfetch.fetch, "http://example.com/")
+
+    @patch('gchaos.gae.urlfetch.throttle.sleep')
+    def test_throttle(self, sleep):
+        """Ensure the fetch is stalled for the size of the response."""
+        self.install([{'throttle': 4}])
+
+        result = urlfetch.fetch("http://example.com/")
+
+        self.assertEqual(len(result.content), 2048)
+        sleep.assert_called_once_with(0.5)
+
+    @patch('gchaos.gae.urlfetch.throttle.sleep')
+    def test_throttled_once(self, sleep):
+        """Ensure checking the fetch's success again doesn't stall again."""
+        self.install([{'throttle': 4}])
+
+        rpc = urlfetch.create_rpc()
+        urlfetch.make_fetch_call(rpc, "http://example.com/")
+
+        rpc.get_result()
+        rpc.check_success()
+
+        sleep.assert_called_once_with(0.5)
+
+    @patch('gchaos.gae.datastore.latency._stall')
+    @patch('gchaos.gae.datastore.latency.roll', return_value=True)
+    def test_latency(self, roll, _stall):
+        """Ensure latency is injected for matching fetches."""
+        self.install([{'latency': ((250,), 1.0)}])
+
+        urlfetch.fetch("http://example.com/")
+
+        _stall.assert_called_once_with(250)
@@ -0,0 +1,83 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import unittest
+
+from mock import patch
+
+from gchaos.config.hydrate import UrlfetchRuleConfig
+from gchaos.gae.urlfetch.rules import RuleIndex
+from gchaos.gae.urlfetch.rules import split_url
+
+
+class SplitUrlTestCase(unittest.TestCase):
+
+    def test_split(self):
+        """Ensure the host is lower cased and the port and query dropped."""
+        self.assertEqual(split_url("https://API.example.com:8080/v1/a?b=c"),
+                         ("api.example.com", "/v1/a"))
+
+    def test_empty_path(self):
+        """Ensure an empty path is the root."""
+        self.assertEqual(split_url("http://example.com"),
+                         ("example.com", "/"))
+
+
+class RuleIndexTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.index = RuleIndex([
+            (UrlfetchRuleConfig({'hosts': ['api.example.com'],
+                                 'paths': ['prefix:/v1/']}), 'v1'),
+            (UrlfetchRuleConfig({'hosts': ['*.example.com']}), 'example'),
+            (UrlfetchRuleConfig({'paths': ['*.json']}), 'json'),
+        ])
+
+        super(RuleIndexTestCase, self).setUp()
+
+    def test_first_match(self):
+        """Ensure the first matching rule is found."""
+        self.assertEqual(self.index.find("http://api.example.com/v1/a"), 'v1')
+        self.assertEqual(self.index.find("http://api.example.com/v2"),
+                         'example')
+        self.assertEqual(self.index.find("http://other.com/a.json"), 'json')
+
+    def test_no_match(self):
+        """Ensure None is returned when no rule matches."""
+        self.assertIsNone(self.index.find("http://other.com/a.xml"))
+
+    def test_host_rules_remembered(self):
+        """Ensure the rules for a host are only worked out once."""
+        self.index.find("http://api.example.com/v1/a")
+
+        with patch.object(self.index, '_index_host') as index_host:
+            self.index.find("http://api.example.com/v2")
+
+        index_host.assert_not_called()
+
+    @patch('gchaos.gae.urlfetch.rules.HOST_CACHE_SIZE', 1)
+    def test_host_cache_bounded(self):
+        """Ensure the remembered hosts are dropped once full."""
+        self.index.find("http://a.com/")
+        self.index.find("http://b.com/")
+
+        self.assertEqual(self.index._hosts.keys(), ["b.com"])
@@ -0,0 +1,208 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import unittest
+
+from mock import MagicMock
+from mock import patch
+
+from gchaos import budget
+from gchaos.budget import allow_error
+from gchaos.budget import allow_fault
+from gchaos.budget import allow_latency
+from gchaos.budget import begin
+from gchaos.budget import Budget
+from gchaos.budget import budget_middleware
+from gchaos.budget import configure
+from gchaos.budget import current
+from gchaos.budget import end
+from gchaos.budget import scope
+from gchaos.config.hydrate import BudgetConfig
+from gchaos.config.hydrate import ErrorConfig
+from gchaos.gae.datastore.errors import trigger
+from gchaos.gae.datastore.latency import stall
+
+
+class BudgetTestCase(unittest.TestCase):
+
+    def test_unlimited(self):
+        """Ensure a budget without limits allows everything."""
+        unlimited = Budget()
+
+        for _ in xrange(100):
+            self.assertTrue(unlimited.allow_error())
+            self.assertTrue(unlimited.allow_fault())
+            self.assertEqual(unlimited.allow_latency(10000), 10000)
+
+    def test_errors_spent(self):
+        """Ensure errors stop once the error budget is spent."""
+        limited = Budget(errors=2)
+
+        self.assertTrue(limited.allow_error())
+        self.assertTrue(limited.allow_error())
+        self.assertFalse(limited.allow_error())
+
+    def test_errors_are_faults(self):
+        """Ensure errors and latency spikes share the fault budget."""
+        limited = Budget(errors=5, faults=2)
+
+        self.assertTrue(limited.allow_error())
+        self.assertEqual(limited.allow_latency(100), 100)
+        self.assertFalse(limited.allow_error())
+        self.assertFalse(limited.allow_fault())
+        self.assertEqual(limited.errors, 4)
+
+    def test_error_not_spent_without_fault(self):
+        """Ensure an error refused for lack of faults isn't spent."""
+        limited = Budget(errors=1, faults=0)
+
+        self.assertFalse(limited.allow_error())
+        self.assertEqual(limited.errors, 1)
+
+    def test_latency_clamped(self):
+        """Ensure latency is cut short to what is left of the budget."""
+        limited = Budget(latency_ms=1500)
+
+        self.assertEqual(limited.allow_latency(1000), 1000)
+        self.assertEqual(limited.allow_latency(1000), 500)
+        self.assertEqual(limited.allow_latency(1000), 0)
+
+    def test_no_latency_no_fault(self):
+        """Ensure spent latency doesn't spend a fault."""
+        limited = Budget(latency_ms=0, faults=1)
+
+        self.assertEqual(limited.allow_latency(1000), 0)
+        self.assertEqual(limited.faults, 1)
+
+
+class RequestBudgetTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.original_config = budget._CONFIG
+
+        configure(BudgetConfig({
+            'enabled': True, 'latency_ms': 100, 'errors': 1, 'faults': 2}))
+
+        super(RequestBudgetTestCase, self).setUp()
+
+    def tearDown(self):
+        budget._CONFIG = self.original_config
+        end()
+
+        super(RequestBudgetTestCase, self).tearDown()
+
+    def test_unlimited_outside_request(self):
+        """Ensure chaos outside a request isn't limited."""
+        self.assertIsNone(current())
+
+        for _ in xrange(10):
+            self.assertTrue(allow_error())
+            self.assertEqual(allow_latency(1000), 1000)
+
+    def test_limited_in_request(self):
+        """Ensure chaos in a request is limited by the configuration."""
+        begin()
+
+        self.assertTrue(allow_error())
+        self.assertFalse(allow_error())
+        self.assertEqual(allow_latency(1000), 100)
+        self.assertFalse(allow_fault())
+
+    def test_begin_resets(self):
+        """Ensure each request starts with a fresh budget."""
+        begin()
+        allow_error()
+
+        begin()
+
+        self.assertTrue(allow_error())
+
+    def test_disabled(self):
+        """Ensure requests aren't limited when budgets are off."""
+        configure(BudgetConfig({'enabled': False, 'errors': 0}))
+
+        self.assertIsNone(begin())
+        self.assertTrue(allow_error())
+
+    def test_scope_restores(self):
+        """Ensure a scope's budget is dropped when it ends."""
+        with scope():
+            self.assertIsNotNone(current())
+
+        self.assertIsNone(current())
+
+    def test_middleware(self):
+        """Ensure the middleware gives the request a budget and drops it after
+        the request.
+        """
+        def app(environ, start_response):
+            self.assertEqual(current().errors, 1)
+
+            return ['body']
+
+        result = budget_middleware(app)('environ', 'start_response')
+
+        self.assertEqual(result, ['body'])
+        self.assertIsNone(current())
+
+    def test_middleware_drops_on_error(self):
+        """Ensure the budget is dropped when the app raises."""
+        app = MagicMock(side_effect=ValueError)
+
+        self.assertRaises(
+            ValueError, budget_middleware(app), 'environ', 'start_response')
+        self.assertIsNone(current())
+
+
+class BudgetedTriggerTestCase(unittest.TestCase):
+
+    @patch('gchaos.gae.datastore.latency._stall')
+    @patch('gchaos.gae.datastore.latency.allow_latency')
+    def test_stall_clamped(self, allow_latency_mock, stall_mock):
+        """Ensure the stall is cut short to the budget."""
+        allow_latency_mock.return_value = 250
+
+        stall((1000,))
+
+        allow_latency_mock.assert_called_once_with(1000)
+        stall_mock.assert_called_once_with(250)
+
+    @patch('gchaos.gae.datastore.latency._stall')
+    @patch('gchaos.gae.datastore.latency.allow_latency')
+    def test_stall_spent(self, allow_latency_mock, stall_mock):
+        """Ensure there's no stall once the latency budget is spent."""
+        allow_latency_mock.return_value = 0
+
+        stall((1000,))
+
+        self.assertFalse(stall_mock.called)
+
+    @patch('gchaos.gae.datastore.errors.roll')
+    @patch('gchaos.gae.datastore.errors.allow_error')
+    def test_error_spent(self, allow_error_mock, roll_mock):
+        """Ensure no error is raised once the error budget is spent."""
+        allow_error_mock.return_value = False
+        roll_mock.return_value = True
+
+        trigger(ErrorConfig({}, 1.0))
+
+        allow_error_mock.assert_called_once_with()
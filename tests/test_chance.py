@@ -21,11 +21,17 @@
 # SOFTWARE.
 
 
+import threading
 import unittest
 
 from mock import patch
 
+from gchaos import chance
+from gchaos.chance import randint
+from gchaos.chance import RandomStream
 from gchaos.chance import roll
+from gchaos.chance import seed
+from gchaos.chance import uniform
 
 
 @patch('gchaos.chance._get_chance')
@@ -63,3 +69,77 @@ class RollTestCase(unittest.TestCase):
         self.assertTrue(result)
 
         get_chance_mock.assert_called_once_with()
+
+
+class RandomStreamTestCase(unittest.TestCase):
+
+    def test_values_in_range(self):
+        """Ensure the stream returns values in [0.0, 1.0) across blocks."""
+        stream = RandomStream(block_size=8, use_numpy=False)
+
+        for _ in xrange(100):
+            value = stream.next()
+
+            self.assertTrue(0.0 <= value < 1.0)
+
+    def test_seeded(self):
+        """Ensure streams with the same seed return the same values."""
+        first = RandomStream(42, block_size=8, use_numpy=False)
+        second = RandomStream(42, block_size=8, use_numpy=False)
+
+        self.assertEqual([first.next() for _ in xrange(20)],
+                         [second.next() for _ in xrange(20)])
+
+    @unittest.skipIf(chance.get_numpy() is None, "NumPy is not installed")
+    def test_numpy_seeded(self):
+        """Ensure NumPy backed streams with the same seed return the same
+        values.
+        """
+        first = RandomStream(42, block_size=8)
+        second = RandomStream(42, block_size=8)
+
+        self.assertEqual([first.next() for _ in xrange(20)],
+                         [second.next() for _ in xrange(20)])
+
+
+class SeedTestCase(unittest.TestCase):
+
+    def tearDown(self):
+        seed()
+
+        super(SeedTestCase, self).tearDown()
+
+    def test_reproducible(self):
+        """Ensure reseeding with the same value replays the same values."""
+        seed(7)
+        first = [uniform() for _ in xrange(10)]
+
+        seed(7)
+        second = [uniform() for _ in xrange(10)]
+
+        self.assertEqual(first, second)
+
+    def test_threads_use_their_own_stream(self):
+        """Ensure each thread gets its own stream."""
+        seed(7)
+
+        values = []
+
+        thread = threading.Thread(
+            target=lambda: values.extend(uniform() for _ in xrange(10)))
+        thread.start()
+        thread.join()
+
+        self.assertNotEqual(values, [uniform() for _ in xrange(10)])
+
+
+class RandintTestCase(unittest.TestCase):
+
+    @patch('gchaos.chance.uniform')
+    def test_bounds(self, uniform_mock):
+        """Ensure the lowest and highest draws map to the range bounds."""
+        uniform_mock.return_value = 0.0
+        self.assertEqual(randint(5, 10), 5)
+
+        uniform_mock.return_value = 0.999999
+        self.assertEqual(randint(5, 10), 10)
@@ -25,6 +25,12 @@ import unittest
 
 from nose.plugins.attrib import attr
 
+from mock import patch
+
+from gchaos.choice import ALIAS
+from gchaos.choice import ALIAS_THRESHOLD
+from gchaos.choice import BISECT
+from gchaos.choice import build_alias_table
 from gchaos.choice import Choice
 
 
@@ -51,6 +57,71 @@ class TestChoice(unittest.TestCase):
 
         self.assertEqual(result, choice)
 
+    def test_alias_single_choice(self):
+        """Ensure the alias engine returns the only choice."""
+        choice = "mychoice"
+        result = Choice([100], [choice], engine=ALIAS).next()
+
+        self.assertEqual(result, choice)
+
+    def test_alias_no_weights(self):
+        """Ensure the alias engine returns None when there are no weights."""
+        result = Choice([], ["a"], engine=ALIAS).next()
+
+        self.assertIsNone(result)
+
+    def test_unknown_engine(self):
+        """Ensure an unknown engine raises a ValueError."""
+        self.assertRaises(ValueError, Choice, [1], ["a"], engine="foo")
+
+    def test_engine_picked_by_size(self):
+        """Ensure small catalogs use bisect and large ones use alias."""
+        small = Choice([1] * (ALIAS_THRESHOLD - 1),
+                       range(ALIAS_THRESHOLD - 1))
+        large = Choice([1] * ALIAS_THRESHOLD, range(ALIAS_THRESHOLD))
+
+        self.assertEqual(small.engine, BISECT)
+        self.assertEqual(large.engine, ALIAS)
+
+    @patch('gchaos.choice.uniform')
+    def test_float_weights(self, random_mock):
+        """Ensure float weights are supported by both engines."""
+        random_mock.return_value = 0.9
+
+        for engine in (BISECT, ALIAS):
+            result = Choice([0.25, 0.75], ["a", "b"], engine=engine).next()
+
+            self.assertEqual(result, "b")
+
+
+class BuildAliasTableTestCase(unittest.TestCase):
+
+    def test_distribution_preserved(self):
+        """Ensure the alias table gives each choice the same probability as
+        its weight.
+        """
+        weights = [1, 2, 3, 0.5, 10, 0]
+        choices = ["a", "b", "c", "d", "e", "f"]
+
+        probabilities, columns, aliases = build_alias_table(weights, choices)
+
+        size = float(len(choices))
+        mass = dict((choice, 0.0) for choice in choices)
+
+        for probability, column, alias in zip(
+                probabilities, columns, aliases):
+            mass[column] += probability / size
+            mass[alias] += (1.0 - probability) / size
+
+        total = float(sum(weights))
+
+        for weight, choice in zip(weights, choices):
+            self.assertAlmostEqual(mass[choice], weight / total)
+
+    def test_zero_total(self):
+        """Ensure weights that add up to zero raise a ValueError."""
+        self.assertRaises(ValueError, build_alias_table, [0, 0], ["a", "b"])
+
 
 @attr('slow')
 class TestChoiceSlow(unittest.TestCase):
@@ -77,3 +148,22 @@ class TestChoiceSlow(unittest.TestCase):
 
         print done
         raise Exception("Never hit 2 choices. This really shouldn't happen.")
+
+    def test_alias_multiple_choices_with_weights_of_50(self):
+        """Ensure the alias engine hits both choices with equal weights."""
+        choices = ["mychoice", "mychoice2"]
+        choice = Choice([50, 50], choices, engine=ALIAS)
+
+        done = {}
+
+        for _ in xrange(1000):
+            result = choice.next()
+
+            self.assertIn(result, choices)
+
+            done[result] = True
+
+            if len(done) == 2:
+                return
+
+        raise Exception("Never hit 2 choices. This really shouldn't happen.")
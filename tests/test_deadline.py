@@ -0,0 +1,221 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import unittest
+
+from mock import patch
+
+from google.appengine.api import apiproxy_rpc
+from google.appengine.api import datastore_errors
+from google.appengine.api import urlfetch_errors
+from google.appengine.runtime import apiproxy_errors
+from google.appengine.runtime import DeadlineExceededError
+
+from gchaos import deadline
+from gchaos.config.deadlines import DATASTORE_TIMEOUT
+from gchaos.config.deadlines import URLFETCH_TIMEOUT
+from gchaos.config.hydrate import DeadlinesConfig
+from gchaos.config.hydrate import LatencyConfig
+from gchaos.deadline import begin
+from gchaos.deadline import check
+from gchaos.deadline import configure
+from gchaos.deadline import deadline_middleware
+from gchaos.deadline import end
+from gchaos.deadline import MODES
+from gchaos.deadline import remaining
+from gchaos.gae.datastore.latency import latency_trigger
+from gchaos.gae.datastore.latency import MODES as LATENCY_MODES
+from gchaos.settings import DATASTORE_STUB
+from gchaos.settings import MEMCACHE_STUB
+from gchaos.settings import URLFETCH_STUB
+
+
+class DeadlineTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.original_config = deadline._CONFIG
+
+        self._configure()
+
+        super(DeadlineTestCase, self).setUp()
+
+    def tearDown(self):
+        deadline._CONFIG = self.original_config
+        end()
+
+        super(DeadlineTestCase, self).tearDown()
+
+    def _configure(self, mode=MODES.TIMEOUT):
+        configure(DeadlinesConfig({
+            'enabled': True,
+            'mode': mode,
+            'request': 60,
+            'task': 600,
+            'errors': {
+                DATASTORE_STUB: DATASTORE_TIMEOUT,
+                URLFETCH_STUB: URLFETCH_TIMEOUT,
+            },
+        }))
+
+    def test_no_deadlines(self):
+        """Ensure a stall without an RPC outside a request is left alone."""
+        self.assertEqual(check(100000), (100000, None))
+
+    def test_disabled(self):
+        """Ensure stalls aren't checked when deadlines are off."""
+        configure(DeadlinesConfig({'enabled': False}))
+
+        rpc = apiproxy_rpc.RPC(deadline=1)
+
+        self.assertEqual(check(5000, rpc, DATASTORE_STUB), (5000, None))
+
+    def test_within_rpc_deadline(self):
+        """Ensure a stall shorter than the RPC's deadline is left alone."""
+        rpc = apiproxy_rpc.RPC(deadline=5)
+
+        self.assertEqual(check(4000, rpc, DATASTORE_STUB), (4000, None))
+
+    def test_rpc_deadline_timed_out(self):
+        """Ensure a stall overrunning the RPC's deadline is cut short and
+        times out with the service's error.
+        """
+        rpc = apiproxy_rpc.RPC(deadline=0.5)
+
+        milli_time, error = check(4000, rpc, DATASTORE_STUB)
+
+        self.assertEqual(milli_time, 500)
+        self.assertIsInstance(error, datastore_errors.Timeout)
+
+    def test_urlfetch_timed_out(self):
+        """Ensure a fetch times out with the urlfetch error."""
+        rpc = apiproxy_rpc.RPC(deadline=5)
+
+        _, error = check(10000, rpc, URLFETCH_STUB)
+
+        self.assertIsInstance(error, urlfetch_errors.DeadlineExceededError)
+
+    def test_default_rpc_error(self):
+        """Ensure services without an error of their own time out with the
+        API proxy's error.
+        """
+        rpc = apiproxy_rpc.RPC(deadline=1)
+
+        _, error = check(2000, rpc, MEMCACHE_STUB)
+
+        self.assertIsInstance(error, apiproxy_errors.DeadlineExceededError)
+
+    def test_clamped(self):
+        """Ensure in clamp mode the stall is only cut short."""
+        self._configure(MODES.CLAMP)
+
+        rpc = apiproxy_rpc.RPC(deadline=1)
+
+        self.assertEqual(check(2000, rpc, DATASTORE_STUB), (1000, None))
+
+    def test_rpc_without_service(self):
+        """Ensure an RPC deadline without the service times out with the API
+        proxy's error rather than the request's.
+        """
+        rpc = apiproxy_rpc.RPC(deadline=1)
+
+        _, error = check(2000, rpc)
+
+        self.assertIsInstance(error, apiproxy_errors.DeadlineExceededError)
+
+    @patch('gchaos.gae.datastore.latency._time_out')
+    @patch('gchaos.gae.datastore.latency._stall')
+    @patch('gchaos.gae.datastore.latency.roll', return_value=True)
+    def test_service_from_hook(self, roll, _stall_mock, time_out):
+        """Ensure the error is picked by the service the hook passes, the
+        RPC's package isn't set before it's made.
+        """
+        rpc = apiproxy_rpc.RPC(deadline=0.5)
+        trigger = latency_trigger(LatencyConfig((4000,), 1.0),
+                                  LATENCY_MODES.BLOCKING)
+
+        trigger(DATASTORE_STUB, 'Get', None, None, rpc)
+
+        _stall_mock.assert_called_once_with(500)
+        error, timed_out_rpc, _, _ = time_out.call_args[0]
+        self.assertIsInstance(error, datastore_errors.Timeout)
+        self.assertIs(timed_out_rpc, rpc)
+
+    @patch('gchaos.deadline.time')
+    def test_request_deadline(self, time_mock):
+        """Ensure a stall overrunning the request's deadline times out with
+        the runtime's error.
+        """
+        time_mock.return_value = 100.0
+        begin({})
+
+        time_mock.return_value = 155.0
+        rpc = apiproxy_rpc.RPC(deadline=30)
+
+        milli_time, error = check(10000, rpc, DATASTORE_STUB)
+
+        self.assertEqual(milli_time, 5000)
+        self.assertIsInstance(error, DeadlineExceededError)
+
+    @patch('gchaos.deadline.time')
+    def test_task_deadline(self, time_mock):
+        """Ensure task queue requests get the task deadline."""
+        time_mock.return_value = 100.0
+
+        begin({'HTTP_X_APPENGINE_QUEUENAME': 'default'})
+
+        self.assertEqual(remaining(), 600000)
+
+    @patch('gchaos.deadline.time')
+    def test_passed_deadline(self, time_mock):
+        """Ensure no time is left past the deadline."""
+        time_mock.return_value = 100.0
+        begin()
+
+        time_mock.return_value = 200.0
+
+        self.assertEqual(remaining(), 0)
+        self.assertEqual(check(1000)[0], 0)
+
+    def test_middleware(self):
+        """Ensure the middleware starts the request's deadline and drops it
+        after the request.
+        """
+        def app(environ, start_response):
+            self.assertGreater(remaining(), 59000)
+
+            return ['body']
+
+        result = deadline_middleware(app)({}, 'start_response')
+
+        self.assertEqual(result, ['body'])
+        self.assertIsNone(remaining())
+
+
+class DeadlinesConfigTestCase(unittest.TestCase):
+
+    def test_invalid_mode(self):
+        """Ensure an unknown mode is rejected."""
+        self.assertRaises(ValueError, DeadlinesConfig, {'mode': 'sleep'})
+
+    def test_invalid_deadline(self):
+        """Ensure a deadline that isn't positive is rejected."""
+        self.assertRaises(ValueError, DeadlinesConfig, {'request': 0})
@@ -0,0 +1,233 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import math
+import os
+import tempfile
+import unittest
+
+from mock import patch
+
+from gchaos.config.hydrate import LatencyConfig
+from gchaos.distributions import Distribution
+from gchaos.distributions import DISTRIBUTIONS
+from gchaos.distributions import from_config
+from gchaos.distributions import load_histogram
+from gchaos.distributions import normal_ppf
+from gchaos.errors import InvalidLatencyException
+
+
+class DistributionTestCase(unittest.TestCase):
+
+    def test_interpolates(self):
+        """Ensure values between table entries are interpolated."""
+        distribution = Distribution([0, 10, 20])
+
+        self.assertEqual(distribution.value_at(0.0), 0)
+        self.assertEqual(distribution.value_at(0.25), 5)
+        self.assertEqual(distribution.value_at(0.75), 15)
+        self.assertEqual(distribution.value_at(1.0), 20)
+
+    def test_max_value(self):
+        """Ensure values are capped to the max value."""
+        distribution = Distribution([0, 10, 20], max_value=15)
+
+        self.assertEqual(distribution.value_at(1.0), 15)
+
+    def test_tail(self):
+        """Ensure the top quantiles are drawn from the tail."""
+        distribution = Distribution([0, 10, 20], tail=lambda q: q * 100)
+
+        self.assertEqual(distribution.value_at(0.75), 15)
+        self.assertEqual(distribution.value_at(0.995), 99.5)
+
+    def test_tail_max_value(self):
+        """Ensure values from the tail are capped to the max value."""
+        distribution = Distribution(
+            [0, 10, 20], max_value=15, tail=lambda q: q * 100)
+
+        self.assertEqual(distribution.value_at(0.995), 15)
+
+    def test_table_too_small(self):
+        """Ensure a table needs at least two entries."""
+        self.assertRaises(InvalidLatencyException, Distribution, [1])
+
+    @patch('gchaos.distributions.uniform')
+    def test_sample(self, uniform_mock):
+        """Ensure sampling looks up the random quantile."""
+        uniform_mock.return_value = 0.5
+
+        self.assertEqual(Distribution([0, 10, 20]).sample(), 10)
+
+
+class FromConfigTestCase(unittest.TestCase):
+
+    def test_exponential(self):
+        """Ensure the exponential distribution has the right median."""
+        distribution = from_config({
+            'distribution': DISTRIBUTIONS.EXPONENTIAL, 'mean': 100})
+
+        self.assertAlmostEqual(
+            distribution.value_at(0.5), 100 * math.log(2), places=5)
+
+    def test_lognormal(self):
+        """Ensure the lognormal distribution has the right median and p99."""
+        distribution = from_config({
+            'distribution': DISTRIBUTIONS.LOGNORMAL, 'median': 200,
+            'sigma': 1.0})
+
+        self.assertAlmostEqual(distribution.value_at(0.5), 200, places=3)
+        self.assertAlmostEqual(
+            distribution.value_at(0.99), 200 * math.exp(2.326348), delta=1)
+
+    def test_pareto(self):
+        """Ensure the pareto distribution starts at its scale and has the
+        right median.
+        """
+        distribution = from_config({
+            'distribution': DISTRIBUTIONS.PARETO, 'scale': 100, 'alpha': 2})
+
+        self.assertEqual(distribution.value_at(0.0), 100)
+        self.assertAlmostEqual(
+            distribution.value_at(0.5), 100 * math.sqrt(2), places=5)
+
+    def test_heavy_tail(self):
+        """Ensure the far tail of a heavy tailed distribution matches its
+        closed form instead of being interpolated.
+        """
+        distribution = from_config({
+            'distribution': DISTRIBUTIONS.PARETO, 'scale': 10, 'alpha': 1})
+
+        for quantile in (0.999, 0.9995, 0.9999):
+            self.assertAlmostEqual(
+                distribution.value_at(quantile), 10 / (1 - quantile),
+                delta=10 / (1 - quantile) * 1e-6)
+
+    def test_lognormal_tail(self):
+        """Ensure the lognormal p99.9 and p99.99 match the closed form."""
+        distribution = from_config({
+            'distribution': DISTRIBUTIONS.LOGNORMAL, 'median': 200,
+            'sigma': 1.0})
+
+        self.assertAlmostEqual(
+            distribution.value_at(0.999), 200 * math.exp(3.090232), delta=1)
+        self.assertAlmostEqual(
+            distribution.value_at(0.9999), 200 * math.exp(3.719016),
+            delta=1)
+
+    def test_percentiles(self):
+        """Ensure the percentiles table passes through each percentile."""
+        distribution = from_config({
+            'distribution': DISTRIBUTIONS.PERCENTILES,
+            'percentiles': {50: 100, 90: 500, 99.9: 5000},
+        })
+
+        self.assertEqual(distribution.value_at(0.0), 0)
+        self.assertAlmostEqual(distribution.value_at(0.5), 100)
+        self.assertEqual(distribution.value_at(1.0), 5000)
+
+        # Percentiles that don't fall on a table entry are within a step of
+        # the table.
+        self.assertAlmostEqual(distribution.value_at(0.9), 500, delta=25)
+        self.assertAlmostEqual(distribution.value_at(0.999), 5000, delta=25)
+
+    def test_histogram_buckets(self):
+        """Ensure a histogram reaches each bucket at its cumulative share."""
+        distribution = from_config({
+            'distribution': DISTRIBUTIONS.HISTOGRAM,
+            'buckets': [(300, 1), (100, 2), (200, 1)],
+        })
+
+        self.assertEqual(distribution.value_at(0.0), 100)
+        self.assertAlmostEqual(distribution.value_at(0.5), 100)
+        self.assertAlmostEqual(distribution.value_at(0.75), 200)
+        self.assertEqual(distribution.value_at(1.0), 300)
+
+    def test_histogram_path(self):
+        """Ensure a histogram can be loaded from a CSV file."""
+        fd, path = tempfile.mkstemp(suffix=".csv")
+
+        try:
+            with os.fdopen(fd, 'w') as histogram:
+                histogram.write("latency_ms,count\n100,2\n200,2\n")
+
+            distribution = from_config({
+                'distribution': DISTRIBUTIONS.HISTOGRAM, 'path': path})
+        finally:
+            os.remove(path)
+
+        self.assertAlmostEqual(distribution.value_at(0.5), 100)
+        self.assertEqual(distribution.value_at(1.0), 200)
+
+    def test_max(self):
+        """Ensure the max caps unbounded distributions."""
+        distribution = from_config({
+            'distribution': DISTRIBUTIONS.PARETO, 'scale': 100, 'alpha': 1,
+            'max': 1000})
+
+        self.assertEqual(distribution.value_at(1.0), 1000)
+
+    def test_unknown_distribution(self):
+        """Ensure an unknown distribution raises InvalidLatencyException."""
+        self.assertRaises(
+            InvalidLatencyException, from_config, {'distribution': 'foo'})
+
+    def test_missing_parameter(self):
+        """Ensure a missing parameter raises InvalidLatencyException."""
+        self.assertRaises(
+            InvalidLatencyException, from_config,
+            {'distribution': DISTRIBUTIONS.PARETO, 'scale': 100})
+
+    def test_hydrated_by_latency_config(self):
+        """Ensure a LatencyConfig builds the distribution."""
+        config = LatencyConfig(
+            {'distribution': DISTRIBUTIONS.EXPONENTIAL, 'mean': 100}, 0.5)
+
+        self.assertIsInstance(config.latency, Distribution)
+
+
+class LoadHistogramTestCase(unittest.TestCase):
+
+    def test_rows_without_counts(self):
+        """Ensure rows without counts count once and headers are skipped."""
+        fd, path = tempfile.mkstemp(suffix=".csv")
+
+        try:
+            with os.fdopen(fd, 'w') as histogram:
+                histogram.write("latency_ms\n100\n250.5\n\n")
+
+            result = load_histogram(path)
+        finally:
+            os.remove(path)
+
+        self.assertEqual(result, [(100.0, 1.0), (250.5, 1.0)])
+
+
+class NormalPPFTestCase(unittest.TestCase):
+
+    def test_known_values(self):
+        """Ensure the approximation matches known normal quantiles."""
+        self.assertAlmostEqual(normal_ppf(0.5), 0.0)
+        self.assertAlmostEqual(normal_ppf(0.975), 1.959964, places=5)
+        self.assertAlmostEqual(normal_ppf(0.001), -3.090232, places=5)
+        self.assertAlmostEqual(normal_ppf(0.999), 3.090232, places=5)
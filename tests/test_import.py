@@ -0,0 +1,59 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+import subprocess
+import sys
+import unittest
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHECK = """
+import sys
+{0}
+print ','.join(sorted(name for name, module in sys.modules.items()
+                      if module and name.split('.')[0] in ('google', 'numpy')))
+"""
+
+
+def _imported(statement):
+    """Return the SDK and NumPy modules imported by the statement in a new
+    interpreter.
+    """
+    output = subprocess.check_output(
+        [sys.executable, '-c', CHECK.format(statement)], cwd=ROOT)
+
+    return [name for name in output.strip().split(',') if name]
+
+
+class LazyImportTestCase(unittest.TestCase):
+
+    def test_import_gchaos(self):
+        """Ensure importing gchaos doesn't import the SDK or NumPy."""
+        self.assertEqual(_imported("import gchaos"), [])
+
+    def test_import_install(self):
+        """Ensure loading the default config and hooks doesn't import the
+        SDK or NumPy.
+        """
+        self.assertEqual(_imported("import gchaos.install"), [])
@@ -0,0 +1,53 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import logging
+import unittest
+
+from gchaos.log import logger
+from gchaos.log import set_quiet
+
+
+class SetQuietTestCase(unittest.TestCase):
+
+    def tearDown(self):
+        set_quiet(False)
+
+        super(SetQuietTestCase, self).tearDown()
+
+    def test_quiet(self):
+        """Ensure in quiet mode debug messages are dropped but info messages
+        are still emitted.
+        """
+        set_quiet(True)
+
+        self.assertFalse(logger.isEnabledFor(logging.DEBUG))
+        self.assertTrue(logger.isEnabledFor(logging.INFO))
+
+    def test_not_quiet(self):
+        """Ensure when not quiet the logger defers to the root logger's
+        level.
+        """
+        set_quiet(False)
+
+        self.assertEqual(logger.level, logging.NOTSET)
@@ -0,0 +1,154 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import unittest
+
+from mock import patch
+
+from gchaos.matcher import glob_to_regex
+from gchaos.matcher import Matcher
+from gchaos.matcher import parse_rule
+from gchaos.matcher import RULES
+
+
+class ParseRuleTestCase(unittest.TestCase):
+
+    def test_exact(self):
+        """Ensure a rule without a type or wildcard is exact."""
+        self.assertEqual(parse_rule("Session"), (RULES.EXACT, "Session"))
+
+    def test_glob(self):
+        """Ensure a rule with a wildcard is a glob."""
+        self.assertEqual(parse_rule("Counter*"), (RULES.GLOB, "Counter*"))
+
+    def test_typed(self):
+        """Ensure the type prefix is split off the pattern."""
+        self.assertEqual(parse_rule("prefix:Log"), (RULES.PREFIX, "Log"))
+        self.assertEqual(parse_rule("re:^a:b$"), (RULES.REGEX, "^a:b$"))
+
+    def test_unknown_type(self):
+        """Ensure a colon that isn't a type is part of the pattern."""
+        self.assertEqual(
+            parse_rule("Session:abc"), (RULES.EXACT, "Session:abc"))
+
+
+class GlobToRegexTestCase(unittest.TestCase):
+
+    def test_wildcards(self):
+        """Ensure the wildcards are converted and everything else is
+        escaped.
+        """
+        self.assertEqual(glob_to_regex("a.*?"), r"a\..*.\Z")
+
+
+class MatcherTestCase(unittest.TestCase):
+
+    def test_empty(self):
+        """Ensure a matcher without rules is falsy and matches nothing."""
+        matcher = Matcher()
+
+        self.assertFalse(matcher)
+        self.assertFalse(matcher.match("Session"))
+
+    def test_exact(self):
+        """Ensure exact rules only match the whole value."""
+        matcher = Matcher(["Session"])
+
+        self.assertTrue(matcher)
+        self.assertTrue(matcher.match("Session"))
+        self.assertFalse(matcher.match("SessionLog"))
+        self.assertIsNone(matcher.pattern)
+
+    def test_prefix(self):
+        """Ensure prefix rules match the start of the value."""
+        matcher = Matcher(["prefix:Log."])
+
+        self.assertTrue(matcher.match("Log.Entry"))
+        self.assertFalse(matcher.match("LogXEntry"))
+
+    def test_glob(self):
+        """Ensure glob rules match the whole value."""
+        matcher = Matcher(["Counter*Shard", "User?"])
+
+        self.assertTrue(matcher.match("CounterPageShard"))
+        self.assertFalse(matcher.match("CounterPageShards"))
+        self.assertTrue(matcher.match("User1"))
+        self.assertFalse(matcher.match("User12"))
+
+    def test_regex(self):
+        """Ensure regex rules are matched from the start of the value."""
+        matcher = Matcher([r"re:User:\d+$"])
+
+        self.assertTrue(matcher.match("User:42"))
+        self.assertFalse(matcher.match("User:abc"))
+        self.assertFalse(matcher.match("Parent:1/User:42"))
+
+    def test_combined(self):
+        """Ensure the non exact rules are compiled into one expression."""
+        matcher = Matcher(["Session", "Counter*", "prefix:Log", "re:a+$"])
+
+        self.assertEqual(matcher.exact, {"Session": True})
+        self.assertEqual(matcher.pattern.pattern.count('|'), 2)
+
+        for value in ("Session", "Counter", "Logs", "aaa"):
+            self.assertTrue(matcher.match(value))
+
+        self.assertFalse(matcher.match("Other"))
+
+    def test_ignore_case(self):
+        """Ensure rules match regardless of case without changing what the
+        regex rules mean.
+        """
+        matcher = Matcher(["Session", "prefix:Log", r"re:U\D+$"],
+                          ignore_case=True)
+
+        self.assertEqual(matcher.exact, {"session": True})
+
+        for value in ("session", "logs", "user"):
+            self.assertTrue(matcher.match(value))
+
+        self.assertFalse(matcher.match("u42"))
+
+    def test_invalid_regex(self):
+        """Ensure an invalid regex raises a ValueError."""
+        self.assertRaises(ValueError, Matcher, ["re:("])
+
+    def test_results_remembered(self):
+        """Ensure the regex is only matched once for a value."""
+        matcher = Matcher(["Counter*"])
+        matcher.match("Counter")
+
+        with patch.object(matcher, 'pattern') as pattern:
+            self.assertTrue(matcher.match("Counter"))
+
+        pattern.match.assert_not_called()
+
+    @patch('gchaos.matcher.MATCH_CACHE_SIZE', 2)
+    def test_cache_bounded(self):
+        """Ensure the remembered results are dropped once full."""
+        matcher = Matcher(["Counter*"])
+
+        for value in ("a", "b", "c"):
+            matcher.match(value)
+
+        self.assertEqual(len(matcher._cache), 1)
@@ -0,0 +1,304 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import json
+import unittest
+
+from threading import Thread
+
+from mock import MagicMock
+from mock import patch
+
+from gchaos import metrics
+from gchaos.config.hydrate import ErrorConfig
+from gchaos.config.hydrate import MetricsConfig
+from gchaos.gae.datastore.errors import trigger
+from gchaos.gae.datastore.latency import stall
+from gchaos.metrics import configure
+from gchaos.metrics import count_error
+from gchaos.metrics import count_stall
+from gchaos.metrics import Histogram
+from gchaos.metrics import instrument
+from gchaos.metrics import metrics_app
+from gchaos.metrics import reset
+from gchaos.metrics import snapshot
+from gchaos.metrics import to_prometheus
+
+
+class HistogramTestCase(unittest.TestCase):
+
+    def test_buckets(self):
+        """Ensure values land in the first bucket bounding them."""
+        histogram = Histogram((10, 100))
+
+        for value in (1, 10, 11, 100, 1000):
+            histogram.add(value)
+
+        self.assertEqual(histogram.counts, [2, 2, 1])
+        self.assertEqual(histogram.sum, 1122)
+        self.assertEqual(histogram.count, 5)
+        self.assertEqual(histogram.cumulative(),
+                         [(10, 2), (100, 4), ('+Inf', 5)])
+
+    def test_merge(self):
+        """Ensure merging adds up the buckets, sum and count."""
+        first = Histogram((10,))
+        second = Histogram((10,))
+        first.add(5)
+        second.add(50)
+        second.add(5)
+
+        first.merge(second)
+
+        self.assertEqual(first.counts, [2, 1])
+        self.assertEqual(first.sum, 60)
+        self.assertEqual(first.count, 3)
+
+
+class MetricsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.original_config = metrics._CONFIG
+
+        configure(MetricsConfig({'enabled': True}))
+        reset()
+
+        super(MetricsTestCase, self).setUp()
+
+    def tearDown(self):
+        metrics._CONFIG = self.original_config
+        reset()
+
+        super(MetricsTestCase, self).tearDown()
+
+    def test_disabled_hook_untouched(self):
+        """Ensure hooks aren't wrapped while metrics are off."""
+        configure(MetricsConfig({}))
+        handler = MagicMock()
+
+        self.assertIs(instrument('memcache', handler), handler)
+        self.assertEqual(snapshot(), {'enabled': False})
+        self.assertEqual(to_prometheus(), '')
+
+    def test_rpcs_counted(self):
+        """Ensure RPCs are counted by service and call."""
+        handler = MagicMock()
+        hook = instrument('memcache', handler)
+
+        hook('memcache', 'Get', 1, 2, 3)
+        hook('memcache', 'Get', 1, 2)
+        hook('memcache', 'Set', 1, 2)
+
+        handler.assert_called_with('memcache', 'Set', 1, 2, None)
+        self.assertEqual(snapshot()['rpcs'],
+                         {'memcache': {'Get': 2, 'Set': 1}})
+        self.assertEqual(snapshot()['hook_overhead_us']['count'], 3)
+
+    def test_rpc_counted_when_hook_raises(self):
+        """Ensure an RPC the hook fails is still counted and timed."""
+        hook = instrument('memcache', MagicMock(side_effect=ValueError))
+
+        self.assertRaises(ValueError, hook, 'memcache', 'Get', 1, 2)
+
+        self.assertEqual(snapshot()['rpcs'], {'memcache': {'Get': 1}})
+        self.assertEqual(snapshot()['hook_overhead_us']['count'], 1)
+
+    @patch('gchaos.metrics.time')
+    def test_overhead_excludes_stalls(self, time):
+        """Ensure time slept on stalls isn't counted as hook overhead."""
+        time.side_effect = [10.0, 10.5]
+
+        def handler(*args):
+            count_stall(499.8)
+
+        instrument('datastore_v3', handler)('datastore_v3', 'Get', 1, 2)
+
+        overhead = snapshot()['hook_overhead_us']
+        self.assertAlmostEqual(overhead['sum'], 200, places=3)
+        self.assertEqual(overhead['buckets'][4], [100, 0])
+        self.assertEqual(overhead['buckets'][5], [250, 1])
+
+    @patch('gchaos.metrics.time')
+    def test_deferred_stall_is_overhead(self, time):
+        """Ensure a stall left for the RPC's waiter isn't taken off."""
+        time.side_effect = [10.0, 10.001]
+
+        def handler(*args):
+            count_stall(500, slept=False)
+
+        instrument('datastore_v3', handler)('datastore_v3', 'Get', 1, 2)
+
+        self.assertAlmostEqual(
+            snapshot()['hook_overhead_us']['sum'], 1000, places=3)
+        self.assertEqual(snapshot()['stall_ms']['sum'], 500)
+
+    def test_threads_added_up(self):
+        """Ensure every thread's counts are added up."""
+        def work():
+            for _ in xrange(100):
+                count_error(ValueError())
+                count_stall(20)
+
+        threads = [Thread(target=work) for _ in xrange(4)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        metrics_snapshot = snapshot()
+        self.assertEqual(metrics_snapshot['errors'], {'ValueError': 400})
+        self.assertEqual(metrics_snapshot['stall_ms']['count'], 400)
+        self.assertEqual(metrics_snapshot['stall_ms']['buckets'][1],
+                         [50, 400])
+
+    def test_reset(self):
+        """Ensure reset drops what was counted."""
+        count_error(ValueError())
+
+        reset()
+        count_error(KeyError())
+
+        self.assertEqual(snapshot()['errors'], {'KeyError': 1})
+
+    def test_new_buckets_start_over(self):
+        """Ensure changing the buckets drops the counts that don't fit."""
+        count_stall(20)
+
+        configure(MetricsConfig({'enabled': True, 'stall_buckets': [1]}))
+
+        self.assertEqual(snapshot()['stall_ms']['count'], 0)
+
+        count_stall(20)
+
+        self.assertEqual(snapshot()['stall_ms']['buckets'],
+                         [[1, 0], ['+Inf', 1]])
+
+    @patch('gchaos.gae.datastore.latency.sleep')
+    def test_stall_counted(self, sleep):
+        """Ensure injected latency is counted."""
+        stall((25,))
+
+        self.assertEqual(snapshot()['stall_ms']['sum'], 25)
+
+    @patch('gchaos.gae.datastore.errors.roll', return_value=True)
+    def test_error_counted(self, roll):
+        """Ensure raised errors are counted by class."""
+        error_config = ErrorConfig({KeyError: 1}, 1.0)
+
+        self.assertRaises(KeyError, trigger, error_config)
+
+        self.assertEqual(snapshot()['errors'], {'KeyError': 1})
+
+    def test_prometheus(self):
+        """Ensure the Prometheus text has the counters and histograms."""
+        instrument('memcache', MagicMock())('memcache', 'Get', 1, 2)
+        count_error(ValueError())
+        count_stall(20)
+
+        text = to_prometheus()
+
+        self.assertIn(
+            'gchaos_rpcs_total{service="memcache",call="Get"} 1\n', text)
+        self.assertIn('gchaos_errors_total{error="ValueError"} 1\n', text)
+        self.assertIn('gchaos_stall_milliseconds_bucket{le="10"} 0\n', text)
+        self.assertIn('gchaos_stall_milliseconds_bucket{le="50"} 1\n', text)
+        self.assertIn(
+            'gchaos_stall_milliseconds_bucket{le="+Inf"} 1\n', text)
+        self.assertIn('gchaos_stall_milliseconds_count 1\n', text)
+        self.assertIn('# TYPE gchaos_hook_overhead_microseconds histogram\n',
+                      text)
+
+
+class MetricsAppTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.original_config = metrics._CONFIG
+
+        configure(MetricsConfig({'enabled': True}))
+        reset()
+
+        super(MetricsAppTestCase, self).setUp()
+
+    def tearDown(self):
+        metrics._CONFIG = self.original_config
+        reset()
+
+        super(MetricsAppTestCase, self).tearDown()
+
+    def request(self, environ):
+        start_response = MagicMock()
+        body = ''.join(metrics_app(environ, start_response))
+        status, headers = start_response.call_args[0]
+
+        self.assertEqual(status, '200 OK')
+
+        return dict(headers)['Content-Type'], body
+
+    def test_json_by_default(self):
+        """Ensure the metrics are served as JSON by default."""
+        count_error(ValueError())
+
+        content_type, body = self.request({})
+
+        self.assertEqual(content_type, 'application/json')
+        self.assertEqual(json.loads(body)['errors'], {'ValueError': 1})
+
+    def test_prometheus_format(self):
+        """Ensure the format parameter asks for Prometheus text."""
+        content_type, body = self.request(
+            {'QUERY_STRING': 'format=prometheus'})
+
+        self.assertTrue(content_type.startswith('text/plain'))
+        self.assertIn('# TYPE gchaos_rpcs_total counter', body)
+
+    def test_prometheus_accept(self):
+        """Ensure a scraper accepting text/plain gets Prometheus text."""
+        content_type, _ = self.request({'HTTP_ACCEPT': 'text/plain'})
+
+        self.assertTrue(content_type.startswith('text/plain'))
+
+    def test_format_beats_accept(self):
+        """Ensure the format parameter wins over the Accept header."""
+        content_type, _ = self.request({
+            'QUERY_STRING': 'format=json', 'HTTP_ACCEPT': 'text/plain'})
+
+        self.assertEqual(content_type, 'application/json')
+
+
+class MetricsConfigTestCase(unittest.TestCase):
+
+    def test_defaults(self):
+        """Ensure metrics are off with the default buckets."""
+        config = MetricsConfig({})
+
+        self.assertFalse(config.enabled)
+        self.assertEqual(config.stall_buckets[-1], 60000)
+
+    def test_bad_buckets(self):
+        """Ensure bucket bounds must be positive and increasing."""
+        self.assertRaises(ValueError, MetricsConfig, {'stall_buckets': []})
+        self.assertRaises(
+            ValueError, MetricsConfig, {'overhead_buckets': [0, 10]})
+        self.assertRaises(
+            ValueError, MetricsConfig, {'stall_buckets': [10, 10]})
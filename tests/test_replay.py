@@ -0,0 +1,337 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from mock import MagicMock
+from mock import patch
+
+from gchaos import replay
+from gchaos.config.hydrate import ReplayConfig
+from gchaos.gae.memcache.bypass import bypass
+from gchaos.gae.rpc import after_completion
+from gchaos.gae.rpc import raise_on_completion
+from gchaos.replay import begin
+from gchaos.replay import configure
+from gchaos.replay import DECISIONS
+from gchaos.replay import end
+from gchaos.replay import HEADER
+from gchaos.replay import instrument
+from gchaos.replay import RECORD
+from gchaos.replay import record_stall
+from gchaos.replay import replay_middleware
+from gchaos.replay import Schedule
+from gchaos.replay import ScheduleWriter
+
+
+class FakeRPC(object):
+
+    def __init__(self):
+        self.calls = []
+
+    def CheckSuccess(self):
+        self.calls.append("CheckSuccess")
+
+
+class ReplayTestCase(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, 'chaos.schedule')
+
+        super(ReplayTestCase, self).setUp()
+
+    def tearDown(self):
+        replay.close()
+        end()
+
+        super(ReplayTestCase, self).tearDown()
+
+
+class ScheduleTestCase(ReplayTestCase):
+
+    def test_round_trip(self):
+        """Ensure appended decisions read back by number and by RPC."""
+        writer = ScheduleWriter(self.path, grow_by=2)
+
+        for sequence in xrange(5):
+            writer.append(7, sequence, 99, DECISIONS.STALL, sequence * 1.5)
+
+        self.assertEqual(writer.append(7, 1, 99, DECISIONS.ERROR,
+                                       error=KeyError), 5)
+        writer.close()
+
+        self.assertEqual(os.path.getsize(self.path),
+                         HEADER.size + 6 * RECORD.size)
+
+        schedule = Schedule(self.path)
+
+        self.assertEqual(len(schedule), 6)
+        self.assertEqual(schedule.decision(4).stall_ms, 6.0)
+        self.assertRaises(IndexError, schedule.decision, 6)
+
+        stall, error = schedule.decisions(7, 1)
+        self.assertEqual((stall.decision, stall.stall_ms),
+                         (DECISIONS.STALL, 1.5))
+        self.assertEqual((error.decision, error.error),
+                         (DECISIONS.ERROR, 'exceptions.KeyError'))
+        self.assertEqual(schedule.decisions(8, 1), [])
+
+    def test_unclosed(self):
+        """Ensure a recording still being written can be read."""
+        writer = ScheduleWriter(self.path)
+        writer.append(1, 0, 2, DECISIONS.STALL, 10)
+
+        self.assertEqual(len(Schedule(self.path)), 1)
+
+        writer.close()
+
+    def test_not_a_schedule(self):
+        """Ensure other files are refused."""
+        with open(self.path, 'wb') as schedule_file:
+            schedule_file.write('\0' * HEADER.size)
+
+        self.assertRaises(ValueError, Schedule, self.path)
+
+    def test_closed_writer(self):
+        """Ensure appending after closing is ignored."""
+        writer = ScheduleWriter(self.path)
+        writer.close()
+
+        self.assertIsNone(writer.append(1, 0, 2, DECISIONS.STALL, 10))
+
+
+class RequestIdTestCase(ReplayTestCase):
+
+    def setUp(self):
+        super(RequestIdTestCase, self).setUp()
+
+        configure(ReplayConfig({'enabled': True, 'path': self.path}))
+
+    def test_same_url(self):
+        """Ensure requests to the same URL are told apart by their order."""
+        environ = {'REQUEST_METHOD': 'GET', 'PATH_INFO': '/a'}
+
+        first = begin(environ)
+        second = begin(environ)
+
+        self.assertEqual(second, first + 1)
+        self.assertNotEqual(begin({'PATH_INFO': '/b'}) >> 32, first >> 32)
+
+    def test_repeatable(self):
+        """Ensure a new recording gives the requests the same ids."""
+        environ = {'HTTP_X_GCHAOS_REQUEST_ID': 'abc', 'PATH_INFO': '/a'}
+        first = begin(environ)
+
+        replay.close()
+        configure(ReplayConfig({'enabled': True, 'path': self.path}))
+
+        self.assertEqual(begin(environ), first)
+        self.assertEqual(begin({'HTTP_X_GCHAOS_REQUEST_ID': 'abc'}),
+                         first + 1)
+
+    def test_middleware(self):
+        """Ensure the middleware numbers each request's RPCs from zero."""
+        def app(environ, start_response):
+            self.assertEqual(replay._next_key('memcache', 'Get')[1], 0)
+            self.assertEqual(replay._next_key('memcache', 'Get')[1], 1)
+
+        replay_middleware(app)({'PATH_INFO': '/a'}, None)
+
+        self.assertEqual(replay._LOCAL.request_id, 0)
+
+
+class RecordReplayTestCase(ReplayTestCase):
+
+    def record(self, handler):
+        configure(ReplayConfig({'enabled': True, 'path': self.path}))
+        hook = instrument('memcache', handler)
+
+        begin({'PATH_INFO': '/a'})
+        self.run_request(hook)
+
+        replay.close()
+
+    def run_request(self, hook):
+        """Make the RPCs of a request, returning those made and whether
+        each raised on the spot.
+        """
+        rpcs = []
+        raised = []
+
+        for call in ('Get', 'Set', 'Get'):
+            rpc = FakeRPC()
+            rpcs.append(rpc)
+
+            try:
+                hook('memcache', call, None, None, rpc)
+                raised.append(False)
+            except KeyError:
+                raised.append(True)
+
+        return rpcs, raised
+
+    def test_disabled(self):
+        """Ensure hooks aren't wrapped while off."""
+        handler = MagicMock()
+
+        self.assertIs(instrument('memcache', handler), handler)
+
+    def test_reconfigure_keeps_recording(self):
+        """Ensure reloading the same config doesn't start over."""
+        configure(ReplayConfig({'enabled': True, 'path': self.path}))
+        writer = replay._WRITER
+
+        configure(ReplayConfig({'enabled': True, 'path': self.path}))
+
+        self.assertIs(replay._WRITER, writer)
+
+    def test_recorded(self):
+        """Ensure decisions are recorded against their RPC."""
+        def handler(service, call, request, response, rpc):
+            if call == 'Set':
+                raise KeyError()
+
+            record_stall(25)
+            raise_on_completion(rpc, ValueError())
+
+        self.record(handler)
+
+        schedule = Schedule(self.path)
+        request_id = replay._LOCAL.request_id
+
+        self.assertEqual(
+            [decision.decision for decision in schedule.decisions(
+                request_id, 0)],
+            [DECISIONS.STALL, DECISIONS.COMPLETION_ERROR])
+        self.assertEqual(
+            [decision.error for decision in schedule.decisions(
+                request_id, 1)], ['exceptions.KeyError'])
+        self.assertEqual(len(schedule.decisions(request_id, 2)), 2)
+
+    def test_completion_recorded(self):
+        """Ensure what happens when the RPC completes is recorded."""
+        def handler(service, call, request, response, rpc):
+            after_completion(rpc, lambda: record_stall(5))
+
+        configure(ReplayConfig({'enabled': True, 'path': self.path}))
+        hook = instrument('memcache', handler)
+        rpc = FakeRPC()
+
+        request_id = begin({'PATH_INFO': '/a'})
+        hook('memcache', 'Get', None, None, rpc)
+        rpc.CheckSuccess()
+        replay.close()
+
+        decision, = Schedule(self.path).decisions(request_id, 0)
+
+        self.assertEqual(decision.decision, DECISIONS.COMPLETION_STALL)
+        self.assertEqual(decision.stall_ms, 5)
+
+    @patch('gchaos.replay.sleep')
+    def test_replayed(self, sleep):
+        """Ensure the recorded schedule is injected instead of the hook."""
+        def handler(service, call, request, response, rpc):
+            if call == 'Set':
+                raise KeyError()
+
+            record_stall(25)
+            raise_on_completion(rpc, ValueError())
+
+        self.record(handler)
+
+        configure(ReplayConfig({
+            'enabled': True, 'mode': 'replay', 'path': self.path}))
+        replayed = MagicMock()
+        hook = instrument('memcache', replayed)
+
+        begin({'PATH_INFO': '/a'})
+        rpcs, raised = self.run_request(hook)
+
+        self.assertFalse(replayed.called)
+        self.assertEqual(raised, [False, True, False])
+        self.assertEqual(sleep.call_count, 2)
+        sleep.assert_called_with(0.025)
+        self.assertRaises(ValueError, rpcs[0].CheckSuccess)
+
+    @patch('gchaos.replay.sleep')
+    def test_reload_not_numbered(self, sleep):
+        """Ensure gchaos's own memcache calls, like reloading the config,
+        don't shift the RPCs after them.
+        """
+        def handler(service, call, request, response, rpc):
+            if call == 'Set':
+                raise KeyError()
+
+            record_stall(25)
+
+        self.record(handler)
+
+        configure(ReplayConfig({
+            'enabled': True, 'mode': 'replay', 'path': self.path}))
+        hook = instrument('memcache', MagicMock())
+
+        begin({'PATH_INFO': '/a'})
+
+        with bypass():
+            hook('memcache', 'Get', None, None, FakeRPC())
+
+        rpcs, raised = self.run_request(hook)
+
+        self.assertEqual(raised, [False, True, False])
+        self.assertEqual(sleep.call_count, 2)
+
+    @patch('gchaos.replay.sleep')
+    def test_diverged(self, sleep):
+        """Ensure nothing is injected into an RPC that wasn't recorded."""
+        def handler(service, call, request, response, rpc):
+            record_stall(25)
+
+        self.record(handler)
+
+        configure(ReplayConfig({
+            'enabled': True, 'mode': 'replay', 'path': self.path}))
+        hook = instrument('memcache', MagicMock())
+
+        begin({'PATH_INFO': '/a'})
+        hook('memcache', 'Delete', None, None, FakeRPC())
+        hook('memcache', 'Set', None, None, FakeRPC())
+
+        self.assertEqual(sleep.call_count, 1)
+
+
+class ReplayConfigTestCase(unittest.TestCase):
+
+    def test_defaults(self):
+        """Ensure recording is off by default."""
+        config = ReplayConfig({})
+
+        self.assertFalse(config.enabled)
+        self.assertEqual(config.mode, 'record')
+
+    def test_bad_mode(self):
+        """Ensure unknown modes are refused."""
+        self.assertRaises(ValueError, ReplayConfig, {'mode': 'rewind'})
@@ -0,0 +1,106 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import unittest
+
+from gchaos.sketch import MAX_EXPONENT
+from gchaos.sketch import SpaceSaving
+
+
+class SpaceSavingTestCase(unittest.TestCase):
+
+    def test_invalid(self):
+        """Ensure a capacity or half life that isn't positive raises a
+        ValueError.
+        """
+        self.assertRaises(ValueError, SpaceSaving, 0)
+        self.assertRaises(ValueError, SpaceSaving, 1, 0)
+
+    def test_counts(self):
+        """Ensure items are counted exactly while there's room."""
+        sketch = SpaceSaving(3)
+
+        for item in "abacab":
+            sketch.add(item)
+
+        self.assertEqual(sketch.estimate("a"), 3)
+        self.assertEqual(sketch.estimate("b"), 2)
+        self.assertEqual(sketch.estimate("d"), 0)
+        self.assertEqual(sketch.top(2), [("a", 3, 0), ("b", 2, 0)])
+
+    def test_replaces_lowest(self):
+        """Ensure a new item replaces the lowest count and inherits it."""
+        sketch = SpaceSaving(2)
+
+        for item in "aaab":
+            sketch.add(item)
+
+        self.assertEqual(sketch.add("c"), 2)
+
+        self.assertEqual(len(sketch), 2)
+        self.assertEqual(sketch.estimate("b"), 0)
+        self.assertEqual(sketch.top(), [("a", 3, 0), ("c", 2, 1)])
+
+    def test_heavy_hitters(self):
+        """Ensure the heavy hitters of a long tail stream are found in fixed
+        memory.
+        """
+        sketch = SpaceSaving(10)
+
+        for i in xrange(10000):
+            sketch.add("hot" if i % 4 == 0 else "warm" if i % 8 == 1 else i)
+
+        self.assertEqual(len(sketch), 10)
+        self.assertEqual([item for item, _, _ in sketch.top(2)],
+                         ["hot", "warm"])
+
+    def test_decay(self):
+        """Ensure counts halve every half life."""
+        sketch = SpaceSaving(2, half_life=10, now=100.0)
+
+        sketch.add("a", now=100.0, count=8)
+
+        self.assertAlmostEqual(sketch.estimate("a", now=110.0), 4)
+        self.assertAlmostEqual(sketch.add("a", now=120.0), 3)
+
+    def test_rate(self):
+        """Ensure a steady rate is recovered from the decayed count."""
+        sketch = SpaceSaving(1, half_life=1)
+
+        for i in xrange(2000):
+            count = sketch.add("a", now=i / 100.0)
+
+        self.assertAlmostEqual(sketch.rate(count), 100, delta=1)
+
+    def test_rescale(self):
+        """Ensure counts are kept when the scale is brought back down."""
+        sketch = SpaceSaving(2, half_life=1)
+
+        sketch.add("a", now=0.0, count=2 ** 80)
+
+        later = MAX_EXPONENT / sketch.rate(1) + 10
+        sketch.add("b", now=later)
+
+        self.assertAlmostEqual(sketch.estimate("a", now=later) / 2 ** 80,
+                               0.5 ** later)
+        self.assertAlmostEqual(sketch.estimate("b", now=later), 1)
@@ -0,0 +1,246 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from mock import MagicMock
+from mock import patch
+
+from google.appengine.api import apiproxy_rpc
+
+from gchaos import tracing
+from gchaos.config.hydrate import ErrorConfig
+from gchaos.config.hydrate import LatencyConfig
+from gchaos.config.hydrate import TracingConfig
+from gchaos.gae.datastore.errors import trigger
+from gchaos.gae.datastore.latency import latency_trigger
+from gchaos.gae.datastore.latency import MODES as LATENCY_MODES
+from gchaos.settings import DATASTORE_STUB
+from gchaos.tracing import Annotation
+from gchaos.tracing import configure
+from gchaos.tracing import flush
+from gchaos.tracing import JsonFileExporter
+from gchaos.tracing import parse_trace_context
+from gchaos.tracing import to_span
+from gchaos.tracing import trace_error
+from gchaos.tracing import trace_stall
+
+
+def exporter(spans):
+    """Stand in exporter the tests point the config at."""
+    exporter.batches.append(spans)
+
+
+exporter.batches = []
+
+
+class TracingTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.original_config = tracing._CONFIG
+        exporter.batches = []
+
+        configure(TracingConfig({
+            'enabled': True, 'batch_size': 2, 'flush_interval': 3600,
+            'exporter': 'tests.test_tracing.exporter'}))
+
+        super(TracingTestCase, self).setUp()
+
+    def tearDown(self):
+        flush()
+        tracing._CONFIG = self.original_config
+
+        super(TracingTestCase, self).tearDown()
+
+    def test_disabled(self):
+        """Ensure nothing is buffered while tracing is off."""
+        configure(TracingConfig({}))
+
+        trace_error(ValueError(), DATASTORE_STUB, 'Get')
+
+        self.assertEqual(flush(), 0)
+        self.assertEqual(exporter.batches, [])
+
+    @patch('gchaos.tracing._start_flush')
+    def test_batches(self, start_flush):
+        """Ensure annotations are exported in batches."""
+        for _ in xrange(3):
+            trace_stall(10, DATASTORE_STUB, 'Get')
+
+        self.assertEqual(flush(), 3)
+        self.assertEqual([len(batch) for batch in exporter.batches], [2, 1])
+
+    def test_full_batch_flushed(self):
+        """Ensure a full batch is flushed without being asked to."""
+        trace_stall(10, DATASTORE_STUB, 'Get')
+        trace_error(ValueError(), DATASTORE_STUB, 'Get')
+
+        # Waits for the background flush to let go of the lock.
+        flush()
+
+        self.assertEqual(len(exporter.batches), 1)
+        self.assertEqual([span['name'] for span in exporter.batches[0]],
+                         ['gchaos/latency', 'gchaos/error'])
+
+    @patch('gchaos.tracing.time')
+    def test_partial_batch_flushed(self, time):
+        """Ensure a partial batch is flushed once it waited long enough."""
+        time.return_value = tracing._LAST_FLUSH + 3600
+
+        trace_stall(10, DATASTORE_STUB, 'Get')
+        flush()
+
+        self.assertEqual(len(exporter.batches), 1)
+
+    def test_capacity(self):
+        """Ensure the oldest annotations are dropped past the capacity."""
+        configure(TracingConfig({
+            'enabled': True, 'capacity': 2, 'batch_size': 10,
+            'flush_interval': 3600,
+            'exporter': 'tests.test_tracing.exporter'}))
+
+        for milli_time in (1, 2, 3):
+            trace_stall(milli_time, DATASTORE_STUB, 'Get')
+
+        self.assertEqual(flush(), 2)
+        self.assertEqual(
+            [span['labels']['gchaos/stall_ms'] for span in
+             exporter.batches[0]], ['2', '3'])
+
+    @patch('gchaos.tracing.Thread')
+    def test_flush_without_threads(self, thread):
+        """Ensure annotations are flushed on the caller without threads."""
+        thread.return_value.start.side_effect = RuntimeError
+
+        trace_stall(10, DATASTORE_STUB, 'Get')
+        trace_stall(10, DATASTORE_STUB, 'Get')
+
+        self.assertEqual(len(exporter.batches), 1)
+        self.assertFalse(tracing._FLUSH_LOCK.locked())
+
+    @patch('gchaos.tracing._start_flush')
+    def test_exporter_failure(self, start_flush):
+        """Ensure a failing exporter drops the batch without raising."""
+        tracing._EXPORTER = MagicMock(side_effect=IOError)
+
+        trace_stall(10, DATASTORE_STUB, 'Get')
+
+        self.assertEqual(flush(), 0)
+        self.assertEqual(flush(), 0)
+
+    @patch.dict(os.environ, {
+        'HTTP_X_CLOUD_TRACE_CONTEXT': 'abc123/42;o=1',
+        'REQUEST_LOG_ID': 'request-1'})
+    @patch('gchaos.gae.datastore.latency.sleep')
+    @patch('gchaos.gae.datastore.latency.roll', return_value=True)
+    def test_stall_annotated(self, roll, sleep):
+        """Ensure a stall is annotated as a child of the request's span with
+        the service and call the hook was called with, the RPC's own aren't
+        set before it's made.
+        """
+        trigger_latency = latency_trigger(
+            LatencyConfig((25,), 1.0), LATENCY_MODES.BLOCKING)
+
+        trigger_latency(DATASTORE_STUB, 'Get', None, None, apiproxy_rpc.RPC())
+        flush()
+
+        span, = exporter.batches[0]
+        self.assertEqual(span['traceId'], 'abc123')
+        self.assertEqual(span['parentSpanId'], '42')
+        self.assertEqual(span['labels'], {
+            'gchaos/kind': 'latency',
+            'gchaos/stall_ms': '25',
+            'gchaos/service': 'datastore_v3',
+            'gchaos/action': 'Get',
+            'gchaos/request_id': 'request-1',
+        })
+
+    @patch('gchaos.gae.datastore.errors.roll', return_value=True)
+    def test_error_annotated(self, roll):
+        """Ensure a raised error is annotated with its class."""
+
+        self.assertRaises(
+            KeyError, trigger, ErrorConfig({KeyError: 1}, 1.0))
+        flush()
+
+        span, = exporter.batches[0]
+        self.assertEqual(span['labels']['gchaos/error'], 'KeyError')
+        self.assertNotIn('traceId', span)
+
+
+class SpanTestCase(unittest.TestCase):
+
+    def test_span(self):
+        """Ensure a stall's span lasts as long as the stall."""
+        span = to_span(Annotation(
+            0.5, None, None, 'memcache', 'Get', 'latency', 1500, None, True))
+
+        self.assertEqual(span['startTime'], '1970-01-01T00:00:00.500000Z')
+        self.assertEqual(span['endTime'], '1970-01-01T00:00:02.000000Z')
+        self.assertEqual(span['labels']['gchaos/deferred'], 'true')
+        self.assertNotEqual(span['spanId'], '0')
+
+    def test_parse_trace_context(self):
+        """Ensure the trace context parts are split out."""
+        self.assertEqual(parse_trace_context('abc/1;o=1'), ('abc', '1'))
+        self.assertEqual(parse_trace_context('abc'), ('abc', None))
+        self.assertEqual(parse_trace_context(None), (None, None))
+
+    def test_json_file_exporter(self):
+        """Ensure spans are appended to the file a line each."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'spans.json')
+
+        JsonFileExporter(path)([{'name': 'one'}])
+        JsonFileExporter(path)([{'name': 'two'}])
+
+        with open(path) as spans_file:
+            names = [json.loads(line)['name'] for line in spans_file]
+
+        self.assertEqual(names, ['one', 'two'])
+
+
+class TracingConfigTestCase(unittest.TestCase):
+
+    def test_exporter(self):
+        """Ensure the exporter path is resolved."""
+        config = TracingConfig({'exporter': 'tests.test_tracing.exporter'})
+
+        self.assertIs(config.exporter(), exporter)
+        self.assertIs(TracingConfig({}).exporter(), tracing.log_exporter)
+
+    def test_path(self):
+        """Ensure a path writes the spans to a file."""
+        config = TracingConfig({'path': '/tmp/spans.json'})
+
+        self.assertIsInstance(config.exporter(), JsonFileExporter)
+
+    def test_invalid(self):
+        """Ensure bad sizes are rejected."""
+        self.assertRaises(ValueError, TracingConfig, {'batch_size': 0})
+        self.assertRaises(ValueError, TracingConfig, {'capacity': -1})
+        self.assertRaises(ValueError, TracingConfig, {'flush_interval': -1})
@@ -0,0 +1,119 @@
+# MIT License
+
+# Copyright (c) 2017 Real Kinetic
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import unittest
+
+from mock import patch
+
+from google.appengine.api import datastore_errors
+
+from gchaos.utils import BadObjectPathError
+from gchaos.utils import full_name
+from gchaos.utils import get_func_info_for_path
+from gchaos.utils import LRUCache
+from gchaos.utils import resolve_path
+from gchaos.utils import _PATH_CACHE
+
+
+class GetFuncInfoForPathTestCase(unittest.TestCase):
+
+    def test_module_attribute(self):
+        """Ensure a module level path is found."""
+        result = get_func_info_for_path(full_name(datastore_errors.Timeout))
+
+        self.assertEqual(result.func, datastore_errors.Timeout)
+        self.assertEqual(result.name, "Timeout")
+
+    def test_builtin(self):
+        """Ensure a builtin without a module path is found."""
+        result = get_func_info_for_path("ValueError")
+
+        self.assertEqual(result.func, ValueError)
+
+    def test_missing_module(self):
+        """Ensure a missing module raises a BadObjectPathError."""
+        self.assertRaises(
+            BadObjectPathError, get_func_info_for_path, "notamodule.Error")
+
+    def test_missing_attribute(self):
+        """Ensure a missing attribute raises a BadObjectPathError."""
+        self.assertRaises(
+            BadObjectPathError, get_func_info_for_path,
+            "google.appengine.api.datastore_errors.NotAnError")
+
+
+class LRUCacheTestCase(unittest.TestCase):
+
+    def test_get_missing(self):
+        """Ensure the default is returned for missing keys."""
+        cache = LRUCache(2)
+
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("a", 1), 1)
+
+    def test_evicts_least_recently_used(self):
+        """Ensure the least recently used entry is evicted when full."""
+        cache = LRUCache(2)
+
+        cache.set("a", 1)
+        cache.set("b", 2)
+
+        # Touch a so b is the least recently used.
+        cache.get("a")
+
+        cache.set("c", 3)
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+
+
+class ResolvePathTestCase(unittest.TestCase):
+
+    def setUp(self):
+        _PATH_CACHE.clear()
+
+        super(ResolvePathTestCase, self).setUp()
+
+    def test_resolves_path(self):
+        """Ensure the path is resolved to the object."""
+        result = resolve_path(full_name(datastore_errors.Timeout))
+
+        self.assertEqual(result, datastore_errors.Timeout)
+
+    def test_non_string_returned(self):
+        """Ensure objects that are already resolved are returned as is."""
+        self.assertEqual(
+            resolve_path(datastore_errors.Timeout), datastore_errors.Timeout)
+
+    @patch('gchaos.utils.get_func_info_for_path',
+           wraps=get_func_info_for_path)
+    def test_memoized(self, get_func_info_mock):
+        """Ensure resolving the same path twice only imports once."""
+        path = full_name(datastore_errors.Timeout)
+
+        resolve_path(path)
+        resolve_path(path)
+
+        get_func_info_mock.assert_called_once_with(path)